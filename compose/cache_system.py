@@ -6,8 +6,10 @@ Provides intelligent caching for expensive operations like math rendering and di
 
 import hashlib
 import pickle
+import threading
 import time
-from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple, List
 from pathlib import Path
 import os
 
@@ -141,6 +143,8 @@ class IntelligentCache:
                 with open(cache_file, 'rb') as f:
                     entry = pickle.load(f)
                     if not entry.is_expired(self.default_ttl):
+                        # Mark the file used, so sweep_persistent removes it last
+                        os.utime(cache_file)
                         return entry.data
                     else:
                         # Remove expired file
@@ -162,6 +166,42 @@ class IntelligentCache:
             # If writing fails, just skip persistent caching
             pass
 
+    def sweep_persistent(self, max_bytes: int, max_age: float = None) -> int:
+        """
+        Bound the persistent cache directory.
+
+        Removes files unused for longer than max_age (the default TTL
+        unless given), then the least recently used ones until the rest
+        fit in max_bytes.
+
+        Returns:
+            Number of files removed
+        """
+        if max_age is None:
+            max_age = self.default_ttl
+        files = []
+        for cache_file in self.cache_dir.glob('*.cache'):
+            try:
+                stat = cache_file.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, cache_file))
+        files.sort(reverse=True)  # Most recently used first
+
+        removed = 0
+        kept_bytes = 0
+        cutoff = time.time() - max_age
+        for mtime, size, cache_file in files:
+            if mtime >= cutoff and kept_bytes + size <= max_bytes:
+                kept_bytes += size
+                continue
+            try:
+                cache_file.unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
     def _cache_file_path(self, key: str) -> Path:
         """Get cache file path for key"""
         # Create a safe filename from key hash
@@ -237,9 +277,328 @@ class DiagramCache:
         })
 
 
+class ContentStreamCache:
+    """
+    Persistent cache for compressed PDF page content streams.
+    Most pages are byte-identical between rebuilds, so their compressed
+    streams are reused instead of being compressed again. Every build
+    adds the pages it changed, so the streams live in their own directory
+    and sweep() bounds it after each build.
+    """
+
+    def __init__(self, max_disk: int = 64 * 1024 * 1024):  # 64MB
+        self.cache = IntelligentCache(max_memory=20 * 1024 * 1024,  # 20MB
+                                      default_ttl=7 * 24 * 3600)   # One week
+        self.cache.cache_dir = self.cache.cache_dir / 'streams'
+        self.cache.cache_dir.mkdir(exist_ok=True)
+        self.max_disk = max_disk
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(content: bytes, resources: str, level: int) -> str:
+        """Cache key for a page's operators, resources and compression level"""
+        digest = hashlib.sha256(content)
+        digest.update(f"\0{resources}\0{level}".encode('utf-8'))
+        return f"stream:{digest.hexdigest()}"
+
+    def get_stream(self, key: str) -> Optional[bytes]:
+        """Get a cached compressed stream from memory or disk"""
+        data = self.cache.get(key)
+        if data is None:
+            data = self.cache.persistent_get(key)
+            if data is not None:
+                self.cache.set(key, data, {'type': 'content_stream'})
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set_stream(self, key: str, data: bytes) -> None:
+        """Cache a compressed stream in memory and on disk"""
+        self.cache.set(key, data, {'type': 'content_stream'})
+        self.cache.persistent_set(key, data, {'type': 'content_stream'})
+
+    def sweep(self) -> int:
+        """Remove stale and least recently used streams beyond max_disk from disk"""
+        return self.cache.sweep_persistent(self.max_disk)
+
+
+class FontMetricsCache:
+    """
+    Persistent cache for parsed font tables.
+    Entries are keyed by the SHA-256 of the font file; a second index from
+    path, size and modification time to that hash lets unchanged files be
+    found without reading them at all.
+    """
+
+    def __init__(self):
+        self.cache = IntelligentCache(max_memory=10 * 1024 * 1024,  # 10MB
+                                      default_ttl=30 * 24 * 3600)  # 30 days
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_key(path: str, size: int, mtime_ns: int) -> str:
+        """Cache key identifying a font file by its location and stat data"""
+        return f"fontfile:{path}:{size}:{mtime_ns}"
+
+    def get_digest(self, file_key: str) -> Optional[str]:
+        """Get the content hash recorded for a font file"""
+        return self._get(file_key)
+
+    def set_digest(self, file_key: str, digest: str) -> None:
+        """Record the content hash of a font file"""
+        self._set(file_key, digest, 'font_digest')
+
+    def get_metrics(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Get the compact parsed tables of a font"""
+        data = self._get(f"fontmetrics:{digest}")
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set_metrics(self, digest: str, data: Dict[str, Any]) -> None:
+        """Cache the compact parsed tables of a font"""
+        self._set(f"fontmetrics:{digest}", data, 'font_metrics')
+
+    def _get(self, key: str) -> Any:
+        data = self.cache.get(key)
+        if data is None:
+            data = self.cache.persistent_get(key)
+            if data is not None:
+                self.cache.set(key, data)
+        return data
+
+    def _set(self, key: str, data: Any, kind: str) -> None:
+        self.cache.set(key, data, {'type': kind})
+        self.cache.persistent_set(key, data, {'type': kind})
+
+
+class LineBreakCache:
+    """
+    Cache of paragraph line breaks, in memory and optionally on disk.
+    Entries are keyed by a fingerprint of the paragraph text, line width,
+    font, size and breaker settings, and hold each line's end position
+    and adjustment ratio. Measuring and rendering the same paragraph, or
+    rebuilding an unchanged one, reuse a single break computation. The
+    memory side is a bounded LRU like WordWidthCache; files on disk live
+    in their own directory and sweep() bounds it after each build.
+    """
+
+    def __init__(self, max_entries: int = 5000,
+                 max_disk: int = 16 * 1024 * 1024):  # 16MB
+        self.max_entries = max_entries
+        self.breaks: "OrderedDict[str, Tuple[List[int], List[float]]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.disk = IntelligentCache(max_memory=0,
+                                     default_ttl=7 * 24 * 3600)  # One week
+        self.disk.cache_dir = self.disk.cache_dir / 'linebreaks'
+        self.disk.cache_dir.mkdir(exist_ok=True)
+        self.max_disk = max_disk
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint(text: str, line_width: float, font_key: str, size: float, settings: str) -> str:
+        """Cache key for breaking one paragraph at one measure"""
+        digest = hashlib.sha256(text.encode('utf-8', 'surrogatepass'))
+        digest.update(f"\0{line_width!r}\0{font_key}\0{size!r}\0{settings}".encode('utf-8'))
+        return f"linebreaks:{digest.hexdigest()}"
+
+    def get_breaks(self, key: str, persistent: bool = True) -> Optional[Tuple[List[int], List[float]]]:
+        """Get cached line end positions and adjustment ratios"""
+        data = self._lookup(key, persistent)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def has_breaks(self, key: str, persistent: bool = True) -> bool:
+        """Check for cached breaks without counting a hit or miss"""
+        return self._lookup(key, persistent) is not None
+
+    def set_breaks(self, key: str, ends: List[int], ratios: List[float],
+                   persistent: bool = True) -> None:
+        """Cache the breaks of a paragraph in memory and, if persistent, on disk"""
+        data = (ends, ratios)
+        self._remember(key, data)
+        if persistent:
+            self.disk.persistent_set(key, data, {'type': 'line_breaks'})
+
+    def sweep(self) -> int:
+        """Remove stale and least recently used breaks beyond max_disk from disk"""
+        return self.disk.sweep_persistent(self.max_disk)
+
+    def clear(self) -> None:
+        """Drop every in-memory entry and reset the statistics"""
+        with self.lock:
+            self.breaks.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.breaks),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: str, persistent: bool) -> Optional[Tuple[List[int], List[float]]]:
+        with self.lock:
+            data = self.breaks.get(key)
+            if data is not None:
+                self.breaks.move_to_end(key)
+                return data
+        if persistent:
+            data = self.disk.persistent_get(key)
+            if data is not None:
+                self._remember(key, data)
+        return data
+
+    def _remember(self, key: str, data: Tuple[List[int], List[float]]) -> None:
+        with self.lock:
+            self.breaks[key] = data
+            self.breaks.move_to_end(key)
+            if len(self.breaks) > self.max_entries:
+                self.breaks.popitem(last=False)
+                self.evictions += 1
+
+
+class HyphenationCache:
+    """
+    Persistent cache for compiled hyphenation pattern tries.
+    Entries are keyed by the SHA-256 of the pattern file, so editing the
+    patterns compiles them again.
+    """
+
+    def __init__(self):
+        self.cache = IntelligentCache(max_memory=5 * 1024 * 1024,  # 5MB
+                                      default_ttl=30 * 24 * 3600)  # 30 days
+        self.hits = 0
+        self.misses = 0
+
+    def get_trie(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Get the packed trie compiled from a pattern file"""
+        key = f"hyphenation:{digest}"
+        data = self.cache.get(key)
+        if data is None:
+            data = self.cache.persistent_get(key)
+            if data is not None:
+                self.cache.set(key, data)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set_trie(self, digest: str, data: Dict[str, Any]) -> None:
+        """Cache the packed trie compiled from a pattern file"""
+        key = f"hyphenation:{digest}"
+        self.cache.set(key, data, {'type': 'hyphenation'})
+        self.cache.persistent_set(key, data, {'type': 'hyphenation'})
+
+
+class WordWidthCache:
+    """
+    In-memory LRU cache of word widths, keyed by font, size and word.
+    Text is measured word by word, so a line, a paragraph and every later
+    build that reuses the same words only measure each word once. The
+    cache is bounded, thread-safe and shared by every renderer in the
+    process.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self.widths: "OrderedDict[Tuple[str, float, str], float]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def text_width(self, font_key: str, text: str, size: float,
+                   measure: Callable[[str], float]) -> float:
+        """
+        Width of text at a size, from cached word widths.
+
+        Args:
+            font_key: Identifies the font's metrics (not just its name)
+            text: Text to measure; split into words at single spaces
+            size: Font size in points
+            measure: Measures one word (or a space) at this size on a miss
+
+        Returns:
+            Width in points
+        """
+        words = text.split(' ')
+        total = 0.0
+        for word in words:
+            if word:
+                total += self.word_width(font_key, word, size, measure)
+        if len(words) > 1:
+            total += (len(words) - 1) * self.word_width(font_key, ' ', size, measure)
+        return total
+
+    def word_width(self, font_key: str, word: str, size: float,
+                   measure: Callable[[str], float]) -> float:
+        """Width of one word, measured on a miss and cached"""
+        key = (font_key, size, word)
+        with self.lock:
+            width = self.widths.get(key)
+            if width is not None:
+                self.widths.move_to_end(key)
+                self.hits += 1
+                return width
+            self.misses += 1
+        width = measure(word)
+        with self.lock:
+            self.widths[key] = width
+            if len(self.widths) > self.max_entries:
+                self.widths.popitem(last=False)
+                self.evictions += 1
+        return width
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Drop every cached width and reset the statistics"""
+        with self.lock:
+            self.widths.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {
+            'entries': len(self.widths),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+
 # Global cache instances
 math_cache = MathExpressionCache()
 diagram_cache = DiagramCache()
+content_stream_cache = ContentStreamCache()
+font_metrics_cache = FontMetricsCache()
+word_width_cache = WordWidthCache()
+line_break_cache = LineBreakCache()
+hyphenation_cache = HyphenationCache()
 
 
 def optimize_memory_usage():
@@ -260,7 +619,12 @@ def get_cache_stats() -> Dict[str, Any]:
     return {
         'math_cache': math_cache.memory_cache.stats(),
         'diagram_cache': diagram_cache.cache.stats(),
-        'render_cache': math_cache.render_cache.stats()
+        'render_cache': math_cache.render_cache.stats(),
+        'content_stream_cache': content_stream_cache.cache.stats(),
+        'font_metrics_cache': font_metrics_cache.cache.stats(),
+        'word_width_cache': word_width_cache.stats(),
+        'line_break_cache': line_break_cache.stats(),
+        'hyphenation_cache': hyphenation_cache.cache.stats()
     }
 
 
@@ -135,7 +135,8 @@ def watch_and_build(md_path: str, cfg_path: str):
                     build_count += 1
                     print(f"\n--- Build #{build_count} ---")
                     try:
-                        build(md_path, cfg_path)
+                        # Only changed pages are appended to the PDF
+                        build(md_path, cfg_path, incremental=True)
                         print("✓ Build successful")
                     except Exception as e:
                         print(f"✗ Build failed: {e}")
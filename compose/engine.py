@@ -17,7 +17,11 @@ from .render.multi_page import MultiPageRenderer
 from .render.cross_references import CrossReferenceProcessor, TableOfContentsGenerator
 from .analysis.document_analyzer import DocumentAnalyzer
 
-def build(md_path, cfg_path):
+# Incremental (watch-mode) builds pass the last build's layout checkpoints
+# to the next build's PDF renderer
+_layout_record = None
+
+def build(md_path, cfg_path, incremental=False):
     config = parse_config(cfg_path)
     
     # Initialize plugin system
@@ -72,19 +76,33 @@ def build(md_path, cfg_path):
     # Handle document modes
     if output == 'pdf':
         from .render.pdf_renderer import ProfessionalPDFRenderer
+        global _layout_record
         renderer = ProfessionalPDFRenderer()
-        pdf_data = renderer.render(doc, config)
-        print(f"Generated {len(pdf_data)} bytes of PDF data")
-        print(f"First 20 bytes: {pdf_data[:20]}")
-        
-        # Write to temporary file first
-        temp_file = 'output.pdf.tmp'
-        with open(temp_file, 'wb') as f:
-            f.write(pdf_data)
-        
-        # Rename to final file
+        if incremental:
+            # Only what an edit reached is laid out again. The renderer itself
+            # is new, so options removed from the config fall back to defaults.
+            renderer.layout_checkpoints = True
+            renderer.layout_record = _layout_record
+        renderer.incremental = incremental
+        renderer.stream_cache = True  # Unchanged pages come from earlier builds
+
         import os
-        os.rename(temp_file, 'output.pdf')
+        if config.get('pdf', {}).get('incremental', incremental):
+            # Changed objects are appended to output.pdf in place
+            renderer.render(doc, config, output='output.pdf')
+            if renderer.incremental_target is not None:
+                print(renderer.writer.summary())
+        else:
+            # Stream straight into a temporary file first
+            temp_file = 'output.pdf.tmp'
+            renderer.render(doc, config, output=temp_file)
+            print(f"Generated {os.path.getsize(temp_file)} bytes of PDF data")
+
+            # Rename to final file
+            os.replace(temp_file, 'output.pdf')
+        if incremental:
+            _layout_record = renderer.layout_record
+        print(renderer.compression_stats.summary(renderer.compression_level))
         print("PDF output written to output.pdf")
     elif output == 'html':
         if multi_page:
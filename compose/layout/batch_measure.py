@@ -0,0 +1,105 @@
+"""
+Batch text measurement.
+
+Paragraph breaking and table layout measure thousands of words at a
+time. ``measure_words`` measures a whole list in one call: with NumPy
+installed the words are joined into a single array of code points, widths
+are looked up through a per-font width table and summed per word with
+one cumulative sum. Without NumPy each word is measured through the
+shared word width cache, giving the same numbers.
+
+Fonts are any object with ``cache_key``, ``char_widths()``,
+``missing_width``, ``units_per_em`` and ``text_width(text, size)`` -
+the standard fonts and embedded TrueType fonts both qualify.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from ..cache_system import word_width_cache
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+# Width tables cover the Basic Multilingual Plane; code points above it
+# are looked up individually
+TABLE_LIMIT = 0x10000
+
+
+@dataclass
+class BatchMeasurement:
+    """
+    Widths of a list of words, in points.
+
+    ``widths`` and ``prefix_sums`` are NumPy arrays when NumPy is
+    installed and lists otherwise. ``prefix_sums[i]`` is the total width
+    of the first ``i`` words, so it has one more entry than ``widths``.
+    """
+    widths: Sequence[float]
+    prefix_sums: Optional[Sequence[float]] = None
+
+
+@lru_cache(maxsize=32)
+def _width_table(font: Any) -> Tuple[Any, Dict[int, int]]:
+    """Dense width array over the BMP, plus widths of any astral characters."""
+    table = np.full(TABLE_LIMIT + 1, font.missing_width, dtype=np.int64)
+    astral = {}
+    for code_point, width in font.char_widths().items():
+        if code_point < TABLE_LIMIT:
+            table[code_point] = width
+        else:
+            astral[code_point] = width
+    return table, astral
+
+
+def _char_units(font: Any, text: str):
+    """Width in font units of every character of text."""
+    code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    table, astral = _width_table(font)
+    units = table[np.minimum(code_points, TABLE_LIMIT)]
+    for index in np.flatnonzero(code_points >= TABLE_LIMIT):
+        units[index] = astral.get(int(code_points[index]), font.missing_width)
+    return units
+
+
+def measure_words(font: Any, words: Sequence[str], size: float,
+                  prefix_sums: bool = False) -> BatchMeasurement:
+    """
+    Measure many words in one call.
+
+    Args:
+        font: Font to measure with (see the module docstring)
+        words: Words (or any strings) to measure
+        size: Font size in points
+        prefix_sums: Also return the running total of the widths
+
+    Returns:
+        BatchMeasurement with one width per word
+    """
+    if not HAS_NUMPY:
+        widths = [word_width_cache.text_width(font.cache_key, word, size,
+                                              lambda text: font.text_width(text, size))
+                  for word in words]
+        sums = list(accumulate(widths, initial=0.0)) if prefix_sums else None
+        return BatchMeasurement(widths, sums)
+
+    lengths = np.fromiter((len(word) for word in words), dtype=np.int64, count=len(words))
+    ends = np.cumsum(lengths)
+    total_chars = int(ends[-1]) if len(ends) else 0
+    char_sums = np.zeros(total_chars + 1, dtype=np.int64)
+    np.cumsum(_char_units(font, "".join(words)), out=char_sums[1:])
+    units = char_sums[ends] - char_sums[ends - lengths]
+    widths = units * (size / font.units_per_em)
+
+    sums = None
+    if prefix_sums:
+        sums = np.zeros(len(widths) + 1)
+        np.cumsum(widths, out=sums[1:])
+    return BatchMeasurement(widths, sums)
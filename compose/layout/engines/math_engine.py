@@ -18,7 +18,7 @@ from ..box_model import (
 )
 from ..font_metrics import MathFontMetrics
 from ..math_layout import MathLayoutEngine as _AdvancedMathLayout, MathStyle, layout_matrix, layout_fraction as layout_fraction_simple, layout_large_operator, layout_radical
-from ..knuth_plass import MathKnuthPlassBreaker
+from ..knuth_plass import MathKnuthPlassBreaker, create_breakpoints_from_text
 
 
 class MathLayoutEngine:
@@ -113,10 +113,13 @@ class MathLayoutEngine:
         Returns:
             List of line strings
         """
+        words = text.split()
+        if not words:
+            return [text]
         breaker = MathKnuthPlassBreaker(line_width)
-        # This is a simplified implementation - would need proper breakpoint creation
-        # For now, just return the original text as a single line
-        return [text]
+        breaks = breaker.find_optimal_breaks(create_breakpoints_from_text(text, {}))
+        # Breakpoint i follows word i - 1, so a line from break a to b holds words a..b-1
+        return [' '.join(words[line.start_position:line.end_position]) for line in breaks]
 
     # Convenience methods for advanced layouts
     def create_matrix_box(self, rows: List[List[str]]):
@@ -0,0 +1,267 @@
+"""
+Liang hyphenation.
+
+Hyphenation points come from Liang's patterns, as in TeX. A language's
+pattern file under ``hyphenation_data/`` is compiled into a packed trie:
+every node's outgoing edges sit in one sorted run of a flat ``array``, so
+following an edge is a binary search, and each node's pattern values are
+a slice of a byte array. The compiled arrays are kept in the persistent
+hyphenation cache, keyed by the pattern file's hash, so later runs skip
+parsing the patterns altogether.
+
+Languages are loaded the first time ``get_hyphenator`` is asked for them,
+and each hyphenator remembers the points of the words it has seen.
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..cache_system import hyphenation_cache
+
+
+# Characters kept before and after a hyphen, as TeX's \lefthyphenmin and \righthyphenmin
+DEFAULT_LEFT_MIN = 2
+DEFAULT_RIGHT_MIN = 3
+
+# Words whose hyphenation points each hyphenator remembers
+WORD_CACHE_SIZE = 65536
+
+# Bumped whenever the packed layout or the parsing of pattern files changes,
+# so stale cached tries are ignored
+TRIE_FORMAT = 2
+
+_DATA_DIR = Path(__file__).parent / "hyphenation_data"
+
+
+class PackedTrie:
+    """
+    Liang patterns packed into flat arrays.
+
+    Node ``n`` has edges ``edge_start[n]:edge_start[n + 1]`` in
+    ``edge_chars`` (sorted code points) and ``edge_targets``, and the
+    values of the pattern ending at it are
+    ``values[value_start[n]:value_start[n + 1]]``. Node 0 is the root.
+    """
+
+    def __init__(self, edge_start: array, edge_chars: array, edge_targets: array,
+                 value_start: array, values: array):
+        self.edge_start = edge_start
+        self.edge_chars = edge_chars
+        self.edge_targets = edge_targets
+        self.value_start = value_start
+        self.values = values
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str]) -> 'PackedTrie':
+        """
+        Compile patterns such as ``".ach4"`` or ``"1ba"``.
+
+        Each pattern's digits become its values, one per gap between (and
+        around) its letters; a missing digit is 0.
+        """
+        children: List[Dict[str, int]] = [{}]
+        node_values: Dict[int, List[int]] = {}
+        for pattern in patterns:
+            letters = [char for char in pattern if not char.isdigit()]
+            digits = [0] * (len(letters) + 1)
+            position = 0
+            for char in pattern:
+                if char.isdigit():
+                    digits[position] = int(char)
+                else:
+                    position += 1
+
+            node = 0
+            for letter in letters:
+                child = children[node].get(letter)
+                if child is None:
+                    child = children[node][letter] = len(children)
+                    children.append({})
+                node = child
+            node_values[node] = digits
+
+        edge_start, edge_chars, edge_targets = array('I', [0]), array('I'), array('I')
+        value_start, values = array('I', [0]), array('B')
+        for node, edges in enumerate(children):
+            for letter in sorted(edges):
+                edge_chars.append(ord(letter))
+                edge_targets.append(edges[letter])
+            edge_start.append(len(edge_chars))
+            values.extend(node_values.get(node, ()))
+            value_start.append(len(values))
+        return cls(edge_start, edge_chars, edge_targets, value_start, values)
+
+    def to_dict(self) -> Dict[str, bytes]:
+        """The arrays as bytes, for the persistent cache."""
+        return {name: getattr(self, name).tobytes()
+                for name in ('edge_start', 'edge_chars', 'edge_targets', 'value_start', 'values')}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, bytes]) -> 'PackedTrie':
+        """Rebuild a trie saved with ``to_dict``."""
+        def load(typecode: str, name: str) -> array:
+            packed = array(typecode)
+            packed.frombytes(data[name])
+            return packed
+        return cls(load('I', 'edge_start'), load('I', 'edge_chars'), load('I', 'edge_targets'),
+                   load('I', 'value_start'), load('B', 'values'))
+
+    def points(self, text: str) -> List[int]:
+        """
+        Highest pattern value at each gap of ``text``.
+
+        Returns:
+            ``len(text) + 1`` values; entry ``i`` is the gap before ``text[i]``
+        """
+        edge_start, edge_chars, edge_targets = self.edge_start, self.edge_chars, self.edge_targets
+        value_start, values = self.value_start, self.values
+        codes = [ord(char) for char in text]
+        points = [0] * (len(codes) + 1)
+
+        for start in range(len(codes)):
+            node = 0
+            for code in codes[start:]:
+                low, high = edge_start[node], edge_start[node + 1]
+                index = bisect_left(edge_chars, code, low, high)
+                if index == high or edge_chars[index] != code:
+                    break
+                node = edge_targets[index]
+                first, last = value_start[node], value_start[node + 1]
+                for offset in range(last - first):
+                    value = values[first + offset]
+                    if value > points[start + offset]:
+                        points[start + offset] = value
+        return points
+
+
+class Hyphenator:
+    """Hyphenation points of words in one language."""
+
+    def __init__(self, language: str, trie: PackedTrie, exceptions: Dict[str, Tuple[int, ...]],
+                 left_min: int = DEFAULT_LEFT_MIN, right_min: int = DEFAULT_RIGHT_MIN):
+        """
+        Initialize the hyphenator; use ``get_hyphenator`` to load a language.
+
+        Args:
+            language: Language code such as "en-us"
+            trie: Compiled patterns
+            exceptions: Hyphenation points of words the patterns get wrong,
+                        keyed by lowercase word
+            left_min: Fewest characters before a hyphen
+            right_min: Fewest characters after a hyphen
+        """
+        self.language = language
+        self.trie = trie
+        self.exceptions = exceptions
+        self.left_min = left_min
+        self.right_min = right_min
+        self._word_positions = lru_cache(maxsize=WORD_CACHE_SIZE)(self._compute_positions)
+
+    def positions(self, word: str) -> Tuple[int, ...]:
+        """
+        Where a word may be hyphenated.
+
+        Leading and trailing punctuation is ignored; words with other
+        characters than letters inside are never hyphenated.
+
+        Returns:
+            Indices ``i`` such that the word may break before ``word[i]``
+        """
+        return self._word_positions(word)
+
+    def split(self, word: str) -> List[str]:
+        """The word cut at every hyphenation point."""
+        cuts = (0, *self.positions(word), len(word))
+        return [word[start:end] for start, end in zip(cuts, cuts[1:])]
+
+    def _compute_positions(self, word: str) -> Tuple[int, ...]:
+        lead = 0
+        while lead < len(word) and not word[lead].isalpha():
+            lead += 1
+        tail = len(word)
+        while tail > lead and not word[tail - 1].isalpha():
+            tail -= 1
+        core = word[lead:tail].lower()
+        if len(core) < self.left_min + self.right_min or not core.isalpha():
+            return ()
+
+        allowed = range(self.left_min, len(core) - self.right_min + 1)
+        if core in self.exceptions:
+            return tuple(lead + i for i in self.exceptions[core] if i in allowed)
+        points = self.trie.points(f".{core}.")
+        # Gap i of the core is gap i + 1 of ".core."; odd values allow a break
+        return tuple(lead + i for i in allowed if points[i + 1] % 2)
+
+
+def _parse_patterns(lines: Iterable[str]) -> Tuple[List[str], Dict[str, Tuple[int, ...]]]:
+    """
+    Patterns and exceptions from a ``hyphenation_data`` file.
+
+    Every pattern has at least one digit; an entry without digits is an
+    exception word, hyphenated only where it has hyphens (a word with none
+    is never hyphenated).
+    """
+    patterns, exceptions = [], {}
+    for line in lines:
+        entry = line.strip()
+        if not entry or entry.startswith("%"):
+            continue
+        if not any(character.isdigit() for character in entry):
+            parts = entry.lower().split("-")
+            cuts = []
+            for part in parts[:-1]:
+                cuts.append((cuts[-1] if cuts else 0) + len(part))
+            exceptions["".join(parts)] = tuple(cuts)
+        else:
+            patterns.append(entry)
+    return patterns, exceptions
+
+
+def normalize_language(language: str) -> str:
+    """Language code as pattern files are named ("en_US" -> "en-us")."""
+    return language.strip().lower().replace("_", "-")
+
+
+def available_languages() -> List[str]:
+    """Languages with a pattern file."""
+    return sorted(path.stem for path in _DATA_DIR.glob("*.txt") if path.stem != "README")
+
+
+def get_hyphenator(language: str = "en-us") -> Optional[Hyphenator]:
+    """
+    Load a language's hyphenator, once per process.
+
+    A bare language such as "en" uses the first regional patterns for it.
+
+    Args:
+        language: Language code such as "en-US"
+
+    Returns:
+        The hyphenator, or None if there are no patterns for ``language``
+    """
+    return _load_hyphenator(normalize_language(language))
+
+
+@lru_cache(maxsize=None)
+def _load_hyphenator(language: str) -> Optional[Hyphenator]:
+    languages = available_languages()
+    if language not in languages:
+        regional = [name for name in languages if name.split("-")[0] == language.split("-")[0]]
+        if not regional:
+            return None
+        language = regional[0]
+
+    data = (_DATA_DIR / f"{language}.txt").read_bytes()
+    digest = hashlib.sha256(data + f"\0{TRIE_FORMAT}".encode("ascii")).hexdigest()
+    cached = hyphenation_cache.get_trie(digest)
+    if cached is not None:
+        return Hyphenator(language, PackedTrie.from_dict(cached['trie']), cached['exceptions'])
+
+    patterns, exceptions = _parse_patterns(data.decode("utf-8").splitlines())
+    trie = PackedTrie.from_patterns(patterns)
+    hyphenation_cache.set_trie(digest, {'trie': trie.to_dict(), 'exceptions': exceptions})
+    return Hyphenator(language, trie, exceptions)
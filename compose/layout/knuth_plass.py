@@ -6,10 +6,14 @@ This implements the classic dynamic programming algorithm for optimal line break
 in typography, adapted for both text and mathematical content.
 """
 
-from typing import List, Tuple, Optional, Dict, Any
+from itertools import accumulate
+from typing import List, Tuple, Optional, Dict, Any, Sequence
 from dataclasses import dataclass
 from enum import Enum
 
+from .batch_measure import measure_words
+from .hyphenation import Hyphenator
+
 
 class BreakType(Enum):
     """Types of line breaks"""
@@ -28,6 +32,8 @@ class Breakpoint:
     penalty: float        # Break penalty
     break_type: BreakType
     is_hyphenated: bool   # Whether this break includes hyphenation
+    glue_width: float = 0.0  # Part of width that is glue, dropped when breaking here
+    hyphen_width: float = 0.0  # Width of the hyphen added when breaking here
 
 
 @dataclass
@@ -40,6 +46,23 @@ class LineBreak:
     demerits: float         # Quality score
 
 
+# Badness of a line that cannot stretch enough (TeX's inf_bad)
+INF_BADNESS = 10000.0
+
+# Penalty for breaking at a hyphenation point (TeX's \hyphenpenalty)
+HYPHEN_PENALTY = 50.0
+
+
+@dataclass
+class _BreakNode:
+    """An active (or chosen) break: the best way to end a line at a breakpoint"""
+    position: int                       # Breakpoint index
+    fitness: int                        # Fitness class of the line ending here
+    total_demerits: float               # Demerits of the paragraph up to here
+    adjustment_ratio: float             # Ratio of the line ending here
+    previous: Optional['_BreakNode']    # Break that starts that line
+
+
 class KnuthPlassBreaker:
     """
     Implementation of the Knuth-Plass line breaking algorithm.
@@ -49,6 +72,13 @@ class KnuthPlassBreaker:
     - Badness of line spacing (stretch/shrink)
     - Penalties for breaking at certain points
     - Bonus for breaking at good points
+
+    As in TeX, line widths, stretch and shrink come from cumulative sums,
+    so measuring any candidate line is O(1). Each breakpoint keeps at most
+    one active node per fitness class, and a node is deactivated as soon
+    as the line from it is overfull - no later line from it can fit - so
+    only the nodes within one line's reach are ever examined and long
+    paragraphs break in near-linear time.
     """
 
     def __init__(self, line_width: float, tolerance: float = 100.0):
@@ -62,10 +92,15 @@ class KnuthPlassBreaker:
         self.line_width = line_width
         self.tolerance = tolerance
 
+        # Running totals for the paragraph being broken
+        self._width_sums: List[float] = []
+        self._stretch_sums: List[float] = []
+        self._shrink_sums: List[float] = []
+
         # Algorithm parameters (from TeX)
         self.looseness = 0  # Allow stretching beyond tolerance
         self.paragraph_indent = 0.0
-        self.emergency_stretch = 0.0  # Emergency stretchability
+        self.emergency_stretch = 0.0  # Extra stretch per line in the final pass
 
         # Fitness classes for different line types
         self.fitness_classes = {
@@ -79,92 +114,156 @@ class KnuthPlassBreaker:
         """
         Find optimal line breaks using dynamic programming.
 
+        A first pass only accepts lines within ``tolerance``. If the
+        paragraph cannot be set that way, a final pass accepts any line
+        that is not overfull (with ``emergency_stretch`` added) and, where
+        even that is impossible, lets a line run overfull.
+
         Args:
-            breakpoints: List of potential breaking points
+            breakpoints: List of potential breaking points; the first one
+                         is the start of the paragraph
 
         Returns:
             List of optimal line breaks
         """
-        if not breakpoints:
+        if len(breakpoints) < 2:
             return []
 
-        n = len(breakpoints)
-
-        # Dynamic programming tables
-        active_lines = []  # Active (incomplete) lines
-        best_breaks = {}   # Best predecessor for each breakpoint
-        line_costs = {}    # Cost to reach each breakpoint
-
-        # Initialize with starting point
-        start_breakpoint = Breakpoint(0, 0, 0, 0, 0, BreakType.NORMAL, False)
-        active_lines.append((0, 0, start_breakpoint))  # (position, fitness_class, breakpoint)
-        line_costs[0] = 0
+        self._prepare_sums(breakpoints)
+        end_node = self._break_pass(breakpoints, self.tolerance, final=False)
+        if end_node is None:
+            end_node = self._break_pass(breakpoints, INF_BADNESS, final=True)
+        return self._reconstruct_breaks(end_node, breakpoints)
 
-        for j in range(1, n):
-            current_breakpoint = breakpoints[j]
+    def _prepare_sums(self, breakpoints: List[Breakpoint]):
+        """Cumulative width, stretch and shrink of the breakpoints"""
+        self._width_sums = list(accumulate((bp.width for bp in breakpoints), initial=0.0))
+        self._stretch_sums = list(accumulate((bp.stretch for bp in breakpoints), initial=0.0))
+        self._shrink_sums = list(accumulate((bp.shrink for bp in breakpoints), initial=0.0))
 
-            # Consider all possible predecessors
-            best_predecessor = None
-            best_cost = float('inf')
-            best_fitness = None
+    def _break_pass(self, breakpoints: List[Breakpoint], tolerance: float,
+                    final: bool) -> Optional[_BreakNode]:
+        """
+        One pass over the paragraph.
 
-            for position, fitness_class, prev_breakpoint in active_lines:
-                # Calculate line width from position to j
-                line_width = self._calculate_line_width(breakpoints, position, j)
-                if line_width > self.line_width * 2:  # Skip impossibly long lines
+        Returns:
+            The best node at the last breakpoint, or None if this pass
+            cannot set the paragraph
+        """
+        widths, stretches, shrinks = self._width_sums, self._stretch_sums, self._shrink_sums
+        extra_stretch = self.emergency_stretch if final else 0.0
+        last = len(breakpoints) - 1
+
+        active = [_BreakNode(0, self.fitness_classes['decent'], 0.0, 0.0, None)]
+        last_deactivated = active[0]
+
+        for j in range(1, last + 1):
+            breakpoint = breakpoints[j]
+            if breakpoint.break_type == BreakType.PREVENT:
+                continue
+            forced = breakpoint.break_type == BreakType.FORCE or j == last
+
+            # The glue at the break is dropped from the line ending here, a hyphen added
+            width_end = widths[j + 1] - breakpoint.glue_width + breakpoint.hyphen_width
+            stretch_end = stretches[j + 1] - breakpoint.stretch + extra_stretch
+            shrink_end = shrinks[j + 1] - breakpoint.shrink
+
+            # Best way to reach j for each fitness class: (demerits, node, ratio)
+            candidates: Dict[int, Tuple[float, _BreakNode, float]] = {}
+            still_active = []
+            for node in active:
+                start = node.position + 1
+                width = width_end - widths[start]
+                if forced and width <= self.line_width:
+                    # The last line of a paragraph is filled, not stretched
+                    adjustment_ratio, badness = 0.0, 0.0
+                else:
+                    adjustment_ratio, badness = self._calculate_badness(
+                        width, stretch_end - stretches[start], shrink_end - shrinks[start])
+
+                if adjustment_ratio < -1:
+                    # Overfull, and every later line from this node is longer
+                    last_deactivated = node
                     continue
+                still_active.append(node)
 
-                # Calculate adjustment ratio and badness
-                adjustment_ratio, badness = self._calculate_badness(line_width)
-
-                if badness > self.tolerance:
+                badness = min(badness, INF_BADNESS)
+                if badness > tolerance:
                     continue
 
-                # Calculate demerits for this break
-                demerits = self._calculate_demerits(
-                    badness, current_breakpoint.penalty,
-                    fitness_class, self._get_fitness_class(adjustment_ratio)
-                )
-
-                total_cost = line_costs[position] + demerits
-
-                if total_cost < best_cost:
-                    best_cost = total_cost
-                    best_predecessor = (position, fitness_class, prev_breakpoint)
-                    best_fitness = self._get_fitness_class(adjustment_ratio)
-
-            if best_predecessor is not None:
-                best_breaks[j] = best_predecessor
-                line_costs[j] = best_cost
-                active_lines.append((j, best_fitness, current_breakpoint))
+                fitness = self._get_fitness_class(adjustment_ratio)
+                demerits = node.total_demerits + self._calculate_demerits(
+                    badness, breakpoint.penalty, node.fitness, fitness)
+                best = candidates.get(fitness)
+                if best is None or demerits < best[0]:
+                    candidates[fitness] = (demerits, node, adjustment_ratio)
+
+            # Nothing may span a forced break
+            active = [] if forced else still_active
+            for fitness, (demerits, node, adjustment_ratio) in candidates.items():
+                active.append(_BreakNode(j, fitness, demerits, adjustment_ratio, node))
+
+            if not active:
+                if not final:
+                    return None
+                # No line can end here within the rules: let one run overfull
+                active = [self._overfull_node(breakpoints, last_deactivated, j)]
+
+        return min(active, key=lambda node: node.total_demerits)
+
+    def _overfull_node(self, breakpoints: List[Breakpoint], node: _BreakNode,
+                       position: int) -> _BreakNode:
+        """Break at ``position`` after an overfull line from ``node``"""
+        adjustment_ratio, _ = self._calculate_badness(
+            *self._line_metrics(breakpoints, node.position, position))
+        fitness = self.fitness_classes['tight']
+        demerits = node.total_demerits + self._calculate_demerits(
+            INF_BADNESS, breakpoints[position].penalty, node.fitness, fitness)
+        return _BreakNode(position, fitness, demerits, adjustment_ratio, node)
+
+    def _line_metrics(self, breakpoints: List[Breakpoint], start: int,
+                      end: int) -> Tuple[float, float, float]:
+        """
+        Natural width, stretch and shrink of the line from start to end.
 
-        # Find optimal path
-        return self._reconstruct_breaks(best_breaks, n - 1, breakpoints)
+        The glue of the breakpoint the line ends at is dropped, and its
+        hyphen added.
+        """
+        if len(self._width_sums) != len(breakpoints) + 1:
+            self._prepare_sums(breakpoints)
+        last = breakpoints[end]
+        return (self._width_sums[end + 1] - self._width_sums[start + 1] - last.glue_width + last.hyphen_width,
+                self._stretch_sums[end + 1] - self._stretch_sums[start + 1] - last.stretch,
+                self._shrink_sums[end + 1] - self._shrink_sums[start + 1] - last.shrink)
 
     def _calculate_line_width(self, breakpoints: List[Breakpoint], start: int, end: int) -> float:
         """Calculate the width of a line from start to end breakpoint"""
-        width = 0
-        for i in range(start + 1, end + 1):
-            width += breakpoints[i].width
-        return width
+        return self._line_metrics(breakpoints, start, end)[0]
 
-    def _calculate_badness(self, line_width: float) -> Tuple[float, float]:
+    def _calculate_badness(self, line_width: float, stretch: float,
+                           shrink: float) -> Tuple[float, float]:
         """
         Calculate adjustment ratio and badness for a line.
 
+        Args:
+            line_width: Natural width of the line
+            stretch: Total stretchability of its glue
+            shrink: Total shrinkability of its glue
+
         Returns:
-            (adjustment_ratio, badness)
+            (adjustment_ratio, badness); the ratio is below -1 when the
+            line cannot shrink enough
         """
         if line_width < self.line_width:
             # Line is too short, needs stretching
-            adjustment_ratio = (self.line_width - line_width) / max(line_width * 0.5, 1)
+            adjustment_ratio = (self.line_width - line_width) / stretch if stretch > 0 else float('inf')
         elif line_width > self.line_width:
             # Line is too long, needs shrinking
-            adjustment_ratio = (line_width - self.line_width) / max(line_width * 0.5, 1)
+            adjustment_ratio = (self.line_width - line_width) / shrink if shrink > 0 else float('-inf')
         else:
-            adjustment_ratio = 0
+            adjustment_ratio = 0.0
 
-        # Badness is roughly proportional to adjustment ratio squared
+        # Badness grows with the cube of the adjustment ratio, as in TeX
         badness = 100 * abs(adjustment_ratio) ** 3
         return adjustment_ratio, badness
 
@@ -190,34 +289,24 @@ class KnuthPlassBreaker:
         else:
             return self.fitness_classes['very_loose']
 
-    def _reconstruct_breaks(self, best_breaks: Dict[int, Tuple],
-                           end_position: int, breakpoints: List[Breakpoint]) -> List[LineBreak]:
+    def _reconstruct_breaks(self, end_node: _BreakNode,
+                            breakpoints: List[Breakpoint]) -> List[LineBreak]:
         """Reconstruct the optimal sequence of line breaks"""
         breaks = []
-        current = end_position
-
-        while current > 0:
-            if current not in best_breaks:
-                break
-
-            prev_position, fitness_class, prev_breakpoint = best_breaks[current]
-            current_breakpoint = breakpoints[current]
-
-            # Calculate line properties
-            line_width = self._calculate_line_width(breakpoints, prev_position, current)
-            adjustment_ratio, badness = self._calculate_badness(line_width)
-
-            line_break = LineBreak(
-                start_position=prev_position,
-                end_position=current,
-                width=line_width,
-                adjustment_ratio=adjustment_ratio,
-                demerits=badness  # Simplified
-            )
-
-            breaks.insert(0, line_break)
-            current = prev_position
-
+        node = end_node
+
+        while node.previous is not None:
+            previous = node.previous
+            breaks.append(LineBreak(
+                start_position=previous.position,
+                end_position=node.position,
+                width=self._calculate_line_width(breakpoints, previous.position, node.position),
+                adjustment_ratio=node.adjustment_ratio,
+                demerits=node.total_demerits - previous.total_demerits
+            ))
+            node = previous
+
+        breaks.reverse()
         return breaks
 
 
@@ -233,13 +322,14 @@ class MathKnuthPlassBreaker(KnuthPlassBreaker):
         # Math expressions can tolerate more stretching/shrinking
         self.emergency_stretch = 2.0
 
-    def _calculate_badness(self, line_width: float) -> Tuple[float, float]:
+    def _calculate_badness(self, line_width: float, stretch: float,
+                           shrink: float) -> Tuple[float, float]:
         """
         Math-specific badness calculation.
 
         Math expressions can tolerate more variation than regular text.
         """
-        adjustment_ratio, badness = super()._calculate_badness(line_width)
+        adjustment_ratio, badness = super()._calculate_badness(line_width, stretch, shrink)
 
         # Math can stretch/shrink more before becoming "bad"
         if abs(adjustment_ratio) > 2.0:
@@ -257,29 +347,50 @@ class MathKnuthPlassBreaker(KnuthPlassBreaker):
         return super()._calculate_demerits(badness, penalty, prev_fitness, current_fitness)
 
 
-def create_breakpoints_from_text(text: str, font_metrics: Dict[str, Any]) -> List[Breakpoint]:
+def create_breakpoints(words: List[str], word_widths: List[float],
+                       space_width: float, word_ends: Optional[Sequence[bool]] = None,
+                       hyphen_width: float = 0.0, shrink: bool = True) -> List[Breakpoint]:
     """
-    Create breakpoints from plain text.
+    Create breakpoints for measured words separated by spaces.
+
+    Hyphenated words are passed as their pieces, with ``word_ends`` False
+    for every piece but a word's last; the line may then also break after
+    such a piece, at ``HYPHEN_PENALTY`` and with a hyphen added.
 
     Args:
-        text: Input text
-        font_metrics: Font metrics for width calculation
+        words: Words (or word pieces) of the paragraph
+        word_widths: Width of each word
+        space_width: Natural width of an interword space
+        word_ends: Whether each piece ends its word (default: all do)
+        hyphen_width: Width of a hyphen
+        shrink: Whether spaces may shrink; text set ragged-right is drawn
+                at natural spacing, so its lines must fit without shrinking
 
     Returns:
-        List of breakpoints
+        List of breakpoints, starting with the start of the paragraph
     """
     breakpoints = [Breakpoint(0, 0, 0, 0, 0, BreakType.NORMAL, False)]
 
-    words = text.split()
-    current_position = 0
-
-    for word in words:
-        word_width = len(word) * 0.6  # Simplified width calculation
+    # Space between words (glue) stretches and shrinks in proportion to its width
+    space_stretch = space_width * 0.6
+    space_shrink = space_width * 0.2 if shrink else 0.0
 
-        # Space between words (glue)
-        space_width = 0.25
-        space_stretch = 0.15
-        space_shrink = 0.05
+    current_position = 0
+    for index, (word, word_width) in enumerate(zip(words, word_widths)):
+        if word_ends is not None and not word_ends[index]:
+            # Hyphenation point inside a word: no glue, a hyphen if broken here
+            breakpoints.append(Breakpoint(
+                position=current_position + len(word),
+                width=word_width,
+                stretch=0,
+                shrink=0,
+                penalty=HYPHEN_PENALTY,
+                break_type=BreakType.NORMAL,
+                is_hyphenated=True,
+                hyphen_width=hyphen_width
+            ))
+            current_position += len(word)
+            continue
 
         # Add breakpoint after word
         breakpoint = Breakpoint(
@@ -289,7 +400,8 @@ def create_breakpoints_from_text(text: str, font_metrics: Dict[str, Any]) -> Lis
             shrink=space_shrink,
             penalty=0,  # Normal break
             break_type=BreakType.NORMAL,
-            is_hyphenated=False
+            is_hyphenated=False,
+            glue_width=space_width
         )
 
         breakpoints.append(breakpoint)
@@ -298,6 +410,80 @@ def create_breakpoints_from_text(text: str, font_metrics: Dict[str, Any]) -> Lis
     return breakpoints
 
 
+def split_words(words: List[str], hyphenator: Optional[Hyphenator]) -> Tuple[List[str], List[bool]]:
+    """
+    Cut words at their hyphenation points.
+
+    Returns:
+        (pieces, word_ends) as taken by ``create_breakpoints``; without a
+        hyphenator the pieces are the words
+    """
+    if hyphenator is None:
+        return list(words), [True] * len(words)
+    pieces, word_ends = [], []
+    for word in words:
+        parts = hyphenator.split(word)
+        pieces.extend(parts)
+        word_ends.extend([False] * (len(parts) - 1) + [True])
+    return pieces, word_ends
+
+
+def join_lines(pieces: List[str], word_ends: Sequence[bool], ends: Sequence[int]) -> List[str]:
+    """
+    Text of the lines ending at the given breakpoints.
+
+    Breakpoint i follows piece i - 1; a line broken inside a word ends
+    with a hyphen.
+    """
+    lines = []
+    start = 0
+    for end in ends:
+        parts = []
+        for index in range(start, end):
+            parts.append(pieces[index])
+            if word_ends[index] and index != end - 1:
+                parts.append(' ')
+        if end > start and not word_ends[end - 1]:
+            parts.append('-')
+        lines.append(''.join(parts))
+        start = end
+    return lines
+
+
+def create_breakpoints_from_text(text: str, font_metrics: Dict[str, Any],
+                                 size: float = 1.0,
+                                 hyphenator: Optional[Hyphenator] = None) -> List[Breakpoint]:
+    """
+    Create breakpoints from plain text.
+
+    Words are measured in one batch with the font in ``font_metrics``
+    (a standard font metrics dictionary); without a font, every
+    character counts as 0.6 units.
+
+    Args:
+        text: Input text
+        font_metrics: Font metrics for width calculation
+        size: Font size the widths are measured at
+        hyphenator: Also break words at its hyphenation points
+
+    Returns:
+        List of breakpoints
+    """
+    pieces, word_ends = split_words(text.split(), hyphenator)
+    font = font_metrics.get("font") if font_metrics else None
+    if font is not None:
+        widths = measure_words(font, pieces + [' ', '-'], size).widths
+        word_widths = [float(width) for width in widths[:-2]]
+        space_width = float(widths[-2])
+        hyphen_width = float(widths[-1])
+    else:
+        word_widths = [len(word) * 0.6 * size for word in pieces]  # Simplified width calculation
+        space_width = 0.25 * size
+        hyphen_width = 0.6 * size
+
+    return create_breakpoints(pieces, word_widths, space_width, word_ends, hyphen_width)
+
+
 # Example usage:
 # breaker = KnuthPlassBreaker(line_width=80)
 # breakpoints = create_breakpoints_from_text("Your text here", font_metrics)
@@ -0,0 +1,138 @@
+"""
+Parallel paragraph breaking.
+
+Paragraphs break independently of each other, so before layout the
+renderer hands every paragraph of a document to ``ParallelParagraphBreaker``,
+which measures their words in one batch and breaks them in batches on a
+process pool. The breaks are returned to the renderer, which keeps them
+for the build and hands them to ``TieredLineBreaker.wrap_text``, so
+measuring and rendering never break a paragraph again on the main
+process. They also go into the line breaker's ``LineBreakCache`` for
+later builds; that cache is bounded, so a large document's early
+paragraphs may already be evicted by the time they are measured.
+
+Starting a process pool costs more than breaking a short document, so
+fewer than ``threshold`` uncached paragraphs are left to be broken on
+demand as before.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from ..cache_system import LineBreakCache
+from .knuth_plass import KnuthPlassBreaker, create_breakpoints, split_words
+from .tiered_breaker import LineBreakingStats, TieredLineBreaker
+
+
+DEFAULT_PARALLEL_THRESHOLD = 200  # Uncached paragraphs before a pool is worth starting
+DEFAULT_BATCH_SIZE = 64           # Paragraphs sent to a worker at a time
+
+# (piece widths, space width, word ends, hyphen width) of one paragraph
+ParagraphJob = Tuple[List[float], float, List[bool], float]
+# (line end positions, adjustment ratios, set by the greedy fast path)
+ParagraphBreaks = Tuple[List[int], List[float], bool]
+# (line end positions, adjustment ratios) of one paragraph, as cached
+CachedBreaks = Tuple[List[int], List[float]]
+
+
+def _break_batch(settings: Tuple[float, float, Type[KnuthPlassBreaker], bool], line_width: float,
+                 jobs: List[ParagraphJob]) -> List[ParagraphBreaks]:
+    """Break a batch of measured paragraphs in a worker process."""
+    badness_threshold, tolerance, breaker_class, ragged_right = settings
+    stats = LineBreakingStats()
+    breaker = TieredLineBreaker(badness_threshold, tolerance, breaker_class, stats=stats,
+                                ragged_right=ragged_right)
+
+    results = []
+    for widths, space_width, word_ends, hyphen_width in jobs:
+        fast_path = stats.fast_path
+        # Only the widths decide the breaks, so the words themselves stay behind
+        breaks = breaker.find_breaks(create_breakpoints([''] * len(widths), widths, space_width,
+                                                        word_ends, hyphen_width, shrink=not ragged_right),
+                                     line_width)
+        results.append(([line.end_position for line in breaks],
+                        [float(line.adjustment_ratio) for line in breaks],
+                        stats.fast_path > fast_path))
+    return results
+
+
+class ParallelParagraphBreaker:
+    """
+    Breaks many paragraphs of one column ahead of layout on a process pool.
+
+    Results are returned by fingerprint, for callers to pass to
+    ``TieredLineBreaker.wrap_text``, and stored in the line breaker's cache.
+    """
+
+    def __init__(self, line_breaker: TieredLineBreaker, workers: Optional[int] = None,
+                 threshold: int = DEFAULT_PARALLEL_THRESHOLD, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Initialize the stage.
+
+        Args:
+            line_breaker: Breaker whose settings, statistics and cache are used
+            workers: Process pool size; ``None`` uses one process per CPU
+                     and 1 leaves every paragraph to be broken on demand
+            threshold: Fewest uncached paragraphs worth starting a pool for
+            batch_size: Paragraphs sent to a worker at a time
+        """
+        self.line_breaker = line_breaker
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.threshold = threshold
+        self.batch_size = max(1, batch_size)
+
+    def break_paragraphs(self, texts: Iterable[str], line_width: float, font_key: str, size: float,
+                         measure: Callable[[List[str]], Sequence[float]]) -> Dict[str, CachedBreaks]:
+        """
+        Break paragraphs set in one font at one measure.
+
+        Args:
+            texts: Paragraph texts; words are separated by whitespace
+            line_width: Target width of every line
+            font_key: Cache key of the font the text is set in
+            size: Font size in points
+            measure: Widths of a list of strings in that font and size
+
+        Returns:
+            The breaks of the paragraphs broken on the pool, keyed by
+            their ``LineBreakCache`` fingerprint
+        """
+        cache = self.line_breaker.cache
+        if cache is None or self.workers <= 1:
+            return {}
+
+        persistent = self.line_breaker.persistent_cache
+        settings_key = self.line_breaker.settings_key
+        pending = {}
+        for text in texts:
+            words = text.split()
+            if not words:
+                continue
+            key = LineBreakCache.fingerprint(text, line_width, font_key, size, settings_key)
+            if key not in pending and not cache.has_breaks(key, persistent=persistent):
+                pending[key] = split_words(words, self.line_breaker.hyphenator)
+        if len(pending) < self.threshold:
+            return {}
+
+        # Measure each distinct word (or word piece) once, in a single batch
+        vocabulary = list(dict.fromkeys(piece for pieces, _ in pending.values() for piece in pieces))
+        *widths, space_width, hyphen_width = measure(vocabulary + [' ', '-'])
+        piece_width = dict(zip(vocabulary, (float(width) for width in widths)))
+
+        keys = list(pending)
+        jobs = [([piece_width[piece] for piece in pieces], float(space_width), word_ends, float(hyphen_width))
+                for pieces, word_ends in (pending[key] for key in keys)]
+        settings = (self.line_breaker.badness_threshold, self.line_breaker.tolerance,
+                    self.line_breaker.breaker_class, self.line_breaker.ragged_right)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(_break_batch, settings, line_width, jobs[start:start + self.batch_size])
+                       for start in range(0, len(jobs), self.batch_size)]
+            results = [breaks for future in futures for breaks in future.result()]
+
+        broken = {}
+        for key, (ends, ratios, fast_path) in zip(keys, results):
+            self.line_breaker.stats.record(fast=fast_path)
+            cache.set_breaks(key, ends, ratios, persistent=persistent)
+            broken[key] = (ends, ratios)
+        return broken
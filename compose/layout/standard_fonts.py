@@ -0,0 +1,212 @@
+"""
+Metrics for the 14 standard PDF fonts.
+
+Widths and kerning pairs come from the Adobe Core 14 AFM files, kept in a
+compact text form under ``font_data/``. Each font is read the first time
+it is asked for; its widths live in an ``array`` indexed by code point
+(with a small dictionary for the sparse code points above Latin Extended),
+so measuring text is an index lookup per character.
+
+All widths are in thousandths of an em, as in the AFM files.
+"""
+
+from array import array
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from ..cache_system import word_width_cache
+
+
+STANDARD_FONT_NAMES = (
+    "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+    "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+    "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
+    "Symbol", "ZapfDingbats",
+)
+
+# Code points below this are stored densely
+DENSE_LIMIT = 0x0300
+
+# Line gap reported with the AFM vertical metrics (AFM files have none)
+DEFAULT_LINE_GAP = 200
+
+_DATA_DIR = Path(__file__).parent / "font_data"
+
+
+class StandardFont:
+    """Widths, kerning and vertical metrics of one standard font."""
+
+    def __init__(self, name: str):
+        """
+        Initialize empty metrics; use ``load_standard_font`` to read them.
+
+        Args:
+            name: PostScript name of the font
+        """
+        self.name = name
+        self.cache_key = f"afm:{name}"  # Identifies these widths in the word width cache
+        self.ascent = 0
+        self.descent = 0
+        self.cap_height = 0
+        self.x_height = 0
+        self.bbox: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self.italic_angle = 0.0
+        self.fixed_pitch = False
+        self.widths = array('H', bytes(2 * DENSE_LIMIT))  # 0 = no glyph
+        self.sparse_widths: Dict[int, int] = {}
+        self.kerning: Dict[int, int] = {}  # (left << 21 | right) -> adjustment
+        self.missing_width = 0
+        self.units_per_em = 1000
+        self.metrics: Dict = {}  # Font metrics dictionary, set once loaded
+
+    def char_width(self, code_point: int) -> int:
+        """Advance width of one character, or ``missing_width`` without a glyph."""
+        if code_point < DENSE_LIMIT:
+            width = self.widths[code_point]
+        else:
+            width = self.sparse_widths.get(code_point, 0)
+        return width or self.missing_width
+
+    def char_widths(self) -> Dict[int, int]:
+        """Width of every character the font has a glyph for, by code point."""
+        widths = {code_point: width for code_point, width in enumerate(self.widths) if width}
+        widths.update(self.sparse_widths)
+        return widths
+
+    def kern(self, left: int, right: int) -> int:
+        """Kerning adjustment between two code points (usually negative)."""
+        return self.kerning.get(left << 21 | right, 0)
+
+    def text_units(self, text: str, kerning: bool = False) -> int:
+        """Advance width of text in thousandths of an em."""
+        widths = self.widths
+        total = 0
+        for char in text:
+            code_point = ord(char)
+            if code_point < DENSE_LIMIT:
+                total += widths[code_point] or self.missing_width
+            else:
+                total += self.sparse_widths.get(code_point, 0) or self.missing_width
+        if kerning and self.kerning and len(text) > 1:
+            total += sum(self.kern(ord(left), ord(right)) for left, right in zip(text, text[1:]))
+        return total
+
+    def text_width(self, text: str, size: float, kerning: bool = False) -> float:
+        """Advance width of text in points."""
+        return self.text_units(text, kerning) * size / 1000.0
+
+    def _metrics_dict(self) -> Dict:
+        """The font metrics dictionary used throughout the layout code."""
+        return {
+            "ascent": self.ascent,
+            "descent": self.descent,
+            "line_gap": DEFAULT_LINE_GAP,
+            "units_per_em": 1000,
+            "cap_height": self.cap_height,
+            "x_height": self.x_height,
+            "font": self,
+        }
+
+
+def _parse(font: StandardFont, lines) -> StandardFont:
+    """Fill in a font from its ``font_data`` file."""
+    for line in lines:
+        key, _, value = line.rstrip("\n").partition(" ")
+        if key == "W":
+            start, *widths = value.split()
+            for offset, width in enumerate(widths):
+                code_point = int(start) + offset
+                if code_point < DENSE_LIMIT:
+                    font.widths[code_point] = int(width)
+                else:
+                    font.sparse_widths[code_point] = int(width)
+        elif key == "K":
+            left, *pairs = value.split()
+            left_key = int(left) << 21
+            for pair in pairs:
+                right, _, adjustment = pair.partition(":")
+                font.kerning[left_key | int(right)] = int(adjustment)
+        elif key == "Ascender":
+            font.ascent = int(value)
+        elif key == "Descender":
+            font.descent = int(value)
+        elif key == "CapHeight":
+            font.cap_height = int(value)
+        elif key == "XHeight":
+            font.x_height = int(value)
+        elif key == "FontBBox":
+            font.bbox = tuple(int(part) for part in value.split())
+        elif key == "ItalicAngle":
+            font.italic_angle = float(value)
+        elif key == "IsFixedPitch":
+            font.fixed_pitch = value == "true"
+
+    # Characters without a glyph measure as an average lowercase letter
+    letters = [font.widths[code_point] for code_point in range(ord('a'), ord('z') + 1)
+               if font.widths[code_point]]
+    font.missing_width = sum(letters) // len(letters) if letters else 500
+    font.metrics = font._metrics_dict()
+    return font
+
+
+@lru_cache(maxsize=None)
+def load_standard_font(name: str) -> Optional[StandardFont]:
+    """
+    Read one standard font's metrics, once per process.
+
+    Args:
+        name: PostScript name such as "Helvetica-Bold"
+
+    Returns:
+        The font, or None if ``name`` is not a standard font
+    """
+    if name not in STANDARD_FONT_NAMES:
+        return None
+    with open(_DATA_DIR / f"{name}.txt", "r", encoding="ascii") as f:
+        return _parse(StandardFont(name), (line for line in f if not line.startswith("#")))
+
+
+class StandardFontMetrics(Mapping):
+    """
+    Read-only mapping of standard font name to its metrics dictionary.
+
+    Behaves like the plain ``{font: {"ascent": ...}}`` dictionaries the
+    layout code passes around, but a font's data is only read when the
+    font is first looked up.
+    """
+
+    def __getitem__(self, name: str) -> Dict:
+        font = load_standard_font(name)
+        if font is None:
+            raise KeyError(name)
+        return font.metrics
+
+    def __contains__(self, name) -> bool:
+        return name in STANDARD_FONT_NAMES
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STANDARD_FONT_NAMES)
+
+    def __len__(self) -> int:
+        return len(STANDARD_FONT_NAMES)
+
+
+def metrics_text_width(metrics: Dict, text: str, size: float) -> float:
+    """
+    Width of text in points from a font metrics dictionary.
+
+    Standard fonts are measured word by word from their AFM tables
+    through the shared word width cache; dictionaries that carry a
+    ``glyph_widths`` mapping instead (custom metrics) are summed per
+    character in font units.
+    """
+    font = metrics.get("font")
+    if font is not None:
+        return word_width_cache.text_width(font.cache_key, text, size,
+                                           lambda word: font.text_width(word, size))
+    glyph_widths = metrics.get("glyph_widths", {})
+    fallback = glyph_widths.get('a', 500)
+    units = sum(glyph_widths.get(char, fallback) for char in text)
+    return units * size / metrics.get("units_per_em", 1000)
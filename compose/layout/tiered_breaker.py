@@ -0,0 +1,260 @@
+"""
+Tiered line breaking.
+
+Most paragraphs break the same way under first-fit and optimal breaking,
+so ``TieredLineBreaker`` first sets a paragraph greedily and scores each
+line with the Knuth-Plass badness function. Only when some line is
+overfull or worse than ``badness_threshold`` is the paragraph broken
+again with the full Knuth-Plass algorithm.
+
+How often the fast path was enough is counted in ``LineBreakingStats``;
+breakers share the process-wide ``line_breaking_stats`` unless given
+their own.
+
+A breaker given a ``LineBreakCache`` remembers where each paragraph
+broke, so ``wrap_text`` on the same text, measure and font only splits
+it at the stored positions instead of measuring and breaking it again.
+A breaker given a ``Hyphenator`` also lets ``wrap_text`` break lines
+inside words at their hyphenation points.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+from ..cache_system import LineBreakCache
+
+from .hyphenation import Hyphenator
+from .knuth_plass import (
+    Breakpoint, BreakType, KnuthPlassBreaker, LineBreak, create_breakpoints, join_lines, split_words,
+)
+
+
+@dataclass
+class LineBreakingStats:
+    """Counts of paragraphs set by the greedy fast path and by Knuth-Plass."""
+    paragraphs: int = 0
+    fast_path: int = 0
+    knuth_plass: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, fast: bool):
+        """Count one broken paragraph."""
+        with self.lock:
+            self.paragraphs += 1
+            if fast:
+                self.fast_path += 1
+            else:
+                self.knuth_plass += 1
+
+    @property
+    def fast_path_rate(self) -> float:
+        """Fraction of paragraphs the greedy pass was good enough for."""
+        return self.fast_path / self.paragraphs if self.paragraphs else 0.0
+
+    def reset(self):
+        """Start counting again."""
+        with self.lock:
+            self.paragraphs = self.fast_path = self.knuth_plass = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a plain dictionary."""
+        return {
+            'paragraphs': self.paragraphs,
+            'fast_path': self.fast_path,
+            'knuth_plass': self.knuth_plass,
+            'fast_path_rate': self.fast_path_rate,
+        }
+
+
+# Shared by every breaker that is not given its own statistics
+line_breaking_stats = LineBreakingStats()
+
+
+class TieredLineBreaker:
+    """
+    Greedy line breaking with a Knuth-Plass fallback.
+
+    The breaker keeps no per-paragraph state, so one instance can serve a
+    whole renderer at any line width.
+    """
+
+    def __init__(self, badness_threshold: float = 100.0, tolerance: float = 100.0,
+                 breaker_class: Type[KnuthPlassBreaker] = KnuthPlassBreaker,
+                 stats: LineBreakingStats = None, cache: Optional[LineBreakCache] = None,
+                 hyphenator: Optional[Hyphenator] = None, ragged_right: bool = False):
+        """
+        Initialize the breaker.
+
+        Args:
+            badness_threshold: Worst badness a greedy line may have before
+                               the paragraph is broken optimally
+            tolerance: Knuth-Plass tolerance for the fallback
+            breaker_class: Knuth-Plass implementation scoring lines and
+                           running the fallback
+            stats: Statistics to record into (default: line_breaking_stats)
+            cache: Cache of earlier breaks consulted by wrap_text
+            hyphenator: Hyphenation points wrap_text may break words at
+            ragged_right: Lines are drawn at natural word spacing, so
+                          spaces never shrink and no line is wider than
+                          the measure
+        """
+        self.badness_threshold = badness_threshold
+        self.tolerance = tolerance
+        self.breaker_class = breaker_class
+        self.stats = stats if stats is not None else line_breaking_stats
+        self.cache = cache
+        self.persistent_cache = False  # Also keep cached breaks on disk
+        self.hyphenator = hyphenator
+        self.ragged_right = ragged_right
+
+    @property
+    def settings_key(self) -> str:
+        """Settings that change where a paragraph breaks, for cache keys."""
+        hyphenation = self.hyphenator.language if self.hyphenator is not None else "none"
+        return (f"{self.breaker_class.__name__}:{self.tolerance!r}:{self.badness_threshold!r}:{hyphenation}"
+                f"{':ragged' if self.ragged_right else ''}")
+
+    def find_breaks(self, breakpoints: List[Breakpoint], line_width: float) -> List[LineBreak]:
+        """
+        Break a paragraph, greedily when that is good enough.
+
+        Args:
+            breakpoints: Breakpoints, starting with the start of the paragraph
+            line_width: Target width of every line
+
+        Returns:
+            Line breaks in order
+        """
+        if len(breakpoints) < 2:
+            return []
+
+        breaker = self.breaker_class(line_width, self.tolerance)
+        breaks = self._greedy_breaks(breaker, breakpoints)
+        if breaks is not None:
+            self.stats.record(fast=True)
+            return breaks
+
+        self.stats.record(fast=False)
+        return breaker.find_optimal_breaks(breakpoints)
+
+    def wrap_words(self, words: List[str], word_widths: Sequence[float],
+                   space_width: float, line_width: float) -> List[str]:
+        """
+        Break measured words into lines of text.
+
+        Args:
+            words: Words of the paragraph
+            word_widths: Width of each word
+            space_width: Width of an interword space
+            line_width: Target width of every line
+
+        Returns:
+            The lines, with words joined by single spaces
+        """
+        breakpoints = create_breakpoints(words, word_widths, space_width, shrink=not self.ragged_right)
+        # Breakpoint i follows word i - 1, so a line from break a to b holds words a..b-1
+        return [' '.join(words[line.start_position:line.end_position])
+                for line in self.find_breaks(breakpoints, line_width)]
+
+    def wrap_text(self, text: str, line_width: float, font_key: str, size: float,
+                  measure: Callable[[List[str]], Sequence[float]],
+                  known: Optional[Mapping[str, Tuple[List[int], List[float]]]] = None) -> List[str]:
+        """
+        Break a paragraph of text into lines, reusing cached breaks.
+
+        Args:
+            text: Paragraph text; words are separated by whitespace
+            line_width: Target width of every line
+            font_key: Cache key of the font the text is set in
+            size: Font size in points
+            measure: Widths of a list of strings in that font and size,
+                     only called when the breaks are not cached
+            known: Breaks found ahead, by ``LineBreakCache`` fingerprint
+                   (see ``ParallelParagraphBreaker``), used before the cache
+
+        Returns:
+            The lines, with words joined by single spaces and a hyphen
+            ending lines broken inside a word
+        """
+        words = text.split()
+        if not words:
+            return []
+        pieces, word_ends = split_words(words, self.hyphenator)
+
+        key = None
+        if self.cache is not None or known:
+            key = LineBreakCache.fingerprint(text, line_width, font_key, size, self.settings_key)
+            if known and key in known:
+                return join_lines(pieces, word_ends, known[key][0])
+        if self.cache is not None:
+            cached = self.cache.get_breaks(key, persistent=self.persistent_cache)
+            if cached is not None:
+                return join_lines(pieces, word_ends, cached[0])
+
+        breaks = self.find_breaks(self.measured_breakpoints(pieces, word_ends, measure), line_width)
+        ends = [line.end_position for line in breaks]
+        if self.cache is not None:
+            self.cache.set_breaks(key, ends, [float(line.adjustment_ratio) for line in breaks],
+                                  persistent=self.persistent_cache)
+        return join_lines(pieces, word_ends, ends)
+
+    def measured_breakpoints(self, pieces: List[str], word_ends: List[bool],
+                             measure: Callable[[List[str]], Sequence[float]]) -> List[Breakpoint]:
+        """Breakpoints of word pieces from ``split_words``, measured in one batch."""
+        if self.hyphenator is None:
+            *widths, space_width = measure(pieces + [' '])
+            return create_breakpoints(pieces, widths, space_width, shrink=not self.ragged_right)
+        *widths, space_width, hyphen_width = measure(pieces + [' ', '-'])
+        return create_breakpoints(pieces, widths, space_width, word_ends, hyphen_width,
+                                  shrink=not self.ragged_right)
+
+    def _greedy_breaks(self, breaker: KnuthPlassBreaker,
+                       breakpoints: List[Breakpoint]) -> List[LineBreak]:
+        """
+        First-fit breaks scored like Knuth-Plass lines.
+
+        Returns:
+            The breaks, or None if a line is overfull or worse than the
+            badness threshold
+        """
+        breaker._prepare_sums(breakpoints)
+        last = len(breakpoints) - 1
+        breaks = []
+        fitness = breaker.fitness_classes['decent']
+        start = 0
+
+        while start < last:
+            # Extend the line while it still fits
+            end = None
+            for j in range(start + 1, last + 1):
+                break_type = breakpoints[j].break_type
+                if break_type == BreakType.PREVENT and j != last:
+                    continue
+                if end is not None and breaker._calculate_line_width(breakpoints, start, j) > breaker.line_width:
+                    break
+                end = j
+                if break_type == BreakType.FORCE:
+                    break
+
+            width, stretch, shrink = breaker._line_metrics(breakpoints, start, end)
+            if (end == last or breakpoints[end].break_type == BreakType.FORCE) and width <= breaker.line_width:
+                adjustment_ratio, badness = 0.0, 0.0
+            else:
+                adjustment_ratio, badness = breaker._calculate_badness(width, stretch, shrink)
+            if adjustment_ratio < -1 or badness > self.badness_threshold:
+                return None
+
+            line_fitness = breaker._get_fitness_class(adjustment_ratio)
+            breaks.append(LineBreak(
+                start_position=start,
+                end_position=end,
+                width=width,
+                adjustment_ratio=adjustment_ratio,
+                demerits=breaker._calculate_demerits(badness, breakpoints[end].penalty,
+                                                     fitness, line_fitness)
+            ))
+            fitness = line_fitness
+            start = end
+
+        return breaks
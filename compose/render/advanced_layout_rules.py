@@ -11,9 +11,10 @@ These rules implement sophisticated typographic constraints:
 from typing import List
 from .constraint_primitives import LayoutState, Violation, Severity, Adjustment
 from .layout_primitives import LayoutBox, BoxType
+from .layout_rules import LayoutRule
 
 
-class HeadingOrphanRule:
+class HeadingOrphanRule(LayoutRule):
     """
     Prevent headings from appearing alone at bottom of page.
     
@@ -21,35 +22,38 @@ class HeadingOrphanRule:
     with no content following it on the same page.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for orphan headings"""
+    # Whether a heading is stranded depends on the next page
+    page_reach = 1
+    
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check for orphan headings on one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            if not page.boxes:
-                continue
-            
-            # Check last element on page
-            last_box = page.boxes[-1]
-            
-            # Only check headings
-            if last_box.box_type != BoxType.HEADING:
-                continue
+        page = state.pages[page_idx]
+        if not page.boxes:
+            return violations
+        
+        # Check last element on page
+        last_box = page.boxes[-1]
+        
+        # Only check headings
+        if last_box.box_type != BoxType.HEADING:
+            return violations
+        
+        # Check if there's a next page with content
+        if page_idx + 1 < len(state.pages):
+            next_page = state.pages[page_idx + 1]
             
-            # Check if there's a next page with content
-            if page_idx + 1 < len(state.pages):
-                next_page = state.pages[page_idx + 1]
-                
-                # If heading is last on page and next page has content,
-                # it's an orphan
-                if next_page.boxes:
-                    violations.append(Violation(
-                        rule_name="no_heading_orphans",
-                        severity=Severity.WARNING,
-                        element=last_box,
-                        page=page_idx,
-                        description="Heading orphan: heading alone at bottom of page"
-                    ))
+            # If heading is last on page and next page has content,
+            # it's an orphan
+            if next_page.boxes:
+                violations.append(Violation(
+                    rule_name="no_heading_orphans",
+                    severity=Severity.WARNING,
+                    element=last_box,
+                    page=page_idx,
+                    description="Heading orphan: heading alone at bottom of page"
+                ))
         
         return violations
     
@@ -60,7 +64,7 @@ class HeadingOrphanRule:
         return [MoveToNextPageAdjustment(violation.element)]
 
 
-class KeepTogetherRule:
+class KeepTogetherRule(LayoutRule):
     """
     Keep related elements together on same page.
     
@@ -68,28 +72,28 @@ class KeepTogetherRule:
     or between list items that should stay together.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for elements that should be kept together"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check one page for elements that should be kept together"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            for i in range(len(page.boxes) - 1):
-                box1 = page.boxes[i]
-                box2 = page.boxes[i + 1]
+        page = state.pages[page_idx]
+        for i in range(len(page.boxes) - 1):
+            box1 = page.boxes[i]
+            box2 = page.boxes[i + 1]
+            
+            # Check if heading is followed by paragraph on different pages
+            if (box1.box_type == BoxType.HEADING and 
+                box2.box_type == BoxType.PARAGRAPH):
                 
-                # Check if heading is followed by paragraph on different pages
-                if (box1.box_type == BoxType.HEADING and 
-                    box2.box_type == BoxType.PARAGRAPH):
-                    
-                    # If they're on different pages, they should be together
-                    if box1.y > box2.y:  # box2 is on next page
-                        violations.append(Violation(
-                            rule_name="keep_together",
-                            severity=Severity.INFO,
-                            element=box1,
-                            page=page_idx,
-                            description="Heading and paragraph separated by page break"
-                        ))
+                # If they're on different pages, they should be together
+                if box1.y > box2.y:  # box2 is on next page
+                    violations.append(Violation(
+                        rule_name="keep_together",
+                        severity=Severity.INFO,
+                        element=box1,
+                        page=page_idx,
+                        description="Heading and paragraph separated by page break"
+                    ))
         
         return violations
     
@@ -100,7 +104,7 @@ class KeepTogetherRule:
         return [MoveToNextPageAdjustment(violation.element)]
 
 
-class MaxLinesPerPageRule:
+class MaxLinesPerPageRule(LayoutRule):
     """
     Ensure pages don't exceed maximum lines.
     
@@ -116,28 +120,28 @@ class MaxLinesPerPageRule:
         """
         self.max_lines = max_lines
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check page line counts"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check the line count of one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            # Count lines on page
-            line_count = 0
-            
-            for box in page.boxes:
-                if box.box_type == BoxType.PARAGRAPH:
-                    # Count lines in paragraph
-                    if isinstance(box.content, list):
-                        line_count += len(box.content)
-            
-            if line_count > self.max_lines:
-                violations.append(Violation(
-                    rule_name="max_lines_per_page",
-                    severity=Severity.INFO,
-                    element=page.boxes[-1] if page.boxes else None,
-                    page=page_idx,
-                    description=f"Page has {line_count} lines > maximum {self.max_lines}"
-                ))
+        page = state.pages[page_idx]
+        # Count lines on page
+        line_count = 0
+        
+        for box in page.boxes:
+            if box.box_type == BoxType.PARAGRAPH:
+                # Count lines in paragraph
+                if isinstance(box.content, list):
+                    line_count += len(box.content)
+        
+        if line_count > self.max_lines:
+            violations.append(Violation(
+                rule_name="max_lines_per_page",
+                severity=Severity.INFO,
+                element=page.boxes[-1] if page.boxes else None,
+                page=page_idx,
+                description=f"Page has {line_count} lines > maximum {self.max_lines}"
+            ))
         
         return violations
     
@@ -150,13 +154,16 @@ class MaxLinesPerPageRule:
         return []
 
 
-class MinimumPageFullnessRule:
+class MinimumPageFullnessRule(LayoutRule):
     """
     Ensure pages are adequately filled.
     
     Prevents pages from being too sparse with lots of whitespace.
     """
     
+    # The last page is exempt, so appending a page changes the one before
+    page_reach = 1
+    
     def __init__(self, min_fullness: float = 0.7):
         """
         Initialize rule.
@@ -166,28 +173,28 @@ class MinimumPageFullnessRule:
         """
         self.min_fullness = min_fullness
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check page fullness"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check the fullness of one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            # Calculate page fullness
-            total_content_height = sum(box.height for box in page.boxes)
-            available_height = page.height - page.margin_top - page.margin_bottom
+        page = state.pages[page_idx]
+        # Calculate page fullness
+        total_content_height = sum(box.height for box in page.boxes)
+        available_height = page.height - page.margin_top - page.margin_bottom
+        
+        if available_height > 0:
+            fullness = total_content_height / available_height
             
-            if available_height > 0:
-                fullness = total_content_height / available_height
-                
-                # Check all pages except last
-                if page_idx < len(state.pages) - 1:
-                    if fullness < self.min_fullness:
-                        violations.append(Violation(
-                            rule_name="minimum_page_fullness",
-                            severity=Severity.INFO,
-                            element=page.boxes[-1] if page.boxes else None,
-                            page=page_idx,
-                            description=f"Page fullness {fullness:.1%} < minimum {self.min_fullness:.1%}"
-                        ))
+            # Check all pages except last
+            if page_idx < len(state.pages) - 1:
+                if fullness < self.min_fullness:
+                    violations.append(Violation(
+                        rule_name="minimum_page_fullness",
+                        severity=Severity.INFO,
+                        element=page.boxes[-1] if page.boxes else None,
+                        page=page_idx,
+                        description=f"Page fullness {fullness:.1%} < minimum {self.min_fullness:.1%}"
+                    ))
         
         return violations
     
@@ -198,7 +205,7 @@ class MinimumPageFullnessRule:
         return []
 
 
-class BalancedSpacingRule:
+class BalancedSpacingRule(LayoutRule):
     """
     Ensure consistent spacing between elements.
     
@@ -214,38 +221,38 @@ class BalancedSpacingRule:
         """
         self.tolerance = tolerance
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check spacing consistency"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check spacing consistency on one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            spacings = []
-            
-            # Calculate spacings between elements
-            for i in range(len(page.boxes) - 1):
-                box1 = page.boxes[i]
-                box2 = page.boxes[i + 1]
-                spacing = box1.bottom - box2.y
-                spacings.append(spacing)
-            
-            if not spacings:
-                continue
-            
-            # Calculate average and variance
-            avg_spacing = sum(spacings) / len(spacings)
+        page = state.pages[page_idx]
+        spacings = []
+        
+        # Calculate spacings between elements
+        for i in range(len(page.boxes) - 1):
+            box1 = page.boxes[i]
+            box2 = page.boxes[i + 1]
+            spacing = box1.bottom - box2.y
+            spacings.append(spacing)
+        
+        if not spacings:
+            return violations
+        
+        # Calculate average and variance
+        avg_spacing = sum(spacings) / len(spacings)
+        
+        # Check for outliers
+        for i, spacing in enumerate(spacings):
+            deviation = abs(spacing - avg_spacing) / avg_spacing if avg_spacing > 0 else 0
             
-            # Check for outliers
-            for i, spacing in enumerate(spacings):
-                deviation = abs(spacing - avg_spacing) / avg_spacing if avg_spacing > 0 else 0
-                
-                if deviation > self.tolerance:
-                    violations.append(Violation(
-                        rule_name="balanced_spacing",
-                        severity=Severity.INFO,
-                        element=page.boxes[i + 1],
-                        page=page_idx,
-                        description=f"Spacing {spacing:.1f}pt deviates {deviation:.1%} from average {avg_spacing:.1f}pt"
-                    ))
+            if deviation > self.tolerance:
+                violations.append(Violation(
+                    rule_name="balanced_spacing",
+                    severity=Severity.INFO,
+                    element=page.boxes[i + 1],
+                    page=page_idx,
+                    description=f"Spacing {spacing:.1f}pt deviates {deviation:.1%} from average {avg_spacing:.1f}pt"
+                ))
         
         return violations
     
@@ -257,27 +264,27 @@ class BalancedSpacingRule:
         return [IncreaseSpacingAdjustment(violation.element, 12.0)]
 
 
-class NoBlankPagesRule:
+class NoBlankPagesRule(LayoutRule):
     """
     Prevent completely blank pages.
     
     Ensures every page has at least some content.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for blank pages"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check whether a page is blank"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            # Check if page is empty
-            if not page.boxes:
-                violations.append(Violation(
-                    rule_name="no_blank_pages",
-                    severity=Severity.WARNING,
-                    element=None,
-                    page=page_idx,
-                    description="Page is completely blank"
-                ))
+        page = state.pages[page_idx]
+        # Check if page is empty
+        if not page.boxes:
+            violations.append(Violation(
+                rule_name="no_blank_pages",
+                severity=Severity.WARNING,
+                element=None,
+                page=page_idx,
+                description="Page is completely blank"
+            ))
         
         return violations
     
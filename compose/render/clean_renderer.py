@@ -8,10 +8,11 @@ Key principle: Each render method is simple - take a Y position, render, return
 No spacing logic, no page break logic in render methods.
 """
 
-from typing import Tuple
+from typing import Optional, Tuple
 from compose.model.ast import (
     Heading, Paragraph, CodeBlock, ListBlock, MathBlock, Image, Table, Text
 )
+from .layout_measurer import ParagraphLayout
 
 
 class CleanRenderer:
@@ -60,18 +61,10 @@ class CleanRenderer:
         descender = abs(font_metrics.get('descent', font_size * 0.2)) / 1000.0 * font_size
         
         # Render heading
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/{font_name} {font_size} Tf",
-            f"1 0 0 1 {self.renderer.margin_left} {y} Tm",
-            f"{self.renderer._to_pdf_literal(text_content)} Tj",
-            "ET"
-        ]
-        self.renderer._add_to_current_page(commands)
+        self.renderer._page_stream.text(text_content, font_name, font_size, self.renderer.margin_left, y)
         
         # Record to tracker
-        text_width = self.renderer._measure_text_width(text_content, font_name, font_size)
+        text_width = self.renderer.get_text_width(text_content, font_name, font_size)
         self.renderer.tracker.record_text(
             x=self.renderer.margin_left,
             y=y + ascender,
@@ -87,20 +80,20 @@ class CleanRenderer:
         # Return new Y (move down by font size)
         return y - font_size
     
-    def render_paragraph(self, paragraph: Paragraph, y: float) -> float:
+    def render_paragraph(self, paragraph: Paragraph, y: float,
+                         layout: Optional[ParagraphLayout] = None) -> float:
         """
         Render a paragraph at position y.
         
         Args:
             paragraph: Paragraph element to render
             y: Y position (baseline) for rendering
+            layout: Lines found when the paragraph was measured; the
+                    paragraph is only set again without them
         
         Returns:
             New Y position after paragraph
         """
-        # Extract text content
-        text_content = self.renderer._extract_text_content(paragraph.content)
-        
         font_size = self.renderer.current_font_size
         font_name = "Helvetica"
         
@@ -109,26 +102,16 @@ class CleanRenderer:
         ascender = font_metrics.get('ascent', font_size * 0.8) / 1000.0 * font_size
         descender = abs(font_metrics.get('descent', font_size * 0.2)) / 1000.0 * font_size
         
-        # Wrap text to page width
-        max_width = self.renderer.page_width - self.renderer.margin_left - self.renderer.margin_right
-        lines = self.renderer._wrap_text(text_content, max_width)
-        
-        current_y = y
+        if layout is None:
+            layout = self.renderer._paragraph_layout(paragraph)
         
         # Render each line
-        for line in lines:
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/{font_name} {font_size} Tf",
-                f"1 0 0 1 {self.renderer.margin_left} {current_y} Tm",
-                f"{self.renderer._to_pdf_literal(line)} Tj",
-                "ET"
-            ]
-            self.renderer._add_to_current_page(commands)
+        for line, baseline in zip(layout.lines, layout.baselines):
+            current_y = y - baseline
+            self.renderer._page_stream.text(line, font_name, font_size, self.renderer.margin_left, current_y)
             
             # Record to tracker
-            text_width = self.renderer._measure_text_width(line, font_name, font_size)
+            text_width = self.renderer.get_text_width(line, font_name, font_size)
             self.renderer.tracker.record_text(
                 x=self.renderer.margin_left,
                 y=current_y + ascender,
@@ -140,11 +123,8 @@ class CleanRenderer:
             
             # Update content bottom
             self.renderer._update_content_bottom(current_y, descender)
-            
-            # Move down for next line
-            current_y -= (font_size * self.renderer.line_height_factor)
         
-        return current_y
+        return y - layout.height
     
     def render_code_block(self, code_block: CodeBlock, y: float) -> float:
         """
@@ -171,18 +151,10 @@ class CleanRenderer:
         for line in lines:
             if line.strip():
                 # Render line
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/{font_name} {font_size} Tf",
-                    f"1 0 0 1 {self.renderer.margin_left} {current_y} Tm",
-                    f"{self.renderer._to_pdf_literal(line)} Tj",
-                    "ET"
-                ]
-                self.renderer._add_to_current_page(commands)
+                self.renderer._page_stream.text(line, font_name, font_size, self.renderer.margin_left, current_y)
                 
                 # Record to tracker
-                line_width = self.renderer._measure_text_width(line, font_name, font_size)
+                line_width = self.renderer.get_text_width(line, font_name, font_size)
                 self.renderer.tracker.record_text(
                     x=self.renderer.margin_left,
                     y=current_y + ascender,
@@ -226,18 +198,10 @@ class CleanRenderer:
             bullet = "• "
             full_text = bullet + item_text
             
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {font_size} Tf",
-                f"1 0 0 1 {self.renderer.margin_left + 10} {current_y} Tm",
-                f"{self.renderer._to_pdf_literal(full_text)} Tj",
-                "ET"
-            ]
-            self.renderer._add_to_current_page(commands)
+            self.renderer._page_stream.text(full_text, "Helvetica", font_size, self.renderer.margin_left + 10, current_y)
             
             # Record to tracker
-            text_width = self.renderer._measure_text_width(full_text, "Helvetica", font_size)
+            text_width = self.renderer.get_text_width(full_text, "Helvetica", font_size)
             ascender = font_metrics.get('ascent', font_size * 0.8) / 1000.0 * font_size
             self.renderer.tracker.record_text(
                 x=self.renderer.margin_left + 10,
@@ -277,18 +241,10 @@ class CleanRenderer:
         descender = abs(font_metrics.get('descent', font_size * 0.2)) / 1000.0 * font_size
         
         # Render as text
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/Helvetica {font_size} Tf",
-            f"1 0 0 1 {self.renderer.margin_left} {y} Tm",
-            f"{self.renderer._to_pdf_literal(content)} Tj",
-            "ET"
-        ]
-        self.renderer._add_to_current_page(commands)
+        self.renderer._page_stream.text(content, "Helvetica", font_size, self.renderer.margin_left, y)
         
         # Record to tracker
-        text_width = self.renderer._measure_text_width(content, "Helvetica", font_size)
+        text_width = self.renderer.get_text_width(content, "Helvetica", font_size)
         self.renderer.tracker.record_text(
             x=self.renderer.margin_left,
             y=y + ascender,
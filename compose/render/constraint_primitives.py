@@ -5,7 +5,7 @@ Core data structures for the iterative constraint-solving layout system.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 from enum import Enum
 from .layout_primitives import LayoutBox, PageLayout
 
@@ -41,6 +41,12 @@ class LayoutState:
     Immutable snapshot of layout at a point in time.
     
     Each iteration of constraint solving produces a new LayoutState.
+    States are copy-on-write: a clone shares its pages with the state it
+    was cloned from, and a page is only copied when one of them changes it
+    through ``edit_page`` or ``add_page``. Code changing a cloned state
+    must go through these instead of changing ``pages`` in place; they
+    also mark the pages they hand out dirty, so that rules are only
+    checked again on pages that changed.
     """
     pages: List[PageLayout]
     current_page: int
@@ -48,23 +54,70 @@ class LayoutState:
     elements: List[LayoutBox]
     metadata: Dict[str, Any] = field(default_factory=dict)
     iteration: int = 0
+    # Indices of pages changed since the state's rules were last checked
+    dirty_pages: Set[int] = field(default_factory=set, compare=False)
+    # Pages this state has copied or created, by id, which it alone holds
+    _owned_pages: Set[int] = field(default_factory=set, init=False, repr=False, compare=False)
     
     def clone(self) -> 'LayoutState':
         """
-        Create a deep copy for the next iteration.
+        Create the state for the next iteration.
+        
+        Only the page list is copied; the pages themselves are shared
+        until either state edits them, so the cost of an iteration grows
+        with the pages it changes rather than with the document.
         
         Returns:
-            New LayoutState with cloned pages and elements
+            New LayoutState sharing this state's pages
         """
+        # From now on neither state may change the pages in place
+        self._owned_pages.clear()
         return LayoutState(
-            pages=[self._clone_page(p) for p in self.pages],
+            pages=list(self.pages),
             current_page=self.current_page,
             current_y=self.current_y,
             elements=list(self.elements),
             metadata=dict(self.metadata),
-            iteration=self.iteration + 1
+            iteration=self.iteration + 1,
+            dirty_pages=set(self.dirty_pages)
         )
     
+    def edit_page(self, page_num: int) -> PageLayout:
+        """
+        Get a page to change, marking it dirty.
+        
+        A page still shared with another state is replaced by a copy of it
+        and its boxes the first time it is edited.
+        
+        Args:
+            page_num: Index of the page
+            
+        Returns:
+            The page, owned by this state
+        """
+        page = self.pages[page_num]
+        if id(page) not in self._owned_pages:
+            page = self._clone_page(page)
+            self.pages[page_num] = page
+            self._owned_pages.add(id(page))
+        self.dirty_pages.add(page_num)
+        return page
+    
+    def add_page(self, page: PageLayout) -> PageLayout:
+        """
+        Append a new page owned by this state, marking it dirty.
+        
+        Args:
+            page: Page to append
+            
+        Returns:
+            The page
+        """
+        self.pages.append(page)
+        self._owned_pages.add(id(page))
+        self.dirty_pages.add(len(self.pages) - 1)
+        return page
+    
     def _clone_page(self, page: PageLayout) -> PageLayout:
         """Deep clone a page"""
         return PageLayout(
@@ -106,6 +159,12 @@ class LayoutState:
         Returns:
             (page_index, box_index) or (None, None) if not found
         """
+        for page_idx, page in enumerate(self.pages):
+            for box_idx, box in enumerate(page.boxes):
+                if box is element:
+                    return (page_idx, box_idx)
+        
+        # A page edited since the element was found holds a copy of it
         for page_idx, page in enumerate(self.pages):
             try:
                 box_idx = page.boxes.index(element)
@@ -4,9 +4,11 @@ Constraint solver.
 Iteratively resolves layout constraints until satisfied.
 """
 
-from typing import List, TYPE_CHECKING, Optional
+import time
+from typing import List, TYPE_CHECKING, Optional, Tuple
 from .constraint_primitives import LayoutState, Violation, Severity
 from .layout_rules import LayoutRule
+from .layout_optimization import RuleCheckOptimizer
 
 if TYPE_CHECKING:
     from .layout_generator import LayoutGenerator
@@ -18,10 +20,13 @@ class ConstraintSolver:
     
     Applies rules, detects violations, generates adjustments,
     and regenerates layout until all constraints are satisfied.
+    
+    Solving is anytime: whenever it stops, before converging or when its
+    time budget runs out, it returns the best layout it has checked.
     """
     
     def __init__(self, rules: List[LayoutRule], max_iterations: int = 10, 
-                 verbose: bool = True):
+                 verbose: bool = True, time_budget: Optional[float] = None):
         """
         Initialize solver.
         
@@ -29,11 +34,17 @@ class ConstraintSolver:
             rules: List of layout rules to check
             max_iterations: Maximum iterations before giving up
             verbose: Print progress information
+            time_budget: Seconds to spend solving before giving up;
+                         None for no limit
         """
         self.rules = rules
         self.max_iterations = max_iterations
         self.verbose = verbose
+        self.time_budget = time_budget
         self.iteration_history = []
+        self.timed_out = False
+        # Re-checks only the pages adjustments changed
+        self.optimizer = RuleCheckOptimizer()
     
     def solve(self, initial_state: LayoutState, 
              generator: 'LayoutGenerator') -> LayoutState:
@@ -45,9 +56,14 @@ class ConstraintSolver:
             generator: Layout generator for regeneration
             
         Returns:
-            Final layout state with constraints satisfied
+            Final layout state with constraints satisfied, or the one
+            with the fewest violations found if they could not all be
         """
         current_state = initial_state
+        self.optimizer.reset()
+        self.timed_out = False
+        start = time.perf_counter()
+        best_state, best_score = None, None
         
         for iteration in range(self.max_iterations):
             if self.verbose:
@@ -70,6 +86,17 @@ class ConstraintSolver:
                     print(f"\n✓ SUCCESS: Layout converged - no violations found")
                 return current_state
             
+            score = self._score(violations)
+            if best_score is None or score < best_score:
+                best_state, best_score = current_state, score
+            
+            if self.time_budget is not None and time.perf_counter() - start >= self.time_budget:
+                self.timed_out = True
+                if self.verbose:
+                    print(f"\n⚠ WARNING: Time budget ({self.time_budget}s) used up")
+                    print(f"  Returning the best layout found: {best_score[-1]} violation(s)")
+                return best_state
+            
             # Print violations
             if self.verbose:
                 self._print_violations(violations)
@@ -81,7 +108,7 @@ class ConstraintSolver:
                 if self.verbose:
                     print(f"\n⚠ WARNING: No adjustments possible")
                     print(f"  {len(violations)} violations remain")
-                return current_state
+                return best_state
             
             if self.verbose:
                 print(f"\nApplying {len(adjustments)} adjustment(s)...")
@@ -96,25 +123,40 @@ class ConstraintSolver:
             print(f"\n⚠ WARNING: Max iterations ({self.max_iterations}) reached")
             print(f"  Layout may have unresolved violations")
         
-        return current_state
+        # The last adjustments may have made things better or worse
+        if best_state is None or self._score(self._check_all_rules(current_state)) < best_score:
+            return current_state
+        return best_state
     
     def _check_all_rules(self, state: LayoutState) -> List[Violation]:
         """
         Check all rules against state.
         
+        Only pages changed since the previous check are checked again.
+        
         Args:
             state: Layout state to check
             
         Returns:
             List of all violations found
         """
-        violations = []
+        return self.optimizer.check_rules_incremental(state, self.rules)
+    
+    def _score(self, violations: List[Violation]) -> Tuple[int, int, int]:
+        """
+        Rank a layout by its violations, lower being better.
         
-        for rule in self.rules:
-            rule_violations = rule.check(state)
-            violations.extend(rule_violations)
+        Errors count before warnings, and warnings before the rest.
         
-        return violations
+        Args:
+            violations: Violations of the layout
+            
+        Returns:
+            (errors, warnings, violations) counts
+        """
+        errors = sum(1 for v in violations if v.severity == Severity.ERROR)
+        warnings = sum(1 for v in violations if v.severity == Severity.WARNING)
+        return (errors, warnings, len(violations))
     
     def _generate_adjustments(self, violations: List[Violation],
                              state: LayoutState) -> List:
@@ -144,7 +186,7 @@ class ConstraintSolver:
             # Find rule that created this violation
             for rule in self.rules:
                 rule_name = rule.__class__.__name__.replace('Rule', '').lower()
-                if rule_name in violation.rule_name.lower():
+                if rule_name in violation.rule_name.replace('_', '').lower():
                     suggested = rule.suggest_fix(violation, state)
                     adjustments.extend(suggested)
                     break
@@ -189,6 +231,9 @@ class ConstraintSolver:
             status = "✓" if violations == 0 else "✗"
             print(f"  Iteration {iteration}: {status} {violations} violation(s)")
         
+        if self.timed_out:
+            print(f"\n⚠ Time budget ({self.time_budget}s) used up")
+        
         if self.iteration_history:
             final_violations = self.iteration_history[-1]['violations']
             if final_violations == 0:
@@ -0,0 +1,221 @@
+"""
+Byte-oriented PDF content stream builder.
+
+Page content used to be collected as lists of formatted strings that were
+joined and UTF-8 encoded when the page was written. ContentStreamBuilder
+appends each operator straight to a ``bytearray`` through typed methods,
+so a text run costs one encode of its characters and a few small byte
+concatenations instead of a list of f-strings.
+
+Text is encoded for the WinAnsi (cp1252) encoding used by the standard
+Type 1 fonts the renderer declares, unless the current font is an
+embedded font, which encodes its own glyph IDs.
+"""
+
+from typing import Iterable, Iterator, Mapping, Optional, Set, Tuple, Union
+
+
+# Characters outside WinAnsi that have a close ASCII equivalent
+_WINANSI_REPLACEMENTS = str.maketrans({
+    '\u2022': '*',      # bullet point
+    '\u2026': '...',    # ellipsis
+    '\u2013': '-',      # en dash
+    '\u2014': '--',     # em dash
+    '\u2018': "'",      # left single quote
+    '\u2019': "'",      # right single quote
+    '\u201c': '"',      # left double quote
+    '\u201d': '"',      # right double quote
+    '\u00a0': ' ',      # non-breaking space
+    '\u00ad': '',       # soft hyphen
+    '\u00e9': 'e',      # é (e with acute)
+    '\u00e0': 'a',      # à (a with grave)
+    '\u00e8': 'e',      # è (e with grave)
+    '\u00ea': 'e',      # ê (e with circumflex)
+    '\u00fc': 'u',      # ü (u with umlaut)
+    '\u00f1': 'n',      # ñ (n with tilde)
+})
+
+
+def encode_text(text: str) -> bytes:
+    """
+    Encode text as the escaped body of a PDF literal string.
+
+    Characters WinAnsi cannot represent are replaced by ASCII
+    equivalents or dropped.
+    """
+    data = text.translate(_WINANSI_REPLACEMENTS).encode('cp1252', errors='ignore')
+    if b'\\' in data:
+        data = data.replace(b'\\', b'\\\\')
+    if b'(' in data or b')' in data:
+        data = data.replace(b'(', b'\\(').replace(b')', b'\\)')
+    return data
+
+
+def winansi_encodable(text: str) -> bool:
+    """Whether every character of text has a WinAnsi glyph or an ASCII equivalent."""
+    try:
+        text.translate(_WINANSI_REPLACEMENTS).encode('cp1252')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def format_number(value: float) -> bytes:
+    """Format a number for a content stream (never in exponent notation)."""
+    if value == int(value):
+        return b"%d" % value
+    return (b"%.3f" % value).rstrip(b"0").rstrip(b".")
+
+
+class ContentStreamBuilder:
+    """
+    Accumulates content stream operators as bytes.
+
+    Iterating over the builder yields the operators as strings, which
+    keeps it usable wherever a list of commands used to be inspected.
+    """
+
+    def __init__(self, fonts: Optional[Mapping] = None):
+        """
+        Initialize an empty content stream.
+
+        Args:
+            fonts: Embedded fonts by resource name; text set in one of
+                   them is encoded with its ``encode`` method
+        """
+        self.buffer = bytearray()
+        self.operator_count = 0
+        self.xobjects: Set[str] = set()  # Names drawn with Do
+        self.fonts = fonts if fonts is not None else {}
+        self.font: Optional[str] = None  # Font selected by the last Tf
+
+    def __len__(self) -> int:
+        return self.operator_count
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.buffer.decode('cp1252').splitlines())
+
+    def getvalue(self) -> bytes:
+        """The content stream data."""
+        return bytes(self.buffer)
+
+    # -- composition ------------------------------------------------------
+
+    def raw(self, operator: Union[str, bytes]):
+        """Append one pre-formatted operator line."""
+        if isinstance(operator, str):
+            if operator.endswith(" Do"):
+                self.xobjects.add(operator[1:-3])
+            operator = operator.encode('cp1252')
+        self.buffer += operator
+        self.buffer += b"\n"
+        self.operator_count += 1
+
+    def extend(self, commands: Union['ContentStreamBuilder', Iterable[str]]):
+        """Append another builder's operators or a list of operator strings."""
+        if isinstance(commands, ContentStreamBuilder):
+            self.buffer += commands.buffer
+            self.operator_count += commands.operator_count
+            self.xobjects |= commands.xobjects
+            return
+        for command in commands:
+            self.raw(command)
+
+    # -- text ---------------------------------------------------------------
+
+    def begin_text(self):
+        self.buffer += b"BT\n"
+        self.operator_count += 1
+
+    def end_text(self):
+        self.buffer += b"ET\n"
+        self.operator_count += 1
+
+    def set_font(self, name: str, size: float):
+        self.buffer += b"/%s %s Tf\n" % (name.encode('ascii'), format_number(size))
+        self.operator_count += 1
+        self.font = name
+
+    def set_text_position(self, x: float, y: float):
+        """Set the text matrix to a plain translation (``Tm``)."""
+        self.buffer += b"1 0 0 1 %s %s Tm\n" % (format_number(x), format_number(y))
+        self.operator_count += 1
+
+    def move_text(self, dx: float, dy: float):
+        self.buffer += b"%s %s Td\n" % (format_number(dx), format_number(dy))
+        self.operator_count += 1
+
+    def show_text(self, text: str):
+        embedded = self.fonts.get(self.font) if self.fonts else None
+        if embedded is not None:
+            self.buffer += b"%s Tj\n" % embedded.encode(text)
+        else:
+            self.buffer += b"(%s) Tj\n" % encode_text(text)
+        self.operator_count += 1
+
+    def text(self, text: str, font: str, size: float, x: float, y: float,
+             color: Tuple[float, float, float] = (0, 0, 0)):
+        """
+        Draw one run of text in its own text object.
+
+        Args:
+            text: Characters to show
+            font: Resource name of the font
+            size: Font size in points
+            x: Left edge of the run
+            y: Baseline of the run
+            color: RGB fill color with components in 0-1
+        """
+        self.begin_text()
+        self.set_fill_color(*color)
+        self.set_font(font, size)
+        self.set_text_position(x, y)
+        self.show_text(text)
+        self.end_text()
+
+    # -- color ----------------------------------------------------------------
+
+    def set_fill_color(self, r: float, g: float, b: float):
+        self.buffer += b"%s %s %s rg\n" % (format_number(r), format_number(g), format_number(b))
+        self.operator_count += 1
+
+    def set_stroke_color(self, r: float, g: float, b: float):
+        self.buffer += b"%s %s %s RG\n" % (format_number(r), format_number(g), format_number(b))
+        self.operator_count += 1
+
+    # -- graphics -------------------------------------------------------------
+
+    def save_state(self):
+        self.buffer += b"q\n"
+        self.operator_count += 1
+
+    def restore_state(self):
+        self.buffer += b"Q\n"
+        self.operator_count += 1
+
+    def concat_matrix(self, a: float, b: float, c: float, d: float, e: float, f: float):
+        self.buffer += b"%s cm\n" % b" ".join(format_number(v) for v in (a, b, c, d, e, f))
+        self.operator_count += 1
+
+    def set_line_width(self, width: float):
+        self.buffer += b"%s w\n" % format_number(width)
+        self.operator_count += 1
+
+    def line(self, x1: float, y1: float, x2: float, y2: float):
+        """Stroke a straight line with the current line width and color."""
+        self.buffer += b"%s %s m\n%s %s l\nS\n" % (format_number(x1), format_number(y1),
+                                                  format_number(x2), format_number(y2))
+        self.operator_count += 3
+
+    def rect(self, x: float, y: float, width: float, height: float, fill: bool = False):
+        """Fill or stroke a rectangle."""
+        self.buffer += b"%s %s %s %s re\n%s\n" % (format_number(x), format_number(y),
+                                                 format_number(width), format_number(height),
+                                                 b"f" if fill else b"S")
+        self.operator_count += 2
+
+    def draw_xobject(self, name: str):
+        """Paint an image or Form XObject (``Do``)."""
+        self.buffer += b"/%s Do\n" % name.encode('ascii')
+        self.operator_count += 1
+        self.xobjects.add(name)
@@ -0,0 +1,171 @@
+"""
+Form XObject reuse for repeated PDF graphics.
+
+Content that appears many times in a document (the same math expression,
+the same rule or running header) is drawn once at the origin and then
+placed with a translation. From the second occurrence on, the drawing is
+stored as a Form XObject and each placement is a single ``Do`` operator,
+so both the content streams and the per-occurrence layout work shrink.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from .content_stream import ContentStreamBuilder
+from .pdf_compression import ContentCompressor
+from .pdf_writer import PDFWriter
+
+
+# Operators whose leading operands are an (x, y) position
+_NUMBER = r"(-?[\d.]+(?:e[-+]?\d+)?)"
+_POSITION_PATTERN = re.compile(rf"^(?:1 0 0 1 )?{_NUMBER} {_NUMBER} (?:Tm|m|l|Td)$")
+_FONT_PATTERN = re.compile(rf"^/\S+ {_NUMBER} Tf$")
+
+
+@dataclass
+class FormXObject:
+    """A drawing recorded at the origin, ready to be placed anywhere."""
+    commands: ContentStreamBuilder
+    width: float
+    bbox: Tuple[float, float, float, float]
+    uses: int = 0
+    name: Optional[str] = None  # Assigned once the drawing is reused
+    object_number: Optional[int] = field(default=None, repr=False)
+
+
+def compute_bbox(commands: Iterable[str], width: float) -> Tuple[float, float, float, float]:
+    """
+    Estimate a bounding box for origin-relative drawing commands.
+
+    Positions come from ``Tm``/``Td``/``m``/``l`` operands; the box is
+    padded by the largest font size so glyph ascenders and descenders
+    are never clipped.
+    """
+    xs = [0.0, width]
+    ys = [0.0]
+    pad = 2.0
+    for command in commands:
+        match = _POSITION_PATTERN.match(command)
+        if match:
+            xs.append(float(match.group(1)))
+            ys.append(float(match.group(2)))
+            continue
+        match = _FONT_PATTERN.match(command)
+        if match:
+            pad = max(pad, float(match.group(1)))
+    return (min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+
+
+class FormXObjectRegistry:
+    """
+    Records repeated drawings and turns them into Form XObjects.
+
+    Drawings are identified by a caller-supplied key (for math, the
+    LaTeX source and font size). The first placement is drawn inline so
+    one-off content costs nothing extra; later placements reference the
+    shared XObject.
+    """
+
+    def __init__(self, min_uses: int = 2, prefix: str = "Fx"):
+        """
+        Initialize the registry.
+
+        Args:
+            min_uses: Occurrences at which a drawing becomes an XObject
+            prefix: Resource name prefix for the XObjects
+        """
+        self.min_uses = min_uses
+        self.prefix = prefix
+        self.forms: Dict[Hashable, FormXObject] = {}
+        self.named: List[FormXObject] = []
+
+    def record(self, key: Hashable,
+               draw: Callable[[], Tuple[Union[ContentStreamBuilder, List[str]], float]]
+               ) -> FormXObject:
+        """
+        Draw a drawing at the origin unless it was drawn already.
+
+        Lets a caller learn the width before choosing where to place it.
+
+        Args:
+            key: Identity of the drawing
+            draw: Callable returning ``(commands, width)`` for the drawing
+                  made at the origin; exceptions propagate to the caller
+
+        Returns:
+            The recorded drawing
+        """
+        form = self.forms.get(key)
+        if form is None:
+            commands, width = draw()
+            stream = ContentStreamBuilder()
+            stream.extend(commands)
+            form = FormXObject(commands=stream, width=width,
+                               bbox=compute_bbox(stream, width))
+            self.forms[key] = form
+        return form
+
+    def place(self, key: Hashable, x: float, y: float,
+              draw: Callable[[], Tuple[Union[ContentStreamBuilder, List[str]], float]]
+              ) -> Tuple[ContentStreamBuilder, float]:
+        """
+        Place a drawing at (x, y), drawing it only the first time.
+
+        Args:
+            key: Identity of the drawing
+            x: Horizontal position of the drawing's origin
+            y: Vertical position of the drawing's origin (baseline)
+            draw: Callable returning ``(commands, width)`` for the drawing
+                  made at the origin; exceptions propagate to the caller
+
+        Returns:
+            Tuple of (pdf_commands, width)
+        """
+        form = self.record(key, draw)
+        form.uses += 1
+
+        placed = ContentStreamBuilder()
+        placed.save_state()
+        placed.concat_matrix(1, 0, 0, 1, x, y)
+        if form.uses < self.min_uses:
+            placed.extend(form.commands)
+        else:
+            if form.name is None:
+                form.name = f"{self.prefix}{len(self.named) + 1}"
+                self.named.append(form)
+            placed.draw_xobject(form.name)
+        placed.restore_state()
+        return placed, form.width
+
+    @property
+    def reuse_count(self) -> int:
+        """Placements served by an XObject instead of fresh operators."""
+        return sum(form.uses - self.min_uses + 1 for form in self.named)
+
+    def write_forms(self, writer: PDFWriter, compressor: ContentCompressor,
+                    resources: int) -> Dict[str, int]:
+        """
+        Write every reused drawing as a Form XObject.
+
+        Args:
+            writer: Writer bound to the output sink
+            compressor: Compressor for the form content streams
+            resources: Object number of the resource dictionary the
+                       forms draw with
+
+        Returns:
+            Mapping of XObject resource name to object number
+        """
+        written = {}
+        for form in self.named:
+            if form.object_number is None:
+                data, filters = compressor.encode(form.commands.getvalue())
+                bbox = ' '.join(f"{value:g}" for value in form.bbox)
+                form.object_number = writer.write_stream(
+                    data, filters=filters,
+                    extra_entries=(f"/Type /XObject\n/Subtype /Form\n/BBox [{bbox}]\n"
+                                   f"/Resources {resources} 0 R")
+                )
+            written[form.name] = form.object_number
+        return written
@@ -8,9 +8,13 @@ Provides automatic layout management, proper math rendering, and eliminates posi
 import io
 from typing import Dict, List, Optional, Tuple, Any
 from fpdf import FPDF
+from fpdf.image_parsing import preload_image
 from ..model.ast import Document, Heading, Paragraph, MathBlock, MathInline, CodeBlock, ListBlock, ListItem, Link, Image, Text, Bold, Italic, Strikethrough, CodeInline, Table
 from .rendering_tracker import RenderingTracker
 from .math_graphics import MathGraphicsRenderer
+from .pdf_images import ImageStore, UnsupportedImageError
+from ..cache_system import word_width_cache
+from ..layout.tiered_breaker import TieredLineBreaker
 from ..math import MathExpressionParser, MathLayoutEngine
 
 
@@ -53,12 +57,17 @@ class FPDF2Renderer:
         self.math_engine = MathLayoutEngine()
         self.math_graphics = MathGraphicsRenderer(self)
 
+        # Images are identified by content hash; sizes come from headers
+        self.images = ImageStore()
+        self.image_dpi = 96
+
         # Font setup - use built-in fonts initially
         self.setup_fonts()
 
         # Typography settings
         self.current_font_size = 12
         self.line_height_factor = 1.2
+        self.line_breaker = TieredLineBreaker(ragged_right=True)  # Greedy wrapping, Knuth-Plass when it sets badly
 
     def setup_fonts(self):
         """Setup fonts for rendering using only built-in fpdf2 fonts."""
@@ -383,30 +392,29 @@ class FPDF2Renderer:
             # Update current position after each element
             current_x = self.pdf.get_x()
 
+    def _string_width(self, text: str) -> float:
+        """Width of text in the current fpdf2 font, from the shared word width cache."""
+        font_key = f"fpdf2:{self.pdf.font_family}:{self.pdf.font_style}"
+        return word_width_cache.text_width(font_key, text, self.pdf.font_size_pt,
+                                           self.pdf.get_string_width)
+
     def _render_text_with_wrapping(self, text: str, start_x: float, start_y: float, max_width: float, line_height: float):
         """Render text with automatic wrapping, updating current position."""
         words = text.split()
-        current_line = []
-        current_width = 0
-        
-        for word in words:
-            word_width = self.pdf.get_string_width(word + ' ')
-            if current_line and current_width + word_width > max_width:
-                # Render current line
-                line_text = ' '.join(current_line)
-                self.pdf.text(start_x, self.pdf.get_y() + line_height * 0.8, line_text)
-                self.pdf.set_xy(start_x, self.pdf.get_y() + line_height)
-                current_line = [word]
-                current_width = word_width
-            else:
-                current_line.append(word)
-                current_width += word_width
-        
-        # Render remaining line
-        if current_line:
-            line_text = ' '.join(current_line)
+        if not words:
+            return
+
+        word_widths = [self._string_width(word) for word in words]
+        lines = self.line_breaker.wrap_words(words, word_widths, self._string_width(' '), max_width)
+
+        # Every line but the last moves down to a fresh line
+        for line_text in lines[:-1]:
             self.pdf.text(start_x, self.pdf.get_y() + line_height * 0.8, line_text)
-            self.pdf.set_xy(start_x + self.pdf.get_string_width(line_text), self.pdf.get_y())
+            self.pdf.set_xy(start_x, self.pdf.get_y() + line_height)
+
+        # Render remaining line
+        self.pdf.text(start_x, self.pdf.get_y() + line_height * 0.8, lines[-1])
+        self.pdf.set_xy(start_x + self._string_width(lines[-1]), self.pdf.get_y())
 
     def _render_math_block_fpdf2(self, math_block: MathBlock):
         """Render math block with matplotlib integration."""
@@ -425,7 +433,7 @@ class FPDF2Renderer:
         math_text = f"[MATH: {content}]"
 
         # Center the math text
-        text_width = self.pdf.get_string_width(math_text)
+        text_width = self._string_width(math_text)
         x_pos = (self.pdf.w - text_width) / 2
 
         start_y = self.pdf.get_y()
@@ -551,7 +559,7 @@ class FPDF2Renderer:
             # Fallback to text
             fallback_text = f"[{latex}]"
             self.pdf.text(self.pdf.get_x(), self.pdf.get_y(), fallback_text)
-            self.pdf.set_x(self.pdf.get_x() + self.pdf.get_string_width(fallback_text))
+            self.pdf.set_x(self.pdf.get_x() + self._string_width(fallback_text))
             return False
 
     def _render_inline_math_with_graphics(self, latex: str, x: float, y: float, max_width: float, line_height: float):
@@ -601,7 +609,7 @@ class FPDF2Renderer:
             # Fallback to simple text
             fallback_text = f"[{latex}]"
             self.pdf.text(self.pdf.get_x(), self.pdf.get_y(), fallback_text)
-            self.pdf.set_x(self.pdf.get_x() + self.pdf.get_string_width(fallback_text))
+            self.pdf.set_x(self.pdf.get_x() + self._string_width(fallback_text))
             return False
 
     def _render_code_block_fpdf2(self, code_block: CodeBlock):
@@ -620,7 +628,7 @@ class FPDF2Renderer:
                 self.pdf.cell(0, 12, sanitized_line, ln=True)
 
                 # Record in tracker
-                line_width = self.pdf.get_string_width(sanitized_line)
+                line_width = self._string_width(sanitized_line)
                 self.tracker.record_text(
                     x=self.pdf.l_margin,
                     y=self.pdf.get_y() - 12,
@@ -661,7 +669,7 @@ class FPDF2Renderer:
                 current_width = 0
 
                 for word in words:
-                    word_width = self.pdf.get_string_width(word + ' ')
+                    word_width = self._string_width(word + ' ')
                     if current_line and current_width + word_width > available_width:
                         lines.append(' '.join(current_line))
                         current_line = [word]
@@ -690,7 +698,7 @@ class FPDF2Renderer:
                     self.pdf.cell(available_width, line_height, line, ln=True)
 
                     # Record in tracker
-                    line_width = self.pdf.get_string_width(line)
+                    line_width = self._string_width(line)
                     current_y = self.pdf.get_y() - line_height
                     pdf_y_top, pdf_y_bottom = self._convert_fpdf2_to_pdf_coords(current_y, line_height)
 
@@ -755,7 +763,7 @@ class FPDF2Renderer:
                 y_pos = start_y + CELL_PADDING + 8  # 8 is approx text height offset
                 
                 # Handle text that might be too wide
-                if self.pdf.get_string_width(cell_text) > col_width - (2 * CELL_PADDING):
+                if self._string_width(cell_text) > col_width - (2 * CELL_PADDING):
                     # Truncate with ellipsis
                     while cell_text and self.pdf.get_string_width(cell_text + '...') > col_width - (2 * CELL_PADDING):
                         cell_text = cell_text[:-1]
@@ -799,7 +807,7 @@ class FPDF2Renderer:
                 y_pos = start_y + CELL_PADDING + 8
                 
                 # Handle text that might be too wide
-                if self.pdf.get_string_width(cell_text) > col_width - (2 * CELL_PADDING):
+                if self._string_width(cell_text) > col_width - (2 * CELL_PADDING):
                     # Truncate with ellipsis
                     while cell_text and self.pdf.get_string_width(cell_text + '...') > col_width - (2 * CELL_PADDING):
                         cell_text = cell_text[:-1]
@@ -829,9 +837,63 @@ class FPDF2Renderer:
         self.pdf.ln(12)
 
     def _render_image_fpdf2(self, image: Image):
-        """Render image using fpdf2 (placeholder)."""
-        # For now, just add some space
-        self.pdf.ln(50)
+        """
+        Render image using fpdf2.
+
+        The size is read from the image header without decoding, and
+        content-identical files are always passed to fpdf2 under the
+        first path they were seen at, so fpdf2's per-name image cache
+        embeds each distinct image once. Images the header reader does
+        not handle (other formats, interlaced PNGs) are still embedded
+        by fpdf2, which then also supplies their size.
+        """
+        try:
+            info = self.images.add_file(image.url)
+            info.data = None  # fpdf2 reads the file itself
+            source, name = info.source, info.name
+            pixel_width, pixel_height = info.width, info.height
+        except UnsupportedImageError:
+            source, name = image.url, image.url
+            try:
+                pixel_width, pixel_height = self._fpdf2_image_size(image.url)
+            except Exception as e:
+                print(f"Image embedding failed for {image.url}: {e}")
+                self.pdf.ln(self.current_font_size * self.line_height_factor)
+                return
+        except OSError as e:
+            print(f"Image embedding failed for {image.url}: {e}")
+            self.pdf.ln(self.current_font_size * self.line_height_factor)
+            return
+
+        max_width = self.pdf.w - self.pdf.l_margin - self.pdf.r_margin
+        width = pixel_width * 72.0 / self.image_dpi
+        height = pixel_height * 72.0 / self.image_dpi
+        scale = min(1.0, max_width / width)
+        width, height = width * scale, height * scale
+
+        if self.pdf.get_y() + height > self.pdf.h - self.margin_bottom:
+            self.pdf.add_page()
+            self.current_page += 1
+            self.tracker.current_page = self.current_page
+
+        start_y = self.pdf.get_y()
+        self.pdf.image(source, x=self.pdf.l_margin, y=start_y, w=width, h=height)
+        self.pdf.set_y(start_y + height)
+
+        pdf_y_top, _ = self._convert_fpdf2_to_pdf_coords(start_y, height)
+        self.tracker.record_object(
+            x=self.pdf.l_margin,
+            y=pdf_y_top,
+            width=width,
+            height=height,
+            page=self.current_page,
+            label=f"image_{name}"
+        )
+
+    def _fpdf2_image_size(self, path: str) -> Tuple[int, int]:
+        """Pixel size of an image as fpdf2 loads it, cached for the later placement."""
+        _, _, info = preload_image(self.pdf.image_cache, path)
+        return int(info["w"]), int(info["h"])
 
     def _render_horizontal_rule_fpdf2(self, block):
         """Render horizontal rule (page break)."""
@@ -2,9 +2,12 @@
 Layout adjustments.
 
 Adjustments modify layout state to fix constraint violations.
+They repair the layout locally: the pages an adjustment changes are
+re-flowed forward only until the layout matches the previous one again,
+so the rest of the document is neither laid out again nor copied.
 """
 
-from typing import TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 from .constraint_primitives import LayoutState, Adjustment
 from .layout_primitives import LayoutBox, PageLayout
 
@@ -12,11 +15,81 @@ if TYPE_CHECKING:
     from .layout_generator import LayoutGenerator
 
 
+BOX_SPACING = 6.0  # Spacing between boxes placed by an adjustment
+
+
+def reflow_from(state: LayoutState, page_idx: int, spacing: float = BOX_SPACING) -> int:
+    """
+    Carry boxes that no longer fit a page on to the following pages.
+    
+    The boxes from the first one overflowing the page onwards move to the
+    top of the next page, pushing its boxes down as far as needed. Re-flow
+    stops at the first page that overflows no more: from there on the
+    layout is the previous one, and its pages stay shared with it. A box
+    taller than a page is left alone at the top of its page.
+    
+    Args:
+        state: Layout state to change in place
+        page_idx: Index of the first page that may overflow
+        spacing: Spacing left after each carried box
+        
+    Returns:
+        Index of the page where re-flow stopped
+    """
+    while page_idx < len(state.pages):
+        page = state.pages[page_idx]
+        overflow = next((index for index, box in enumerate(page.boxes)
+                         if index > 0 and box.bottom < page.content_bottom), None)
+        if overflow is None:
+            break
+        
+        page = state.edit_page(page_idx)
+        carried = page.boxes[overflow:]
+        del page.boxes[overflow:]
+        _place_at_top(_next_page(state, page_idx), carried, spacing)
+        page_idx += 1
+    
+    return page_idx
+
+
+def _next_page(state: LayoutState, page_idx: int) -> PageLayout:
+    """Get the page after page_idx to change, adding it if needed"""
+    if page_idx + 1 >= len(state.pages):
+        page = state.pages[page_idx]
+        state.add_page(PageLayout(
+            page_number=len(state.pages),
+            width=page.width,
+            height=page.height,
+            margin_top=page.margin_top,
+            margin_bottom=page.margin_bottom,
+            margin_left=page.margin_left,
+            margin_right=page.margin_right
+        ))
+    return state.edit_page(page_idx + 1)
+
+
+def _place_at_top(page: PageLayout, boxes: List[LayoutBox], spacing: float):
+    """Stack boxes at the top of a page, pushing its boxes down if they are in the way"""
+    y = page.content_top
+    for box in boxes:
+        box.y = y
+        y -= box.height + spacing
+    
+    if page.boxes and page.boxes[0].y > y:
+        shift = page.boxes[0].y - y
+        for box in page.boxes:
+            box.y -= shift
+    
+    page.boxes[0:0] = boxes
+
+
 class MoveToNextPageAdjustment(Adjustment):
     """
     Move an element to the next page.
     
     Used to fix overflow violations by moving content to next page.
+    The element and the boxes after it start the next page, and the
+    boxes they push off it re-flow on to the pages that follow.
     """
     
     def __init__(self, element: LayoutBox):
@@ -48,47 +121,16 @@ class MoveToNextPageAdjustment(Adjustment):
             # Element not found, return unchanged
             return new_state
         
-        page = new_state.pages[page_idx]
-        
-        # Remove from current page
-        page.boxes.pop(box_idx)
-        
-        # Ensure next page exists
-        if page_idx + 1 >= len(new_state.pages):
-            new_page = PageLayout(
-                page_number=len(new_state.pages),
-                width=page.width,
-                height=page.height,
-                margin_top=page.margin_top,
-                margin_bottom=page.margin_bottom,
-                margin_left=page.margin_left,
-                margin_right=page.margin_right
-            )
-            new_state.pages.append(new_page)
-        
-        next_page = new_state.pages[page_idx + 1]
-        
-        # Create new box at top of next page
-        moved_box = LayoutBox(
-            box_type=self.element.box_type,
-            x=self.element.x,
-            y=next_page.content_top,
-            width=self.element.width,
-            height=self.element.height,
-            content=self.element.content,
-            children=self.element.children,
-            metadata=dict(self.element.metadata)
-        )
-        moved_box.add_adjustment("moved_to_next_page")
-        
-        # Add to next page
-        next_page.boxes.insert(0, moved_box)
-        
-        # Reflow subsequent elements on next page
-        current_y = next_page.content_top - moved_box.height - 6
-        for i, box in enumerate(next_page.boxes[1:], 1):
-            box.y = current_y
-            current_y -= box.height + 6
+        page = new_state.edit_page(page_idx)
+        
+        # The element and what follows it start the next page
+        moved = page.boxes[box_idx:]
+        del page.boxes[box_idx:]
+        moved[0].add_adjustment("moved_to_next_page")
+        _place_at_top(_next_page(new_state, page_idx), moved, BOX_SPACING)
+        
+        # Re-flow only as far as the next page overflows
+        reflow_from(new_state, page_idx + 1)
         
         return new_state
 
@@ -97,7 +139,8 @@ class IncreaseSpacingAdjustment(Adjustment):
     """
     Increase spacing after an element.
     
-    Used to fix minimum spacing violations.
+    Used to fix minimum spacing violations. Boxes pushed off the
+    bottom of the page re-flow on to the pages that follow.
     """
     
     def __init__(self, element: LayoutBox, target_spacing: float):
@@ -130,7 +173,7 @@ class IncreaseSpacingAdjustment(Adjustment):
         if page_idx is None or box_idx is None:
             return new_state
         
-        page = new_state.pages[page_idx]
+        page = new_state.edit_page(page_idx)
         
         # Calculate current spacing to previous element
         if box_idx > 0:
@@ -143,7 +186,8 @@ class IncreaseSpacingAdjustment(Adjustment):
                 for i in range(box_idx, len(page.boxes)):
                     page.boxes[i].y -= spacing_increase
                 
-                self.element.add_adjustment("spacing_increased")
+                page.boxes[box_idx].add_adjustment("spacing_increased")
+                reflow_from(new_state, page_idx)
         
         return new_state
 
@@ -153,7 +197,9 @@ class PullLineFromPreviousPageAdjustment(Adjustment):
     Pull one more line from previous page to fix widow.
     
     This is complex - requires re-breaking the paragraph.
-    For now, we'll implement a simple version that moves the element.
+    For now, we'll implement a simple version that moves the element
+    to the foot of the previous page, where it is re-flowed back if it
+    does not fit there.
     """
     
     def __init__(self, element: LayoutBox):
@@ -189,25 +235,26 @@ class PullLineFromPreviousPageAdjustment(Adjustment):
         
         # For now, just move to previous page
         # A full implementation would re-break the paragraph
-        current_page = new_state.pages[page_idx]
-        prev_page = new_state.pages[page_idx - 1]
-        
-        # Remove from current page
-        current_page.boxes.pop(box_idx)
-        
-        # Add to previous page
-        moved_box = LayoutBox(
-            box_type=self.element.box_type,
-            x=self.element.x,
-            y=prev_page.content_bottom + self.element.height,
-            width=self.element.width,
-            height=self.element.height,
-            content=self.element.content,
-            children=self.element.children,
-            metadata=dict(self.element.metadata)
-        )
+        current_page = new_state.edit_page(page_idx)
+        prev_page = new_state.edit_page(page_idx - 1)
+        
+        # Remove from current page, closing the gap it leaves
+        moved_box = current_page.boxes.pop(box_idx)
+        if box_idx < len(current_page.boxes):
+            gap = current_page.boxes[box_idx].y - moved_box.y
+            for box in current_page.boxes[box_idx:]:
+                box.y -= gap
+        
+        # Add to previous page, after its last box
+        if prev_page.boxes:
+            moved_box.y = prev_page.boxes[-1].bottom - BOX_SPACING
+        else:
+            moved_box.y = prev_page.content_top
         moved_box.add_adjustment("pulled_from_next_page")
         
         prev_page.boxes.append(moved_box)
         
+        # Carry it back if the previous page cannot take it
+        reflow_from(new_state, page_idx - 1)
+        
         return new_state
@@ -0,0 +1,146 @@
+"""
+Page-boundary layout checkpoints.
+
+A build records a compact checkpoint at every page boundary: the block the
+page starts in, the line of that block when a paragraph continues from the
+previous page, and where on the page its content starts. Together with
+each block's measurement and the page builder's plan, this is everything
+the next build needs to lay out an edited document incrementally:
+
+- blocks before the first changed one, and after the last, keep their
+  measurements, so only changed blocks are broken into lines again
+- the page builder's plan for the items after the last changed block
+  carries over; the plan is global (the best break on a page depends on
+  everything after it), so the entries before it are computed again from
+  the kept measurements, which is cheap next to measuring
+- pages are walked from the first one, and as soon as a page starts
+  where an old one did past the changed blocks, the old pages from there
+  on are reused as they are
+
+The pages are therefore always those a fresh build of the same source
+would choose, whatever the edit history.
+
+Layout carries no other state across a page boundary (there are no floats
+waiting for a page and no counters that change where lines fall), so equal
+checkpoints mean the rest of the layout is the same.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .layout_measurer import MeasurementResult
+from .page_builder import PageItem, PagePlan
+
+
+@dataclass(frozen=True)
+class LayoutCheckpoint:
+    """Where layout stands when a page starts."""
+    block: int         # Block the page starts in
+    line: int = 0      # Line of that block the page starts at, for a split paragraph
+    y: float = 0.0     # Where the page's content starts
+    item: int = field(default=0, compare=False)  # The page's first page item
+
+    def shifted(self, blocks: int, items: int) -> 'LayoutCheckpoint':
+        """The checkpoint after blocks and items were inserted before it."""
+        return LayoutCheckpoint(block=self.block + blocks, line=self.line, y=self.y,
+                                item=self.item + items)
+
+
+@dataclass
+class LayoutRecord:
+    """What one build laid out, kept to lay out the next build incrementally."""
+    key: Tuple                              # Settings the layout depends on
+    fingerprints: List[str]                 # One per block, equal for equal blocks
+    measurements: List[MeasurementResult]   # One per block
+    items: List[PageItem]
+    plan: PagePlan
+    checkpoints: List[LayoutCheckpoint]     # One per page, in order
+    replanned: int = 0                      # Pages whose breaks this build planned again
+
+
+def block_fingerprint(block) -> str:
+    """Text equal for equal blocks."""
+    return repr(block)
+
+
+def changed_blocks(old: Sequence[str], new: Sequence[str]) -> Tuple[int, int]:
+    """
+    Find which blocks an edit changed.
+
+    Args:
+        old: Fingerprints of the previous build's blocks
+        new: Fingerprints of this build's blocks
+
+    Returns:
+        ``(prefix, suffix)``: how many blocks at the start and at the end
+        of the document are unchanged
+    """
+    shortest = min(len(old), len(new))
+    prefix = 0
+    while prefix < shortest and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+def first_item_of(items: Sequence[PageItem], block: int) -> int:
+    """Index of the first item of ``block`` or a later block."""
+    low, high = 0, len(items)
+    while low < high:
+        middle = (low + high) // 2
+        if items[middle].block < block:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def plan_checkpoints(items: List[PageItem], plan: PagePlan, checkpoints: List[LayoutCheckpoint],
+                     start: int, page_top: float, previous: Optional[LayoutRecord] = None,
+                     reuse_from: int = 0, block_shift: int = 0) -> Tuple[List[LayoutCheckpoint], int]:
+    """
+    Add the checkpoints of the planned pages from one page start on.
+
+    Args:
+        items: The document's items
+        plan: The document's plan, known from ``start`` on
+        checkpoints: Checkpoints of the pages before, extended in place
+        start: Item the next page starts at
+        page_top: Where the content of a page that is not the first starts
+        previous: The previous build, whose checkpoints are reused as soon
+                  as a page starts where one of them did
+        reuse_from: First item from which the items are the previous
+                    build's, shifted
+        block_shift: Blocks the edit inserted (negative when removed)
+
+    Returns:
+        The checkpoints, and how many of them were planned
+    """
+    item_shift = len(items) - len(previous.items) if previous else 0
+    old_pages: Dict[int, int] = {}
+    if previous is not None:
+        old_pages = {checkpoint.item: index for index, checkpoint in enumerate(previous.checkpoints)}
+
+    planned = 0
+    while start < len(items):
+        old = old_pages.get(start - item_shift) if start >= reuse_from else None
+        if old is not None:
+            # Same page start past the edit: the rest is the old layout
+            checkpoints.extend(checkpoint.shifted(block_shift, item_shift)
+                               for checkpoint in previous.checkpoints[old:])
+            break
+        checkpoints.append(LayoutCheckpoint(block=items[start].block, line=items[start].line,
+                                            y=page_top, item=start))
+        planned += 1
+        start = plan.next[start]
+    return checkpoints, planned
+
+
+def page_breaks(checkpoints: Sequence[LayoutCheckpoint]) -> Dict[int, List[int]]:
+    """For each block a page after the first starts in, the lines those pages start at."""
+    breaks: Dict[int, List[int]] = {}
+    for checkpoint in checkpoints[1:]:
+        breaks.setdefault(checkpoint.block, []).append(checkpoint.line)
+    return breaks
@@ -5,10 +5,11 @@ Generates layout state from document AST.
 Uses the refactored TextLayoutEngine and layout primitives.
 """
 
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from ..model.ast import Document, Paragraph, Heading, Text
 from .constraint_primitives import LayoutState
 from .layout_primitives import LayoutBox, PageLayout, BoxType, ParagraphLayout
+from .page_builder import PageBuilder, PageItem
 from .text_layout_engine import TextLayoutEngine
 
 if TYPE_CHECKING:
@@ -23,16 +24,24 @@ class LayoutGenerator:
     Produces immutable LayoutState objects.
     """
     
-    def __init__(self, font_metrics: Dict[str, Dict], page_config: Dict[str, Any]):
+    # Spacing that follows each kind of box
+    PARAGRAPH_SPACING = 6.0
+    HEADING_SPACING = 12.0
+    
+    def __init__(self, font_metrics: Dict[str, Dict], page_config: Dict[str, Any],
+                 page_builder: Optional[PageBuilder] = None):
         """
         Initialize generator.
         
         Args:
             font_metrics: Font metrics dictionary
             page_config: Page configuration (width, height, margins)
+            page_builder: Chooses the initial layout's page breaks
+                          (defaults to one scoring every layout rule)
         """
         self.text_engine = TextLayoutEngine(font_metrics)
         self.page_config = page_config
+        self.page_builder = page_builder or PageBuilder()
         
         # Page dimensions
         self.page_width = page_config.get('width', 612)
@@ -51,7 +60,9 @@ class LayoutGenerator:
         """
         Generate initial layout without constraint checking.
         
-        This is the "naive" layout - just place elements sequentially.
+        Elements are placed sequentially, then moved onto the pages the
+        page builder chooses, so that a constraint solver starting from this
+        layout has little left to fix.
         
         Args:
             doc: Document to layout
@@ -72,13 +83,16 @@ class LayoutGenerator:
         for block in doc.blocks:
             state = self._layout_block(block, state)
         
-        return state
+        return self._paginate(state)
     
     def regenerate_with_adjustments(self, state: LayoutState,
                                    adjustments: List['Adjustment']) -> LayoutState:
         """
         Apply adjustments and regenerate layout.
         
+        Each adjustment repairs the layout locally, re-flowing only the
+        pages it changes, so the document is not laid out again.
+        
         Args:
             state: Current layout state
             adjustments: Adjustments to apply
@@ -189,8 +203,7 @@ class LayoutGenerator:
         state.elements.append(para_box)
         
         # Update position (with spacing)
-        paragraph_spacing = 6.0
-        state.current_y -= total_height + paragraph_spacing
+        state.current_y -= total_height + self.PARAGRAPH_SPACING
         
         return state
     
@@ -259,11 +272,67 @@ class LayoutGenerator:
         state.elements.append(heading_box)
         
         # Update position (with spacing)
-        heading_spacing = 12.0
-        state.current_y -= total_height + heading_spacing
+        state.current_y -= total_height + self.HEADING_SPACING
+        
+        return state
+    
+    def _paginate(self, state: LayoutState) -> LayoutState:
+        """
+        Move laid-out elements onto the pages the page builder chooses.
+        
+        Elements are kept whole; the spacing after an element is dropped
+        when a page ends there.
+        
+        Args:
+            state: Layout state holding every element
+            
+        Returns:
+            The state with its pages rebuilt
+        """
+        boxes = state.elements
+        if not boxes:
+            return state
         
+        items = []
+        for index, box in enumerate(boxes):
+            lines = len(box.content) if isinstance(box.content, list) else 1
+            items.append(PageItem(
+                height=box.height,
+                space_before=self._spacing_after(boxes[index - 1]) if index else 0.0,
+                block=index,
+                block_lines=lines,
+                text_lines=lines if box.box_type == BoxType.PARAGRAPH else 0,
+                heading=box.box_type == BoxType.HEADING
+            ))
+        ranges = self.page_builder.break_pages(items, self.page_height - self.margin_top - self.margin_bottom)
+        
+        state.pages = []
+        for start, end in ranges:
+            page = self._create_page(len(state.pages))
+            y = page.content_top
+            for box in boxes[start:end]:
+                self._move_box(box, y)
+                page.add_box(box)
+                y -= box.height + self._spacing_after(box)
+            state.pages.append(page)
+        
+        state.current_page = len(state.pages) - 1
+        state.current_y = y
         return state
     
+    def _spacing_after(self, box: LayoutBox) -> float:
+        """Spacing that follows a box"""
+        return self.HEADING_SPACING if box.box_type == BoxType.HEADING else self.PARAGRAPH_SPACING
+    
+    def _move_box(self, box: LayoutBox, y: float):
+        """Move a box and its lines so that its top is at y"""
+        offset = y - box.y
+        box.y = y
+        for line in box.content if isinstance(box.content, list) else []:
+            line.y += offset
+            for run in line.runs:
+                run.y += offset
+    
     def _add_new_page(self, state: LayoutState) -> LayoutState:
         """Add a new page to state"""
         new_page = self._create_page(len(state.pages))
@@ -7,11 +7,32 @@ This is the foundation of the Measure → Update → Render → Check pipeline.
 """
 
 from dataclasses import dataclass
-from typing import Tuple, Optional, List as ListType
+from typing import Callable, Tuple, Optional, List as ListType
 from compose.model.ast import (
-    BlockElement, Paragraph, Heading, CodeBlock, ListBlock, ListItem,
+    BlockElement, Paragraph, Heading, CodeBlock, ListBlock, ListItem, MathBlock,
     Text, CodeInline, Link, MathInline, Bold, Italic
 )
+from compose.layout.batch_measure import measure_words
+from compose.layout.standard_fonts import metrics_text_width
+from compose.layout.tiered_breaker import TieredLineBreaker
+
+
+@dataclass
+class ParagraphLayout:
+    """Lines of a paragraph as measured, ready to be drawn."""
+    lines: ListType[str]
+    baselines: ListType[float]  # Distance of each baseline below the first
+    line_height: float
+
+    @classmethod
+    def from_lines(cls, lines: ListType[str], line_height: float) -> 'ParagraphLayout':
+        """Lines set one line height apart."""
+        return cls(lines, [index * line_height for index in range(len(lines))], line_height)
+
+    @property
+    def height(self) -> float:
+        """Vertical space the lines take, one line height each."""
+        return len(self.lines) * self.line_height
 
 
 @dataclass
@@ -22,6 +43,7 @@ class MeasurementResult:
     can_split: bool  # Whether this component can be split across pages
     spacing_after: float  # Spacing that should follow this component
     spacing_before: float = 0  # Spacing that should precede this component
+    paragraph_layout: Optional[ParagraphLayout] = None  # Lines to render, for paragraphs
     
     def __repr__(self):
         return (f"MeasurementResult(height={self.height:.1f}, "
@@ -42,7 +64,9 @@ class LayoutMeasurer:
     def __init__(self, page_width: float, page_height: float,
                  margin_left: float, margin_right: float,
                  margin_top: float, margin_bottom: float,
-                 font_metrics: dict, current_font_size: float = 12):
+                 font_metrics: dict, current_font_size: float = 12,
+                 line_breaker: Optional[TieredLineBreaker] = None,
+                 paragraph_layout: Optional[Callable[[Paragraph], ParagraphLayout]] = None):
         """
         Initialize the measurer.
         
@@ -55,6 +79,11 @@ class LayoutMeasurer:
             margin_bottom: Bottom margin
             font_metrics: Font metrics dictionary
             current_font_size: Current font size in points
+            line_breaker: Breaker the renderer wraps paragraphs with
+            paragraph_layout: The renderer's own paragraph setting; when
+                              given, paragraphs are measured by the lines
+                              they will be rendered in, which the result
+                              carries to the render phase
         """
         self.page_width = page_width
         self.page_height = page_height
@@ -64,6 +93,8 @@ class LayoutMeasurer:
         self.margin_bottom = margin_bottom
         self.font_metrics = font_metrics
         self.current_font_size = current_font_size
+        self.line_breaker = line_breaker or TieredLineBreaker()
+        self.paragraph_layout = paragraph_layout
         
         # Content area dimensions
         self.content_width = page_width - margin_left - margin_right
@@ -88,6 +119,8 @@ class LayoutMeasurer:
             return self._measure_code_block(element, spacing_after)
         elif isinstance(element, ListBlock):
             return self._measure_list(element, spacing_after)
+        elif isinstance(element, MathBlock):
+            return self._measure_math_block(element, spacing_after)
         else:
             # Unknown element type - estimate
             return MeasurementResult(
@@ -133,28 +166,22 @@ class LayoutMeasurer:
     
     def _measure_paragraph(self, paragraph: Paragraph, spacing_after: Optional[float] = None) -> MeasurementResult:
         """Measure a paragraph element."""
-        # Estimate paragraph height based on text content
-        # This is a simplified measurement - actual wrapping would be more complex
-        
-        # Extract text content
-        text_content = self._extract_text(paragraph.content)
-        
-        # Estimate number of lines
-        # Average characters per line at current font size
-        chars_per_line = int(self.content_width / (self.current_font_size * 0.5))
-        
-        if chars_per_line <= 0:
-            chars_per_line = 40  # Fallback
-        
-        num_lines = max(1, len(text_content) // chars_per_line + 1)
-        
-        # Line height
-        font_metrics = self.font_metrics.get("Helvetica", {})
-        ascender = font_metrics.get('ascent', self.current_font_size * 0.8) / 1000.0 * self.current_font_size
-        descender = abs(font_metrics.get('descent', self.current_font_size * 0.2)) / 1000.0 * self.current_font_size
-        line_height = (ascender + descender) * 1.2  # 1.2x line height factor
-        
-        content_height = num_lines * line_height
+        layout = None
+        if self.paragraph_layout is not None:
+            # Set the paragraph as the renderer will, so rendering only draws these lines
+            layout = self.paragraph_layout(paragraph)
+            content_height = len(layout.lines) * layout.line_height
+        else:
+            text_content = self._extract_text(paragraph.content)
+            num_lines = self._count_lines(text_content, "Helvetica", self.current_font_size)
+
+            # Line height
+            font_metrics = self.font_metrics.get("Helvetica", {})
+            ascender = font_metrics.get('ascent', self.current_font_size * 0.8) / 1000.0 * self.current_font_size
+            descender = abs(font_metrics.get('descent', self.current_font_size * 0.2)) / 1000.0 * self.current_font_size
+            line_height = (ascender + descender) * 1.2  # 1.2x line height factor
+
+            content_height = num_lines * line_height
         
         # Default spacing after paragraph
         default_spacing = 6
@@ -165,9 +192,24 @@ class LayoutMeasurer:
             content_height=content_height,
             can_split=True,  # Paragraphs can be split
             spacing_after=spacing,
-            spacing_before=0
+            spacing_before=0,
+            paragraph_layout=layout
         )
     
+    def _measure_math_block(self, math_block: MathBlock, spacing_after: Optional[float] = None) -> MeasurementResult:
+        """Measure a display math block."""
+        # The renderer sets the baseline one font size down and leaves one more below it
+        content_height = self.current_font_size * 2
+        spacing = spacing_after if spacing_after is not None else 6
+
+        return MeasurementResult(
+            height=content_height + spacing,
+            content_height=content_height,
+            can_split=False,
+            spacing_after=spacing,
+            spacing_before=0
+        )
+
     def _measure_code_block(self, code_block: CodeBlock, spacing_after: Optional[float] = None) -> MeasurementResult:
         """Measure a code block element."""
         # Count lines in code
@@ -222,6 +264,24 @@ class LayoutMeasurer:
             spacing_before=0
         )
     
+    def _count_lines(self, text: str, font: str, size: float) -> int:
+        """Count the lines the renderer's line breaker gives at the content width."""
+        metrics = self.font_metrics.get(font)
+        if metrics is None:
+            # Average characters per line at this font size
+            chars_per_line = max(1, int(self.content_width / (size * 0.5)))
+            return max(1, len(text) // chars_per_line + 1)
+
+        font_object = metrics.get('font')
+        if font_object is not None:
+            def measure(texts):
+                return measure_words(font_object, texts, size).widths
+        else:
+            def measure(texts):
+                return [metrics_text_width(metrics, text, size) for text in texts]
+        font_key = font_object.cache_key if font_object is not None else font
+        return max(1, len(self.line_breaker.wrap_text(text, self.content_width, font_key, size, measure)))
+
     def _extract_text(self, elements) -> str:
         """Extract plain text from inline elements."""
         result = []
@@ -4,11 +4,12 @@ Layout optimization utilities.
 Provides performance optimizations for the constraint-based layout system:
 - Parallel rule checking
 - Early termination strategies
+- Incremental rule checking of changed pages
 - Incremental layout updates
 - Caching and memoization
 """
 
-from typing import List, Dict, Callable, Any
+from typing import List, Dict, Callable, Any, Optional, Set
 from functools import lru_cache
 from .constraint_primitives import LayoutState, Violation
 from .layout_rules import LayoutRule
@@ -29,6 +30,19 @@ class RuleCheckOptimizer:
         self.max_cache_size = max_cache_size
         self.violation_cache: Dict[int, List[Violation]] = {}
         self.state_hashes: Dict[int, int] = {}
+        
+        # Incremental checking: the last checked state and, for each rule,
+        # its violations on each page of that state
+        self.checked_state: Optional[LayoutState] = None
+        self.checked_rules: List[LayoutRule] = []
+        self.page_violations: List[List[List[Violation]]] = []
+        self.pages_checked = 0  # Calls to LayoutRule.check_page
+    
+    def reset(self) -> None:
+        """Forget the last checked state, so the next check covers every page"""
+        self.checked_state = None
+        self.checked_rules = []
+        self.page_violations = []
     
     def check_rules_optimized(self, state: LayoutState, 
                              rules: List[LayoutRule],
@@ -61,6 +75,64 @@ class RuleCheckOptimizer:
         
         return violations
     
+    def check_rules_incremental(self, state: LayoutState,
+                                rules: List[LayoutRule]) -> List[Violation]:
+        """
+        Check rules, re-checking only the pages changed since the last check.
+        
+        A page is checked again if it is marked dirty, if it is not the
+        same page object as in the last checked state, or if it is within a
+        rule's ``page_reach`` of such a page; every other page keeps its
+        cached violations. The state's dirty marks are cleared.
+        
+        Args:
+            state: Layout state to check
+            rules: Rules to check
+            
+        Returns:
+            List of violations, rule by rule and page by page
+        """
+        page_count = len(state.pages)
+        previous = self.checked_state
+        if (previous is None or len(rules) != len(self.checked_rules) or
+                any(rule is not checked for rule, checked in zip(rules, self.checked_rules))):
+            dirty = set(range(page_count))
+            self.page_violations = [[] for _ in rules]
+        else:
+            dirty = self._changed_pages(previous, state)
+        
+        for rule, cache in zip(rules, self.page_violations):
+            if not hasattr(rule, 'check_page'):
+                # Rules without a per-page check are checked whole
+                cache[:] = [rule.check(state)]
+                continue
+            
+            del cache[page_count:]
+            cache.extend([] for _ in range(page_count - len(cache)))
+            reach = getattr(rule, 'page_reach', 0)
+            pages = {page + offset for page in dirty for offset in range(-reach, reach + 1)}
+            for page_idx in sorted(pages):
+                if 0 <= page_idx < page_count:
+                    cache[page_idx] = rule.check_page(state, page_idx)
+                    self.pages_checked += 1
+        
+        state.dirty_pages.clear()
+        self.checked_state = state
+        self.checked_rules = list(rules)
+        return [violation for cache in self.page_violations
+                for page in cache for violation in page]
+    
+    def _changed_pages(self, previous: LayoutState, state: LayoutState) -> Set[int]:
+        """Pages of state that may differ from the last checked state"""
+        changed = set(state.dirty_pages)
+        changed.update(page_idx for page_idx, (old, new) in enumerate(zip(previous.pages, state.pages))
+                       if old is not new)
+        if len(previous.pages) != len(state.pages):
+            # Pages were added or removed; the last page may have changed role
+            first = max(0, min(len(previous.pages), len(state.pages)) - 1)
+            changed.update(range(first, len(state.pages)))
+        return changed
+    
     def get_state_hash(self, state: LayoutState) -> int:
         """
         Get hash of layout state for caching.
@@ -69,10 +141,12 @@ class RuleCheckOptimizer:
             state: Layout state
             
         Returns:
-            Hash value
+            Hash of every page's boxes and their positions
         """
-        # Simple hash based on number of pages and elements
-        return hash((len(state.pages), len(state.elements), state.iteration))
+        return hash(tuple(
+            tuple((box.box_type, box.x, box.y, box.width, box.height) for box in page.boxes)
+            for page in state.pages
+        ))
 
 
 class IncrementalLayoutUpdater:
@@ -105,6 +179,10 @@ class IncrementalLayoutUpdater:
             old_page = old_state.pages[page_idx]
             new_page = new_state.pages[page_idx]
             
+            # Pages still shared between the states are unchanged
+            if old_page is new_page:
+                continue
+            
             for box_idx in range(min(len(old_page.boxes), len(new_page.boxes))):
                 old_box = old_page.boxes[box_idx]
                 new_box = new_page.boxes[box_idx]
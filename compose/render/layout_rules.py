@@ -16,9 +16,16 @@ class LayoutRule(ABC):
     
     A rule checks if a constraint is satisfied in the layout,
     and suggests adjustments if violations are found.
+    
+    Rules check one page at a time, so that a solver can re-check only
+    the pages an adjustment changed. Checking a page may read the pages
+    up to ``page_reach`` before and after it, and a page's violations
+    carry that page's index.
     """
     
-    @abstractmethod
+    # Pages on either side of a page that checking it reads
+    page_reach = 0
+    
     def check(self, state: LayoutState) -> List[Violation]:
         """
         Check if rule is satisfied.
@@ -29,6 +36,23 @@ class LayoutRule(ABC):
         Returns:
             List of violations (empty if rule satisfied)
         """
+        violations = []
+        for page_idx in range(len(state.pages)):
+            violations.extend(self.check_page(state, page_idx))
+        return violations
+    
+    @abstractmethod
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """
+        Check if rule is satisfied on one page.
+        
+        Args:
+            state: Current layout state
+            page_idx: Index of the page to check
+            
+        Returns:
+            List of the page's violations (empty if rule satisfied)
+        """
         pass
     
     @abstractmethod
@@ -54,33 +78,33 @@ class NoOverflowRule(LayoutRule):
     This is a critical rule - content must fit within page margins.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for content overflow"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check for content overflow on one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            for box in page.boxes:
-                # Check vertical overflow (bottom of page)
-                if box.bottom < page.content_bottom:
-                    overflow_amount = page.content_bottom - box.bottom
-                    violations.append(Violation(
-                        rule_name="no_overflow",
-                        severity=Severity.ERROR,
-                        element=box,
-                        page=page_idx,
-                        description=f"Element overflows page bottom by {overflow_amount:.1f}pt"
-                    ))
-                
-                # Check horizontal overflow (right edge)
-                if box.right > page.margin_left + page.content_width:
-                    overflow_amount = box.right - (page.margin_left + page.content_width)
-                    violations.append(Violation(
-                        rule_name="no_overflow",
-                        severity=Severity.ERROR,
-                        element=box,
-                        page=page_idx,
-                        description=f"Element overflows page right by {overflow_amount:.1f}pt"
-                    ))
+        page = state.pages[page_idx]
+        for box in page.boxes:
+            # Check vertical overflow (bottom of page)
+            if box.bottom < page.content_bottom:
+                overflow_amount = page.content_bottom - box.bottom
+                violations.append(Violation(
+                    rule_name="no_overflow",
+                    severity=Severity.ERROR,
+                    element=box,
+                    page=page_idx,
+                    description=f"Element overflows page bottom by {overflow_amount:.1f}pt"
+                ))
+            
+            # Check horizontal overflow (right edge)
+            if box.right > page.margin_left + page.content_width:
+                overflow_amount = box.right - (page.margin_left + page.content_width)
+                violations.append(Violation(
+                    rule_name="no_overflow",
+                    severity=Severity.ERROR,
+                    element=box,
+                    page=page_idx,
+                    description=f"Element overflows page right by {overflow_amount:.1f}pt"
+                ))
         
         return violations
     
@@ -107,26 +131,26 @@ class MinimumSpacingRule(LayoutRule):
         """
         self.min_spacing = min_spacing
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check spacing between elements"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check spacing between elements on one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            for i in range(len(page.boxes) - 1):
-                box1 = page.boxes[i]
-                box2 = page.boxes[i + 1]
-                
-                # Calculate spacing between boxes
-                spacing = box1.bottom - box2.y
-                
-                if spacing < self.min_spacing:
-                    violations.append(Violation(
-                        rule_name="minimum_spacing",
-                        severity=Severity.INFO,
-                        element=box2,
-                        page=page_idx,
-                        description=f"Spacing {spacing:.1f}pt < minimum {self.min_spacing:.1f}pt"
-                    ))
+        page = state.pages[page_idx]
+        for i in range(len(page.boxes) - 1):
+            box1 = page.boxes[i]
+            box2 = page.boxes[i + 1]
+            
+            # Calculate spacing between boxes
+            spacing = box1.bottom - box2.y
+            
+            if spacing < self.min_spacing:
+                violations.append(Violation(
+                    rule_name="minimum_spacing",
+                    severity=Severity.INFO,
+                    element=box2,
+                    page=page_idx,
+                    description=f"Spacing {spacing:.1f}pt < minimum {self.min_spacing:.1f}pt"
+                ))
         
         return violations
     
@@ -148,41 +172,41 @@ class NoOrphanLinesRule(LayoutRule):
     at the bottom of a page.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for orphan lines"""
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check for orphan lines on one page"""
         violations = []
         
-        for page_idx, page in enumerate(state.pages):
-            if not page.boxes:
-                continue
-            
-            # Check last element on page
-            last_box = page.boxes[-1]
-            
-            # Only check paragraphs
-            if last_box.box_type != BoxType.PARAGRAPH:
-                continue
-            
-            # Check if it's a multi-line paragraph
-            if not hasattr(last_box.content, '__len__'):
-                continue
-            
-            lines = last_box.content
-            if not isinstance(lines, list) or len(lines) <= 1:
-                continue
-            
-            # Count how many lines fit on this page
-            lines_on_page = self._count_lines_on_page(last_box, page)
-            
-            # If only 1 line of multi-line paragraph on page, it's an orphan
-            if lines_on_page == 1 and len(lines) > 1:
-                violations.append(Violation(
-                    rule_name="no_orphan_lines",
-                    severity=Severity.WARNING,
-                    element=last_box,
-                    page=page_idx,
-                    description=f"Orphan line: only 1 of {len(lines)} lines on page"
-                ))
+        page = state.pages[page_idx]
+        if not page.boxes:
+            return violations
+        
+        # Check last element on page
+        last_box = page.boxes[-1]
+        
+        # Only check paragraphs
+        if last_box.box_type != BoxType.PARAGRAPH:
+            return violations
+        
+        # Check if it's a multi-line paragraph
+        if not hasattr(last_box.content, '__len__'):
+            return violations
+        
+        lines = last_box.content
+        if not isinstance(lines, list) or len(lines) <= 1:
+            return violations
+        
+        # Count how many lines fit on this page
+        lines_on_page = self._count_lines_on_page(last_box, page)
+        
+        # If only 1 line of multi-line paragraph on page, it's an orphan
+        if lines_on_page == 1 and len(lines) > 1:
+            violations.append(Violation(
+                rule_name="no_orphan_lines",
+                severity=Severity.WARNING,
+                element=last_box,
+                page=page_idx,
+                description=f"Orphan line: only 1 of {len(lines)} lines on page"
+            ))
         
         return violations
     
@@ -217,48 +241,53 @@ class NoWidowLinesRule(LayoutRule):
     at the top of a page.
     """
     
-    def check(self, state: LayoutState) -> List[Violation]:
-        """Check for widow lines"""
+    # A widow continues a paragraph from the previous page
+    page_reach = 1
+    
+    def check_page(self, state: LayoutState, page_idx: int) -> List[Violation]:
+        """Check for widow lines on one page"""
         violations = []
         
-        for page_idx in range(1, len(state.pages)):  # Start from page 2
-            page = state.pages[page_idx]
-            
-            if not page.boxes:
-                continue
-            
-            # Check first element on page
-            first_box = page.boxes[0]
-            
-            # Only check paragraphs
-            if first_box.box_type != BoxType.PARAGRAPH:
-                continue
-            
-            # Check if it's a continuation from previous page
-            prev_page = state.pages[page_idx - 1]
-            if not prev_page.boxes or prev_page.boxes[-1] != first_box:
-                continue
-            
-            # Check if it's multi-line
-            if not hasattr(first_box.content, '__len__'):
-                continue
-            
-            lines = first_box.content
-            if not isinstance(lines, list) or len(lines) <= 1:
-                continue
-            
-            # Count lines on this page
-            lines_on_page = self._count_lines_on_page(first_box, page)
-            
-            # If only 1 line on page and it's multi-line, it's a widow
-            if lines_on_page == 1 and len(lines) > 1:
-                violations.append(Violation(
-                    rule_name="no_widow_lines",
-                    severity=Severity.WARNING,
-                    element=first_box,
-                    page=page_idx,
-                    description=f"Widow line: only 1 of {len(lines)} lines on page"
-                ))
+        if page_idx == 0:  # Start from page 2
+            return violations
+        
+        page = state.pages[page_idx]
+        
+        if not page.boxes:
+            return violations
+        
+        # Check first element on page
+        first_box = page.boxes[0]
+        
+        # Only check paragraphs
+        if first_box.box_type != BoxType.PARAGRAPH:
+            return violations
+        
+        # Check if it's a continuation from previous page
+        prev_page = state.pages[page_idx - 1]
+        if not prev_page.boxes or prev_page.boxes[-1] != first_box:
+            return violations
+        
+        # Check if it's multi-line
+        if not hasattr(first_box.content, '__len__'):
+            return violations
+        
+        lines = first_box.content
+        if not isinstance(lines, list) or len(lines) <= 1:
+            return violations
+        
+        # Count lines on this page
+        lines_on_page = self._count_lines_on_page(first_box, page)
+        
+        # If only 1 line on page and it's multi-line, it's a widow
+        if lines_on_page == 1 and len(lines) > 1:
+            violations.append(Violation(
+                rule_name="no_widow_lines",
+                severity=Severity.WARNING,
+                element=first_box,
+                page=page_idx,
+                description=f"Widow line: only 1 of {len(lines)} lines on page"
+            ))
         
         return violations
     
@@ -8,6 +8,7 @@ superscripts, and other mathematical elements.
 """
 
 from typing import List, Tuple, Optional
+from .content_stream import ContentStreamBuilder, winansi_encodable
 from ..layout.box_model import MathBox, BoxType
 from ..layout.universal_box import Dimensions
 
@@ -31,13 +32,13 @@ class MathGraphicsRenderer:
                          helper methods like _measure_text_width, etc.
         """
         self.pdf_renderer = pdf_renderer
-        self.commands = []
+        self.commands = ContentStreamBuilder()
         self.current_x = 0.0
         self.current_y = 0.0
         self.baseline_y = 0.0
     
     def render_math_box(self, math_box: MathBox, x: float, y: float, 
-                       baseline_y: float) -> Tuple[List[str], float]:
+                       baseline_y: float) -> Tuple[ContentStreamBuilder, float]:
         """
         Render a MathBox to PDF commands.
         
@@ -50,7 +51,7 @@ class MathGraphicsRenderer:
         Returns:
             Tuple of (pdf_commands, total_width_used)
         """
-        self.commands = []
+        self.commands = ContentStreamBuilder(getattr(self.pdf_renderer, 'embedded_fonts', None))
         self.current_x = x
         self.current_y = y
         self.baseline_y = baseline_y
@@ -138,16 +139,12 @@ class MathGraphicsRenderer:
         # Get font information
         font_name = self._get_font_name(box.font_style)
         font_size = box.font_size
+        if font_name not in self.commands.fonts and not winansi_encodable(box.content):
+            # The standard fonts have no glyph for it; let the caller fall back to text
+            raise ValueError(f"No WinAnsi glyph for {box.content!r}")
         
         # Emit text rendering commands
-        self.commands.extend([
-            "BT",
-            "0 0 0 rg",
-            f"/{font_name} {font_size} Tf",
-            f"1 0 0 1 {render_x} {render_y} Tm",
-            f"{self._to_pdf_literal(box.content)} Tj",
-            "ET"
-        ])
+        self.commands.text(box.content, font_name, font_size, render_x, render_y)
         
         return box.dimensions.width
     
@@ -305,15 +302,11 @@ class MathGraphicsRenderer:
             x2, y2: Ending point
             thickness: Line thickness in points
         """
-        self.commands.extend([
-            "q",  # Save graphics state
-            f"{thickness} w",  # Set line width
-            "0 0 0 RG",  # Set stroke color to black
-            f"{x1} {y1} m",  # Move to start point
-            f"{x2} {y2} l",  # Line to end point
-            "S",  # Stroke the path
-            "Q"  # Restore graphics state
-        ])
+        self.commands.save_state()
+        self.commands.set_line_width(thickness)
+        self.commands.set_stroke_color(0, 0, 0)
+        self.commands.line(x1, y1, x2, y2)
+        self.commands.restore_state()
     
     def _get_font_name(self, font_style: str) -> str:
         """Get PDF font name based on style."""
@@ -7,6 +7,7 @@ Provides page break logic, page-based cross-references, and multi-page output.
 from typing import List, Dict, Any, Optional, Tuple
 from ..model.ast import Document, BlockElement, Heading
 from ..analysis.document_analyzer import DocumentAnalyzer, Page
+from .page_builder import PageBuilder, PageItem
 
 
 class MultiPageRenderer:
@@ -24,6 +25,7 @@ class MultiPageRenderer:
         }
         self.content_width = page_width - self.margins['left'] - self.margins['right']
         self.content_height = page_height - self.margins['top'] - self.margins['bottom']
+        self.page_builder = PageBuilder()
 
     def render_multi_page(self, document: Document, output_format: str = 'html') -> List[Dict[str, Any]]:
         """
@@ -60,42 +62,18 @@ class MultiPageRenderer:
     def _calculate_page_layout(self, document: Document, analyzer: DocumentAnalyzer) -> List[Page]:
         """
         Calculate optimal page breaks based on content flow and semantic structure.
-        """
-        pages = []
-        current_page = Page(page_number=1, blocks=[])
-        current_height = 0
-
-        for i, block in enumerate(document.blocks):
-            block_height = analyzer._estimate_block_height(block, self.content_width)
-
-            # Check for explicit page breaks
-            if self._is_page_break(block):
-                if current_page.blocks:
-                    pages.append(current_page)
-                current_page = Page(page_number=len(pages) + 1, blocks=[block])
-                current_height = block_height
-                continue
-
-            # Check if block fits on current page
-            if current_height + block_height > self.content_height and current_page.blocks:
-                # Try to avoid breaking paragraphs mid-sentence
-                if self._should_break_here(current_page.blocks, block):
-                    pages.append(current_page)
-                    current_page = Page(page_number=len(pages) + 1, blocks=[block])
-                    current_height = block_height
-                else:
-                    # Keep paragraph together - start new page
-                    pages.append(current_page)
-                    current_page = Page(page_number=len(pages) + 1, blocks=[block])
-                    current_height = block_height
-            else:
-                current_page.blocks.append(block)
-                current_height += block_height
 
-        if current_page.blocks:
-            pages.append(current_page)
-
-        return pages
+        Blocks are kept whole; the page builder chooses every break at once,
+        starting a page at each forced break and avoiding headings left at
+        the foot of a page.
+        """
+        blocks = document.blocks
+        items = [PageItem(height=analyzer._estimate_block_height(block, self.content_width), block=index,
+                          heading=isinstance(block, Heading), forced_break=self._is_page_break(block))
+                 for index, block in enumerate(blocks)]
+        ranges = self.page_builder.break_pages(items, self.content_height)
+        return [Page(page_number=number, blocks=blocks[start:end])
+                for number, (start, end) in enumerate(ranges, 1)]
 
     def _is_page_break(self, block: BlockElement) -> bool:
         """Check if block should force a page break."""
@@ -104,18 +82,6 @@ class MultiPageRenderer:
             return True  # Chapter headings start new pages
         return False
 
-    def _should_break_here(self, current_blocks: List[BlockElement], next_block: BlockElement) -> bool:
-        """Decide if it's okay to break the page at this point."""
-        # Avoid breaking after headings
-        if current_blocks and isinstance(current_blocks[-1], Heading):
-            return False
-
-        # Prefer breaking before new sections
-        if isinstance(next_block, Heading):
-            return True
-
-        return True
-
     def _render_page_html(self, page: Page, page_num: int, total_pages: int) -> str:
         """Render a page as HTML."""
         from ..render.ast_renderer import HTMLRenderer
@@ -0,0 +1,279 @@
+"""
+Optimal page breaking.
+
+The page builder chooses every page break of a document at once, the way
+Knuth-Plass chooses the line breaks of a paragraph. The document is a
+sequence of ``PageItem``s (the lines of paragraphs, and blocks that
+cannot be split) separated by spacing that is dropped at the top of a
+page. Each way of filling a page is scored with demerits assembled from
+the layout rules:
+
+- ``NoOverflowRule``: a page may not hold more than fits, unless a single
+  item is taller than the page by itself
+- ``MinimumPageFullnessRule``: empty space at the foot of a page costs
+  badness, and more below the minimum fullness
+- ``NoOrphanLinesRule`` / ``NoWidowLinesRule``: a paragraph split with one
+  line at the foot or head of a page costs a penalty
+- ``HeadingOrphanRule`` / ``KeepTogetherRule``: a break right after a
+  heading costs a penalty
+- ``MaxLinesPerPageRule``: a page with too many lines costs a penalty
+
+A single dynamic-programming pass then finds the pagination with the least
+total demerits, so a layout built from it already satisfies these rules
+and the constraint solver is only left with what could not be avoided.
+
+The pass runs from the end of the document back, so the best way to page
+each tail of the document depends on that tail alone: after an edit the
+``PagePlan`` of the unchanged tail carries over, and only the pages from
+the edit back to where layout resumes are planned again.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .advanced_layout_rules import (
+    HeadingOrphanRule, KeepTogetherRule, MaxLinesPerPageRule, MinimumPageFullnessRule
+)
+from .layout_rules import NoOrphanLinesRule, NoWidowLinesRule
+
+
+PAGE_PENALTY = 10        # Cost of every page, so that fewer pages are preferred
+ORPHAN_PENALTY = 150     # First line of a paragraph alone at the foot of a page
+WIDOW_PENALTY = 150      # Last line of a paragraph alone at the head of a page
+HEADING_PENALTY = 300    # Heading left at the foot of a page, apart from its content
+UNDERFULL_PENALTY = 100  # Page below the minimum fullness
+MAX_LINES_PENALTY = 100  # Page with more lines than the maximum
+MAX_BADNESS = 100        # Badness of an empty page
+
+INFEASIBLE = float('inf')
+
+
+@dataclass
+class PageItem:
+    """
+    One unbreakable piece of a document's vertical list.
+
+    A page may break before any item; the items of one split paragraph
+    share ``block`` and are numbered by ``line``.
+    """
+    height: float
+    space_before: float = 0.0   # Spacing above the item, dropped at the top of a page
+    block: int = 0              # Index of the block the item belongs to
+    line: int = 0               # Line of the block the item starts at
+    block_lines: int = 1        # Lines of the whole block, for widows and orphans
+    text_lines: int = 0         # Lines the item adds to its page's line count
+    heading: bool = False       # Whether a break right after the item strands a heading
+    forced_break: bool = False  # Whether a page must start at the item
+
+
+@dataclass
+class PagePlan:
+    """
+    Least-demerit paging of every tail of a document's items.
+    
+    ``cost[i]`` is the least demerits of paging ``items[i:]`` with a page
+    starting at item ``i``, and ``next[i]`` the item that page ends before.
+    Entries are only known from ``start`` on.
+    """
+    cost: List[float]
+    next: List[int]
+    start: int = 0
+
+    def pages(self, start: int) -> Iterator[Tuple[int, int]]:
+        """``(start, end)`` item ranges of the best paging from item ``start`` on."""
+        count = len(self.next) - 1
+        while start < count:
+            end = self.next[start]
+            yield start, end
+            start = end
+
+
+class PageBuilder:
+    """
+    Chooses minimum-demerit page breaks in one dynamic-programming pass.
+
+    Demerits of a page are ``(PAGE_PENALTY + badness) ** 2`` plus the
+    square of each penalty it incurs, as Knuth-Plass scores lines.
+    """
+
+    def __init__(self, orphan_penalty: float = ORPHAN_PENALTY, widow_penalty: float = WIDOW_PENALTY,
+                 heading_penalty: float = HEADING_PENALTY, min_fullness: Optional[float] = 0.7,
+                 max_lines: Optional[int] = None):
+        """
+        Initialize the builder.
+
+        Args:
+            orphan_penalty: Penalty of one line of a paragraph at the foot of a page
+            widow_penalty: Penalty of one line of a paragraph at the head of a page
+            heading_penalty: Penalty of a break right after a heading
+            min_fullness: Fullness (0-1) below which a page is penalized;
+                          None only charges badness
+            max_lines: Most lines a page holds without a penalty; None for no limit
+        """
+        self.orphan_penalty = orphan_penalty
+        self.widow_penalty = widow_penalty
+        self.heading_penalty = heading_penalty
+        self.min_fullness = min_fullness
+        self.max_lines = max_lines
+
+    @classmethod
+    def from_rules(cls, rules: Iterable) -> 'PageBuilder':
+        """
+        Builder charging for exactly what the given layout rules check.
+
+        Overflow is never allowed, whether or not ``NoOverflowRule`` is given.
+        """
+        rules = list(rules)
+
+        def find(rule_type):
+            return next((rule for rule in rules if isinstance(rule, rule_type)), None)
+
+        fullness = find(MinimumPageFullnessRule)
+        max_lines = find(MaxLinesPerPageRule)
+        return cls(
+            orphan_penalty=ORPHAN_PENALTY if find(NoOrphanLinesRule) else 0,
+            widow_penalty=WIDOW_PENALTY if find(NoWidowLinesRule) else 0,
+            heading_penalty=HEADING_PENALTY if find(HeadingOrphanRule) or find(KeepTogetherRule) else 0,
+            min_fullness=fullness.min_fullness if fullness else None,
+            max_lines=max_lines.max_lines if max_lines else None,
+        )
+
+    def break_pages(self, items: List[PageItem], page_height: float,
+                    first_page_height: Optional[float] = None) -> List[Tuple[int, int]]:
+        """
+        Choose where pages break.
+
+        Args:
+            items: The document's items in order
+            page_height: Content height of a page
+            first_page_height: Room left on the first page, if it is not a whole page
+
+        Returns:
+            ``(start, end)`` item ranges, one per page; the first is empty
+            when the room left on the first page is better left blank
+        """
+        if not items:
+            return []
+        plan = self.plan_pages(items, page_height)
+        first_end = self.first_page_end(items, plan, page_height, first_page_height)
+        if first_end == 0:
+            return [(0, 0)] + list(plan.pages(0))
+        return [(0, first_end)] + list(plan.pages(first_end))
+
+    def plan_pages(self, items: List[PageItem], page_height: float, stop: int = 0,
+                   reuse: Optional[PagePlan] = None, reuse_from: Optional[int] = None) -> PagePlan:
+        """
+        Find the least-demerit paging of every tail of the items.
+
+        Args:
+            items: The document's items in order
+            page_height: Content height of a page
+            stop: First item to plan from; earlier entries are left unknown
+            reuse: Plan of a document whose items from ``reuse_from`` on are
+                   these items' tail, so its entries for them carry over
+            reuse_from: First of these items the reused plan covers
+
+        Returns:
+            The plan, known from ``stop`` on, or from ``reuse_from`` if earlier
+        """
+        count = len(items)
+        cost = [INFEASIBLE] * count + [0.0]
+        nxt = list(range(1, count + 1)) + [count]
+        first = count
+        if reuse is not None and reuse_from is not None and reuse_from < count:
+            # The reused plan's items are these items shifted by the edit
+            shift = count - (len(reuse.cost) - 1)
+            cost[reuse_from:] = reuse.cost[reuse_from - shift:]
+            nxt[reuse_from:] = [end + shift for end in reuse.next[reuse_from - shift:]]
+            first = reuse_from
+
+        for start in range(first - 1, stop - 1, -1):
+            height, lines = 0.0, 0
+            for end in range(start + 1, count + 1):
+                item = items[end - 1]
+                if end > start + 1:
+                    # A page may not run on past a forced break
+                    if item.forced_break:
+                        break
+                    height += item.space_before
+                height += item.height
+                lines += item.text_lines
+                if height > page_height and end > start + 1:
+                    break
+                demerits = cost[end] + self._page_demerits(items, start, end, height, lines,
+                                                           page_height, page_height)
+                if demerits < cost[start]:
+                    cost[start], nxt[start] = demerits, end
+        return PagePlan(cost=cost, next=nxt, start=min(stop, first))
+
+    def first_page_end(self, items: List[PageItem], plan: PagePlan, page_height: float,
+                       first_page_height: Optional[float] = None) -> int:
+        """
+        Choose where the first page ends, given the plan of the rest.
+
+        Args:
+            items: The document's items in order
+            plan: Plan of the items, known from the start
+            page_height: Content height of a page
+            first_page_height: Room left on the first page, if it is not a whole page
+
+        Returns:
+            Item the first page ends before; 0 when the room left on the
+            first page is better left blank
+        """
+        if first_page_height is None or first_page_height >= page_height:
+            return plan.next[0]
+
+        longest = max(page_height, first_page_height)
+        # The rest of a part-filled first page may be left blank, for an empty page's demerits
+        best, best_end = (PAGE_PENALTY + MAX_BADNESS) ** 2 + plan.cost[0], 0
+        height, lines = 0.0, 0
+        for end in range(1, len(items) + 1):
+            item = items[end - 1]
+            if end > 1:
+                if item.forced_break:
+                    break
+                height += item.space_before
+            height += item.height
+            lines += item.text_lines
+            if height > longest and end > 1:
+                break
+            demerits = plan.cost[end] + self._page_demerits(items, 0, end, height, lines,
+                                                            first_page_height, page_height)
+            if demerits < best:
+                best, best_end = demerits, end
+        return best_end
+
+    def _page_demerits(self, items: List[PageItem], start: int, end: int, height: float,
+                       lines: int, capacity: float, page_height: float) -> float:
+        """Demerits of one page holding ``items[start:end]``."""
+        # Only an item taller than a whole page may overflow, alone on its page
+        if height > capacity and (end - start > 1 or height <= page_height):
+            return INFEASIBLE
+
+        badness, penalties = 0.0, []
+        # The last page, and pages ended by a forced break, may be short
+        if end < len(items) and not items[end].forced_break and capacity > 0:
+            slack = max(0.0, capacity - height) / capacity
+            badness = MAX_BADNESS * slack ** 3
+            if self.min_fullness is not None and 1 - slack < self.min_fullness:
+                penalties.append(UNDERFULL_PENALTY)
+        if self.max_lines is not None and lines > self.max_lines:
+            penalties.append(MAX_LINES_PENALTY)
+        if end < len(items):
+            penalties.extend(self._break_penalties(items[end - 1], items[end]))
+        return (PAGE_PENALTY + badness) ** 2 + sum(penalty ** 2 for penalty in penalties)
+
+    def _break_penalties(self, before: PageItem, after: PageItem) -> List[float]:
+        """Penalties of a page break between two items."""
+        if after.forced_break:
+            return []
+        penalties = []
+        if before.block == after.block:
+            if after.line == 1:
+                penalties.append(self.orphan_penalty)
+            if before.block_lines - after.line == 1:
+                penalties.append(self.widow_penalty)
+        if before.heading:
+            penalties.append(self.heading_penalty)
+        return penalties
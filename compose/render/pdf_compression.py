@@ -0,0 +1,133 @@
+"""
+Content stream compression for PDF output.
+
+Page content streams are Flate-compressed on a thread pool. zlib releases
+the GIL while it compresses, so a document's pages are compressed in
+parallel while the writer keeps emitting objects in a fixed order.
+
+Compression level 0 disables Flate entirely (fast draft builds); level 9
+gives the smallest files for release builds.
+"""
+
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+
+@dataclass
+class CompressionStats:
+    """Totals for the streams compressed during one render."""
+    streams: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cpu_seconds: float = 0.0   # Summed across worker threads
+    wall_seconds: float = 0.0  # Time the writer spent compressing or waiting
+    cache_hits: int = 0        # Page streams reused from the stream cache
+    cache_misses: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """Compressed size as a fraction of the original size."""
+        return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+
+    def summary(self, level: int) -> str:
+        """One-line report for the build output."""
+        summary = (f"Compressed {self.streams} streams at level {level}: "
+                   f"{self.bytes_in} -> {self.bytes_out} bytes "
+                   f"in {self.wall_seconds:.3f}s ({self.cpu_seconds:.3f}s CPU)")
+        if self.cache_hits or self.cache_misses:
+            summary += f"; stream cache {self.cache_hits} hits, {self.cache_misses} misses"
+        return summary
+
+
+class ContentCompressor:
+    """
+    Compresses content streams, optionally on a thread pool.
+
+    ``submit`` returns a future so callers can queue many streams and
+    collect the results in the order they need them, which keeps the
+    output byte-for-byte identical regardless of the worker count.
+    """
+
+    def __init__(self, level: int = DEFAULT_COMPRESSION_LEVEL, workers: Optional[int] = None):
+        """
+        Initialize the compressor.
+
+        Args:
+            level: zlib level 0-9; 0 writes streams uncompressed
+            workers: Thread pool size; ``None`` uses one thread per CPU
+                     and 1 compresses inline on the calling thread
+        """
+        if not 0 <= level <= 9:
+            raise ValueError(f"Compression level must be between 0 and 9, got {level}")
+        self.level = level
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.stats = CompressionStats()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def filters(self) -> Optional[str]:
+        """Filter entry for streams produced by this compressor."""
+        return "/FlateDecode" if self.level > 0 else None
+
+    @property
+    def parallel(self) -> bool:
+        """Whether streams are compressed on worker threads."""
+        return self.level > 0 and self.workers > 1
+
+    def compress(self, data: bytes) -> bytes:
+        """Encode one stream on the calling thread."""
+        start = time.perf_counter()
+        encoded = zlib.compress(data, self.level) if self.level > 0 else data
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats.streams += 1
+            self.stats.bytes_in += len(data)
+            self.stats.bytes_out += len(encoded)
+            self.stats.cpu_seconds += elapsed
+        return encoded
+
+    def submit(self, data: bytes) -> Future:
+        """
+        Queue a stream for compression.
+
+        Returns:
+            Future resolving to the encoded bytes
+        """
+        if not self.parallel:
+            start = time.perf_counter()
+            future = Future()
+            future.set_result(self.compress(data))
+            self.stats.wall_seconds += time.perf_counter() - start
+            return future
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="pdf-compress")
+        return self._pool.submit(self.compress, data)
+
+    def result(self, future: Future) -> bytes:
+        """Wait for a queued stream, counting the wait as wall time."""
+        start = time.perf_counter()
+        encoded = future.result()
+        self.stats.wall_seconds += time.perf_counter() - start
+        return encoded
+
+    def encode(self, data: bytes) -> Tuple[bytes, Optional[str]]:
+        """Compress a stream immediately and return it with its filter."""
+        return self.result(self.submit(data)), self.filters
+
+    def close(self):
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
@@ -0,0 +1,171 @@
+"""
+Page emitter for streaming PDF output.
+
+The emitter writes each finished page (content stream, page dictionary
+and link annotations) through a PDFWriter as soon as layout hands it
+over. Afterwards only the page's object number is kept, which is all the
+page tree and outlines need, so finished pages cost no memory no matter
+how long the document is. The renderer likewise drops each paragraph's
+measured lines once its block is drawn. What still grows with the
+document is the parsed document itself, the line ends broken ahead of
+layout, and, with layout checkpoints, every block's measurement, which
+is kept for the next build.
+
+Content streams are handed to a ContentCompressor and written back in
+submission order, so compression can run on worker threads while the
+file layout stays deterministic. With a ContentStreamCache, pages whose
+operators did not change since an earlier build skip compression.
+"""
+
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Iterable, List, Optional, Tuple, Union
+
+from ..cache_system import ContentStreamCache
+from .content_stream import ContentStreamBuilder
+from .pdf_compression import ContentCompressor
+from .pdf_writer import PDFWriter
+
+
+# Content streams held in flight before the oldest is written. Fixed
+# rather than derived from the worker count so the object order in the
+# file never depends on the build machine.
+MAX_PENDING_STREAMS = 32
+
+
+class PageEmitter:
+    """
+    Writes finished pages through a PDFWriter.
+
+    The page tree and shared resource dictionary are referenced by
+    reserved object numbers, so pages can be written before either of
+    them exists in the file.
+    """
+
+    def __init__(self, writer: PDFWriter, page_width: float, page_height: float,
+                 compressor: ContentCompressor, pages_root: int, resources: int,
+                 max_pending: int = MAX_PENDING_STREAMS,
+                 cache: Optional[ContentStreamCache] = None):
+        """
+        Initialize the emitter.
+
+        Args:
+            writer: Writer bound to the output sink
+            page_width: MediaBox width in points
+            page_height: MediaBox height in points
+            compressor: Compressor used for page content streams
+            pages_root: Reserved object number of the page tree root
+            resources: Reserved object number of the shared resources
+            max_pending: Content streams allowed in flight before the
+                         oldest is written
+            cache: Cache of compressed streams from earlier builds
+        """
+        self.writer = writer
+        self.page_width = page_width
+        self.page_height = page_height
+        self.compressor = compressor
+        self.pages_root = pages_root
+        self.resources = resources
+        self.max_pending = max_pending
+        self.cache = cache
+        self.page_object_numbers: List[int] = []
+        # (content object number, compressed data, cache key to store under)
+        self._pending: Deque[Tuple[int, Future, Optional[str]]] = deque()
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages emitted so far."""
+        return len(self.page_object_numbers)
+
+    def emit_page(self, commands: Union[ContentStreamBuilder, List[str]],
+                  annotations: Iterable[str] = (), resources: Optional[str] = None) -> int:
+        """
+        Write one finished page.
+
+        Args:
+            commands: Content stream operators for the page
+            annotations: Inline annotation dictionaries for the page
+            resources: Inline resource dictionary for this page only;
+                       pages use the shared resources when omitted
+
+        Returns:
+            Object number of the page dictionary
+        """
+        page_num = self.writer.reserve_object()
+        content_num = self.writer.reserve_object()
+
+        resources_entry = resources if resources is not None else f"{self.resources} 0 R"
+        if isinstance(commands, ContentStreamBuilder):
+            content = commands.getvalue()
+        else:
+            content = '\n'.join(commands).encode('utf-8')
+        self._pending.append((content_num, *self._submit_content(content, resources_entry)))
+
+        annots = list(annotations)
+        annots_entry = f"/Annots [{' '.join(annots)}]\n" if annots else ""
+
+        page_obj = f"""<<
+/Type /Page
+/Parent {self.pages_root} 0 R
+/MediaBox [0 0 {self.page_width} {self.page_height}]
+/Contents {content_num} 0 R
+/Resources {resources_entry}
+{annots_entry}>>"""
+        self.writer.write_object(page_obj, page_num)
+        self.page_object_numbers.append(page_num)
+
+        while len(self._pending) > self.max_pending:
+            self._write_oldest_content()
+        return page_num
+
+    def _submit_content(self, content: bytes, resources: str) -> Tuple[Future, Optional[str]]:
+        """
+        Queue a content stream, taking it from the cache when possible.
+
+        Returns:
+            Tuple of (future for the compressed data, cache key to store
+            the result under, or None if nothing needs storing)
+        """
+        if self.cache is None:
+            return self.compressor.submit(content), None
+
+        stats = self.compressor.stats
+        key = self.cache.fingerprint(content, resources, self.compressor.level)
+        cached = self.cache.get_stream(key)
+        if cached is None:
+            stats.cache_misses += 1
+            return self.compressor.submit(content), key
+
+        stats.cache_hits += 1
+        future = Future()
+        future.set_result(cached)
+        return future, None
+
+    def _write_oldest_content(self):
+        """Wait for the oldest queued content stream and write it."""
+        content_num, future, cache_key = self._pending.popleft()
+        data = self.compressor.result(future)
+        if cache_key is not None:
+            self.cache.set_stream(cache_key, data)
+        self.writer.write_stream(data, content_num, filters=self.compressor.filters)
+
+    def flush(self):
+        """Write every queued content stream."""
+        while self._pending:
+            self._write_oldest_content()
+
+    def write_page_tree(self) -> int:
+        """
+        Write the page tree root once all pages have been emitted.
+
+        Returns:
+            Object number of the page tree root
+        """
+        self.flush()
+        kids_refs = ' '.join(f"{num} 0 R" for num in self.page_object_numbers)
+        pages_obj = f"""<<
+/Type /Pages
+/Kids [{kids_refs}]
+/Count {self.page_count}
+>>"""
+        return self.writer.write_object(pages_obj, self.pages_root)
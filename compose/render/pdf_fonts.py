@@ -0,0 +1,596 @@
+"""
+TrueType font embedding for PDF output.
+
+Fonts are read through ``mmap`` so only the tables that are actually
+parsed are paged in, however large the file. The metrics needed for
+layout (character map, advance widths and descriptor values) are kept in
+a compact form and cached on disk under the SHA-256 of the font file, so
+later builds do not parse the font again.
+
+When the document is written, each font is subset to the glyphs the text
+used: glyph IDs are kept, but every unused outline is emptied, and the
+font is embedded as a Type 0 font with ``Identity-H`` encoding plus a
+ToUnicode map so text stays searchable and copyable.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..cache_system import FontMetricsCache
+from .pdf_compression import ContentCompressor
+from .pdf_writer import PDFWriter
+
+
+# Bumped whenever the compact metrics layout changes
+METRICS_VERSION = 1
+
+# Tables a font needs to be embedded, and the ones subsetting reads
+_REQUIRED_TABLES = (b"head", b"hhea", b"maxp", b"hmtx", b"cmap", b"loca", b"glyf")
+_OUTLINE_TABLES = (b"head", b"maxp", b"loca", b"glyf")
+
+# Tables copied into a subset; everything else is dropped
+_SUBSET_TABLES = (b"cvt ", b"fpgm", b"glyf", b"head", b"hhea",
+                  b"hmtx", b"loca", b"maxp", b"prep")
+
+# Composite glyph component flags
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+# OS/2 fsType bit for fonts whose licence forbids embedding
+_FS_TYPE_RESTRICTED = 0x0002
+
+_POSTSCRIPT_NAME_DROP = str.maketrans('', '', ' ()<>[]{}/%')
+
+
+class FontFormatError(Exception):
+    """Raised for font files that cannot be embedded."""
+    pass
+
+
+@dataclass
+class FontMetrics:
+    """Everything layout and the font descriptor need from a font file."""
+    postscript_name: str
+    units_per_em: int
+    ascent: int
+    descent: int
+    cap_height: int
+    bbox: Tuple[int, int, int, int]
+    italic_angle: float
+    flags: int
+    stem_v: int
+    num_glyphs: int
+    advances: array          # Advance width of every glyph, in font units
+    cmap: Dict[int, int]     # Code point -> glyph ID
+
+    def to_compact(self) -> Dict:
+        """Flatten into plain values and packed arrays for the disk cache."""
+        codes = array('I', sorted(self.cmap))
+        glyphs = array('H', (self.cmap[code] for code in codes))
+        return {
+            'version': METRICS_VERSION,
+            'postscript_name': self.postscript_name,
+            'units_per_em': self.units_per_em,
+            'ascent': self.ascent,
+            'descent': self.descent,
+            'cap_height': self.cap_height,
+            'bbox': self.bbox,
+            'italic_angle': self.italic_angle,
+            'flags': self.flags,
+            'stem_v': self.stem_v,
+            'num_glyphs': self.num_glyphs,
+            'advances': self.advances.tobytes(),
+            'codes': codes.tobytes(),
+            'glyphs': glyphs.tobytes(),
+        }
+
+    @classmethod
+    def from_compact(cls, data: Dict) -> Optional['FontMetrics']:
+        """Rebuild metrics from ``to_compact`` output, or None if stale."""
+        if data.get('version') != METRICS_VERSION:
+            return None
+        advances = array('H')
+        advances.frombytes(data['advances'])
+        codes = array('I')
+        codes.frombytes(data['codes'])
+        glyphs = array('H')
+        glyphs.frombytes(data['glyphs'])
+        fields = {key: value for key, value in data.items()
+                  if key not in ('version', 'advances', 'codes', 'glyphs')}
+        return cls(advances=advances, cmap=dict(zip(codes, glyphs)), **fields)
+
+
+def _table_directory(data, required: Iterable[bytes] = _REQUIRED_TABLES
+                     ) -> Dict[bytes, Tuple[int, int]]:
+    """Map table tags to (offset, length), checking the required ones exist."""
+    if len(data) < 12:
+        raise FontFormatError("File is too short to be a font")
+    version = bytes(data[:4])
+    if version == b"OTTO":
+        raise FontFormatError("OpenType fonts with CFF outlines are not supported")
+    if version not in (b"\x00\x01\x00\x00", b"true"):
+        raise FontFormatError("Not a TrueType font")
+    (num_tables,) = struct.unpack_from(">H", data, 4)
+    tables = {}
+    for index in range(num_tables):
+        tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * index)
+        tables[tag] = (offset, length)
+    for tag in required:
+        if tag not in tables:
+            raise FontFormatError(f"Font has no '{tag.decode('ascii')}' table")
+    return tables
+
+
+def _read_cmap(data, offset: int) -> Dict[int, int]:
+    """Read the Unicode character map (format 12 preferred, else format 4)."""
+    (num_subtables,) = struct.unpack_from(">H", data, offset + 2)
+    candidates = {}
+    for index in range(num_subtables):
+        platform, encoding, sub_offset = struct.unpack_from(">HHI", data, offset + 4 + 8 * index)
+        (fmt,) = struct.unpack_from(">H", data, offset + sub_offset)
+        candidates.setdefault((platform, encoding, fmt), offset + sub_offset)
+
+    for key in ((3, 10, 12), (0, 4, 12), (0, 6, 12)):
+        if key in candidates:
+            return _read_cmap_format12(data, candidates[key])
+    for key in ((3, 1, 4), (0, 3, 4), (0, 1, 4), (0, 0, 4), (3, 0, 4)):
+        if key in candidates:
+            return _read_cmap_format4(data, candidates[key])
+    raise FontFormatError("Font has no Unicode character map")
+
+
+def _read_cmap_format4(data, offset: int) -> Dict[int, int]:
+    (seg_count_x2,) = struct.unpack_from(">H", data, offset + 6)
+    seg_count = seg_count_x2 // 2
+    ends = struct.unpack_from(f">{seg_count}H", data, offset + 14)
+    starts_at = offset + 16 + seg_count_x2
+    starts = struct.unpack_from(f">{seg_count}H", data, starts_at)
+    deltas = struct.unpack_from(f">{seg_count}h", data, starts_at + seg_count_x2)
+    range_offsets_at = starts_at + 2 * seg_count_x2
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_at)
+
+    cmap = {}
+    for index in range(seg_count):
+        start, end, delta, range_offset = starts[index], ends[index], deltas[index], range_offsets[index]
+        if start == 0xFFFF:
+            continue
+        for code in range(start, end + 1):
+            if range_offset == 0:
+                glyph = (code + delta) & 0xFFFF
+            else:
+                glyph_at = range_offsets_at + 2 * index + range_offset + 2 * (code - start)
+                (glyph,) = struct.unpack_from(">H", data, glyph_at)
+                if glyph:
+                    glyph = (glyph + delta) & 0xFFFF
+            if glyph:
+                cmap[code] = glyph
+    return cmap
+
+
+def _read_cmap_format12(data, offset: int) -> Dict[int, int]:
+    (num_groups,) = struct.unpack_from(">I", data, offset + 12)
+    cmap = {}
+    for index in range(num_groups):
+        start, end, glyph = struct.unpack_from(">III", data, offset + 16 + 12 * index)
+        for code in range(start, end + 1):
+            cmap[code] = glyph + code - start
+    return cmap
+
+
+def _read_postscript_name(data, tables: Dict[bytes, Tuple[int, int]]) -> str:
+    """PostScript name (name ID 6), falling back to a generic name."""
+    if b"name" in tables:
+        offset, _ = tables[b"name"]
+        _, count, string_offset = struct.unpack_from(">HHH", data, offset)
+        for index in range(count):
+            platform, _, _, name_id, length, name_offset = struct.unpack_from(
+                ">HHHHHH", data, offset + 6 + 12 * index)
+            if name_id != 6:
+                continue
+            start = offset + string_offset + name_offset
+            raw = bytes(data[start:start + length])
+            name = raw.decode('utf-16-be' if platform in (0, 3) else 'latin-1', errors='ignore')
+            name = name.translate(_POSTSCRIPT_NAME_DROP)
+            if name:
+                return name
+    return "EmbeddedFont"
+
+
+def read_font_metrics(data) -> FontMetrics:
+    """
+    Parse the tables layout and embedding need.
+
+    Args:
+        data: Font file contents (bytes or a memory map)
+
+    Returns:
+        FontMetrics for the font
+    """
+    tables = _table_directory(data)
+
+    head, _ = tables[b"head"]
+    (units_per_em,) = struct.unpack_from(">H", data, head + 18)
+    bbox = struct.unpack_from(">4h", data, head + 36)
+    (mac_style,) = struct.unpack_from(">H", data, head + 44)
+
+    hhea, _ = tables[b"hhea"]
+    ascent, descent = struct.unpack_from(">hh", data, hhea + 4)
+    (num_h_metrics,) = struct.unpack_from(">H", data, hhea + 34)
+
+    (num_glyphs,) = struct.unpack_from(">H", data, tables[b"maxp"][0] + 4)
+
+    hmtx, _ = tables[b"hmtx"]
+    # Each entry packs (advance, left side bearing); keep the advance
+    advances = array('H', (entry >> 16 for entry in
+                           struct.unpack_from(f">{num_h_metrics}I", data, hmtx)))
+    advances.extend([advances[-1]] * (num_glyphs - num_h_metrics))
+
+    cap_height = ascent
+    weight = 400
+    fixed_pitch = False
+    italic_angle = 0.0
+    if b"OS/2" in tables:
+        os2, length = tables[b"OS/2"]
+        version, _, weight, _, fs_type = struct.unpack_from(">HhHHH", data, os2)
+        if fs_type & _FS_TYPE_RESTRICTED:
+            raise FontFormatError("Font licence does not permit embedding")
+        if version >= 2 and length >= 90:
+            (cap_height,) = struct.unpack_from(">h", data, os2 + 88)
+    if b"post" in tables:
+        post, _ = tables[b"post"]
+        (angle,) = struct.unpack_from(">i", data, post + 4)
+        italic_angle = angle / 65536.0
+        (fixed_pitch,) = struct.unpack_from(">I", data, post + 12)
+
+    flags = 32  # Nonsymbolic
+    if fixed_pitch:
+        flags |= 1
+    if italic_angle or mac_style & 0x02:
+        flags |= 64
+
+    scale = 1000.0 / units_per_em
+    return FontMetrics(
+        postscript_name=_read_postscript_name(data, tables),
+        units_per_em=units_per_em,
+        ascent=round(ascent * scale),
+        descent=round(descent * scale),
+        cap_height=round(cap_height * scale),
+        bbox=tuple(round(value * scale) for value in bbox),
+        italic_angle=italic_angle,
+        flags=flags,
+        # Common estimate of the dominant stem width from the weight class
+        stem_v=round(10 + 220 * ((weight - 50) / 900.0) ** 2),
+        num_glyphs=num_glyphs,
+        advances=advances,
+        cmap=_read_cmap(data, tables[b"cmap"][0]),
+    )
+
+
+def _glyph_offsets(data, tables: Dict[bytes, Tuple[int, int]], num_glyphs: int) -> List[int]:
+    """Start offsets of every glyph in ``glyf`` plus the end offset."""
+    (loc_format,) = struct.unpack_from(">h", data, tables[b"head"][0] + 50)
+    loca, _ = tables[b"loca"]
+    if loc_format == 0:
+        return [value * 2 for value in struct.unpack_from(f">{num_glyphs + 1}H", data, loca)]
+    return list(struct.unpack_from(f">{num_glyphs + 1}I", data, loca))
+
+
+def _component_glyphs(glyph: bytes) -> List[int]:
+    """Glyph IDs referenced by a composite glyph."""
+    components = []
+    pos = 10
+    while True:
+        flags, glyph_id = struct.unpack_from(">HH", glyph, pos)
+        components.append(glyph_id)
+        pos += 4 + (4 if flags & _ARG_1_AND_2_ARE_WORDS else 2)
+        if flags & _WE_HAVE_A_SCALE:
+            pos += 2
+        elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+            pos += 4
+        elif flags & _WE_HAVE_A_TWO_BY_TWO:
+            pos += 8
+        if not flags & _MORE_COMPONENTS:
+            return components
+
+
+def _checksum(data: bytes) -> int:
+    padded = data + b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(padded) // 4}I", padded)) & 0xFFFFFFFF
+
+
+def subset_truetype(data, glyphs: Iterable[int]) -> bytes:
+    """
+    Build a TrueType font containing only the given glyphs' outlines.
+
+    Glyph IDs are unchanged (unused glyphs become empty), so a document
+    can keep addressing glyphs by their original IDs. Components of
+    composite glyphs and ``.notdef`` are always kept.
+
+    Args:
+        data: Original font file contents (bytes or a memory map)
+        glyphs: Glyph IDs the document uses
+
+    Returns:
+        The subset font file
+    """
+    tables = _table_directory(data, _OUTLINE_TABLES)
+    (num_glyphs,) = struct.unpack_from(">H", data, tables[b"maxp"][0] + 4)
+    offsets = _glyph_offsets(data, tables, num_glyphs)
+    glyf, _ = tables[b"glyf"]
+
+    def outline(glyph_id: int) -> bytes:
+        return bytes(data[glyf + offsets[glyph_id]:glyf + offsets[glyph_id + 1]])
+
+    keep: Set[int] = set()
+    pending = [0] + [glyph for glyph in glyphs if glyph < num_glyphs]
+    while pending:
+        glyph_id = pending.pop()
+        if glyph_id in keep:
+            continue
+        keep.add(glyph_id)
+        body = outline(glyph_id)
+        if len(body) >= 10 and struct.unpack_from(">h", body)[0] < 0:
+            pending.extend(component for component in _component_glyphs(body)
+                           if component < num_glyphs)
+
+    glyf_data = bytearray()
+    loca = []
+    for glyph_id in range(num_glyphs):
+        loca.append(len(glyf_data))
+        if glyph_id in keep:
+            glyf_data += outline(glyph_id)
+            glyf_data += b"\0" * (-len(glyf_data) % 4)
+    loca.append(len(glyf_data))
+
+    new_tables = {}
+    for tag in _SUBSET_TABLES:
+        if tag in tables:
+            offset, length = tables[tag]
+            new_tables[tag] = bytes(data[offset:offset + length])
+    head = bytearray(new_tables[b"head"])
+    head[8:12] = b"\0\0\0\0"        # checkSumAdjustment, set below
+    head[50:52] = struct.pack(">h", 1)  # Long loca offsets
+    new_tables[b"head"] = bytes(head)
+    new_tables[b"loca"] = struct.pack(f">{len(loca)}I", *loca)
+    new_tables[b"glyf"] = bytes(glyf_data)
+
+    tags = sorted(new_tables)
+    count = len(tags)
+    entry_selector = count.bit_length() - 1
+    search_range = 16 * (1 << entry_selector)
+    header = struct.pack(">IHHHH", 0x00010000, count, search_range,
+                         entry_selector, count * 16 - search_range)
+
+    directory = bytearray()
+    body = bytearray()
+    offset = len(header) + 16 * count
+    head_offset = 0
+    for tag in tags:
+        table = new_tables[tag]
+        if tag == b"head":
+            head_offset = offset + len(body)
+        directory += struct.pack(">4sIII", tag, _checksum(table), offset + len(body), len(table))
+        body += table
+        body += b"\0" * (-len(body) % 4)
+
+    font = bytearray(header + directory + body)
+    adjustment = (0xB1B0AFBA - _checksum(bytes(font))) & 0xFFFFFFFF
+    font[head_offset + 8:head_offset + 12] = struct.pack(">I", adjustment)
+    return bytes(font)
+
+
+def _file_digest(path: str, cache: Optional[FontMetricsCache]) -> str:
+    """SHA-256 of a font file, skipping the read when its stat data is known."""
+    stat = os.stat(path)
+    file_key = FontMetricsCache.file_key(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = cache.get_digest(file_key) if cache is not None else None
+    if digest is None:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            digest = hashlib.sha256(data).hexdigest()
+        if cache is not None:
+            cache.set_digest(file_key, digest)
+    return digest
+
+
+def load_font_metrics(path: str, cache: Optional[FontMetricsCache] = None) -> Tuple[FontMetrics, str]:
+    """
+    Load a font's metrics, from the cache when the file was seen before.
+
+    Args:
+        path: TrueType font file
+        cache: Persistent metrics cache, or None to always parse
+
+    Returns:
+        Tuple of (metrics, file digest)
+    """
+    if os.path.getsize(path) == 0:
+        # mmap cannot map an empty file
+        raise FontFormatError("Font file is empty")
+    digest = _file_digest(path, cache)
+    if cache is not None:
+        cached = cache.get_metrics(digest)
+        metrics = FontMetrics.from_compact(cached) if cached is not None else None
+        if metrics is not None:
+            return metrics, digest
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        try:
+            metrics = read_font_metrics(data)
+        except struct.error as e:
+            raise FontFormatError(f"Truncated font table: {e}") from e
+    if cache is not None:
+        cache.set_metrics(digest, metrics.to_compact())
+    return metrics, digest
+
+
+class EmbeddedFont:
+    """
+    A TrueType font drawn under a PDF font resource name.
+
+    Text is shown as two-byte glyph IDs; the font records which glyphs
+    (and which characters they stand for) were used so the subset and
+    ToUnicode map cover exactly the document's text.
+    """
+
+    def __init__(self, name: str, path: str, cache: Optional[FontMetricsCache] = None):
+        """
+        Load a font for embedding.
+
+        Args:
+            name: Font resource name used in content streams
+            path: TrueType font file
+            cache: Persistent metrics cache
+        """
+        self.name = name
+        self.path = path
+        self.metrics, self.digest = load_font_metrics(path, cache)
+        self.cache_key = f"ttf:{self.digest}"  # Identifies these widths in the word width cache
+        self.used: Dict[int, str] = {}  # Glyph ID -> characters it shows
+        self.object_number: Optional[int] = None
+
+    def reset(self):
+        """Forget the glyphs used by a previous document."""
+        self.used = {}
+        self.object_number = None
+
+    def encode(self, text: str) -> bytes:
+        """Encode text as a hex string operand of glyph IDs."""
+        cmap = self.metrics.cmap
+        out = bytearray(b"<")
+        for char in text:
+            glyph = cmap.get(ord(char), 0)
+            if glyph:
+                self.used.setdefault(glyph, char)
+            out += b"%04X" % glyph
+        out += b">"
+        return bytes(out)
+
+    def text_width(self, text: str, size: float) -> float:
+        """Advance width of text in points."""
+        cmap = self.metrics.cmap
+        advances = self.metrics.advances
+        units = sum(advances[cmap.get(ord(char), 0)] for char in text)
+        return units * size / self.metrics.units_per_em
+
+    @property
+    def units_per_em(self) -> int:
+        """Font units per em, the scale of every width."""
+        return self.metrics.units_per_em
+
+    @property
+    def missing_width(self) -> int:
+        """Advance of .notdef, drawn for characters the font lacks."""
+        return self.metrics.advances[0]
+
+    def char_widths(self) -> Dict[int, int]:
+        """Advance width of every mapped character, by code point."""
+        advances = self.metrics.advances
+        return {code_point: advances[glyph] for code_point, glyph in self.metrics.cmap.items()}
+
+    @property
+    def subset_name(self) -> str:
+        """PostScript name with the six-letter tag identifying the subset."""
+        digest = hashlib.sha1(repr(sorted(self.used)).encode('ascii')).digest()
+        tag = ''.join(chr(ord('A') + byte % 26) for byte in digest[:6])
+        return f"{tag}+{self.metrics.postscript_name}"
+
+    def write(self, writer: PDFWriter, compressor: ContentCompressor) -> int:
+        """
+        Write the subset font and its dictionaries.
+
+        The Type 0 font goes to ``object_number`` when it was reserved
+        earlier so pages could reference it before the glyphs were known.
+
+        Returns:
+            Object number of the Type 0 font dictionary
+        """
+        metrics = self.metrics
+        base_font = self.subset_name
+
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            font_file = subset_truetype(data, self.used)
+        encoded, filters = compressor.encode(font_file)
+        font_file_num = writer.write_stream(encoded, filters=filters,
+                                            extra_entries=f"/Length1 {len(font_file)}")
+
+        bbox = ' '.join(str(value) for value in metrics.bbox)
+        # Glyphs left out of /W, .notdef among them, take the .notdef advance
+        default_width = round(self.missing_width * 1000.0 / metrics.units_per_em)
+        descriptor_num = writer.write_object(f"""<<
+/Type /FontDescriptor
+/FontName /{base_font}
+/Flags {metrics.flags}
+/FontBBox [{bbox}]
+/ItalicAngle {metrics.italic_angle:g}
+/Ascent {metrics.ascent}
+/Descent {metrics.descent}
+/CapHeight {metrics.cap_height}
+/StemV {metrics.stem_v}
+/FontFile2 {font_file_num} 0 R
+>>""")
+
+        cid_font_num = writer.write_object(f"""<<
+/Type /Font
+/Subtype /CIDFontType2
+/BaseFont /{base_font}
+/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >>
+/FontDescriptor {descriptor_num} 0 R
+/DW {default_width}
+/W [{self._widths()}]
+/CIDToGIDMap /Identity
+>>""")
+
+        to_unicode, filters = compressor.encode(self._to_unicode_cmap())
+        to_unicode_num = writer.write_stream(to_unicode, filters=filters)
+
+        return writer.write_object(f"""<<
+/Type /Font
+/Subtype /Type0
+/BaseFont /{base_font}
+/Encoding /Identity-H
+/DescendantFonts [{cid_font_num} 0 R]
+/ToUnicode {to_unicode_num} 0 R
+>>""", self.object_number)
+
+    def _widths(self) -> str:
+        """/W array entries for the used glyphs, grouped into runs."""
+        scale = 1000.0 / self.metrics.units_per_em
+        runs = []
+        for glyph in sorted(self.used):
+            width = round(self.metrics.advances[glyph] * scale)
+            if runs and runs[-1][0] + len(runs[-1][1]) == glyph:
+                runs[-1][1].append(width)
+            else:
+                runs.append((glyph, [width]))
+        return ' '.join(f"{start} [{' '.join(map(str, widths))}]" for start, widths in runs)
+
+    def _to_unicode_cmap(self) -> bytes:
+        """CMap mapping glyph IDs back to the characters they show."""
+        lines = [
+            "/CIDInit /ProcSet findresource begin",
+            "12 dict begin",
+            "begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Adobe-Identity-UCS def",
+            "/CMapType 2 def",
+            "1 begincodespacerange",
+            "<0000> <FFFF>",
+            "endcodespacerange",
+        ]
+        entries = sorted(self.used.items())
+        for start in range(0, len(entries), 100):
+            chunk = entries[start:start + 100]
+            lines.append(f"{len(chunk)} beginbfchar")
+            lines.extend(f"<{glyph:04X}> <{char.encode('utf-16-be').hex().upper()}>"
+                         for glyph, char in chunk)
+            lines.append("endbfchar")
+        lines.extend(["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"])
+        return '\n'.join(lines).encode('ascii')
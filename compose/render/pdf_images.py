@@ -0,0 +1,347 @@
+"""
+Image XObjects for PDF output.
+
+Images are embedded without decoding where PDF allows it: JPEG data is
+passed straight through as ``/DCTDecode`` and PNG image data (the
+concatenated IDAT chunks) as ``/FlateDecode`` with the PNG predictor.
+Dimensions and colour layout come from the file headers alone. PNGs with
+an alpha channel are the exception: PDF keeps alpha in a separate
+``/SMask`` image, so their rows are decoded and split when they are
+added to an ``ImageStore``.
+
+Each distinct image is stored once, keyed by a hash of its bytes, so a
+logo or plot used on many pages costs one XObject.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .pdf_writer import PDFWriter
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers (baseline, extended, progressive, lossless)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field
+_JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+_JPEG_COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+_PNG_COLORS = {0: 1, 2: 3, 3: 1}
+_PNG_ALPHA_COLORS = {4: 1, 6: 3}  # Colour channels besides alpha
+
+
+class UnsupportedImageError(Exception):
+    """Raised for images that cannot be embedded without decoding."""
+    pass
+
+
+@dataclass
+class ImageInfo:
+    """Header-level description of an embeddable image."""
+    width: int
+    height: int
+    color_space: str
+    bits_per_component: int
+    filter: str
+    data: Optional[bytes]  # Encoded stream data; released once written
+    decode_parms: str = ""
+    decode: str = ""
+    digest: str = ""
+    name: str = ""
+    source: str = ""  # First path the image was loaded from
+    alpha: bool = False  # PNG with an alpha channel, split into an /SMask when stored
+    smask: Optional[bytes] = None  # Encoded alpha samples; released once written
+    object_number: Optional[int] = None
+
+
+def read_jpeg_info(data: bytes) -> ImageInfo:
+    """
+    Read JPEG dimensions and colour layout from the frame header.
+
+    Args:
+        data: Complete JPEG file contents
+
+    Returns:
+        ImageInfo for DCTDecode passthrough
+    """
+    if data[:2] != b"\xff\xd8":
+        raise UnsupportedImageError("Not a JPEG file")
+
+    adobe = False
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            raise UnsupportedImageError("Corrupt JPEG marker sequence")
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        pos += 2
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+
+        (length,) = struct.unpack(">H", data[pos:pos + 2])
+        if marker == 0xEE and data[pos + 2:pos + 7] == b"Adobe":
+            adobe = True
+        elif marker in _JPEG_SOF_MARKERS:
+            precision, height, width, components = struct.unpack(">BHHB", data[pos + 2:pos + 8])
+            if precision != 8:
+                raise UnsupportedImageError(f"{precision}-bit JPEG is not supported by PDF")
+            if components not in _JPEG_COLOR_SPACES:
+                raise UnsupportedImageError(f"JPEG with {components} components")
+            # Adobe CMYK JPEGs are stored inverted
+            decode = "[1 0 1 0 1 0 1 0]" if components == 4 and adobe else ""
+            return ImageInfo(width=width, height=height,
+                             color_space=_JPEG_COLOR_SPACES[components],
+                             bits_per_component=8, filter="/DCTDecode",
+                             data=data, decode=decode)
+        pos += length
+
+    raise UnsupportedImageError("JPEG has no frame header")
+
+
+def read_png_info(data: bytes) -> ImageInfo:
+    """
+    Read PNG dimensions from IHDR and collect the compressed image data.
+
+    The IDAT stream is already zlib data with PNG row filters, which PDF
+    decodes directly with ``/Predictor 15``. Images with an alpha channel
+    keep the IDAT data as it is until ``split_png_alpha`` separates it
+    when the image is stored. Interlaced images would have to be
+    decoded and are rejected.
+
+    Args:
+        data: Complete PNG file contents
+
+    Returns:
+        ImageInfo for FlateDecode passthrough
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise UnsupportedImageError("Not a PNG file")
+
+    header = None
+    palette = b""
+    idat: List[bytes] = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif chunk_type == b"PLTE":
+            palette = body
+        elif chunk_type == b"IDAT":
+            idat.append(body)
+        elif chunk_type == b"IEND":
+            break
+        pos += 12 + length
+
+    if header is None:
+        raise UnsupportedImageError("PNG has no IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if interlace:
+        raise UnsupportedImageError("Interlaced PNG is not supported")
+    if color_type in _PNG_ALPHA_COLORS:
+        color_space = "/DeviceGray" if color_type == 4 else "/DeviceRGB"
+        return ImageInfo(width=width, height=height, color_space=color_space,
+                         bits_per_component=bit_depth, filter="/FlateDecode",
+                         data=b"".join(idat), alpha=True)
+    if color_type not in _PNG_COLORS:
+        raise UnsupportedImageError(f"PNG colour type {color_type} is not supported")
+
+    if color_type == 3:
+        color_space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+    else:
+        color_space = "/DeviceGray" if color_type == 0 else "/DeviceRGB"
+
+    colors = _PNG_COLORS[color_type]
+    decode_parms = (f"<< /Predictor 15 /Colors {colors} "
+                    f"/BitsPerComponent {bit_depth} /Columns {width} >>")
+    return ImageInfo(width=width, height=height, color_space=color_space,
+                     bits_per_component=bit_depth, filter="/FlateDecode",
+                     data=b"".join(idat), decode_parms=decode_parms)
+
+
+def _unfilter_png_rows(data: bytes, height: int, row_bytes: int, pixel_bytes: int) -> bytearray:
+    """Undo the PNG row filters, returning the rows without filter type bytes."""
+    rows = bytearray()
+    prior = bytearray(row_bytes)
+    pos = 0
+    for _ in range(height):
+        filter_type = data[pos]
+        row = bytearray(data[pos + 1:pos + 1 + row_bytes])
+        pos += 1 + row_bytes
+        if filter_type == 1:    # Sub
+            for i in range(pixel_bytes, row_bytes):
+                row[i] = (row[i] + row[i - pixel_bytes]) & 0xFF
+        elif filter_type == 2:  # Up
+            row = bytearray((a + b) & 0xFF for a, b in zip(row, prior))
+        elif filter_type == 3:  # Average
+            for i in range(row_bytes):
+                left = row[i - pixel_bytes] if i >= pixel_bytes else 0
+                row[i] = (row[i] + ((left + prior[i]) >> 1)) & 0xFF
+        elif filter_type == 4:  # Paeth
+            for i in range(row_bytes):
+                left = row[i - pixel_bytes] if i >= pixel_bytes else 0
+                upper_left = prior[i - pixel_bytes] if i >= pixel_bytes else 0
+                estimate = left + prior[i] - upper_left
+                to_left, to_up = abs(estimate - left), abs(estimate - prior[i])
+                to_upper_left = abs(estimate - upper_left)
+                if to_left <= to_up and to_left <= to_upper_left:
+                    predicted = left
+                elif to_up <= to_upper_left:
+                    predicted = prior[i]
+                else:
+                    predicted = upper_left
+                row[i] = (row[i] + predicted) & 0xFF
+        elif filter_type != 0:
+            raise UnsupportedImageError(f"Unknown PNG filter type {filter_type}")
+        rows += row
+        prior = row
+    return rows
+
+
+def split_png_alpha(info: ImageInfo) -> Tuple[bytes, bytes]:
+    """
+    Decode a PNG with an alpha channel into separate colour and alpha data.
+
+    Args:
+        info: Image read by ``read_png_info`` with ``alpha`` set
+
+    Returns:
+        Tuple of (colour samples, alpha samples), each zlib-compressed
+        without a predictor
+    """
+    colors = 1 if info.color_space == "/DeviceGray" else 3
+    sample_bytes = info.bits_per_component // 8
+    pixel_bytes = (colors + 1) * sample_bytes
+    try:
+        raw = zlib.decompress(info.data)
+    except zlib.error as e:
+        raise UnsupportedImageError(f"Corrupt PNG image data: {e}")
+    if len(raw) < info.height * (1 + info.width * pixel_bytes):
+        raise UnsupportedImageError("Truncated PNG image data")
+    pixels = _unfilter_png_rows(raw, info.height, info.width * pixel_bytes, pixel_bytes)
+
+    color_bytes = colors * sample_bytes
+    count = len(pixels) // pixel_bytes
+    color = bytearray(count * color_bytes)
+    alpha = bytearray(count * sample_bytes)
+    for offset in range(color_bytes):
+        color[offset::color_bytes] = pixels[offset::pixel_bytes]
+    for offset in range(sample_bytes):
+        alpha[offset::sample_bytes] = pixels[color_bytes + offset::pixel_bytes]
+    return zlib.compress(bytes(color)), zlib.compress(bytes(alpha))
+
+
+def read_image_info(data: bytes) -> ImageInfo:
+    """
+    Dispatch on the file signature to the matching header reader.
+
+    Truncated headers are reported as ``UnsupportedImageError`` like any
+    other image that cannot be embedded.
+    """
+    try:
+        if data.startswith(b"\xff\xd8"):
+            return read_jpeg_info(data)
+        if data.startswith(PNG_SIGNATURE):
+            return read_png_info(data)
+    except (struct.error, IndexError) as e:
+        raise UnsupportedImageError(f"Truncated image header: {e}") from e
+    raise UnsupportedImageError("Only JPEG and PNG images can be embedded")
+
+
+class ImageStore:
+    """
+    Content-addressed image XObjects for one document.
+
+    Images are keyed by the SHA-256 of their file bytes, so the same
+    picture referenced through different paths is still embedded once.
+    Encoded data is dropped as soon as the XObject has been written.
+    """
+
+    def __init__(self, prefix: str = "Im"):
+        """
+        Initialize the store.
+
+        Args:
+            prefix: Resource name prefix for the image XObjects
+        """
+        self.prefix = prefix
+        self.images: Dict[str, ImageInfo] = {}
+        self._paths: Dict[str, str] = {}  # Resolved path -> digest
+        self.hits = 0
+
+    def add_file(self, path: str) -> ImageInfo:
+        """Register an image file, reading it only the first time."""
+        key = os.path.abspath(path)
+        digest = self._paths.get(key)
+        if digest is not None:
+            self.hits += 1
+            return self.images[digest]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        info = self.add_bytes(data)
+        info.source = info.source or path
+        self._paths[key] = info.digest
+        return info
+
+    def add_bytes(self, data: bytes) -> ImageInfo:
+        """Register image data, returning the stored entry for duplicates."""
+        digest = hashlib.sha256(data).hexdigest()
+        info = self.images.get(digest)
+        if info is not None:
+            self.hits += 1
+            return info
+
+        info = read_image_info(data)
+        if info.alpha:
+            # Decoded now, so a corrupt image is refused before a page uses it
+            info.data, info.smask = split_png_alpha(info)
+        info.digest = digest
+        info.name = f"{self.prefix}{len(self.images) + 1}"
+        self.images[digest] = info
+        return info
+
+    def write_pending(self, writer: PDFWriter) -> int:
+        """
+        Write every image not yet in the file and release its data.
+
+        Returns:
+            Number of XObjects written
+        """
+        written = 0
+        for info in self.images.values():
+            if info.object_number is not None:
+                continue
+            entries = (f"/Type /XObject\n/Subtype /Image\n/Width {info.width}\n"
+                       f"/Height {info.height}\n/ColorSpace {info.color_space}\n"
+                       f"/BitsPerComponent {info.bits_per_component}")
+            if info.decode_parms:
+                entries += f"\n/DecodeParms {info.decode_parms}"
+            if info.decode:
+                entries += f"\n/Decode {info.decode}"
+            if info.smask is not None:
+                smask = writer.write_stream(
+                    info.smask, filters="/FlateDecode",
+                    extra_entries=(f"/Type /XObject\n/Subtype /Image\n/Width {info.width}\n"
+                                   f"/Height {info.height}\n/ColorSpace /DeviceGray\n"
+                                   f"/BitsPerComponent {info.bits_per_component}"))
+                entries += f"\n/SMask {smask} 0 R"
+            info.object_number = writer.write_stream(info.data, filters=info.filter,
+                                                     extra_entries=entries)
+            info.data = info.smask = None
+            written += 1
+        return written
+
+    def resource_entries(self) -> List[Tuple[str, int]]:
+        """(name, object number) pairs for the /XObject resource dictionary."""
+        return [(info.name, info.object_number) for info in self.images.values()
+                if info.object_number is not None]
@@ -0,0 +1,234 @@
+"""
+Append-only incremental PDF updates.
+
+PDF allows a file to be changed by appending new versions of objects and a
+cross-reference section whose trailer points back (``/Prev``) to the
+previous one; readers use the newest entry for every object number. When a
+watch-mode rebuild changes one paragraph, only that page's content stream
+(and the info dictionary) differ from what is already on disk, so appending
+them is far cheaper than rewriting the whole document.
+
+The digest of every object body is kept in a small state file next to the
+PDF. A rebuild compares against it and falls back to a full rewrite when
+the file on disk no longer matches the state, when the update would be a
+large part of the document, or after a number of appended updates so the
+file is compacted again.
+"""
+
+import hashlib
+import io
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Union
+
+from .pdf_writer import PDFWriter
+
+
+# Appended updates allowed before the next build rewrites the file
+DEFAULT_MAX_UPDATES = 20
+
+# Rewrite instead of appending when the changed objects make up more than
+# this fraction of the document
+MAX_UPDATE_FRACTION = 0.5
+
+STATE_SUFFIX = ".incremental.json"
+
+# Bytes at the end of the file fingerprinted to detect outside changes
+_TAIL_BYTES = 1024
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _tail_digest(path: Union[str, os.PathLike], length: int) -> Optional[str]:
+    """Digest of the last bytes of a file, or None if it is not ``length`` long."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() != length:
+                return None
+            f.seek(max(0, length - _TAIL_BYTES))
+            return _digest(f.read())
+    except OSError:
+        return None
+
+
+@dataclass
+class IncrementalState:
+    """What a PDF on disk contains, as recorded by the last build."""
+    objects: Dict[int, str] = field(default_factory=dict)  # Object number -> body digest
+    size: int = 1          # Trailer /Size
+    startxref: int = 0     # Offset of the newest xref section
+    length: int = 0        # File length
+    tail: str = ""         # Digest of the file's last bytes
+    updates: int = 0       # Incremental sections since the last rewrite
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> Optional['IncrementalState']:
+        """Read a state file, returning None if it is missing or unreadable."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data['objects'] = {int(num): digest for num, digest in data['objects'].items()}
+            return cls(**data)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def save(self, path: Union[str, os.PathLike]):
+        """Write the state file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f)
+
+    def matches(self, pdf_path: Union[str, os.PathLike]) -> bool:
+        """Whether the PDF on disk is still the file this state describes."""
+        return bool(self.tail) and _tail_digest(pdf_path, self.length) == self.tail
+
+
+class IncrementalWriter(PDFWriter):
+    """
+    PDFWriter that updates an existing file in place when it can.
+
+    Objects are collected until ``finish``; only then is it known which of
+    them differ from the file on disk. Object numbers must be stable
+    between builds for updates to stay small, which holds for the
+    renderer as long as the page count does not change.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], version: str = "1.7",
+                 max_updates: int = DEFAULT_MAX_UPDATES):
+        """
+        Initialize the writer.
+
+        Args:
+            path: PDF file to update or create
+            version: PDF version written in the file header
+            max_updates: Appended updates allowed before a full rewrite
+        """
+        super().__init__(io.BytesIO(), version)
+        self.path = path
+        self.state_path = f"{os.fspath(path)}{STATE_SUFFIX}"
+        self.max_updates = max_updates
+        self.bodies: Dict[int, bytes] = {}
+        self.appended = False       # Whether the last finish appended
+        self.objects_written = 0
+
+    def write_header(self):
+        """The header is only written when the file is rewritten."""
+        self.header_written = True
+
+    def write_object(self, content: Union[str, bytes], obj_num: Optional[int] = None) -> int:
+        """Collect an object until the update is written."""
+        if obj_num is None:
+            obj_num = self.reserve_object()
+        if obj_num in self.bodies:
+            raise ValueError(f"PDF object {obj_num} was already written")
+        self.bodies[obj_num] = content if isinstance(content, bytes) else content.encode('utf-8')
+        return obj_num
+
+    def finish(self, root: int, info: Optional[int] = None) -> int:
+        """
+        Append the changed objects, or rewrite the file.
+
+        Returns:
+            Length of the PDF file
+        """
+        digests = {num: _digest(body) for num, body in self.bodies.items()}
+        state = IncrementalState.load(self.state_path)
+        changed = self._changed_objects(state, digests)
+
+        if changed is None:
+            state = IncrementalState(objects=digests)
+            # Write beside the file and swap it in, so output.pdf is never half written
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                self._write_full(f, root, info, state)
+            os.replace(temp_path, self.path)
+        elif not changed:
+            # The file on disk is already up to date
+            self.appended = True
+            self.objects_written = 0
+            self.offset = state.length
+            self.bodies = {}
+            return self.offset
+        else:
+            state.objects.update((num, digests[num]) for num in changed)
+            with open(self.path, 'ab') as f:
+                self._write_update(f, changed, root, info, state)
+
+        state.length = self.offset
+        state.tail = _tail_digest(self.path, self.offset) or ""
+        state.save(self.state_path)
+        self.bodies = {}
+        return self.offset
+
+    def _changed_objects(self, state: Optional[IncrementalState],
+                         digests: Dict[int, str]) -> Optional[List[int]]:
+        """Objects to append, or None when the file must be rewritten."""
+        if state is None or state.updates >= self.max_updates or not state.matches(self.path):
+            return None
+        changed = [num for num, digest in digests.items() if state.objects.get(num) != digest]
+        changed_bytes = sum(len(self.bodies[num]) for num in changed)
+        total_bytes = sum(len(body) for body in self.bodies.values())
+        if changed_bytes > total_bytes * MAX_UPDATE_FRACTION:
+            return None
+        return changed
+
+    def _write_full(self, sink, root: int, info: Optional[int], state: IncrementalState):
+        """Write a complete file with a single xref section."""
+        self.sink = sink
+        self.offset = 0
+        self.header_written = False
+        PDFWriter.write_header(self)
+        for num, body in self.bodies.items():
+            PDFWriter.write_object(self, body, num)
+        xref_offset = self.write_xref()
+        self.write_trailer(root, xref_offset, info)
+
+        self.appended = False
+        self.objects_written = len(self.bodies)
+        state.size = self.size
+        state.startxref = xref_offset
+        state.updates = 0
+
+    def _write_update(self, sink, changed: List[int], root: int, info: Optional[int],
+                      state: IncrementalState):
+        """Append changed objects and an xref section chained to the last one."""
+        self.sink = sink
+        self.offset = state.length
+        for num in changed:
+            PDFWriter.write_object(self, self.bodies[num], num)
+
+        # Objects from earlier builds that are no longer used stay in the
+        # file unreferenced, so /Size never shrinks
+        size = max(self.size, state.size)
+        xref_offset = self.offset
+        lines = ["xref\n"]
+        numbers = sorted(self.offsets)
+        start = 0
+        while start < len(numbers):
+            end = start
+            while end + 1 < len(numbers) and numbers[end + 1] == numbers[end] + 1:
+                end += 1
+            lines.append(f"{numbers[start]} {end - start + 1}\n")
+            lines.extend(f"{self.offsets[num]:010d} 00000 n \n" for num in numbers[start:end + 1])
+            start = end + 1
+
+        trailer = f"trailer\n<<\n/Size {size}\n/Root {root} 0 R\n"
+        if info is not None:
+            trailer += f"/Info {info} 0 R\n"
+        trailer += f"/Prev {state.startxref}\n>>\nstartxref\n{xref_offset}\n%%EOF\n"
+        self._write((''.join(lines) + trailer).encode('ascii'))
+
+        self.appended = True
+        self.objects_written = len(changed)
+        state.size = size
+        state.startxref = xref_offset
+        state.updates += 1
+
+    def summary(self) -> str:
+        """One-line report for the build output."""
+        if self.appended:
+            return f"Incremental update: appended {self.objects_written} changed objects"
+        return f"Full rewrite: {self.objects_written} objects"
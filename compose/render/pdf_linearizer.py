@@ -0,0 +1,475 @@
+"""
+Linearized ("fast web view") PDF output.
+
+A linearized file puts everything needed to display page 1 at the front:
+the linearization parameter dictionary, a first-page cross-reference
+table, the catalog, the primary hint stream and the objects of the first
+page. A viewer can show page 1 after fetching that prefix and use the
+hint tables to request any other page with a single byte range.
+
+LinearizingWriter collects the objects produced through the ordinary
+PDFWriter interface, then renumbers and reorders them when the document
+is finished (PDF Reference 1.7, Appendix F):
+
+    1. Header                        6. First-page objects
+    2. Linearization dictionary      7. Remaining pages
+    3. First-page xref and trailer   8. Objects shared by several pages
+    4. Catalog                       9. Everything else
+    5. Primary hint stream          10. Main xref and trailer
+
+Objects in parts 7-9 are numbered from 1 upwards; the linearization
+dictionary and parts 4-6 continue the numbering after them.
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .pdf_writer import PDFWriter, PDF_BINARY_MARKER
+
+
+_REF_PATTERN = re.compile(rb"(\d+) 0 R\b")
+_PARENT_PATTERN = re.compile(rb"/Parent\s+\d+ 0 R\b")
+_PAGES_PATTERN = re.compile(rb"/Pages\s+(\d+) 0 R\b")
+_KIDS_PATTERN = re.compile(rb"/Kids\s*\[([^\]]*)\]")
+_PAGE_TREE_PATTERN = re.compile(rb"/Type\s*/Pages\b")
+
+# Width reserved for offsets that are only known once the layout is final
+_OFFSET_WIDTH = 10
+
+
+def _split_strings(data: bytes) -> List[Tuple[bool, bytes]]:
+    """
+    Split PDF object syntax into (is_string, segment) pieces.
+
+    Literal ``(...)`` and hex ``<...>`` strings are kept whole so that
+    reference rewriting never touches text such as a title that happens
+    to read "1 0 R".
+    """
+    pieces = []
+    start = 0
+    i = 0
+    length = len(data)
+    while i < length:
+        char = data[i:i + 1]
+        if char == b"(":
+            end = i + 1
+            depth = 1
+            while end < length and depth:
+                c = data[end:end + 1]
+                if c == b"\\":
+                    end += 2
+                    continue
+                if c == b"(":
+                    depth += 1
+                elif c == b")":
+                    depth -= 1
+                end += 1
+        elif char == b"<":
+            if data[i + 1:i + 2] == b"<":  # Dictionary, not a hex string
+                i += 2
+                continue
+            end = data.find(b">", i) + 1 or length
+        else:
+            i += 1
+            continue
+        if start < i:
+            pieces.append((False, data[start:i]))
+        pieces.append((True, data[i:end]))
+        start = i = end
+    if start < length:
+        pieces.append((False, data[start:]))
+    return pieces
+
+
+def _split_stream(body: bytes) -> Tuple[bytes, bytes]:
+    """Split an object body into its dictionary part and stream data."""
+    index = body.find(b"\nstream\n")
+    if index < 0 or not body.rstrip().endswith(b"endstream"):
+        return body, b""
+    return body[:index], body[index:]
+
+
+def _nbits(value: int) -> int:
+    """Bits needed to store ``value`` in a hint table field."""
+    return value.bit_length()
+
+
+class _BitWriter:
+    """Big-endian bit packer for hint tables."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._acc = 0
+        self._count = 0
+
+    def write(self, value: int, bits: int):
+        for shift in range(bits - 1, -1, -1):
+            self._acc = (self._acc << 1) | ((value >> shift) & 1)
+            self._count += 1
+            if self._count == 8:
+                self.data.append(self._acc)
+                self._acc = 0
+                self._count = 0
+
+    def flush(self):
+        """Pad to the next byte boundary."""
+        if self._count:
+            self.data.append(self._acc << (8 - self._count))
+            self._acc = 0
+            self._count = 0
+
+
+class LinearizingWriter(PDFWriter):
+    """
+    PDFWriter that lays the file out for linearized access.
+
+    Objects are kept in memory until ``finish``, which is when their
+    final order and numbers are known; linearized output therefore
+    always buffers the document. Object streams are not used because
+    the first-page section must stay readable on its own.
+    """
+
+    def __init__(self, sink, version: str = "1.7"):
+        super().__init__(sink, version)
+        self.bodies: Dict[int, bytes] = {}
+
+    def write_header(self):
+        """The header is written by ``finish`` together with the rest."""
+        self.header_written = True
+
+    def write_object(self, content: Union[str, bytes], obj_num: Optional[int] = None) -> int:
+        """Collect an object for the final layout."""
+        if obj_num is None:
+            obj_num = self.reserve_object()
+        if obj_num in self.bodies:
+            raise ValueError(f"PDF object {obj_num} was already written")
+        body = content if isinstance(content, bytes) else content.encode('utf-8')
+        self.bodies[obj_num] = body.rstrip(b"\n") + b"\n"
+        return obj_num
+
+    def finish(self, root: int, info: Optional[int] = None) -> int:
+        """Write the linearized file and return its length."""
+        data = _Linearizer(self.bodies, root, info, self.version).build()
+        self._write(data)
+        self.bodies = {}
+        return self.offset
+
+
+class _Linearizer:
+    """Computes the linearized object order, numbering and hint tables."""
+
+    def __init__(self, bodies: Dict[int, bytes], root: int, info: Optional[int], version: str):
+        self.bodies = bodies
+        self.root = root
+        self.info = info
+        self.version = version
+        self.refs = {num: self._references(num, body) for num, body in bodies.items()}
+
+    # -- object graph ---------------------------------------------------
+
+    def _references(self, obj_num: int, body: bytes) -> List[int]:
+        """Indirect references made by an object's dictionary."""
+        dictionary, _ = _split_stream(body)
+        if self._is_page_node(body):
+            dictionary = _PARENT_PATTERN.sub(b"", dictionary)
+        refs = []
+        for is_string, piece in _split_strings(dictionary):
+            if not is_string:
+                refs.extend(int(m.group(1)) for m in _REF_PATTERN.finditer(piece))
+        return [ref for ref in refs if ref in self.bodies and ref != obj_num]
+
+    @staticmethod
+    def _is_page_node(body: bytes) -> bool:
+        """Page and page tree nodes, whose /Parent links point back up."""
+        return re.search(rb"/Type\s*/Pages?\b", body) is not None
+
+    def _page_order(self) -> Tuple[List[int], Set[int]]:
+        """Page objects in document order, and all page tree nodes."""
+        match = _PAGES_PATTERN.search(self.bodies[self.root])
+        pages: List[int] = []
+        tree: Set[int] = set()
+        stack = [int(match.group(1))] if match else []
+        while stack:
+            node = stack.pop()
+            body = self.bodies.get(node, b"")
+            if _PAGE_TREE_PATTERN.search(body):
+                tree.add(node)
+                kids = _KIDS_PATTERN.search(body)
+                kid_refs = [int(m.group(1)) for m in _REF_PATTERN.finditer(kids.group(1))] if kids else []
+                stack.extend(reversed(kid_refs))
+            else:
+                pages.append(node)
+        return pages, tree
+
+    def _closure(self, start: int, stop: Set[int]) -> List[int]:
+        """Objects reachable from ``start`` without entering ``stop``."""
+        seen = {start}
+        order = []
+        stack = list(reversed(self.refs[start]))
+        while stack:
+            obj = stack.pop()
+            if obj in seen or obj in stop:
+                continue
+            seen.add(obj)
+            order.append(obj)
+            stack.extend(reversed(self.refs[obj]))
+        return order
+
+    # -- layout -----------------------------------------------------------
+
+    def build(self) -> bytes:
+        pages, tree = self._page_order()
+        if not pages:
+            raise ValueError("Cannot linearize a document without pages")
+        stop = set(pages) | tree
+
+        used_by = {page: self._closure(page, stop) for page in pages}
+        users: Dict[int, Set[int]] = {}
+        for index, page in enumerate(pages):
+            for obj in used_by[page]:
+                users.setdefault(obj, set()).add(index)
+
+        # Part 4: the catalog and what it references, minus pages and outlines
+        outlines = self._closure_of_key(b"/Outlines", stop)
+        catalog_stop = stop | set(outlines) | set(users)
+        part4 = [self.root] + self._closure(self.root, catalog_stop)
+
+        # Part 6: first page and everything it uses
+        part6 = [pages[0]] + [obj for obj in used_by[pages[0]] if obj not in part4]
+        placed = set(part4) | set(part6)
+
+        # Part 7: remaining pages with their private objects
+        part7: List[List[int]] = []
+        for index, page in enumerate(pages[1:], start=1):
+            private = [obj for obj in used_by[page]
+                       if users[obj] == {index} and obj not in placed]
+            placed.update(private)
+            placed.add(page)
+            part7.append([page] + private)
+
+        # Part 8: objects shared by several pages but not the first
+        part8 = []
+        for page in pages[1:]:
+            for obj in used_by[page]:
+                if obj not in placed:
+                    placed.add(obj)
+                    part8.append(obj)
+
+        # Part 9: outlines (kept together for their hint table), page
+        # tree, info and anything unreferenced
+        outlines = [obj for obj in outlines if obj not in placed]
+        placed.update(outlines)
+        part9 = outlines + [obj for obj in sorted(self.bodies) if obj not in placed]
+
+        # Numbering: parts 7-9 from 1, then the first-page section
+        main_order = [obj for group in part7 for obj in group] + part8 + part9
+        renumber = {old: new for new, old in enumerate(main_order, start=1)}
+        lin_num = len(main_order) + 1
+        next_num = lin_num + 1
+        for obj in part4:
+            renumber[obj] = next_num
+            next_num += 1
+        hint_num = next_num
+        next_num += 1
+        for obj in part6:
+            renumber[obj] = next_num
+            next_num += 1
+        size = next_num
+
+        serialized = {renumber[old]: self._serialize(renumber[old], body, renumber)
+                      for old, body in self.bodies.items()}
+
+        return self._assemble(pages, part4, part6, part7, part8, outlines, main_order,
+                              users, renumber, serialized, lin_num, hint_num, size)
+
+    def _closure_of_key(self, key: bytes, stop: Set[int]) -> List[int]:
+        """Objects reachable from a catalog entry such as /Outlines."""
+        match = re.search(re.escape(key) + rb"\s+(\d+) 0 R\b", self.bodies[self.root])
+        if not match:
+            return []
+        start = int(match.group(1))
+        return [start] + self._closure(start, stop)
+
+    def _serialize(self, new_num: int, body: bytes, renumber: Dict[int, int]) -> bytes:
+        """Render an object with its references renumbered."""
+        dictionary, stream = _split_stream(body)
+
+        def replace(match):
+            ref = int(match.group(1))
+            return b"%d 0 R" % renumber.get(ref, ref)
+
+        parts = [piece if is_string else _REF_PATTERN.sub(replace, piece)
+                 for is_string, piece in _split_strings(dictionary)]
+        return b"%d 0 obj\n" % new_num + b"".join(parts) + stream + b"endobj\n"
+
+    def _assemble(self, pages, part4, part6, part7, part8, outlines, main_order,
+                  users, renumber, serialized, lin_num, hint_num, size) -> bytes:
+        header = f"%PDF-{self.version}\n".encode('ascii') + PDF_BINARY_MARKER
+        first_count = size - lin_num
+
+        def lin_dict(length, hint_offset, hint_length, end_first, main_t):
+            values = [f"{v:<{_OFFSET_WIDTH}}" for v in (length, hint_offset, hint_length, end_first, main_t)]
+            return (f"{lin_num} 0 obj\n<< /Linearized 1 /L {values[0]} /H [ {values[1]} {values[2]} ] "
+                    f"/O {renumber[pages[0]]} /E {values[3]} /N {len(pages)} /T {values[4]} >>\n"
+                    f"endobj\n").encode('ascii')
+
+        def first_trailer(prev):
+            info = f" /Info {renumber[self.info]} 0 R" if self.info in renumber else ""
+            return (f"trailer\n<< /Size {size} /Root {renumber[self.root]} 0 R{info} "
+                    f"/Prev {prev:<{_OFFSET_WIDTH}} >>\nstartxref\n0\n%%EOF\n").encode('ascii')
+
+        lin_len = len(lin_dict(0, 0, 0, 0, 0))
+        first_xref_len = len(f"xref\n{lin_num} {first_count}\n") + 20 * first_count
+        first_trailer_len = len(first_trailer(0))
+
+        part4_bytes = [serialized[renumber[obj]] for obj in part4]
+        part6_bytes = [serialized[renumber[obj]] for obj in part6]
+        main_bytes = [serialized[renumber[obj]] for obj in main_order]
+
+        # Offsets as if the hint stream were absent (hint tables use these)
+        offsets: Dict[int, int] = {}
+        position = len(header)
+        offsets[lin_num] = position
+        position += lin_len
+        first_xref_offset = position
+        position += first_xref_len + first_trailer_len
+        for obj, data in zip(part4, part4_bytes):
+            offsets[renumber[obj]] = position
+            position += len(data)
+        hint_offset = position
+        for obj, data in zip(part6, part6_bytes):
+            offsets[renumber[obj]] = position
+            position += len(data)
+        end_first = position
+        for obj, data in zip(main_order, main_bytes):
+            offsets[renumber[obj]] = position
+            position += len(data)
+
+        hint_data, table_offsets = self._hint_tables(
+            pages, part6, part7, part8, outlines, users, renumber, serialized, offsets)
+        tables = ' '.join(f"/{key} {value}" for key, value in table_offsets.items())
+        hint_obj = (f"{hint_num} 0 obj\n<< /Length {len(hint_data)} {tables} >>\n"
+                    f"stream\n").encode('ascii') + hint_data + b"\nendstream\nendobj\n"
+        hint_length = len(hint_obj)
+
+        # Shift everything after the hint stream into its real position
+        for num, offset in offsets.items():
+            if offset >= hint_offset:
+                offsets[num] = offset + hint_length
+        offsets[hint_num] = hint_offset
+        end_first += hint_length
+        main_xref_offset = position + hint_length
+
+        main_xref = [f"xref\n0 {lin_num}\n", "0000000000 65535 f \n"]
+        main_xref.extend(f"{offsets[num]:010d} 00000 n \n" for num in range(1, lin_num))
+        main_t = main_xref_offset + len(f"xref\n0 {lin_num}")
+        main_tail = (''.join(main_xref)
+                     + f"trailer\n<< /Size {lin_num} >>\nstartxref\n{first_xref_offset}\n%%EOF\n")
+        total_length = main_xref_offset + len(main_tail)
+
+        first_xref = [f"xref\n{lin_num} {first_count}\n"]
+        first_xref.extend(f"{offsets[num]:010d} 00000 n \n" for num in range(lin_num, size))
+
+        out = bytearray(header)
+        out += lin_dict(total_length, hint_offset, hint_length, end_first, main_t)
+        out += ''.join(first_xref).encode('ascii')
+        out += first_trailer(main_xref_offset)
+        for data in part4_bytes:
+            out += data
+        out += hint_obj
+        for data in part6_bytes:
+            out += data
+        for data in main_bytes:
+            out += data
+        out += main_tail.encode('ascii')
+        return bytes(out)
+
+    def _hint_tables(self, pages, part6, part7, part8, outlines, users, renumber,
+                     serialized, offsets) -> Tuple[bytes, Dict[str, int]]:
+        """
+        Build the primary hint stream data.
+
+        Returns:
+            Tuple of (stream data, hint table offsets keyed by the hint
+            stream dictionary entry that records them)
+        """
+        def length(obj):
+            return len(serialized[renumber[obj]])
+
+        # Shared object table: every first-page object, then part 8
+        shared = part6 + part8
+        shared_index = {obj: i for i, obj in enumerate(shared)}
+
+        page_objects = [part6] + part7
+        nobjects = [len(group) for group in page_objects]
+        page_lengths = [sum(length(obj) for obj in group) for group in page_objects]
+        shared_ids: List[List[int]] = [[]]
+        for index, page in enumerate(pages[1:], start=1):
+            ids = sorted(shared_index[obj] for obj in self._closure(page, set(pages))
+                         if obj in shared_index and len(users.get(obj, ())) > 1)
+            shared_ids.append(ids)
+
+        min_nobjects = min(nobjects)
+        min_length = min(page_lengths)
+        bits_nobjects = _nbits(max(nobjects) - min_nobjects)
+        bits_length = _nbits(max(page_lengths) - min_length)
+        bits_nshared = _nbits(max(len(ids) for ids in shared_ids))
+        bits_shared_id = _nbits(len(shared))
+
+        w = _BitWriter()
+        w.write(min_nobjects, 32)
+        w.write(offsets[renumber[pages[0]]], 32)
+        w.write(bits_nobjects, 16)
+        w.write(min_length, 32)
+        w.write(bits_length, 16)
+        w.write(0, 32)            # Least content stream offset (always 0)
+        w.write(0, 16)
+        w.write(min_length, 32)   # Content length is reported as page length
+        w.write(bits_length, 16)
+        w.write(bits_nshared, 16)
+        w.write(bits_shared_id, 16)
+        w.write(0, 16)            # Bits for shared object numerators
+        w.write(4, 16)            # Shared object denominator
+        for count in nobjects:
+            w.write(count - min_nobjects, bits_nobjects)
+        w.flush()
+        for page_length in page_lengths:
+            w.write(page_length - min_length, bits_length)
+        w.flush()
+        for ids in shared_ids:
+            w.write(len(ids), bits_nshared)
+        w.flush()
+        for ids in shared_ids:
+            for shared_id in ids:
+                w.write(shared_id, bits_shared_id)
+        w.flush()
+        for page_length in page_lengths:
+            w.write(page_length - min_length, bits_length)
+        w.flush()
+        table_offsets = {"S": len(w.data)}
+
+        group_lengths = [length(obj) for obj in shared]
+        min_group = min(group_lengths)
+        bits_group = _nbits(max(group_lengths) - min_group)
+        first_shared = renumber[part8[0]] if part8 else 0
+        w.write(first_shared, 32)
+        w.write(offsets[first_shared] if part8 else 0, 32)
+        w.write(len(part6), 32)
+        w.write(len(shared), 32)
+        w.write(0, 16)            # Every group is a single object
+        w.write(min_group, 32)
+        w.write(bits_group, 16)
+        for group_length in group_lengths:
+            w.write(group_length - min_group, bits_group)
+        w.flush()
+        for _ in shared:
+            w.write(0, 1)         # No MD5 signatures
+        w.flush()
+
+        if outlines:
+            table_offsets["O"] = len(w.data)
+            w.write(renumber[outlines[0]], 32)
+            w.write(offsets[renumber[outlines[0]]], 32)
+            w.write(len(outlines), 32)
+            w.write(sum(length(obj) for obj in outlines), 32)
+        return bytes(w.data), table_offsets
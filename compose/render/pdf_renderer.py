@@ -12,18 +12,39 @@ Creates valid PDF files by generating the PDF file structure manually.
 PDF format reference: https://www.adobe.com/content/dam/acom/en/devnet/pdf/pdf_reference_archive/pdf_reference_1-7.pdf
 """
 
-import zlib
+import os
 import base64
-from typing import Dict, List, Optional, Tuple, Any
+from typing import BinaryIO, Dict, List, Optional, Tuple, Any, Union
 from datetime import datetime
 from ..model.ast import Document, Heading, Paragraph, MathBlock, MathInline, CodeBlock, ListBlock, ListItem, Link, Image, Text, Bold, Italic, Strikethrough, CodeInline, Table, InlineElement
 from ..layout.box_model import MathBox, BoxType, Dimensions
 from ..layout.engines.math_engine import MathLayoutEngine, ExpressionLayout
+from ..layout.standard_fonts import StandardFontMetrics, metrics_text_width
+from ..layout.batch_measure import measure_words
+from ..layout.tiered_breaker import TieredLineBreaker
+from ..layout.hyphenation import get_hyphenator
+from ..layout.parallel_breaking import DEFAULT_PARALLEL_THRESHOLD, ParallelParagraphBreaker
 from ..layout.content.math_parser import MathExpressionParser
 from .rendering_tracker import RenderingTracker
-from .layout_measurer import LayoutMeasurer
+from .layout_measurer import LayoutMeasurer, MeasurementResult, ParagraphLayout
+from .page_builder import PageBuilder, PageItem, PagePlan
+from .layout_checkpoints import (
+    LayoutCheckpoint, LayoutRecord, block_fingerprint, changed_blocks, first_item_of,
+    page_breaks as checkpoint_page_breaks, plan_checkpoints
+)
 from .math_graphics import MathGraphicsRenderer
-from ..cache_system import performance_monitor
+from .pdf_writer import PDFWriter, open_pdf_sink
+from .content_stream import ContentStreamBuilder, encode_text
+from .pdf_emitter import PageEmitter
+from .pdf_linearizer import LinearizingWriter
+from .pdf_incremental import DEFAULT_MAX_UPDATES, IncrementalWriter
+from .pdf_compression import ContentCompressor, CompressionStats, DEFAULT_COMPRESSION_LEVEL
+from .form_xobjects import FormXObjectRegistry
+from .pdf_images import ImageInfo, ImageStore, UnsupportedImageError
+from .pdf_fonts import EmbeddedFont, FontFormatError
+from ..cache_system import (
+    content_stream_cache, font_metrics_cache, line_break_cache, performance_monitor, word_width_cache,
+)
 
 
 class ProfessionalPDFRenderer:
@@ -40,9 +61,24 @@ class ProfessionalPDFRenderer:
     """
 
     def __init__(self):
-        # PDF structure
-        self.objects: List[Any] = []
-        self.object_offsets: List[int] = []
+        # PDF structure (objects are streamed through the writer)
+        self.writer: Optional[PDFWriter] = None
+        self.emitter: Optional[PageEmitter] = None
+        self.streaming = False  # Emit pages as soon as they are finished
+        self.compressor: Optional[ContentCompressor] = None
+        self.compression_level = DEFAULT_COMPRESSION_LEVEL  # 0 = draft, 9 = release
+        self.compression_workers: Optional[int] = None  # None = one per CPU
+        self.object_streams = False  # Pack objects into /ObjStm with an /XRef stream
+        self.linearize = False  # Lay the file out for fast web view (always buffered)
+        self.incremental = False  # Append changed objects to an existing output file
+        self.incremental_max_updates = DEFAULT_MAX_UPDATES  # Appends before a full rewrite
+        self.incremental_target: Optional[Union[str, os.PathLike]] = None
+        self.stream_cache = False  # Reuse compressed page streams from earlier builds
+        self.line_break_cache = False  # Keep paragraph line breaks on disk between builds
+        self.break_workers: Optional[int] = None  # Processes breaking paragraphs (None = one per CPU)
+        self.parallel_break_threshold = DEFAULT_PARALLEL_THRESHOLD  # Fewer paragraphs break serially
+        self.layout_checkpoints = False  # Lay out only what an edit reached since the last build
+        self.layout_record: Optional[LayoutRecord] = None  # Checkpoints of the last build
 
         # Page layout
         self.page_width = 612   # Letter width in points (8.5 inches)
@@ -61,7 +97,7 @@ class ProfessionalPDFRenderer:
         # Layout state
         self.current_page = 0
         self.current_y = self.page_height - self.margin_top
-        self.pages: List[List[str]] = [[]]  # Content streams for each page
+        self.pages: List[Optional[ContentStreamBuilder]] = []  # Content streams for each page (None once emitted)
 
         # Enhanced font system
         self.fonts = {
@@ -73,17 +109,21 @@ class ProfessionalPDFRenderer:
             "Helvetica-Oblique": 6,
             "Courier": 7,
             "Courier-Bold": 8,
-            "Courier-Oblique": 9
+            "Courier-Oblique": 9,
+            "Helvetica-BoldOblique": 10
         }
         
-        # Font embedding support
-        self.embedded_fonts = {}
+        # Font embedding support (TrueType fonts by resource name)
+        self.embedded_fonts: Dict[str, EmbeddedFont] = {}
         self.font_metrics = self._load_font_metrics()
+        self.pages.append(ContentStreamBuilder(self.embedded_fonts))
 
         # Math rendering
         self.math_engine = MathLayoutEngine()
         self.math_parser = MathExpressionParser()
         self.math_graphics = MathGraphicsRenderer(self)
+        self.reuse_xobjects = True  # Draw repeated math once as a Form XObject
+        self.xobjects = FormXObjectRegistry()
 
         # Color support
         self.current_color = (0, 0, 0)  # RGB black
@@ -93,14 +133,21 @@ class ProfessionalPDFRenderer:
         self.font_encoding = "WinAnsiEncoding"
         self.enable_kerning = False
         self.enable_ligatures = False
+        self.hyphenation = True  # Break words at Liang hyphenation points of self.language
+        # Greedy wrapping, Knuth-Plass when it sets badly; breaks are shared with the measurer.
+        # Lines are drawn ragged-right at natural spacing, so spaces never shrink.
+        self.line_breaker = TieredLineBreaker(cache=line_break_cache, ragged_right=True)
+        self.prebroken: Dict[str, Tuple[List[int], List[float]]] = {}  # Breaks the pool found this build
+        # Page breaks for the whole document at once, scored by the layout rules
+        self.page_builder = PageBuilder()
 
         # Document structure for bookmarks (accessibility)
         self.bookmarks = []
         self.current_bookmark_level = 0
 
-        # Image support with accessibility
-        self.images = {}
-        self.image_counter = 0
+        # Image support with accessibility (one XObject per distinct image)
+        self.images = ImageStore()
+        self.image_dpi = 96  # Pixel density assumed for natural image size
 
         # Hyperlink support
         self.links = []
@@ -124,91 +171,45 @@ class ProfessionalPDFRenderer:
             margin_top=self.margin_top,
             margin_bottom=self.margin_bottom,
             font_metrics=self.font_metrics,
-            current_font_size=self.current_font_size
+            current_font_size=self.current_font_size,
+            line_breaker=self.line_breaker,
+            paragraph_layout=self._paragraph_layout
         )
 
-    def _load_font_metrics(self) -> Dict[str, Dict]:
-        """Load font metrics for accurate text layout"""
-        # Basic font metrics (in font units where 1000 = 1em)
-        return {
-            "Times-Roman": {
-                "ascent": 770,    # Standard Times ascent
-                "descent": -230,  # Standard Times descent  
-                "line_gap": 200,  # Standard line gap
-                "units_per_em": 1000,
-                "glyph_widths": self._get_standard_font_widths("Times-Roman")
-            },
-            "Times-Bold": {
-                "ascent": 770,
-                "descent": -230,
-                "line_gap": 200,
-                "units_per_em": 1000,
-                "glyph_widths": self._get_standard_font_widths("Times-Bold")
-            },
-            "Helvetica": {
-                "ascent": 770,    # Standard Helvetica ascent
-                "descent": -230,  # Standard Helvetica descent
-                "line_gap": 200,  # Standard line gap
-                "units_per_em": 1000,
-                "glyph_widths": self._get_standard_font_widths("Helvetica")
-            },
-            "Courier": {
-                "ascent": 770,    # Monospace fonts have similar metrics
-                "descent": -230,
-                "line_gap": 200,
-                "units_per_em": 1000,
-                "glyph_widths": self._get_standard_font_widths("Courier")
-            }
-        }
-
-    def _get_standard_font_widths(self, font_name: str) -> Dict[str, float]:
-        """Get standard glyph widths for common fonts"""
-        # Simplified glyph widths (in points for 1pt font)
-        # In practice, this would be loaded from AFM files or embedded metrics
-        base_widths = {
-            'a': 4.4, 'b': 4.4, 'c': 3.9, 'd': 4.4, 'e': 4.4, 'f': 2.2, 'g': 4.4,
-            'h': 4.4, 'i': 2.2, 'j': 2.2, 'k': 4.0, 'l': 2.2, 'm': 6.7, 'n': 4.4,
-            'o': 4.4, 'p': 4.4, 'q': 4.4, 'r': 2.8, 's': 3.9, 't': 2.8, 'u': 4.4,
-            'v': 4.0, 'w': 5.6, 'x': 4.0, 'y': 4.0, 'z': 3.6,
-            'A': 5.6, 'B': 5.0, 'C': 5.0, 'D': 5.6, 'E': 4.4, 'F': 3.9, 'G': 5.6,
-            'H': 5.6, 'I': 2.2, 'J': 3.3, 'K': 5.0, 'L': 4.4, 'M': 6.7, 'N': 5.6,
-            'O': 5.6, 'P': 4.4, 'Q': 5.6, 'R': 5.0, 'S': 4.4, 'T': 4.4, 'U': 5.6,
-            'V': 5.0, 'W': 7.2, 'X': 5.0, 'Y': 5.0, 'Z': 4.4,
-            ' ': 2.2, '.': 2.2, ',': 2.2, '!': 2.2, '?': 3.9, '-': 2.8, '_': 4.4
-        }
-        
-        # Adjust for different font characteristics
-        if "Bold" in font_name:
-            # Bold fonts are slightly wider
-            return {k: v * 1.05 for k, v in base_widths.items()}
-        elif "Courier" in font_name:
-            # Monospace fonts have fixed width
-            return {k: 4.0 for k in base_widths.keys()}
-        else:
-            return base_widths
+    def _load_font_metrics(self) -> StandardFontMetrics:
+        """Font metrics for the standard fonts, read from AFM data on first use"""
+        return StandardFontMetrics()
 
     def get_text_width(self, text: str, font: str = None, size: float = None) -> float:
         """Calculate accurate text width using font metrics"""
         font = font or self.current_font
         size = size or self.current_font_size
-        
+
+        if font in self.embedded_fonts:
+            embedded = self.embedded_fonts[font]
+            return word_width_cache.text_width(embedded.cache_key, text, size,
+                                               lambda word: embedded.text_width(word, size))
+
         if font not in self.font_metrics:
             # Fallback to simple estimation
             return len(text) * size * 0.5
-        
-        metrics = self.font_metrics[font]
-        glyph_widths = metrics['glyph_widths']
-        
-        total_width = 0
-        for char in text:
-            if char in glyph_widths:
-                total_width += glyph_widths[char]
-            else:
-                # Fallback for unknown characters
-                total_width += glyph_widths.get('a', 4.4)
-        
-        # Convert to actual size (metrics are for 1pt font)
-        return total_width * (size / 1000.0)
+
+        return metrics_text_width(self.font_metrics[font], text, size)
+
+    def get_text_widths(self, texts: List[str], font: str = None, size: float = None) -> List[float]:
+        """Calculate the widths of many strings at once with the batch kernel"""
+        font = font or self.current_font
+        size = size or self.current_font_size
+
+        if font in self.embedded_fonts:
+            font_object = self.embedded_fonts[font]
+        elif font in self.font_metrics:
+            font_object = self.font_metrics[font].get("font")
+        else:
+            font_object = None
+        if font_object is None:
+            return [self.get_text_width(text, font, size) for text in texts]
+        return [float(width) for width in measure_words(font_object, texts, size).widths]
 
     def _normalize_color(self, color) -> Tuple[float, float, float]:
         """Normalize color input to 0-1 RGB tuple.
@@ -280,20 +281,30 @@ class ProfessionalPDFRenderer:
         return text
 
     def embed_font(self, font_name: str, font_path: str = None) -> bool:
-        """Embed a custom font in the PDF"""
-        try:
-            # In practice, this would load and embed the font
-            # For now, we'll just mark it as embedded
-            if font_name not in self.embedded_fonts:
-                self.embedded_fonts[font_name] = {
-                    'embedded': True,
-                    'path': font_path,
-                    'subset': True  # Use font subsetting for smaller PDFs
-                }
-                return True
+        """
+        Embed a TrueType font under a font resource name.
+
+        Text set in ``font_name`` is drawn with the font's own glyphs and
+        the font is subset to the characters used. Using the name of a
+        standard font (e.g. "Helvetica") replaces it throughout.
+
+        Args:
+            font_name: Font resource name
+            font_path: TrueType font file
+
+        Returns:
+            True if the font was added
+        """
+        if font_name in self.embedded_fonts or not font_path:
             return False
-        except Exception:
+        try:
+            font = EmbeddedFont(font_name, font_path, font_metrics_cache)
+        except (OSError, FontFormatError) as e:
+            print(f"Font embedding failed for {font_path}: {e}")
             return False
+        self.embedded_fonts[font_name] = font
+        self.fonts.setdefault(font_name, len(self.fonts) + 1)
+        return True
 
     def set_high_quality_mode(self, enabled: bool = True):
         """Enable high-quality rendering mode"""
@@ -304,16 +315,21 @@ class ProfessionalPDFRenderer:
             self.dpi = 300  # Standard high DPI
 
     @performance_monitor.time_operation("pdf_rendering")
-    def render(self, doc: Document, config: Dict = None) -> bytes:
+    def render(self, doc: Document, config: Dict = None,
+               output: Union[str, os.PathLike, BinaryIO, None] = None):
         """
         Render document to professional PDF using manual PDF generation.
 
         Args:
             doc: Document AST to render
             config: Configuration options
+            output: Optional destination. A file path or a binary stream
+                    (file, socket, BytesIO) receives the PDF as it is
+                    written; when omitted the PDF is returned as bytes.
 
         Returns:
-            Complete PDF file as bytes
+            Complete PDF file as bytes, or ``output`` itself when a path
+            or stream was given
         """
         config = config or {}
 
@@ -323,11 +339,46 @@ class ProfessionalPDFRenderer:
         # Reset rendering state
         self._reset_render_state()
 
-        # Use the clean rendering pipeline
-        self._layout_document_clean(doc)
-
-        # Generate PDF manually
-        return self._generate_professional_pdf()
+        # Incremental updates need the existing file, so the writer opens
+        # the path itself instead of truncating it here
+        if self.incremental and not self.linearize and isinstance(output, (str, os.PathLike)):
+            self.incremental_target = output
+        sink, owns_sink = open_pdf_sink(None if self.incremental_target else output)
+        try:
+            if self.streaming and not self.linearize:
+                # Pages are compressed and written as layout finishes them
+                self._create_professional_pdf_structure(sink)
+                self._layout_document_clean(doc)
+                self._finish_pdf_output()
+            else:
+                # Use the clean rendering pipeline
+                self._layout_document_clean(doc)
+
+                # Generate PDF manually
+                self._generate_professional_pdf(sink)
+            if output is None:
+                return sink.getvalue()
+        finally:
+            self._close_compressor()
+            if owns_sink:
+                sink.close()
+        return output
+
+    @property
+    def compression_stats(self) -> CompressionStats:
+        """Compression totals for the most recent render."""
+        if self.compressor is None:
+            return CompressionStats()
+        return self.compressor.stats
+
+    def _close_compressor(self):
+        """Stop the compression workers and record the time spent."""
+        if self.compressor is None:
+            return
+        self.compressor.close()
+        performance_monitor.operations.setdefault("pdf_compression", []).append(
+            self.compressor.stats.wall_seconds
+        )
 
     def _apply_config(self, config: Dict):
         """Apply configuration settings."""
@@ -346,11 +397,24 @@ class ProfessionalPDFRenderer:
 
     def _reset_render_state(self):
         """Reset rendering state for new document."""
-        self.objects = []
-        self.object_offsets = []
+        self.writer = None
+        self.emitter = None
+        self.compressor = None
+        self.incremental_target = None
+        self.xobjects = FormXObjectRegistry()
+        self.images = ImageStore()
         self.current_page = 0
         self.current_y = self.page_height - self.margin_top
-        self.pages = [[]]
+        self.pages = [ContentStreamBuilder(self.embedded_fonts)]
+        for font in self.embedded_fonts.values():
+            font.reset()
+        self.links = []
+        self.bookmarks = []
+        self._validation_error_count = 0
+        self._validation_error_samples: List[str] = []
+        self.line_breaker.persistent_cache = self.line_break_cache
+        self.prebroken = {}
+        self.line_breaker.hyphenator = get_hyphenator(self.language) if self.hyphenation else None
         
         # Reset new architecture components
         self.tracker.clear()
@@ -362,7 +426,9 @@ class ProfessionalPDFRenderer:
             margin_top=self.margin_top,
             margin_bottom=self.margin_bottom,
             font_metrics=self.font_metrics,
-            current_font_size=self.current_font_size
+            current_font_size=self.current_font_size,
+            line_breaker=self.line_breaker,
+            paragraph_layout=self._paragraph_layout
         )
 
     def _layout_document_clean(self, doc: Document):
@@ -388,19 +454,25 @@ class ProfessionalPDFRenderer:
                 margin_top=self.margin_top,
                 margin_bottom=self.margin_bottom,
                 font_metrics=self.font_metrics,
-                current_font_size=self.current_font_size
+                current_font_size=self.current_font_size,
+                line_breaker=self.line_breaker,
+                paragraph_layout=self._paragraph_layout
             )
 
+        # MEASURE phase - measure every block, then choose all page breaks at once
+        measurements, page_breaks = self._measure_and_plan(doc.blocks)
+
         # Process each block using the new pipeline
-        for block in doc.blocks:
-            # MEASURE phase
-            measurement = self.measurer.measure(block)
+        for index, block in enumerate(doc.blocks):
+            measurement = measurements[index]
+            breaks = page_breaks.get(index, [])
             
-            # UPDATE phase - check if component fits, handle page breaks, add spacing
+            # UPDATE phase - start the page planned here, or one for a block that
+            # still does not fit because an earlier block was taller than measured
             available_height = self.measurer.get_available_height(self.current_y)
-            
-            # Check if we need a page break (component doesn't fit)
-            if measurement.height > available_height and not measurement.can_split:
+            overflows = (measurement.spacing_before + measurement.content_height > available_height
+                         and not measurement.can_split)
+            if (breaks[:1] == [0] or overflows) and self.current_y < self.page_height - self.margin_top:
                 self._new_page_clean()
             
             # Add spacing before component (UPDATE phase)
@@ -418,13 +490,157 @@ class ProfessionalPDFRenderer:
                 # Then move current_y down by spacing
                 self.current_y -= measurement.spacing_before
             
-            # RENDER phase - render at current position
-            self.current_y = self._render_block_clean(block, self.current_y)
+            # RENDER phase - render at current position, reusing what was measured
+            self.current_y = self._render_block_clean(block, self.current_y, measurement,
+                                                      [line for line in breaks if line > 0])
+            if not self.layout_checkpoints:
+                # No later build reuses the measurement; drop the drawn lines
+                measurements[index] = None
             
             # CHECK phase - tracker automatically validates via record methods
             
-        # Final validation
-        errors = self.tracker.validate_all(
+        # Final validation (pages already emitted in streaming mode were
+        # validated as they were released)
+        self._record_validation_errors(self._validate_tracker(self.tracker))
+        
+        errors = self._validation_error_samples
+        total = self._validation_error_count
+        if total:
+            print(f"Rendering validation errors: {total}")
+            for error in errors[:10]:  # Show first 10 errors
+                print(f"  {error}")
+            if total > 10:
+                print(f"  ... and {total - 10} more errors")
+
+    def _measure_and_plan(self, blocks: List) -> Tuple[List[MeasurementResult], Dict[int, List[int]]]:
+        """
+        Measure the document's blocks and choose its page breaks.
+
+        With layout checkpoints, a build laid out with the same settings as
+        the last one measures only the blocks that changed and reuses the
+        page builder's plan for the items after them. The plan is global,
+        so the entries before the edit are computed again and the pages
+        are the same as a fresh build's; checkpoints are walked from the
+        first page until a page starts where one did after the edit.
+
+        Returns:
+            The blocks' measurements, and for each block a page starts in,
+            the lines of the block the pages start at
+        """
+        if not self.layout_checkpoints:
+            self._prebreak_paragraphs(blocks)
+            measurements = [self.measurer.measure(block) for block in blocks]
+            return measurements, self._plan_page_breaks(blocks, measurements)
+
+        key = self._layout_key()
+        fingerprints = [block_fingerprint(block) for block in blocks]
+        previous = self.layout_record
+        if previous is not None and previous.key != key:
+            previous = None
+
+        prefix, suffix = changed_blocks(previous.fingerprints, fingerprints) if previous else (0, 0)
+        changed = blocks[prefix:len(blocks) - suffix]
+        self._prebreak_paragraphs(changed)
+        measurements = [self.measurer.measure(block) for block in changed]
+        if previous is not None:
+            measurements = (previous.measurements[:prefix] + measurements
+                            + previous.measurements[len(previous.measurements) - suffix:])
+
+        items, plan, checkpoints, planned = self._plan_checkpoints(blocks, measurements, previous,
+                                                                   prefix, suffix)
+        self.layout_record = LayoutRecord(key=key, fingerprints=fingerprints, measurements=measurements,
+                                          items=items, plan=plan, checkpoints=checkpoints,
+                                          replanned=planned)
+        return measurements, checkpoint_page_breaks(checkpoints)
+
+    def _layout_key(self) -> Tuple:
+        """Settings a build's measurements and page breaks depend on."""
+        return (self.page_width, self.page_height, self.margin_left, self.margin_right,
+                self.margin_top, self.margin_bottom, self.current_font, self.current_font_size,
+                self.line_height_factor, self.paragraph_spacing, self.enable_ligatures,
+                self.hyphenation, self.language, self.line_breaker.badness_threshold,
+                tuple(sorted(vars(self.page_builder).items())), self.current_y,
+                tuple(sorted(self.embedded_fonts)))
+
+    def _plan_page_breaks(self, blocks: List, measurements: List[MeasurementResult]) -> Dict[int, List[int]]:
+        """
+        Choose the document's page breaks with the page builder.
+
+        Paragraphs are offered line by line, so they may split across pages;
+        every other block is kept whole.
+
+        Returns:
+            For each block a page starts in, the lines of the block the pages start at
+        """
+        return checkpoint_page_breaks(self._plan_checkpoints(blocks, measurements)[2])
+
+    def _plan_checkpoints(self, blocks: List, measurements: List[MeasurementResult],
+                          previous: Optional[LayoutRecord] = None, prefix: int = 0,
+                          suffix: int = 0) -> Tuple[List[PageItem], PagePlan, List[LayoutCheckpoint], int]:
+        """
+        Plan the document's pages, recording a checkpoint where each starts.
+
+        Args:
+            blocks: The document's blocks
+            measurements: Their measurements
+            previous: The last build, whose plan for the items after the
+                      last changed block and whose pages from where they
+                      start as before are reused
+            prefix: Blocks at the start the last build had as well
+            suffix: Blocks at the end the last build had as well
+
+        Returns:
+            The page items, the page builder's plan, the checkpoints, and
+            how many pages were planned
+        """
+        items = self._page_items(blocks, measurements)
+        page_height = self.measurer.content_height
+        page_top = self.page_height - self.margin_top
+
+        reuse_from, block_shift = len(items), 0
+        if previous is not None:
+            block_shift = len(blocks) - len(previous.fingerprints)
+            # The plan carries over for the items after the last changed block
+            # whose entries the last build knew
+            unchanged = 0 if prefix == len(blocks) and not block_shift else len(blocks) - suffix
+            reuse_from = max(first_item_of(items, unchanged),
+                             previous.plan.start + len(items) - len(previous.items))
+
+        # Every page's best break depends on the whole tail after it, so the
+        # entries before the reused ones are always planned again
+        plan = self.page_builder.plan_pages(items, page_height, reuse=previous and previous.plan,
+                                            reuse_from=reuse_from)
+        checkpoints = [LayoutCheckpoint(block=0, y=self.current_y)]
+        start = self.page_builder.first_page_end(items, plan, page_height,
+                                                 self.measurer.get_available_height(self.current_y))
+        checkpoints, planned = plan_checkpoints(items, plan, checkpoints, start, page_top, previous,
+                                                reuse_from, block_shift)
+        return items, plan, checkpoints, planned + 1
+
+    def _page_items(self, blocks: List, measurements: List[MeasurementResult]) -> List[PageItem]:
+        """The page builder's items for the document's blocks."""
+        items = []
+        space = 0.0  # Spacing after the previous block
+        forced = False
+        for index, (block, measurement) in enumerate(zip(blocks, measurements)):
+            layout = measurement.paragraph_layout
+            if isinstance(block, Paragraph) and layout and layout.lines and not self._is_image_paragraph(block):
+                for line in range(len(layout.lines)):
+                    items.append(PageItem(height=layout.line_height, space_before=space if line == 0 else 0.0,
+                                          block=index, line=line, block_lines=len(layout.lines),
+                                          text_lines=1, forced_break=forced and line == 0))
+            else:
+                items.append(PageItem(height=measurement.spacing_before + measurement.content_height,
+                                      space_before=space, block=index,
+                                      heading=isinstance(block, Heading), forced_break=forced))
+            space = measurement.spacing_after
+            # A horizontal rule starts a new page itself
+            forced = block.__class__.__name__ == 'HorizontalRule'
+        return items
+
+    def _validate_tracker(self, tracker: RenderingTracker) -> List[str]:
+        """Validate tracked content against the page margins."""
+        return tracker.validate_all(
             page_height=self.page_height,
             page_width=self.page_width,
             margin_top=self.margin_top,
@@ -432,13 +648,13 @@ class ProfessionalPDFRenderer:
             margin_left=self.margin_left,
             margin_right=self.margin_right
         )
-        
-        if errors:
-            print(f"Rendering validation errors: {len(errors)}")
-            for error in errors[:10]:  # Show first 10 errors
-                print(f"  {error}")
-            if len(errors) > 10:
-                print(f"  ... and {len(errors) - 10} more errors")
+
+    def _record_validation_errors(self, errors: List[str]):
+        """Count validation errors, keeping only the first few messages."""
+        self._validation_error_count += len(errors)
+        room = 10 - len(self._validation_error_samples)
+        if room > 0:
+            self._validation_error_samples.extend(errors[:room])
 
     def _layout_document(self, doc: Document):
         """Legacy method - now delegates to clean implementation."""
@@ -455,38 +671,16 @@ class ProfessionalPDFRenderer:
         author_y = self.page_height - 250
         date_y = self.page_height - 320
 
-        commands = [
-            # Title (large, bold)
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 36 Tf",
-            f"1 0 0 1 {self.margin_left} {title_y} Tm",
-            f"{self._to_pdf_literal(title)} Tj",
-            "ET",
-
-            # Author
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 18 Tf",
-            f"1 0 0 1 {self.margin_left} {author_y} Tm",
-            f"{self._to_pdf_literal(author)} Tj",
-            "ET",
-
-            # Date
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 12 Tf",
-            f"1 0 0 1 {self.margin_left} {date_y} Tm",
-            f"{self._to_pdf_literal(date)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        page = self._page_stream
+        page.text(title, "Helvetica", 36, self.margin_left, title_y)
+        page.text(author, "Helvetica", 18, self.margin_left, author_y)
+        page.text(date, "Helvetica", 12, self.margin_left, date_y)
         self._new_page_clean()
 
     def _new_page_clean(self):
         """Start a new page with new architecture."""
-        self.pages.append([])
+        self._finish_current_page()
+        self.pages.append(ContentStreamBuilder(self.embedded_fonts))
         self.current_page += 1
         self.current_y = self.page_height - self.margin_top
         self.tracker.current_page = self.current_page
@@ -508,12 +702,22 @@ class ProfessionalPDFRenderer:
             # Move current_y down by spacing amount
             self.current_y -= points
 
-    def _render_block_clean(self, block, y: float) -> float:
-        """Render a block at the given Y position, return new Y."""
+    def _render_block_clean(self, block, y: float, measurement: Optional[MeasurementResult] = None,
+                            page_breaks: List[int] = ()) -> float:
+        """Render a block at the given Y position, return new Y.
+
+        ``page_breaks`` are the lines of a paragraph that start new pages.
+        """
         if isinstance(block, Heading):
             return self._render_heading(block, y)
         elif isinstance(block, Paragraph):
-            return self._render_paragraph(block, y)
+            if self._is_image_paragraph(block):
+                for element in block.content:
+                    if isinstance(element, Image):
+                        y = self._render_image(element, y)
+                return y
+            return self._render_paragraph(block, y, measurement.paragraph_layout if measurement else None,
+                                          page_breaks)
         elif isinstance(block, MathBlock):
             return self._render_math_block(block, y)
         elif isinstance(block, CodeBlock):
@@ -565,16 +769,7 @@ class ProfessionalPDFRenderer:
                 if self.current_y < self.margin_bottom + 12:
                     self._new_page()
 
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/{self.current_font} {self.current_font_size} Tf",
-                    f"1 0 0 1 {self.margin_left} {self.current_y} Tm",
-                    f"{self._to_pdf_literal(line)} Tj",
-                    "ET"
-                ]
-
-                self._add_to_current_page(commands)
+                self._page_stream.text(line, self.current_font, self.current_font_size, self.margin_left, self.current_y)
 
         # Reset to normal font (use Helvetica since that's all we declare)
         self.current_font = "Helvetica"
@@ -608,16 +803,7 @@ class ProfessionalPDFRenderer:
             # Add indentation for wrapped lines
             indent = 20 if i > 0 else 0
 
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/{self.current_font} {self.current_font_size} Tf",
-                f"1 0 0 1 {self.margin_left + indent} {self.current_y} Tm",
-                f"{self._to_pdf_literal(line)} Tj",
-                "ET"
-            ]
-
-            self._add_to_current_page(commands)
+            self._page_stream.text(line, self.current_font, self.current_font_size, self.margin_left + indent, self.current_y)
 
     def _layout_table(self, table):
         """Layout table as simple text representation."""
@@ -653,16 +839,7 @@ class ProfessionalPDFRenderer:
         font = "Helvetica"
         size = 10
         
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/{font} {size} Tf",
-            f"1 0 0 1 {self.margin_left} {self.current_y} Tm",
-            f"{self._to_pdf_literal(text)} Tj",
-            "ET"
-        ]
-        
-        self._add_to_current_page(commands)
+        self._page_stream.text(text, font, size, self.margin_left, self.current_y)
 
     def _layout_heading(self, heading: Heading):
         """Layout heading with proper typography and bookmark generation."""
@@ -679,16 +856,7 @@ class ProfessionalPDFRenderer:
 
         # Set font and render text (use Helvetica which seems to work better)
         font_name = "Helvetica"
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/{font_name} {font_size} Tf",
-            f"1 0 0 1 {self.margin_left} {self.current_y} Tm",
-            f"{self._to_pdf_literal(text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(text, font_name, font_size, self.margin_left, self.current_y)
 
         # Add bookmark for this heading
         self._add_bookmark(text, level, self.current_page, self.current_y)
@@ -762,16 +930,7 @@ class ProfessionalPDFRenderer:
             kerned_line = self._apply_kerning(line, self.current_font)
 
             # Use Helvetica for better viewer compatibility
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {self.current_font_size} Tf",
-                f"1 0 0 1 {self.margin_left} {self.current_y} Tm",
-                f"{self._to_pdf_literal(kerned_line)} Tj",
-                "ET"
-            ]
-
-            self._add_to_current_page(commands)
+            self._page_stream.text(kerned_line, "Helvetica", self.current_font_size, self.margin_left, self.current_y)
 
             # Add link annotations for this line
             self._add_link_annotations_for_line(line, current_char_pos, self.current_page, self.current_y)
@@ -809,16 +968,7 @@ class ProfessionalPDFRenderer:
             kerned_line = self._apply_kerning(line, self.current_font)
 
             # Use Helvetica for better viewer compatibility
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {self.current_font_size} Tf",
-                f"1 0 0 1 {self.margin_left} {self.current_y} Tm",
-                f"{self._to_pdf_literal(kerned_line)} Tj",
-                "ET"
-            ]
-
-            self._add_to_current_page(commands)
+            self._page_stream.text(kerned_line, "Helvetica", self.current_font_size, self.margin_left, self.current_y)
             
             # Move down for next line
             self.current_y -= self.current_font_size * self.line_height_factor
@@ -919,16 +1069,7 @@ class ProfessionalPDFRenderer:
         # Center the math block
         center_x = self.page_width // 2
 
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/Helvetica 12 Tf",
-            f"1 0 0 1 {center_x - len(math_text)*3} {self.current_y - 12} Tm",
-            f"{self._to_pdf_literal(math_text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(math_text, "Helvetica", 12, center_x - len(math_text)*3, self.current_y - 12)
 
         # Update position
         self.current_y -= 24
@@ -936,29 +1077,50 @@ class ProfessionalPDFRenderer:
         # Add spacing after math
         self._add_vertical_space(12)
 
+    def _font_cache_key(self, font: str) -> str:
+        """Key identifying a font's widths, for caches shared between builds"""
+        if font in self.embedded_fonts:
+            return self.embedded_fonts[font].cache_key
+        font_object = self.font_metrics[font].get("font") if font in self.font_metrics else None
+        return font_object.cache_key if font_object is not None else font
+
     def _wrap_text(self, text: str, max_width: float) -> List[str]:
         """Wrap text to fit within max width using professional line breaking."""
-        words = text.split()
-        lines = []
-        current_line = []
-        current_width = 0
-
-        for word in words:
-            word_width = len(word) * (self.current_font_size * 0.6)  # Rough estimate
+        font, size = self.current_font, self.current_font_size
+        return self.line_breaker.wrap_text(text, max_width, self._font_cache_key(font), size,
+                                           lambda texts: self.get_text_widths(texts, font, size),
+                                           known=self.prebroken)
 
-            # Check if word fits
-            if current_line and current_width + word_width > max_width:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-                current_width = word_width
-            else:
-                current_line.append(word)
-                current_width += word_width
-
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        return lines
+    def _paragraph_text(self, paragraph: Paragraph) -> str:
+        """Text a paragraph is broken into lines from"""
+        text = self._extract_text_content(paragraph.content)
+        if not text.strip():
+            return ""
+        return self._apply_ligatures(text)
+
+    def _paragraph_lines(self, paragraph: Paragraph) -> List[str]:
+        """Lines a paragraph is set in"""
+        text = self._paragraph_text(paragraph)
+        if not text:
+            return []
+        return self._wrap_text(text, self.page_width - self.margin_left - self.margin_right)
+
+    def _paragraph_layout(self, paragraph: Paragraph) -> ParagraphLayout:
+        """A paragraph's lines and baselines, as both measured and rendered"""
+        return ParagraphLayout.from_lines(self._paragraph_lines(paragraph),
+                                          self.current_font_size * self.line_height_factor)
+
+    def _prebreak_paragraphs(self, blocks: List):
+        """Break the paragraphs among blocks on a process pool ahead of layout."""
+        font, size = self.current_font, self.current_font_size
+        stage = ParallelParagraphBreaker(self.line_breaker, workers=self.break_workers,
+                                         threshold=self.parallel_break_threshold)
+        # Kept for the whole build: the line break cache may evict them first
+        self.prebroken = stage.break_paragraphs(
+            (self._paragraph_text(block) for block in blocks if isinstance(block, Paragraph)),
+            self.page_width - self.margin_left - self.margin_right,
+            self._font_cache_key(font), size,
+            lambda texts: self.get_text_widths(texts, font, size))
 
     def _add_title_page(self, doc: Document):
         """Add a professional title page."""
@@ -972,42 +1134,30 @@ class ProfessionalPDFRenderer:
         author_y = self.page_height - 250
         date_y = self.page_height - 320
 
-        commands = [
-            # Title (large, bold)
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 36 Tf",
-            f"1 0 0 1 {self.margin_left} {title_y} Tm",
-            f"{self._to_pdf_literal(title)} Tj",
-            "ET",
-
-            # Author
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 18 Tf",
-            f"1 0 0 1 {self.margin_left} {author_y} Tm",
-            f"{self._to_pdf_literal(author)} Tj",
-            "ET",
-
-            # Date
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 12 Tf",
-            f"1 0 0 1 {self.margin_left} {date_y} Tm",
-            f"{self._to_pdf_literal(date)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        page = self._page_stream
+        page.text(title, "Helvetica", 36, self.margin_left, title_y)
+        page.text(author, "Helvetica", 18, self.margin_left, author_y)
+        page.text(date, "Helvetica", 12, self.margin_left, date_y)
         self._new_page()
 
     def _new_page(self):
         """Start a new page."""
-        self.pages.append([])
+        self._finish_current_page()
+        self.pages.append(ContentStreamBuilder(self.embedded_fonts))
         self.current_page += 1
         self.current_y = self.page_height - self.margin_top
 
-    def _add_to_current_page(self, commands: List[str]):
+    def _finish_current_page(self):
+        """In streaming mode, hand the page being closed to the emitter."""
+        if self.streaming and self.emitter is not None:
+            self._emit_page(self.current_page)
+
+    @property
+    def _page_stream(self) -> ContentStreamBuilder:
+        """Content stream of the page being laid out."""
+        return self.pages[self.current_page]
+
+    def _add_to_current_page(self, commands: Union[ContentStreamBuilder, List[str]]):
         """Add PDF commands to the current page."""
         self.pages[self.current_page].extend(commands)
 
@@ -1037,6 +1187,8 @@ class ProfessionalPDFRenderer:
                 result.append(f"§MATH§{math_content}§MATH§")
             elif isinstance(element, Link):
                 result.append(element.text)
+            elif isinstance(element, Image):
+                result.append(element.alt)
             else:
                 result.append(str(element))
 
@@ -1062,264 +1214,280 @@ class ProfessionalPDFRenderer:
         This matches the /WinAnsiEncoding used by base14 Type1 fonts in our PDF.
         Non-encodable characters are replaced with ASCII equivalents or dropped.
         """
-        # Replace common Unicode characters with ASCII equivalents
-        replacements = {
-            '\u2022': '*',      # bullet point
-            '\u2026': '...',    # ellipsis
-            '\u2013': '-',      # en dash
-            '\u2014': '--',     # em dash
-            '\u2018': "'",      # left single quote
-            '\u2019': "'",      # right single quote
-            '\u201c': '"',      # left double quote
-            '\u201d': '"',      # right double quote
-            '\u00a0': ' ',      # non-breaking space
-            '\u00ad': '',       # soft hyphen
-            '\u00e9': 'e',      # é (e with acute)
-            '\u00e0': 'a',      # à (a with grave)
-            '\u00e8': 'e',      # è (e with grave)
-            '\u00ea': 'e',      # ê (e with circumflex)
-            '\u00fc': 'u',      # ü (u with umlaut)
-            '\u00f1': 'n',      # ñ (n with tilde)
-        }
-        
-        for unicode_char, ascii_equiv in replacements.items():
-            text = text.replace(unicode_char, ascii_equiv)
-        
-        try:
-            safe = text.encode('cp1252', errors='ignore').decode('cp1252')
-        except Exception:
-            safe = ''.join(ch for ch in text if ord(ch) < 128)
-        return f"({self._escape_pdf_text(safe)})"
+        return f"({encode_text(text).decode('cp1252')})"
+
+    def _generate_professional_pdf(self, sink: BinaryIO = None) -> Optional[bytes]:
+        """
+        Generate complete PDF with professional features.
 
-    def _generate_professional_pdf(self) -> bytes:
-        """Generate complete PDF with professional features."""
-        # Create PDF structure with multiple pages
-        self._create_professional_pdf_structure()
+        Args:
+            sink: Binary stream to write to; when omitted the PDF is
+                  built in memory and returned as bytes
+        """
+        if sink is None:
+            return self._build_pdf_bytes()
+
+        # Create PDF structure and emit every buffered page
+        self._create_professional_pdf_structure(sink)
+        if self.linearize:
+            # Pages name their own XObjects, so those must exist first
+            self._write_xobjects()
+        for page_index in range(len(self.pages)):
+            self._emit_page(page_index)
 
-        # Build the final PDF
-        return self._build_pdf_bytes()
+        self._finish_pdf_output()
+        return None
+
+    def _build_pdf_bytes(self) -> bytes:
+        """Build the final PDF file in memory."""
+        sink, _ = open_pdf_sink(None)
+        self._generate_professional_pdf(sink)
+        return sink.getvalue()
+
+    def _create_professional_pdf_structure(self, sink: BinaryIO):
+        """
+        Open the PDF output and write the document-wide objects.
+
+        Object numbers for the catalog, page tree and shared resources
+        are reserved up front so pages can be written as soon as they
+        are finished; the reserved objects are filled in by
+        ``_finish_pdf_output``.
+
+        Args:
+            sink: Binary stream receiving the PDF
+        """
+        if self.linearize:
+            self.writer = LinearizingWriter(sink)
+        elif self.incremental_target is not None:
+            self.writer = IncrementalWriter(self.incremental_target,
+                                            max_updates=self.incremental_max_updates)
+        else:
+            self.writer = PDFWriter(sink, object_streams=self.object_streams,
+                                    compression_level=self.compression_level)
+        self.writer.write_header()
+        self.compressor = ContentCompressor(self.compression_level, self.compression_workers)
+
+        self.catalog_obj_num = self.writer.reserve_object()
+        pages_obj_num = self.writer.reserve_object()
+        self.resources_obj_num = self.writer.reserve_object()
+
+        # Standard fonts never change, so write them right away
+        self._create_font_objects()
+
+        self.emitter = PageEmitter(
+            self.writer,
+            page_width=self.page_width,
+            page_height=self.page_height,
+            compressor=self.compressor,
+            pages_root=pages_obj_num,
+            resources=self.resources_obj_num,
+            cache=content_stream_cache if self.stream_cache else None
+        )
+
+    def _emit_page(self, page_index: int):
+        """
+        Hand a finished page to the emitter and release its commands.
+
+        Link annotations for the page are written with it, and in
+        streaming mode the page's tracker records are validated and
+        dropped, so nothing page-sized outlives the page.
+
+        Args:
+            page_index: Index of the finished page
+        """
+        commands = self.pages[page_index]
+        if commands is None:
+            return
+
+        # Images first used on this page go out with it
+        self.images.write_pending(self.writer)
+
+        page_links = [link for link in self.links if link['page'] == page_index]
+        annotations = [self._create_link_annotation_object(link) for link in page_links]
+        resources = self._page_resources(commands) if self.linearize else None
+        self.emitter.emit_page(commands, annotations, resources)
+
+        self.pages[page_index] = None
+        if page_links:
+            self.links = [link for link in self.links if link['page'] != page_index]
+
+        if self.streaming and not self.linearize:
+            finished = self.tracker.release_page(page_index)
+            self._record_validation_errors(self._validate_tracker(finished))
+
+    def _finish_pdf_output(self) -> int:
+        """
+        Write the remaining document-level objects, xref and trailer.
+
+        Returns:
+            Total number of bytes written
+        """
+        # Emit whatever page is still open (streaming mode)
+        for page_index in range(len(self.pages)):
+            self._emit_page(page_index)
+
+        self._create_resources_object()
+        self._write_embedded_fonts()
+
+        outlines_obj_num = None
+        if self.bookmarks:
+            outlines_obj_num = self._create_outline_objects()
+
+        self.emitter.write_page_tree()
+        if self.emitter.cache is not None:
+            # Every build adds its changed pages; keep the cache directory bounded
+            self.emitter.cache.sweep()
+        if self.line_break_cache:
+            line_break_cache.sweep()
 
-    def _create_professional_pdf_structure(self):
-        """Create PDF structure with professional features."""
         # Catalog with accessibility features
         catalog_dict = f"""<<
 /Type /Catalog
-/Pages 2 0 R
+/Pages {self.emitter.pages_root} 0 R
 /Lang ({self.language})
 /PageLayout /OneColumn
 /ViewerPreferences <<
 /DisplayDocTitle true
 >>
 """
-        
         # Add outlines (bookmarks) if available
-        if self.bookmarks:
-            catalog_dict += "/Outlines 3 0 R\n"
-        
-        catalog_dict += ">>"
-        self._add_object(catalog_dict)
-
-        # Pages object
-        # After catalog (obj 1) and pages object (obj 2), pages start at obj 3
-        # Each page takes 2 objects (page + content stream), so page i is at object (3 + i*2)
-        kids_refs = ' '.join([f"{3 + i*2} 0 R" for i in range(len(self.pages))])
-        pages_obj = f"""<<
-/Type /Pages
-/Kids [{kids_refs}]
-/Count {len(self.pages)}
->>"""
-        self._add_object(pages_obj)
-
-        # Create page objects
-        for i, page_commands in enumerate(self.pages):
-            self._create_page_object(3 + i*2, page_commands)
+        if outlines_obj_num is not None:
+            catalog_dict += f"/Outlines {outlines_obj_num} 0 R\n"
 
-        # Create font objects AFTER pages so we know their object numbers
-        font_obj_start = len(self.objects) + 1
-        self._create_font_objects()
-        # Record font object numbers for page resources
-        self.font_obj_nums = {
-            'Helvetica': font_obj_start,
-            'Times-Roman': font_obj_start + 1,
-            'Times-Bold': font_obj_start + 2,
-            'Times-Italic': font_obj_start + 3,
-            'Courier': font_obj_start + 4
-        }
+        catalog_dict += ">>"
+        self.writer.write_object(catalog_dict, self.catalog_obj_num)
 
-        # Annotations (links)
-        self._create_annotation_objects()
+        # Document information dictionary with rich metadata
+        info_num = self.writer.write_object(self._create_info_object())
 
-        # Bookmarks/Outlines for accessibility
-        if self.bookmarks:
-            self._create_outline_objects()
+        return self.writer.finish(root=self.catalog_obj_num, info=info_num)
 
-    def _create_outline_objects(self):
-        """Create PDF outline (bookmark) objects for accessibility."""
-        if not self.bookmarks:
-            return
+    def _create_outline_objects(self) -> int:
+        """
+        Create PDF outline (bookmark) objects for accessibility.
 
-        # Create outline items
-        outline_refs = []
-        for bookmark in self.bookmarks:
-            # Create destination object for this bookmark
-            dest_obj = f"[{bookmark['page'] + 1} 0 R /XYZ null {bookmark['y_position']} null]"
-            self._add_object(dest_obj)
-            dest_ref = len(self.objects)
+        Returns:
+            Object number of the outline root
+        """
+        outline_root = self.writer.reserve_object()
+        item_nums = [self.writer.reserve_object() for _ in self.bookmarks]
+        page_refs = self.emitter.page_object_numbers
 
-            # Create outline item
+        for i, bookmark in enumerate(self.bookmarks):
+            page_index = min(bookmark['page'], len(page_refs) - 1)
             outline_obj = f"""<<
-/Title (<{self._to_pdf_hex(bookmark['title'])}>)
-/Parent {(len(self.objects) + 2) if bookmark['parent'] else len(self.objects) + 1} 0 R
-/Dest {dest_ref} 0 R
->>"""
-            self._add_object(outline_obj)
-            outline_refs.append(f"{len(self.objects)} 0 R")
-
-        # Create outline root
-        outline_root = "<<\n/Type /Outlines\n"
-        if outline_refs:
-            outline_root += f"/First {outline_refs[0]}\n"
-            outline_root += f"/Last {outline_refs[-1]}\n"
-            outline_root += f"/Count {len(outline_refs)}\n"
-        outline_root += ">>"
-        self._add_object(outline_root)
-
-    def _create_page_object(self, obj_num: int, commands: List[str]):
-        """Create a page object with content."""
-        content_stream = '\n'.join(commands)
-        compressed_content = self._compress_content(content_stream)
-
-        # The content stream will be the next object after this page object
-        content_obj_num = obj_num + 1
-
-        # Check if this page has annotations
-        annots_ref = ""
-        if hasattr(self, 'links') and self.links:
-            page_links = [link for link in self.links if link['page'] == (obj_num - 4)]
-            if page_links:
-                # Calculate annotation array reference
-                # This is a simplified calculation - would need more sophisticated tracking in production
-                annots_ref = f"/Annots {len(self.objects) + len(self.pages) * 2 + 10} 0 R"
-
-        # Calculate font object numbers: they come after all pages
-        # Obj 1: Catalog, Obj 2: Pages, Obj 3 to 3+2*N-1: Page objects
-        num_pages = len(self.pages)
-        font_obj_base = 3 + num_pages * 2
-        helvetica_ref = font_obj_base
-        times_roman_ref = font_obj_base + 1
-        times_bold_ref = font_obj_base + 2
-        times_italic_ref = font_obj_base + 3
-        courier_ref = font_obj_base + 4
-        
-        page_obj = f"""<<
-/Type /Page
-/Parent 2 0 R
-/MediaBox [0 0 {self.page_width} {self.page_height}]
-/Contents {content_obj_num} 0 R
-/Resources <<
-/Font <<
-/Helvetica {helvetica_ref} 0 R
-/Times-Roman {times_roman_ref} 0 R
-/Times-Bold {times_bold_ref} 0 R
-/Times-Italic {times_italic_ref} 0 R
-/Courier {courier_ref} 0 R
->>
->>
-{annots_ref}
+/Title <{self._to_pdf_hex(bookmark['title'])}>
+/Parent {outline_root} 0 R
+/Dest [{page_refs[page_index]} 0 R /XYZ null {bookmark['y_position']} null]
+"""
+            if i > 0:
+                outline_obj += f"/Prev {item_nums[i - 1]} 0 R\n"
+            if i + 1 < len(item_nums):
+                outline_obj += f"/Next {item_nums[i + 1]} 0 R\n"
+            outline_obj += ">>"
+            self.writer.write_object(outline_obj, item_nums[i])
+
+        root_obj = f"""<<
+/Type /Outlines
+/First {item_nums[0]} 0 R
+/Last {item_nums[-1]} 0 R
+/Count {len(item_nums)}
 >>"""
-        # Add page object first, then content stream
-        self._add_object(page_obj)
-        self._add_object(compressed_content)
-
-    def _create_annotation_objects(self):
-        """Create annotation objects for links."""
-        if not hasattr(self, 'links') or not self.links:
-            return
-
-        # Group links by page
-        links_by_page = {}
-        for link in self.links:
-            page = link['page']
-            if page not in links_by_page:
-                links_by_page[page] = []
-            links_by_page[page].append(link)
-
-        # Create annotation arrays for each page
-        for page_num, page_links in links_by_page.items():
-            annot_refs = []
-            for link in page_links:
-                annot_obj = self._create_link_annotation_object(link)
-                self._add_object(annot_obj)
-                annot_refs.append(f"{len(self.objects)} 0 R")
-
-            # Create annotations array
-            annots_array = f"[{'] ['.join(annot_refs)}]"
-            self._add_object(annots_array)
+        return self.writer.write_object(root_obj, outline_root)
 
     def _create_link_annotation_object(self, link_info: Dict) -> str:
-        """Create a PDF link annotation object."""
+        """Create an inline PDF link annotation dictionary."""
         rect = link_info['rect']
         url = link_info['url']
 
-        if link_info['type'] == 'external':
-            # External link - URI action
-            action_obj = f"<< /Type /Action /S /URI /URI ({self._escape_pdf_text(url)}) >>"
-            self._add_object(action_obj)
-            action_ref = f"{len(self.objects)} 0 R"
-        else:
-            # Internal link - GoTo action (placeholder for now)
-            # Would need to resolve internal references to named destinations
-            action_obj = f"<< /Type /Action /S /URI /URI ({self._escape_pdf_text(url)}) >>"
-            self._add_object(action_obj)
-            action_ref = f"{len(self.objects)} 0 R"
-
-        annotation = f"""<<
-/Type /Annot
-/Subtype /Link
-/Rect [{rect[0]:.2f} {rect[1]:.2f} {rect[2]:.2f} {rect[3]:.2f}]
-/Border [0 0 1]
-/A {action_ref}
-/F 4
->>"""
+        # Internal links would need named destinations; both kinds use
+        # a URI action for now
+        action = f"<< /Type /Action /S /URI /URI ({self._escape_pdf_text(url)}) >>"
+
+        annotation = (f"<< /Type /Annot /Subtype /Link "
+                      f"/Rect [{rect[0]:.2f} {rect[1]:.2f} {rect[2]:.2f} {rect[3]:.2f}] "
+                      f"/Border [0 0 1] /A {action} /F 4 >>")
 
         return annotation
 
     def _create_font_objects(self):
-        """Create professional font objects."""
-        fonts = [
-            ("Helvetica", "/Helvetica"),
-            ("Times-Roman", "/Times-Roman"),
-            ("Times-Bold", "/Times-Bold"),
-            ("Times-Italic", "/Times-Italic"),
-            ("Courier", "/Courier")
-        ]
-
-        for name, base_font in fonts:
+        """
+        Create font objects for every font we declare.
+
+        Embedded fonts only get an object number here; they are written
+        by ``_write_embedded_fonts`` once every page has been laid out
+        and the glyphs to keep are known.
+        """
+        self.font_obj_nums = {}
+        for name in self.fonts:
+            embedded = self.embedded_fonts.get(name)
+            if embedded is not None:
+                embedded.object_number = self.writer.reserve_object()
+                self.font_obj_nums[name] = embedded.object_number
+                continue
             font_obj = f"""<<
 /Type /Font
 /Subtype /Type1
-/BaseFont {base_font}
+/BaseFont /{name}
+/Encoding /{self.font_encoding}
 >>
 """
-            self._add_object(font_obj)
+            self.font_obj_nums[name] = self.writer.write_object(font_obj)
 
-    def _compress_content(self, content: str) -> bytes:
-        """Compress content stream."""
-        content_bytes = content.encode('utf-8')
-        compressed = zlib.compress(content_bytes)
+    def _write_embedded_fonts(self):
+        """Write the subset of every embedded font the document used."""
+        for font in self.embedded_fonts.values():
+            if font.object_number is not None:
+                font.write(self.writer, self.compressor)
 
-        stream_obj = f"""<<
-/Length {len(compressed)}
-/Filter /FlateDecode
->>
-stream
-""".encode('ascii') + compressed + b"\nendstream\n"
+    def _write_xobjects(self) -> List[Tuple[str, int]]:
+        """
+        Write any Form and image XObjects not yet in the file.
 
-        return stream_obj
+        Returns:
+            (resource name, object number) pairs for every XObject
+        """
+        forms = self.xobjects.write_forms(self.writer, self.compressor, self.resources_obj_num)
+        self.images.write_pending(self.writer)
+        return list(forms.items()) + self.images.resource_entries()
 
-    def _add_object(self, content):
-        """Add an object to the PDF structure."""
-        self.objects.append(content)
+    def _page_resources(self, commands: ContentStreamBuilder) -> str:
+        """
+        Build an inline resource dictionary naming only what a page uses.
+
+        Linearized files group each page with the objects it references,
+        so a page must not point at every image in the document through
+        the shared dictionary.
+        """
+        used = commands.xobjects
+        font_entries = ' '.join(f"/{name} {num} 0 R" for name, num in self.font_obj_nums.items())
+        resources = f"<< /ProcSet [/PDF /Text /ImageB /ImageC /ImageI] /Font << {font_entries} >>"
+        xobjects = [(name, num) for name, num in self._write_xobjects() if name in used]
+        if xobjects:
+            xobject_entries = ' '.join(f"/{name} {num} 0 R" for name, num in xobjects)
+            resources += f" /XObject << {xobject_entries} >>"
+        return resources + " >>"
+
+    def _create_resources_object(self):
+        """
+        Write the resource dictionary shared by all pages.
+
+        In linearized output pages carry their own resources and this
+        dictionary only serves the Form XObjects, which draw text alone.
+        """
+        font_entries = '\n'.join(f"/{name} {num} 0 R" for name, num in self.font_obj_nums.items())
+        resources = f"""<<
+/ProcSet [/PDF /Text /ImageB /ImageC /ImageI]
+/Font <<
+{font_entries}
+>>
+"""
+        xobjects = self._write_xobjects()
+        if xobjects and not self.linearize:
+            xobject_entries = '\n'.join(f"/{name} {num} 0 R" for name, num in xobjects)
+            resources += f"/XObject <<\n{xobject_entries}\n>>\n"
+        resources += ">>"
+        self.writer.write_object(resources, self.resources_obj_num)
 
     def _apply_config(self, config: Dict):
         """Apply configuration settings."""
@@ -1335,6 +1503,7 @@ stream
             typo = config['typography']
             self.line_height_factor = typo.get('line_height', 1.2)
             self.paragraph_spacing = typo.get('paragraph_spacing', 6)
+            self.hyphenation = typo.get('hyphenation', self.hyphenation)
         if 'metadata' in config:
             self.metadata = config['metadata']
             # Extract accessibility info
@@ -1346,66 +1515,26 @@ stream
                 self.set_text_color(colors['text'])
             if 'background' in colors:
                 self.set_fill_color(colors['background'])
-
-    def _build_pdf_bytes(self) -> bytes:
-        """Build the final PDF file with enhanced metadata."""
-        pdf_parts = []
-
-        # PDF header with version and binary marker
-        pdf_parts.append(b"%PDF-1.7")
-        pdf_parts.append(b"%\xe2\xe3\xcf\xd3")
-
-        # Objects
-        for i, obj_content in enumerate(self.objects, 1):
-            self.object_offsets.append(len(b''.join(pdf_parts)))
-            pdf_parts.append(f"{i} 0 obj\n".encode('ascii'))
-
-            if isinstance(obj_content, bytes):
-                pdf_parts.append(obj_content)
-            else:
-                pdf_parts.append(obj_content.encode('utf-8'))
-
-            pdf_parts.append(b"endobj\n")
-
-        # Cross-reference table
-        xref_offset = len(b''.join(pdf_parts))
-        xref_table = f"""xref
-0 {len(self.objects) + 1}
-0000000000 65535 f
-"""
-
-        for offset in self.object_offsets:
-            xref_table += f"{offset:010d} 00000 n \n"
-
-        pdf_parts.append(xref_table.encode('ascii'))
-
-        # Enhanced trailer with metadata
-        trailer = self._create_enhanced_trailer(xref_offset)
-
-        pdf_parts.append(trailer.encode('ascii'))
-
-        return b''.join(pdf_parts)
-
-    def _create_enhanced_trailer(self, xref_offset: int) -> str:
-        """Create an enhanced trailer with rich metadata."""
-        # Create info object with rich metadata
-        info_obj = self._create_info_object()
-
-        # Insert info object before trailer
-        self._add_object(info_obj)
-
-        trailer = f"""trailer
-<<
-/Size {len(self.objects) + 1}
-/Root 1 0 R
-/Info {len(self.objects)} 0 R
->>
-startxref
-{xref_offset}
-%%EOF
-"""
-
-        return trailer
+        if 'pdf' in config:
+            pdf_options = config['pdf']
+            self.streaming = pdf_options.get('streaming', self.streaming)
+            self.compression_level = pdf_options.get('compression_level', self.compression_level)
+            self.compression_workers = pdf_options.get('compression_workers', self.compression_workers)
+            self.object_streams = pdf_options.get('object_streams', self.object_streams)
+            self.reuse_xobjects = pdf_options.get('form_xobjects', self.reuse_xobjects)
+            self.linearize = pdf_options.get('linearize', self.linearize)
+            self.incremental = pdf_options.get('incremental', self.incremental)
+            self.incremental_max_updates = pdf_options.get('compact_after', self.incremental_max_updates)
+            self.stream_cache = pdf_options.get('stream_cache', self.stream_cache)
+            self.line_break_cache = pdf_options.get('line_break_cache', self.line_break_cache)
+            self.break_workers = pdf_options.get('break_workers', self.break_workers)
+            self.layout_checkpoints = pdf_options.get('layout_checkpoints', self.layout_checkpoints)
+            self.parallel_break_threshold = pdf_options.get(
+                'parallel_break_threshold', self.parallel_break_threshold)
+            self.line_breaker.badness_threshold = pdf_options.get(
+                'badness_threshold', self.line_breaker.badness_threshold)
+            for font_name, font_path in pdf_options.get('fonts', {}).items():
+                self.embed_font(font_name, font_path)
 
     def _create_info_object(self) -> str:
         """Create a rich info object with document metadata."""
@@ -1465,16 +1594,7 @@ startxref
         text_height = ascender + descender  # Total text height
 
         # Render text
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            f"/{font_name} {font_size} Tf",
-            f"1 0 0 1 {self.margin_left} {y} Tm",
-            f"{self._to_pdf_literal(text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(text, font_name, font_size, self.margin_left, y)
 
         # Record in tracker with correct bounding box
         self.tracker.record_text(
@@ -1497,18 +1617,18 @@ startxref
         # Return new Y position (moved down by content + spacing_after)
         return y - text_height - spacing_after
 
-    def _render_paragraph(self, paragraph: Paragraph, y: float) -> float:
-        """Render paragraph at given Y position."""
-        text = self._extract_text_content(paragraph.content)
+    def _render_paragraph(self, paragraph: Paragraph, y: float, layout: Optional[ParagraphLayout] = None,
+                          page_breaks: List[int] = ()) -> float:
+        """Render paragraph at given Y position, from its measured layout if given.
 
-        if not text.strip():
-            return y
-
-        # Apply typography enhancements
-        processed_text = self._apply_ligatures(text)
+        A new page starts before each line in ``page_breaks``, and before any
+        later line that would fall below the bottom margin.
+        """
+        if layout is None:
+            layout = self._paragraph_layout(paragraph)
 
-        # Word wrap with proper line breaking
-        lines = self._wrap_text(processed_text, self.page_width - self.margin_left - self.margin_right)
+        if not layout.lines:
+            return y
 
         # Get font metrics for proper bounding box
         font_metrics = self.font_metrics.get("Helvetica", {})
@@ -1516,22 +1636,21 @@ startxref
         descender = abs(font_metrics.get('descent', self.current_font_size * 0.2)) / 1000.0 * self.current_font_size
         text_height = ascender + descender
 
-        for line in lines:
+        top = 0.0  # Baseline offset of the first line on the current page
+        for index, (line, baseline) in enumerate(zip(layout.lines, layout.baselines)):
             # Check if we need a new page
-            if self.current_y < self.margin_bottom + self.current_font_size:
+            if index in page_breaks or (baseline > top and y - (baseline - top) - descender < self.margin_bottom):
                 self._new_page_clean()
+                y, top = self.current_y, baseline
 
             # Render line (handles inline math if present)
-            self._render_text_with_inline_math(line, y)
-
-            # Move down for next line
-            y -= self.current_font_size * self.line_height_factor
+            self._render_text_with_inline_math(line, y - (baseline - top))
 
         # Add paragraph spacing
         self._add_spacing_between_blocks(self.paragraph_spacing)
 
         # Return final Y position
-        return y
+        return y - (layout.height - top)
 
     def _render_text_with_inline_math(self, line: str, y: float):
         """Render a line of text that may contain inline math markers."""
@@ -1565,16 +1684,7 @@ startxref
                 # Apply kerning
                 kerned_part = self._apply_kerning(part, "Helvetica")
 
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/Helvetica {self.current_font_size} Tf",
-                    f"1 0 0 1 {current_x} {y} Tm",
-                    f"{self._to_pdf_literal(kerned_part)} Tj",
-                    "ET"
-                ]
-
-                self._add_to_current_page(commands)
+                self._page_stream.text(kerned_part, "Helvetica", self.current_font_size, current_x, y)
 
                 part_width = self.get_text_width(kerned_part, "Helvetica", self.current_font_size)
                 current_x += part_width
@@ -1590,38 +1700,57 @@ startxref
             label=f"para_line_math_{line[:15]}"
         )
 
-    def _render_inline_math_at_position(self, latex: str, x: float, y: float) -> float:
-        """Render inline math at a specific position and return its width."""
-        try:
-            # Parse the LaTeX
-            parsed = self.math_parser.parse_expression(latex)
-            if parsed is None:
+    def _draw_math(self, latex: str, x: float, baseline_y: float,
+                   align: float = 0.0) -> Tuple[ContentStreamBuilder, float]:
+        """
+        Parse, lay out and draw a math expression.
+
+        Repeated expressions are laid out once and placed from the
+        Form XObject registry.
+
+        Args:
+            latex: Math source without delimiters
+            x: Left edge in PDF coordinates, or the point ``align`` refers to
+            baseline_y: Baseline in PDF coordinates
+            align: Fraction of the width drawn left of ``x`` (0.5 centres)
+
+        Returns:
+            Tuple of (pdf_commands, width)
+        """
+        def draw(origin_x: float = 0.0, origin_y: float = 0.0) -> Tuple[ContentStreamBuilder, float]:
+            # The parser lays out the expression as it builds the box tree
+            layout = self.math_parser.parse_expression(latex)
+            if layout is None:
                 raise ValueError(f"Failed to parse math expression: {latex}")
-            
-            # Layout the math
-            layout = self.math_engine.layout(parsed)
-            
-            # Convert PDF coordinates (Y from bottom) to our coordinate system (Y from top)
-            pdf_y = self.page_height - y  # Convert to PDF coordinates from bottom
-            
-            # Render using MathGraphicsRenderer
             commands, width = self.math_graphics.render_math_box(
-                layout, x, pdf_y, pdf_y  # baseline_y = pdf_y for inline
+                layout, origin_x, origin_y, origin_y
             )
+            return commands, width
+
+        if self.reuse_xobjects:
+            key = ("math", latex, self.current_font_size)
+            if align:
+                x -= align * self.xobjects.record(key, draw).width
+            return self.xobjects.place(key, x, baseline_y, draw)
+        if not align:
+            return draw(x, baseline_y)
+        commands, width = draw()
+        placed = ContentStreamBuilder()
+        placed.save_state()
+        placed.concat_matrix(1, 0, 0, 1, x - align * width, baseline_y)
+        placed.extend(commands)
+        placed.restore_state()
+        return placed, width
+
+    def _render_inline_math_at_position(self, latex: str, x: float, y: float) -> float:
+        """Render inline math at a specific position and return its width."""
+        try:
+            # y is the line's baseline; the caller records the whole line
+            commands, width = self._draw_math(latex, x, y)
             
             # Execute the PDF commands
             self._add_to_current_page(commands)
             
-            # Record in tracker
-            self.tracker.record_text(
-                x=x,
-                y=pdf_y,
-                width=width,
-                height=self.current_font_size,  # Approximate height
-                page=self.current_page,
-                label=f"inline_math_{latex[:10]}"
-            )
-            
             return width
             
         except Exception as e:
@@ -1629,16 +1758,7 @@ startxref
             fallback_text = f"[{latex}]"
             fallback_width = self.get_text_width(fallback_text, "Helvetica", self.current_font_size)
             
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {self.current_font_size} Tf",
-                f"1 0 0 1 {x} {y} Tm",
-                f"{self._to_pdf_literal(fallback_text)} Tj",
-                "ET"
-            ]
-            
-            self._add_to_current_page(commands)
+            self._page_stream.text(fallback_text, "Helvetica", self.current_font_size, x, y)
             return fallback_width
 
     def _wrap_inline_elements(self, elements: List[InlineElement], max_width: float) -> List[List[InlineElement]]:
@@ -1695,16 +1815,7 @@ startxref
                 text = self._apply_kerning(text, "Helvetica")
                 text_width = self.get_text_width(text, "Helvetica", self.current_font_size)
                 
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/Helvetica {self.current_font_size} Tf",
-                    f"1 0 0 1 {current_x} {y} Tm",
-                    f"{self._to_pdf_literal(text)} Tj",
-                    "ET"
-                ]
-                
-                self._add_to_current_page(commands)
+                self._page_stream.text(text, "Helvetica", self.current_font_size, current_x, y)
                 current_x += text_width
                 total_width += text_width
                 
@@ -1720,16 +1831,7 @@ startxref
                 code_text = f'`{element.content}`'
                 code_width = self.get_text_width(code_text, "Helvetica", self.current_font_size)
                 
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/Helvetica {self.current_font_size} Tf",
-                    f"1 0 0 1 {current_x} {y} Tm",
-                    f"{self._to_pdf_literal(code_text)} Tj",
-                    "ET"
-                ]
-                
-                self._add_to_current_page(commands)
+                self._page_stream.text(code_text, "Helvetica", self.current_font_size, current_x, y)
                 current_x += code_width
                 total_width += code_width
                 
@@ -1743,16 +1845,7 @@ startxref
                 # Render link text (simplified)
                 link_width = self.get_text_width(element.text, "Helvetica", self.current_font_size)
                 
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    f"/Helvetica {self.current_font_size} Tf",
-                    f"1 0 0 1 {current_x} {y} Tm",
-                    f"{self._to_pdf_literal(element.text)} Tj",
-                    "ET"
-                ]
-                
-                self._add_to_current_page(commands)
+                self._page_stream.text(element.text, "Helvetica", self.current_font_size, current_x, y)
                 current_x += link_width
                 total_width += link_width
 
@@ -1765,16 +1858,7 @@ startxref
             text = self._apply_kerning(text, "Helvetica")
             text_width = self.get_text_width(text, "Helvetica", self.current_font_size)
             
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {self.current_font_size} Tf",
-                f"1 0 0 1 {x} {y} Tm",
-                f"{self._to_pdf_literal(text)} Tj",
-                "ET"
-            ]
-            
-            self._add_to_current_page(commands)
+            self._page_stream.text(text, "Helvetica", self.current_font_size, x, y)
             return text_width
         else:
             return 0
@@ -1784,28 +1868,17 @@ startxref
         try:
             # Parse the LaTeX
             latex = math_inline.content.strip('$')
-            parsed = self.math_parser.parse_expression(latex)
-            if parsed is None:
-                raise ValueError(f"Failed to parse math expression: {latex}")
-            
-            # Layout the math
-            layout = self.math_engine.layout(parsed)
-            
-            # Convert PDF coordinates (Y from bottom) to our coordinate system (Y from top)
-            pdf_y = self.page_height - y  # Convert to PDF coordinates from bottom
-            
-            # Render using MathGraphicsRenderer
-            commands, width = self.math_graphics.render_math_box(
-                layout, x, pdf_y, pdf_y  # baseline_y = pdf_y for inline
-            )
+
+            # Render using MathGraphicsRenderer (y is the baseline)
+            commands, width = self._draw_math(latex, x, y)
             
             # Execute the PDF commands
             self._add_to_current_page(commands)
             
-            # Record in tracker
+            # Record in tracker, from the top of the line
             self.tracker.record_text(
                 x=x,
-                y=pdf_y,
+                y=y + self.current_font_size * 0.8,
                 width=width,
                 height=self.current_font_size,  # Approximate height
                 page=self.current_page,
@@ -1821,16 +1894,7 @@ startxref
             fallback_text = f"[{fallback_latex}]"
             fallback_width = self.get_text_width(fallback_text, "Helvetica", self.current_font_size)
             
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                f"/Helvetica {self.current_font_size} Tf",
-                f"1 0 0 1 {x} {y} Tm",
-                f"{self._to_pdf_literal(fallback_text)} Tj",
-                "ET"
-            ]
-            
-            self._add_to_current_page(commands)
+            self._page_stream.text(fallback_text, "Helvetica", self.current_font_size, x, y)
             return fallback_width
 
     def _render_math_block(self, math_block: MathBlock, y: float) -> float:
@@ -1843,28 +1907,23 @@ startxref
 
         # Try to render with MathGraphicsRenderer
         try:
-            parsed = self.math_parser.parse_expression(content)
-            if parsed:
-                layout = self.math_engine.layout(parsed)
-                pdf_y = self.page_height - y
-                
-                commands, width = self.math_graphics.render_math_box(
-                    layout, self.margin_left, pdf_y, pdf_y
-                )
-                
-                self._add_to_current_page(commands)
-                
-                # Record in tracker
-                self.tracker.record_text(
-                    x=self.margin_left,
-                    y=pdf_y,
-                    width=width,
-                    height=self.current_font_size * 2,  # Approximate height
-                    page=self.current_page,
-                    label="math_block_graphics"
-                )
-                
-                return y - self.current_font_size * 2
+            # Centred, with the baseline one font size below the top of the block
+            center_x = self.margin_left + (self.page_width - self.margin_left - self.margin_right) / 2
+            commands, width = self._draw_math(content, center_x, y - self.current_font_size, align=0.5)
+
+            self._add_to_current_page(commands)
+            
+            # Record in tracker
+            self.tracker.record_text(
+                x=center_x - width / 2,
+                y=y,
+                width=width,
+                height=self.current_font_size * 2,  # Approximate height
+                page=self.current_page,
+                label="math_block_graphics"
+            )
+            
+            return y - self.current_font_size * 2
         except Exception as e:
             pass
         
@@ -1873,16 +1932,7 @@ startxref
         text_width = self.get_text_width(math_text, "Helvetica", 12)
         center_x = self.margin_left + (self.page_width - self.margin_left - self.margin_right) // 2
         
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 12 Tf",
-            f"1 0 0 1 {center_x - text_width/2} {y - 12} Tm",
-            f"{self._to_pdf_literal(math_text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(math_text, "Helvetica", 12, center_x - text_width/2, y - 12)
 
         # Record in tracker
         self.tracker.record_text(
@@ -1904,16 +1954,7 @@ startxref
         for line in lines:
             if line.strip():
                 line_width = self.get_text_width(line, "Helvetica", 10)
-                commands = [
-                    "BT",
-                    "0 0 0 rg",
-                    "/Helvetica 10 Tf",
-                    f"1 0 0 1 {self.margin_left} {y} Tm",
-                    f"{self._to_pdf_literal(line)} Tj",
-                    "ET"
-                ]
-
-                self._add_to_current_page(commands)
+                self._page_stream.text(line, "Helvetica", 10, self.margin_left, y)
 
                 # Record in tracker
                 self.tracker.record_text(
@@ -1941,16 +1982,7 @@ startxref
                 for line in lines:
                     line_width = self.get_text_width(line, "Helvetica", self.current_font_size)
 
-                    commands = [
-                        "BT",
-                        "0 0 0 rg",
-                        f"/Helvetica {self.current_font_size} Tf",
-                        f"1 0 0 1 {self.margin_left} {y} Tm",
-                        f"{self._to_pdf_literal(line)} Tj",
-                        "ET"
-                    ]
-
-                    self._add_to_current_page(commands)
+                    self._page_stream.text(line, "Helvetica", self.current_font_size, self.margin_left, y)
 
                     # Record in tracker
                     self.tracker.record_text(
@@ -1966,28 +1998,72 @@ startxref
 
         return y
 
+    def _is_image_paragraph(self, paragraph: Paragraph) -> bool:
+        """Check if a paragraph holds only images (a figure)."""
+        has_image = False
+        for element in paragraph.content:
+            if isinstance(element, Image):
+                has_image = True
+            elif not (isinstance(element, Text) and not element.content.strip()):
+                return False
+        return has_image
+
+    def _image_display_size(self, info: ImageInfo) -> Tuple[float, float]:
+        """Natural image size in points, scaled down to fit the text block."""
+        width = info.width * 72.0 / self.image_dpi
+        height = info.height * 72.0 / self.image_dpi
+        max_width = self.page_width - self.margin_left - self.margin_right
+        max_height = self.page_height - self.margin_top - self.margin_bottom
+        scale = min(1.0, max_width / width, max_height / height)
+        return width * scale, height * scale
+
     def _render_image(self, image: Image, y: float) -> float:
-        """Render image at given Y position (placeholder)."""
-        # Placeholder - would need image handling
-        return y - 50
+        """Render image at given Y position."""
+        try:
+            info = self.images.add_file(image.url)
+        except (OSError, UnsupportedImageError) as e:
+            print(f"Image embedding failed for {image.url}: {e}")
+            return self._render_image_placeholder(image, y)
+
+        width, height = self._image_display_size(info)
+        if y - height < self.margin_bottom:
+            self._new_page_clean()
+            y = self.current_y
+
+        bottom = y - height
+        page = self._page_stream
+        page.save_state()
+        page.concat_matrix(width, 0, 0, height, self.margin_left, bottom)
+        page.draw_xobject(info.name)
+        page.restore_state()
+
+        # Record in tracker
+        self.tracker.record_object(
+            x=self.margin_left,
+            y=y,
+            width=width,
+            height=height,
+            page=self.current_page,
+            label=f"image_{info.name}"
+        )
+
+        return bottom - self.paragraph_spacing
+
+    def _render_image_placeholder(self, image: Image, y: float) -> float:
+        """Render an image's alt text when the image cannot be embedded."""
+        text = f"[Image: {image.alt or image.url}]"
+        self._page_stream.text(text, "Helvetica", self.current_font_size, self.margin_left, y - self.current_font_size)
+        return y - self.current_font_size * self.line_height_factor
 
     def _render_table(self, table: Table, y: float) -> float:
         """Render table at given Y position."""
         # Simple text representation for now
         header_text = " | ".join(self._extract_text_content(cell) for cell in table.headers)
-        header_width = self.get_text_width(header_text, "Helvetica", 12)
+        row_texts = [" | ".join(self._extract_text_content(cell) for cell in row) for row in table.rows]
+        header_width, *row_widths = self.get_text_widths([header_text] + row_texts, "Helvetica", 12)
 
         # Render header in bold/larger font
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 12 Tf",
-            f"1 0 0 1 {self.margin_left} {y} Tm",
-            f"{self._to_pdf_literal(header_text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(header_text, "Helvetica", 12, self.margin_left, y)
 
         # Record header
         self.tracker.record_text(
@@ -2003,33 +2079,12 @@ startxref
 
         # Separator
         sep_text = "-" * min(80, len(header_text))
-        commands = [
-            "BT",
-            "0 0 0 rg",
-            "/Helvetica 10 Tf",
-            f"1 0 0 1 {self.margin_left} {y} Tm",
-            f"{self._to_pdf_literal(sep_text)} Tj",
-            "ET"
-        ]
-
-        self._add_to_current_page(commands)
+        self._page_stream.text(sep_text, "Helvetica", 10, self.margin_left, y)
         y -= 14
 
         # Rows
-        for row in table.rows:
-            row_text = " | ".join(self._extract_text_content(cell) for cell in row)
-            row_width = self.get_text_width(row_text, "Helvetica", 12)
-
-            commands = [
-                "BT",
-                "0 0 0 rg",
-                "/Helvetica 12 Tf",
-                f"1 0 0 1 {self.margin_left} {y} Tm",
-                f"{self._to_pdf_literal(row_text)} Tj",
-                "ET"
-            ]
-
-            self._add_to_current_page(commands)
+        for row_text, row_width in zip(row_texts, row_widths):
+            self._page_stream.text(row_text, "Helvetica", 12, self.margin_left, y)
 
             # Record row
             self.tracker.record_text(
@@ -0,0 +1,304 @@
+"""
+Low-level PDF file writer for the Compose typesetting system.
+
+This module serializes PDF objects straight to a binary sink (file, socket,
+BytesIO) while keeping a running byte offset, so the cross-reference table
+can be built without re-joining or re-measuring the bytes already written.
+
+With object streams enabled (PDF 1.5), non-stream objects are packed into
+compressed ``/ObjStm`` streams and the classic xref table is replaced by a
+compressed ``/XRef`` stream.
+
+PDF format reference: https://www.adobe.com/content/dam/acom/en/devnet/pdf/pdf_reference_archive/pdf_reference_1-7.pdf
+"""
+
+import io
+import os
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+
+PDF_BINARY_MARKER = b"%\xe2\xe3\xcf\xd3\n"
+
+# Objects packed into one /ObjStm before it is flushed to the sink
+OBJECTS_PER_STREAM = 100
+
+
+class PDFWriter:
+    """
+    Streaming PDF serializer.
+
+    Objects are written as soon as they are handed over; only the byte
+    offset of each object is kept in memory for the final xref table.
+    Object numbers can be reserved before their content is known, so
+    objects may reference each other regardless of the order in which
+    they are written.
+    """
+
+    def __init__(self, sink: BinaryIO, version: str = "1.7",
+                 object_streams: bool = False, compression_level: int = 6):
+        """
+        Initialize the writer.
+
+        Args:
+            sink: Binary file-like object with a ``write`` method
+            version: PDF version written in the file header
+            object_streams: Pack non-stream objects into ``/ObjStm``
+                            streams and finish with an ``/XRef`` stream
+            compression_level: zlib level for object and xref streams
+                               (0 leaves them unfiltered)
+        """
+        self.sink = sink
+        self.version = version
+        self.object_streams = object_streams
+        self.compression_level = compression_level
+        self.offset = 0
+        self.offsets: Dict[int, int] = {}
+        self.next_object_number = 1
+        self.header_written = False
+
+        # Object number -> (object stream number, index within the stream)
+        self.packed: Dict[int, Tuple[int, int]] = {}
+        self._pending_packed: List[Tuple[int, bytes]] = []
+
+    def _write(self, data: bytes):
+        """Write raw bytes to the sink and advance the running offset."""
+        self.sink.write(data)
+        self.offset += len(data)
+
+    def write_header(self):
+        """Write the PDF header and binary marker comment."""
+        if self.header_written:
+            return
+        self._write(f"%PDF-{self.version}\n".encode('ascii'))
+        self._write(PDF_BINARY_MARKER)
+        self.header_written = True
+
+    def reserve_object(self) -> int:
+        """
+        Reserve an object number without writing the object yet.
+
+        Returns:
+            The reserved object number
+        """
+        obj_num = self.next_object_number
+        self.next_object_number += 1
+        return obj_num
+
+    def write_object(self, content: Union[str, bytes], obj_num: Optional[int] = None) -> int:
+        """
+        Write an indirect object.
+
+        Args:
+            content: Object body (dictionary, array, or complete stream object)
+            obj_num: Previously reserved object number; a new one is
+                     allocated when omitted
+
+        Returns:
+            The object number that was written
+        """
+        if obj_num is None:
+            obj_num = self.reserve_object()
+        if obj_num in self.offsets or obj_num in self.packed:
+            raise ValueError(f"PDF object {obj_num} was already written")
+
+        self.write_header()
+        body = content if isinstance(content, bytes) else content.encode('utf-8')
+
+        # Streams can never live inside an object stream
+        if self.object_streams and not body.rstrip().endswith(b"endstream"):
+            self._pack_object(obj_num, body)
+            return obj_num
+
+        self.offsets[obj_num] = self.offset
+        self._write(f"{obj_num} 0 obj\n".encode('ascii'))
+        self._write(body)
+        if not body.endswith(b"\n"):
+            self._write(b"\n")
+        self._write(b"endobj\n")
+        return obj_num
+
+    def write_stream(self, data: bytes, obj_num: Optional[int] = None,
+                     filters: Optional[str] = None, extra_entries: str = "") -> int:
+        """
+        Write a stream object.
+
+        Args:
+            data: Encoded stream data
+            obj_num: Previously reserved object number
+            filters: Filter name(s) such as ``/FlateDecode``
+            extra_entries: Additional dictionary entries
+
+        Returns:
+            The object number that was written
+        """
+        header = f"<<\n/Length {len(data)}\n"
+        if filters:
+            header += f"/Filter {filters}\n"
+        if extra_entries:
+            header += extra_entries.rstrip("\n") + "\n"
+        header += ">>\nstream\n"
+        return self.write_object(header.encode('ascii') + data + b"\nendstream\n", obj_num)
+
+    def _pack_object(self, obj_num: int, body: bytes):
+        """Queue a non-stream object for the current object stream."""
+        self.packed[obj_num] = (0, len(self._pending_packed))
+        self._pending_packed.append((obj_num, body.strip()))
+        if len(self._pending_packed) >= OBJECTS_PER_STREAM:
+            self.flush_object_stream()
+
+    def _encode(self, data: bytes) -> Tuple[bytes, Optional[str]]:
+        """Compress object or xref stream data at the writer's level."""
+        if self.compression_level > 0:
+            return zlib.compress(data, self.compression_level), "/FlateDecode"
+        return data, None
+
+    def flush_object_stream(self) -> Optional[int]:
+        """
+        Write the queued objects as one ``/ObjStm`` stream.
+
+        Returns:
+            Object number of the object stream, or None if nothing was queued
+        """
+        if not self._pending_packed:
+            return None
+
+        stream_num = self.reserve_object()
+        header_parts = []
+        bodies = []
+        position = 0
+        for index, (obj_num, body) in enumerate(self._pending_packed):
+            header_parts.append(f"{obj_num} {position}")
+            self.packed[obj_num] = (stream_num, index)
+            bodies.append(body)
+            position += len(body) + 1
+
+        header = (' '.join(header_parts) + "\n").encode('ascii')
+        data, filters = self._encode(header + b"\n".join(bodies) + b"\n")
+        count = len(self._pending_packed)
+        self._pending_packed = []
+
+        self.write_stream(data, stream_num, filters=filters,
+                          extra_entries=f"/Type /ObjStm\n/N {count}\n/First {len(header)}")
+        return stream_num
+
+    def write_xref(self) -> int:
+        """
+        Write the classic cross-reference table.
+
+        Reserved object numbers that were never written are recorded as
+        free entries, so the table always covers ``0..size-1``.
+
+        Returns:
+            Byte offset of the ``xref`` keyword
+        """
+        self.write_header()
+        xref_offset = self.offset
+        size = self.size
+
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_num in range(1, size):
+            offset = self.offsets.get(obj_num)
+            if offset is None:
+                lines.append("0000000000 65535 f \n")
+            else:
+                lines.append(f"{offset:010d} 00000 n \n")
+        self._write(''.join(lines).encode('ascii'))
+        return xref_offset
+
+    def write_trailer(self, root: int, xref_offset: int, info: Optional[int] = None):
+        """
+        Write the trailer dictionary, ``startxref`` pointer and EOF marker.
+
+        Args:
+            root: Object number of the document catalog
+            xref_offset: Byte offset returned by ``write_xref``
+            info: Object number of the document information dictionary
+        """
+        trailer = f"trailer\n<<\n/Size {self.size}\n/Root {root} 0 R\n"
+        if info is not None:
+            trailer += f"/Info {info} 0 R\n"
+        trailer += f">>\nstartxref\n{xref_offset}\n%%EOF\n"
+        self._write(trailer.encode('ascii'))
+
+    def finish(self, root: int, info: Optional[int] = None) -> int:
+        """
+        Write the xref table and trailer.
+
+        Args:
+            root: Object number of the document catalog
+            info: Object number of the document information dictionary
+
+        Returns:
+            Total number of bytes written
+        """
+        if self.object_streams:
+            self.flush_object_stream()
+            xref_offset = self.write_xref_stream(root, info)
+        else:
+            xref_offset = self.write_xref()
+            self.write_trailer(root, xref_offset, info)
+        return self.offset
+
+    def write_xref_stream(self, root: int, info: Optional[int] = None) -> int:
+        """
+        Write a cross-reference stream, which also carries the trailer
+        entries, followed by ``startxref`` and the EOF marker.
+
+        Args:
+            root: Object number of the document catalog
+            info: Object number of the document information dictionary
+
+        Returns:
+            Byte offset of the xref stream object
+        """
+        self.write_header()
+        xref_num = self.reserve_object()
+        xref_offset = self.offset
+        size = self.size
+
+        offset_width = max(1, (max(xref_offset, size).bit_length() + 7) // 8)
+        rows = [b"\x00" + bytes(offset_width) + b"\xff\xff"]
+        for obj_num in range(1, size):
+            if obj_num == xref_num:
+                rows.append(b"\x01" + xref_offset.to_bytes(offset_width, 'big') + b"\x00\x00")
+            elif obj_num in self.offsets:
+                rows.append(b"\x01" + self.offsets[obj_num].to_bytes(offset_width, 'big') + b"\x00\x00")
+            elif obj_num in self.packed:
+                stream_num, index = self.packed[obj_num]
+                rows.append(b"\x02" + stream_num.to_bytes(offset_width, 'big') + index.to_bytes(2, 'big'))
+            else:
+                rows.append(b"\x00" + bytes(offset_width) + b"\x00\x00")
+
+        data, filters = self._encode(b"".join(rows))
+        entries = f"/Type /XRef\n/Size {size}\n/W [1 {offset_width} 2]\n/Root {root} 0 R"
+        if info is not None:
+            entries += f"\n/Info {info} 0 R"
+        self.write_stream(data, xref_num, filters=filters, extra_entries=entries)
+        self._write(f"startxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+        return xref_offset
+
+    @property
+    def size(self) -> int:
+        """Value of the trailer ``/Size`` entry (highest object number + 1)."""
+        return self.next_object_number
+
+
+def open_pdf_sink(output: Union[str, os.PathLike, BinaryIO, None]):
+    """
+    Resolve a render destination into a writable binary sink.
+
+    Args:
+        output: File path, binary stream, or ``None`` for an in-memory buffer
+
+    Returns:
+        Tuple of (sink, owns_sink) where ``owns_sink`` tells the caller
+        whether it is responsible for closing the sink
+    """
+    if output is None:
+        return io.BytesIO(), True
+    if isinstance(output, (str, os.PathLike)):
+        return open(output, 'wb'), True
+    if hasattr(output, 'write'):
+        return output, False
+    raise TypeError(f"Unsupported PDF output target: {type(output).__name__}")
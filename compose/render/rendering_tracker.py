@@ -171,6 +171,19 @@ class RenderingTracker:
         
         return errors
     
+    def release_page(self, page: int) -> 'RenderingTracker':
+        """
+        Move a finished page's records into a separate tracker.
+
+        Used by streaming output so tracked content does not accumulate
+        for the whole document.
+        """
+        released = RenderingTracker()
+        released.current_page = page
+        released.content = [item for item in self.content if item.page == page]
+        self.content = [item for item in self.content if item.page != page]
+        return released
+
     def clear(self):
         """Clear all tracked content"""
         self.content = []
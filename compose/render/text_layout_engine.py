@@ -2,13 +2,15 @@
 Text layout engine for calculating text positions and wrapping.
 
 This module provides pure functions for text measurement and layout,
-completely separated from PDF rendering. All functions are stateless
-and can be cached/memoized for performance.
+completely separated from PDF rendering. All functions are stateless;
+widths come from the process-wide word width cache, so engines built
+for different renderers share measurements.
 """
 
-from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 from .layout_primitives import TextRun, LineLayout, TextMeasurement
+from ..layout.batch_measure import measure_words
+from ..layout.standard_fonts import metrics_text_width
 
 
 class TextLayoutEngine:
@@ -24,20 +26,18 @@ class TextLayoutEngine:
         Initialize with font metrics.
         
         Args:
-            font_metrics: Dictionary mapping font names to their metrics
-                         (ascent, descent, glyph_widths, etc.)
+            font_metrics: Mapping of font names to their metrics
+                         (ascent, descent and widths), usually
+                         StandardFontMetrics
         """
         self.font_metrics = font_metrics
-        # Create cache key from font metrics for cache invalidation
-        self._metrics_hash = hash(str(sorted(font_metrics.items())))
     
-    @lru_cache(maxsize=2000)
     def measure_text(self, text: str, font: str, size: float) -> TextMeasurement:
         """
         Measure text dimensions.
         
         This is a pure function - same inputs always produce same output.
-        Results are cached for performance.
+        Word widths are cached in the shared word width cache.
         
         Args:
             text: Text to measure
@@ -61,20 +61,8 @@ class TextLayoutEngine:
             )
         
         metrics = self.font_metrics[font]
-        glyph_widths = metrics['glyph_widths']
-        
-        # Calculate width from glyph metrics
-        total_width = 0.0
-        for char in text:
-            if char in glyph_widths:
-                total_width += glyph_widths[char]
-            else:
-                # Fallback for unknown characters
-                total_width += glyph_widths.get('a', 4.4)
-        
-        # Convert from font units to points
+        width = metrics_text_width(metrics, text, size)
         units_per_em = metrics.get('units_per_em', 1000)
-        width = total_width * (size / units_per_em)
         
         # Calculate height metrics
         ascent = metrics['ascent'] * (size / units_per_em)
@@ -139,10 +127,17 @@ class TextLayoutEngine:
         current_line = []
         current_width = 0.0
         
-        space_width = self.measure_text_width(' ', font, size) + word_spacing
+        font_object = self.font_metrics[font].get('font') if font in self.font_metrics else None
+        if font_object is not None:
+            # Measure every word and the space in one batch
+            widths = measure_words(font_object, words + [' '], size).widths
+            word_widths = [float(width) for width in widths[:-1]]
+            space_width = float(widths[-1]) + word_spacing
+        else:
+            word_widths = [self.measure_text_width(word, font, size) for word in words]
+            space_width = self.measure_text_width(' ', font, size) + word_spacing
         
-        for word in words:
-            word_width = self.measure_text_width(word, font, size)
+        for word, word_width in zip(words, word_widths):
             
             # Check if word fits on current line
             if current_line:
@@ -319,8 +314,13 @@ class TextLayoutEngine:
         return measurement.height * factor
     
     def clear_cache(self):
-        """Clear the measurement cache"""
-        self.measure_text.cache_clear()
+        """
+        Kept for callers of the old per-engine cache; does nothing.
+
+        Widths live in the process-wide ``word_width_cache``, shared with
+        every renderer, so one engine must not clear it. Call
+        ``word_width_cache.clear()`` to drop it deliberately.
+        """
 
 
 # Convenience functions for common operations
@@ -7,6 +7,7 @@ Implements widow/orphan control, paragraph shaping, and LaTeX-like typography ru
 import re
 from typing import List, Dict, Any, Optional, Tuple
 from ..model.ast import Document, BlockElement, Paragraph, Heading, Text, InlineElement
+from ..layout.tiered_breaker import TieredLineBreaker
 
 
 class TypographyEngine:
@@ -22,6 +23,7 @@ class TypographyEngine:
         self.min_orphan_lines = 2  # minimum lines to keep together at page/column end
         self.paragraph_spacing = 1.5  # em units between paragraphs
         self.optimal_line_length = 60  # optimal characters per line
+        self.line_breaker = TieredLineBreaker(ragged_right=True)  # Lines are set at natural spacing
 
         # Typography presets
         self.presets = {
@@ -128,61 +130,17 @@ class TypographyEngine:
     def _apply_paragraph_shaping(self, words: List[str]) -> str:
         """
         Apply paragraph shaping to prevent bad line breaks.
+
+        Lines are measured in characters against the optimal line length;
+        the tiered breaker keeps first-fit lines unless one would be badly
+        spaced, and then balances the whole paragraph with Knuth-Plass.
         """
         if len(words) <= 1:
             return ' '.join(words)
 
-        # Simple paragraph shaping: avoid single words at line end
-        # This is a simplified version - full implementation would use
-        # more sophisticated line breaking algorithms
-
-        result_lines = []
-        current_line = []
-        current_length = 0
-
-        for word in words:
-            word_length = len(word) + 1  # +1 for space
-
-            # Check if adding this word would create a bad line break
-            if current_line and self._would_create_bad_break(current_line + [word]):
-                # Force line break before this word
-                if current_line:
-                    result_lines.append(' '.join(current_line))
-                    current_line = [word]
-                    current_length = len(word)
-                else:
-                    current_line = [word]
-                    current_length = len(word)
-            else:
-                current_line.append(word)
-                current_length += word_length
-
-                # Check for optimal line length
-                if current_length >= self.optimal_line_length:
-                    result_lines.append(' '.join(current_line))
-                    current_line = []
-                    current_length = 0
-
-        # Add remaining words
-        if current_line:
-            result_lines.append(' '.join(current_line))
-
-        return '\n'.join(result_lines)
-
-    def _would_create_bad_break(self, line_words: List[str]) -> bool:
-        """
-        Check if a line would create a bad break (e.g., single word).
-        """
-        if len(line_words) <= 1:
-            return True
-
-        # Check for single short words at end
-        last_word = line_words[-1]
-        if len(last_word) <= 3 and len(line_words) > 1:
-            # Short word at end might be widow/orphan
-            return True
-
-        return False
+        lines = self.line_breaker.wrap_words(
+            words, [len(word) for word in words], 1, self.optimal_line_length)
+        return '\n'.join(lines)
 
     def _style_heading(self, heading: Heading) -> Heading:
         """Apply typography styling to headings."""
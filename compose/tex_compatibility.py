@@ -11,6 +11,8 @@ from dataclasses import dataclass
 import re
 import math
 
+from .layout.tiered_breaker import TieredLineBreaker
+
 
 @dataclass
 class TexBox:
@@ -54,6 +56,8 @@ class TexCompatibilityEngine:
         self.tolerance = 200   # Maximum badness tolerance
         self.looseness = 0     # Allow looseness in line breaking
         self.line_penalty = 10 # Penalty for line breaks
+        self.line_breaker = TieredLineBreaker(badness_threshold=self.tolerance,
+                                              tolerance=self.tolerance)
 
         # Font parameters (simplified)
         self.font_size = 10.0  # Base font size in points
@@ -156,61 +160,10 @@ class TexCompatibilityEngine:
         if not words:
             return []
 
-        # Create boxes for words (simplified)
-        items = []
-        for word in words:
-            # Estimate word width (simplified)
-            word_width = len(word) * self.font_size * 0.5
-            items.append(self.create_box(word_width, content=word))
-
-            # Add inter-word glue
-            if len(items) > 1:  # Don't add glue before first word
-                items.append(self.create_glue(
-                    width=self.font_size * 0.25,  # Space width
-                    stretch=self.font_size * 0.15, # Stretchable
-                    shrink=self.font_size * 0.05   # Shrinkable
-                ))
-
-        # Add penalty at end for paragraph break
-        items.append(self.create_penalty(0))  # No penalty for paragraph end
-
-        # Break into lines
-        lines = []
-        current_line = []
-        current_width = 0.0
-
-        i = 0
-        while i < len(items):
-            item = items[i]
-
-            if isinstance(item, TexBox):
-                # Add word to current line
-                current_line.append(item.content)
-                current_width += item.width
-
-                # Check if we should break here
-                if i + 1 < len(items) and isinstance(items[i + 1], TexGlue):
-                    # Look ahead to see if this would make line too long
-                    next_glue = items[i + 1]
-                    test_width = current_width + next_glue.width
-
-                    if i + 2 < len(items):
-                        next_word = items[i + 2]
-                        if isinstance(next_word, TexBox):
-                            test_width += next_word.width
-
-                    if test_width > line_width * 1.2:  # Getting too long
-                        lines.append(' '.join(current_line))
-                        current_line = []
-                        current_width = 0.0
-
-            i += 1
-
-        # Add remaining line
-        if current_line:
-            lines.append(' '.join(current_line))
-
-        return lines
+        # Estimate word widths (simplified); interword glue is a quarter
+        # em that stretches by 0.15 em and shrinks by 0.05 em
+        word_widths = [len(word) * self.font_size * 0.5 for word in words]
+        return self.line_breaker.wrap_words(words, word_widths, self.font_size * 0.25, line_width)
 
     def run_trip_test_subset(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,111 @@
+"""
+Tests for batch text measurement.
+
+Tests that measuring a list of words in one call gives the same widths
+as measuring each word, with and without NumPy, and that line breaking,
+wrapping and table layout measure through the batch kernel.
+"""
+
+import pytest
+
+from compose.layout import batch_measure
+from compose.layout.batch_measure import measure_words
+from compose.layout.knuth_plass import KnuthPlassBreaker, create_breakpoints_from_text
+from compose.layout.standard_fonts import StandardFontMetrics, load_standard_font
+from compose.model.ast import Document, Table, Text
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.rendering_tracker import RenderingTracker
+from compose.render.text_layout_engine import TextLayoutEngine
+
+WORDS = ["Typeset", "", "café", "naïve", "€100", "中文", "AV", "with  spaces"]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def kernel(request, monkeypatch):
+    """Run a test with the NumPy kernel and with the pure Python fallback."""
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(batch_measure, "HAS_NUMPY", False)
+    return request.param
+
+
+class TestMeasureWords:
+    """Test suite for measure_words."""
+
+    def test_matches_single_measurement(self, kernel):
+        """Every width equals measuring that word on its own."""
+        font = load_standard_font("Times-Roman")
+        widths = measure_words(font, WORDS, 11).widths
+        assert len(widths) == len(WORDS)
+        for word, width in zip(WORDS, widths):
+            assert width == pytest.approx(font.text_width(word, 11))
+
+    def test_prefix_sums(self, kernel):
+        """Prefix sums start at zero and accumulate the widths."""
+        font = load_standard_font("Helvetica")
+        result = measure_words(font, ["a", "bb", "ccc"], 10, prefix_sums=True)
+        assert list(result.prefix_sums) == pytest.approx(
+            [0.0, result.widths[0], result.widths[0] + result.widths[1], sum(result.widths)])
+        assert measure_words(font, ["a"], 10).prefix_sums is None
+
+    def test_empty_batch(self, kernel):
+        """An empty list measures to no widths."""
+        result = measure_words(load_standard_font("Courier"), [], 10, prefix_sums=True)
+        assert len(result.widths) == 0
+        assert list(result.prefix_sums) == [0.0]
+
+    def test_astral_characters(self):
+        """Characters above the BMP fall back to the missing width."""
+        pytest.importorskip("numpy")
+        font = load_standard_font("Helvetica")
+        assert measure_words(font, ["a\U0001F600"], 1000).widths[0] == pytest.approx(
+            font.char_width(ord("a")) + font.missing_width)
+
+
+class TestKernelConsumers:
+    """Test suite for layout code measuring through the batch kernel."""
+
+    def test_wrap_text_uses_batch(self, kernel, monkeypatch):
+        """wrap_text measures the paragraph in one batch call."""
+        calls = []
+        original = measure_words
+        monkeypatch.setattr("compose.render.text_layout_engine.measure_words",
+                            lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs))
+        engine = TextLayoutEngine(StandardFontMetrics())
+        lines = engine.wrap_text("the quick brown fox jumps over the lazy dog " * 5, 120, "Helvetica", 10)
+        assert len(calls) == 1
+        assert all(engine.measure_text_width(line, "Helvetica", 10) <= 120 for line in lines)
+
+    def test_breakpoints_from_font(self, kernel):
+        """Breakpoint widths are the measured word plus a space."""
+        metrics = StandardFontMetrics()["Helvetica"]
+        font = metrics["font"]
+        breakpoints = create_breakpoints_from_text("Hello world", metrics, 10)
+        assert breakpoints[1].width == pytest.approx(font.text_width("Hello ", 10))
+        assert breakpoints[2].stretch == pytest.approx(font.text_width(" ", 10) * 0.6)
+
+    def test_prefix_line_widths(self):
+        """Line widths from running totals equal summing the breakpoints."""
+        breakpoints = create_breakpoints_from_text("one two three four five six", {})
+        breaker = KnuthPlassBreaker(line_width=6.0)
+        breaker.find_optimal_breaks(breakpoints)
+        assert breaker._calculate_line_width(breakpoints, 1, 4) == pytest.approx(
+            sum(bp.width for bp in breakpoints[2:5]) - breakpoints[4].glue_width)
+
+    def test_table_rows_measured_in_batch(self, kernel, monkeypatch):
+        """Table rows are recorded with their measured widths."""
+        recorded = {}
+        original = RenderingTracker.record_text
+
+        def record_text(tracker, *args, **kwargs):
+            recorded[kwargs.get("label")] = kwargs["width"]
+            return original(tracker, *args, **kwargs)
+        monkeypatch.setattr(RenderingTracker, "record_text", record_text)
+
+        renderer = ProfessionalPDFRenderer()
+        table = Table(headers=[[Text(content="Name")], [Text(content="Value")]],
+                      rows=[[[Text(content="alpha")], [Text(content="1")]]])
+        renderer.render(Document(blocks=[table], frontmatter={}))
+        assert recorded["table_row"] == pytest.approx(renderer.get_text_width("alpha | 1", "Helvetica", 12))
+        assert recorded["table_header"] == pytest.approx(renderer.get_text_width("Name | Value", "Helvetica", 12))
@@ -15,7 +15,7 @@ from compose.render.layout_rules import (
     NoOverflowRule, MinimumSpacingRule, NoOrphanLinesRule, NoWidowLinesRule
 )
 from compose.render.layout_adjustments import (
-    MoveToNextPageAdjustment, IncreaseSpacingAdjustment
+    MoveToNextPageAdjustment, IncreaseSpacingAdjustment, PullLineFromPreviousPageAdjustment
 )
 from compose.render.constraint_solver import ConstraintSolver
 from compose.render.layout_generator import LayoutGenerator
@@ -90,6 +90,44 @@ class TestLayoutState:
         assert page_idx is None
         assert box_idx is None
 
+    def test_clone_shares_pages_until_edited(self):
+        """Test that only edited pages are copied"""
+        pages = []
+        for number in range(4):
+            page = PageLayout(page_number=number, width=612, height=792)
+            page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 100))
+            pages.append(page)
+        state = LayoutState(pages=pages, current_page=3, current_y=620, elements=[])
+
+        cloned = state.clone()
+        assert all(a is b for a, b in zip(cloned.pages, state.pages))
+
+        edited = cloned.edit_page(2)
+        edited.boxes[0].y = 500
+        assert cloned.edit_page(2) is edited
+        assert edited is not state.pages[2]
+        assert state.pages[2].boxes[0].y == 720
+        assert [a is b for a, b in zip(cloned.pages, state.pages)] == [True, True, False, True]
+
+        # Boxes are found on shared pages, and as copies on edited ones
+        assert cloned.find_element(state.pages[1].boxes[0]) == (1, 0)
+        cloned.edit_page(0)
+        assert cloned.find_element(state.pages[0].boxes[0]) == (0, 0)
+
+    def test_adjustment_leaves_earlier_state_unchanged(self):
+        """Test that adjustments copy only the pages they change"""
+        pages = [PageLayout(page_number=number, width=612, height=792) for number in range(3)]
+        box = LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 100)
+        pages[0].add_box(box)
+        pages[2].add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 100))
+        state = LayoutState(pages=pages, current_page=2, current_y=620, elements=[])
+
+        new_state = MoveToNextPageAdjustment(box).apply(state, None)
+
+        assert state.pages[0].boxes == [box] and not state.pages[1].boxes
+        assert len(new_state.pages[1].boxes) == 1 and not new_state.pages[0].boxes
+        assert new_state.pages[2] is state.pages[2]
+
 
 class TestNoOverflowRule:
     """Test the no overflow rule"""
@@ -215,6 +253,72 @@ class TestMoveToNextPageAdjustment:
         assert len(new_state.pages) == 2
 
 
+class TestLocalRepair:
+    """Test that adjustments re-flow only the pages they affect"""
+    
+    @staticmethod
+    def _state(counts):
+        """One page per count, each stacking that many 200pt boxes"""
+        pages = []
+        for number, count in enumerate(counts):
+            page = PageLayout(page_number=number, width=612, height=792)
+            for index in range(count):
+                page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720 - index * 206, 468, 200,
+                                       metadata={'id': (number, index)}))
+            pages.append(page)
+        return LayoutState(pages=pages, current_page=len(pages) - 1, current_y=100, elements=[])
+    
+    @staticmethod
+    def _ids(state):
+        return [[box.metadata['id'] for box in page.boxes] for page in state.pages]
+    
+    def test_spacing_reflows_until_a_page_has_room(self):
+        """Test that pushed-off boxes stop at the first page with room"""
+        state = self._state([3, 3, 1, 3, 3])
+        
+        new_state = IncreaseSpacingAdjustment(state.pages[0].boxes[1], 60.0).apply(state, None)
+        
+        assert self._ids(new_state)[:3] == [[(0, 0), (0, 1)], [(0, 2), (1, 0), (1, 1)],
+                                            [(1, 2), (2, 0)]]
+        assert new_state.dirty_pages == {0, 1, 2}
+        assert new_state.pages[3] is state.pages[3] and new_state.pages[4] is state.pages[4]
+        assert NoOverflowRule().check(new_state) == []
+        assert self._ids(state) == self._ids(self._state([3, 3, 1, 3, 3]))
+    
+    def test_move_keeps_document_order(self):
+        """Test that the boxes after a moved one follow it"""
+        state = self._state([3, 3, 1, 3])
+        
+        new_state = MoveToNextPageAdjustment(state.pages[0].boxes[1]).apply(state, None)
+        
+        assert self._ids(new_state)[:3] == [[(0, 0)], [(0, 1), (0, 2), (1, 0)],
+                                            [(1, 1), (1, 2), (2, 0)]]
+        assert new_state.pages[1].boxes[0].y == new_state.pages[1].content_top
+        assert new_state.pages[3] is state.pages[3]
+        assert NoOverflowRule().check(new_state) == []
+    
+    def test_pull_back_fills_previous_page(self):
+        """Test pulling a box back to a page with room"""
+        state = self._state([1, 3, 3])
+        
+        new_state = PullLineFromPreviousPageAdjustment(state.pages[1].boxes[0]).apply(state, None)
+        
+        assert self._ids(new_state)[:2] == [[(0, 0), (1, 0)], [(1, 1), (1, 2)]]
+        assert new_state.pages[0].boxes[1].y == new_state.pages[0].boxes[0].bottom - 6
+        assert new_state.pages[1].boxes[0].y == new_state.pages[1].content_top
+        assert new_state.pages[2] is state.pages[2]
+    
+    def test_pull_back_without_room_is_undone(self):
+        """Test that a box the previous page cannot take re-flows back"""
+        state = self._state([3, 3, 3])
+        
+        new_state = PullLineFromPreviousPageAdjustment(state.pages[1].boxes[0]).apply(state, None)
+        
+        assert self._ids(new_state) == self._ids(state)
+        assert new_state.pages[2] is state.pages[2]
+        assert NoOverflowRule().check(new_state) == []
+
+
 class TestConstraintSolver:
     """Test the constraint solver"""
     
@@ -279,6 +383,103 @@ class TestConstraintSolver:
         # Should still have violations since generator didn't fix them
         final_violations = solver._check_all_rules(final_state)
         assert len(final_violations) > 0
+    
+    def test_solver_returns_best_layout(self):
+        """Test solver returns the layout with the fewest violations"""
+        page = PageLayout(page_number=0, width=612, height=792)
+        page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 700))
+        state = LayoutState(pages=[page], current_page=0, current_y=20, elements=[])
+        
+        # Create generator that makes every layout worse
+        class WorseGenerator:
+            def regenerate_with_adjustments(self, state, adjustments):
+                new_state = state.clone()
+                new_state.edit_page(0).add_box(LayoutBox(BoxType.PARAGRAPH, 72, 100, 468, 100))
+                return new_state
+        
+        solver = ConstraintSolver(rules=[NoOverflowRule()], max_iterations=3, verbose=False)
+        
+        assert solver.solve(state, WorseGenerator()) is state
+        assert [entry['violations'] for entry in solver.iteration_history] == [1, 2, 3]
+    
+    def test_solver_stops_when_time_budget_used_up(self):
+        """Test solver returns the best layout so far when out of time"""
+        page = PageLayout(page_number=0, width=612, height=792)
+        page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 700))
+        state = LayoutState(pages=[page], current_page=0, current_y=20, elements=[])
+        
+        solver = ConstraintSolver(rules=[NoOverflowRule()], verbose=False, time_budget=0)
+        
+        assert solver.solve(state, LayoutGenerator({}, {})) is state
+        assert solver.timed_out
+        assert len(solver.iteration_history) == 1
+        
+        solver = ConstraintSolver(rules=[NoOverflowRule()], verbose=False, time_budget=60)
+        solver.solve(state, LayoutGenerator({}, {}))
+        assert not solver.timed_out
+
+
+class TestIncrementalRuleChecking:
+    """Test re-checking only the pages adjustments changed"""
+    
+    @staticmethod
+    def _state(page_count=30):
+        pages = []
+        for number in range(page_count):
+            page = PageLayout(page_number=number, width=612, height=792)
+            page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 720, 468, 100))
+            # Too close to the first box on every fifth page
+            page.add_box(LayoutBox(BoxType.PARAGRAPH, 72, 618 if number % 5 == 0 else 600, 468, 100))
+            pages.append(page)
+        return LayoutState(pages=pages, current_page=page_count - 1, current_y=500, elements=[])
+    
+    @staticmethod
+    def _summary(violations):
+        return [(v.rule_name, v.page, v.description) for v in violations]
+    
+    def test_only_changed_pages_are_checked(self):
+        """Test that an adjustment leads to re-checking its pages only"""
+        rules = [NoOverflowRule(), MinimumSpacingRule(), NoWidowLinesRule()]
+        solver = ConstraintSolver(rules=rules, verbose=False)
+        state = self._state()
+        assert len(solver._check_all_rules(state)) == 6
+        
+        checked = solver.optimizer.pages_checked
+        spaced = IncreaseSpacingAdjustment(state.pages[10].boxes[1], 6.0).apply(state, None)
+        assert spaced.dirty_pages == {10}
+        violations = solver._check_all_rules(spaced)
+        
+        # Pages 10 for each rule, and 9 and 11 for the widow rule's reach
+        assert solver.optimizer.pages_checked - checked == 5
+        assert not spaced.dirty_pages
+        expected = [v for rule in rules for v in rule.check(spaced)]
+        assert self._summary(violations) == self._summary(expected)
+        assert len(violations) == 5
+    
+    def test_replaced_and_added_pages_are_checked(self):
+        """Test that pages changed without edit_page are noticed"""
+        solver = ConstraintSolver(rules=[MinimumSpacingRule()], verbose=False)
+        state = self._state(10)
+        solver._check_all_rules(state)
+        
+        cloned = state.clone()
+        cloned.pages[3] = cloned.pages[0]
+        cloned.pages.append(cloned.pages[5])
+        checked = solver.optimizer.pages_checked
+        violations = solver._check_all_rules(cloned)
+        
+        # Page 3 was replaced; the last page before the new one is re-checked too
+        assert solver.optimizer.pages_checked - checked == 3
+        assert [v.page for v in violations] == [0, 3, 5, 10]
+    
+    def test_solver_checks_incrementally(self):
+        """Test that a solve re-checks fewer pages than full passes would"""
+        state = self._state()
+        solver = ConstraintSolver(rules=[MinimumSpacingRule()], verbose=False)
+        solver.solve(state, LayoutGenerator({}, {}))
+        
+        assert [entry['violations'] for entry in solver.iteration_history] == [6, 3, 0]
+        assert solver.optimizer.pages_checked == 30 + 3 + 3
 
 
 class TestLayoutGenerator:
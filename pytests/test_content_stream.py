@@ -0,0 +1,81 @@
+"""
+Tests for the byte-oriented content stream builder.
+
+Tests that operators are appended as the expected bytes, that text is
+escaped and encoded for WinAnsi, and that builders compose with each
+other and with legacy lists of operator strings.
+"""
+
+from compose.render.content_stream import ContentStreamBuilder, encode_text, format_number
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Paragraph, Text
+
+
+class TestEncoding:
+    """Test suite for text and number encoding."""
+
+    def test_escapes_string_delimiters(self):
+        """Parentheses and backslashes are escaped."""
+        assert encode_text("f(x) \\ y") == b"f\\(x\\) \\\\ y"
+
+    def test_winansi_replacements(self):
+        """Characters outside WinAnsi fall back to ASCII equivalents."""
+        assert encode_text("“quoted” • café") == b'"quoted" * cafe'
+
+    def test_unencodable_characters_dropped(self):
+        """Characters with no WinAnsi form are dropped."""
+        assert encode_text("a中b") == b"ab"
+
+    def test_number_formatting(self):
+        """Numbers are compact and never use exponent notation."""
+        assert format_number(12) == b"12"
+        assert format_number(12.0) == b"12"
+        assert format_number(695.6000000001) == b"695.6"
+        assert format_number(-0.25) == b"-0.25"
+        assert format_number(1e-7) == b"0"
+        assert format_number(1.5e6) == b"1500000"
+
+
+class TestContentStreamBuilder:
+    """Test suite for ContentStreamBuilder."""
+
+    def test_text_run(self):
+        """A text run is one complete text object."""
+        builder = ContentStreamBuilder()
+        builder.text("Hello (world)", "Helvetica", 12, 72, 700.5)
+        assert builder.getvalue() == (b"BT\n0 0 0 rg\n/Helvetica 12 Tf\n"
+                                      b"1 0 0 1 72 700.5 Tm\n(Hello \\(world\\)) Tj\nET\n")
+        assert len(builder) == 6
+
+    def test_graphics_operators(self):
+        """Lines, rectangles and XObjects produce the standard operators."""
+        builder = ContentStreamBuilder()
+        builder.save_state()
+        builder.set_line_width(0.5)
+        builder.set_stroke_color(1, 0, 0)
+        builder.line(0, 0, 10, 0)
+        builder.rect(1, 2, 3, 4, fill=True)
+        builder.concat_matrix(2, 0, 0, 2, 0, 0)
+        builder.draw_xobject("Im1")
+        builder.restore_state()
+        assert list(builder) == ["q", "0.5 w", "1 0 0 RG", "0 0 m", "10 0 l", "S",
+                                 "1 2 3 4 re", "f", "2 0 0 2 0 0 cm", "/Im1 Do", "Q"]
+        assert builder.xobjects == {"Im1"}
+
+    def test_extend_with_builder_and_list(self):
+        """Builders and lists of operator strings can be appended."""
+        inner = ContentStreamBuilder()
+        inner.draw_xobject("Fx1")
+        builder = ContentStreamBuilder()
+        builder.extend(["q", "/Im2 Do"])
+        builder.extend(inner)
+        builder.raw("Q")
+        assert list(builder) == ["q", "/Im2 Do", "/Fx1 Do", "Q"]
+        assert builder.xobjects == {"Im2", "Fx1"}
+        assert len(builder) == 4
+
+    def test_renderer_writes_builder_bytes(self):
+        """Rendered pages contain the builder's text operators verbatim."""
+        doc = Document(blocks=[Paragraph(content=[Text(content="Builder (text)")])], frontmatter={})
+        pdf = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0}})
+        assert b"(Builder \\(text\\)) Tj" in pdf
@@ -0,0 +1,135 @@
+"""
+Tests for Form XObject reuse.
+
+Tests that repeated drawings are recorded once, placed with ``Do``
+and written as Form XObjects referenced from the shared resources.
+"""
+
+import io
+
+from compose.render.form_xobjects import FormXObjectRegistry, compute_bbox
+from compose.render.pdf_compression import ContentCompressor
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.pdf_writer import PDFWriter
+from compose.model.ast import Document, MathBlock, MathInline, Paragraph, Text
+
+
+def _repeated_math_document(repeats: int = 10) -> Document:
+    blocks = []
+    for _ in range(repeats):
+        blocks.append(Paragraph(content=[Text(content="Sum "), MathInline(content="$a^2 + b$")]))
+        blocks.append(MathBlock(content="$$E = mc^2$$"))
+    return Document(blocks=blocks, frontmatter={})
+
+
+class TestFormXObjectRegistry:
+    """Test suite for FormXObjectRegistry."""
+
+    def test_drawn_once(self):
+        """The draw callable runs only for the first placement."""
+        registry = FormXObjectRegistry()
+        calls = []
+
+        def draw():
+            calls.append(1)
+            return ["0 0 m", "10 0 l", "S"], 10.0
+
+        for x in (0, 20, 40):
+            registry.place("rule", x, 100, draw)
+        assert len(calls) == 1
+
+    def test_first_use_inline_then_do(self):
+        """One-off drawings stay inline; repeats become XObject placements."""
+        registry = FormXObjectRegistry()
+        draw = lambda: (["0 0 m", "10 0 l", "S"], 10.0)
+
+        first, width = registry.place("rule", 5, 50, draw)
+        second, _ = registry.place("rule", 5, 80, draw)
+        assert width == 10.0
+        assert list(first) == ["q", "1 0 0 1 5 50 cm", "0 0 m", "10 0 l", "S", "Q"]
+        assert list(second) == ["q", "1 0 0 1 5 80 cm", "/Fx1 Do", "Q"]
+        assert registry.reuse_count == 1
+
+    def test_only_reused_drawings_are_written(self):
+        """Drawings placed once are not written as XObjects."""
+        registry = FormXObjectRegistry()
+        registry.place("once", 0, 0, lambda: (["S"], 1.0))
+        registry.place("twice", 0, 0, lambda: (["S"], 1.0))
+        registry.place("twice", 0, 0, lambda: (["S"], 1.0))
+
+        sink = io.BytesIO()
+        forms = registry.write_forms(PDFWriter(sink), ContentCompressor(level=0), resources=99)
+        assert list(forms) == ["Fx1"]
+        assert b"/Subtype /Form" in sink.getvalue()
+        assert b"/Resources 99 0 R" in sink.getvalue()
+
+    def test_bbox_covers_positions(self):
+        """The bounding box includes every position plus font padding."""
+        bbox = compute_bbox(["BT", "/Helvetica 12 Tf", "1 0 0 1 0 -5.5 Tm", "ET", "3 20 m"], 30)
+        assert bbox == (-12.0, -17.5, 42.0, 32.0)
+
+
+class TestRendererXObjects:
+    """Test Form XObject reuse in the PDF renderer."""
+
+    def test_repeated_math_uses_xobjects(self):
+        """Repeated math is placed with Do and listed in the resources."""
+        renderer = ProfessionalPDFRenderer()
+        data = renderer.render(_repeated_math_document(), {'pdf': {'compression_level': 0}})
+        assert len(renderer.xobjects.named) == 2
+        assert data.count(b"/Subtype /Form") == 2
+        assert b"/XObject <<\n/Fx1 " in data
+        assert data.count(b" Do\n") >= 18
+
+    def test_reuse_shrinks_content(self):
+        """Content streams are smaller with reuse enabled."""
+        with_reuse = ProfessionalPDFRenderer()
+        with_reuse.render(_repeated_math_document(), {})
+        without_reuse = ProfessionalPDFRenderer()
+        without_reuse.render(_repeated_math_document(), {'pdf': {'form_xobjects': False}})
+        assert without_reuse.xobjects.named == []
+        assert with_reuse.compression_stats.bytes_in < without_reuse.compression_stats.bytes_in
+
+
+class TestMathPlacement:
+    """Test where the PDF renderer places math."""
+
+    def _render(self, blocks, form_xobjects=True):
+        renderer = ProfessionalPDFRenderer()
+        data = renderer.render(Document(blocks=blocks, frontmatter={}),
+                               {'pdf': {'compression_level': 0, 'form_xobjects': form_xobjects}})
+        return renderer, data.decode('latin-1').splitlines()
+
+    def test_inline_math_on_line_baseline(self):
+        """The math is translated to the baseline of the text around it."""
+        for form_xobjects in (True, False):
+            renderer, lines = self._render([Paragraph(content=[
+                Text(content="Hello "), MathInline(content="x^2"), Text(content=" world")])],
+                form_xobjects)
+            text_y = lines[lines.index("(Hello ) Tj") - 1].split()[5]
+            if form_xobjects:
+                math_y = next(line for line in lines if line.endswith(" cm")).split()[5]
+            else:
+                math_y = lines[lines.index("(x) Tj") - 1].split()[5]
+            assert math_y == text_y == "720"
+            assert renderer._validation_error_count == 0
+
+    def test_display_math_centred(self):
+        """Display math is centred between the margins."""
+        for form_xobjects in (True, False):
+            renderer, lines = self._render([MathBlock(content="$$E = mc^2$$")], form_xobjects)
+            placement = next(line for line in lines if line.endswith(" cm")).split()
+            form = renderer.xobjects.forms[("math", "E = mc^2", renderer.current_font_size)] \
+                if form_xobjects else None
+            width = form.width if form else renderer._draw_math("E = mc^2", 0, 0)[1]
+            centre = renderer.margin_left + (renderer.page_width - renderer.margin_left
+                                             - renderer.margin_right) / 2
+            assert abs(float(placement[4]) + width / 2 - centre) < 0.01
+            assert float(placement[5]) < renderer.page_height - renderer.margin_top
+            assert renderer._validation_error_count == 0
+
+    def test_unencodable_glyph_falls_back_to_text(self):
+        """Math the standard fonts cannot show is written as its source."""
+        _, lines = self._render([Paragraph(content=[Text(content="Angle "), MathInline(content="\\alpha")])])
+        assert "([\\\\alpha]) Tj" in lines
+        assert "() Tj" not in lines
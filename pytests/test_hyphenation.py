@@ -0,0 +1,143 @@
+"""
+Tests for Liang hyphenation.
+
+Tests that words split where TeX splits them, that the packed trie
+survives the persistent cache, that languages load lazily and words are
+memoized, and that the line breakers break narrow columns at
+hyphenation points.
+"""
+
+import pytest
+
+from compose.cache_system import HyphenationCache
+from compose.layout import hyphenation
+from compose.layout.hyphenation import PackedTrie, get_hyphenator
+from compose.layout.knuth_plass import KnuthPlassBreaker, create_breakpoints, join_lines, split_words
+from compose.layout.tiered_breaker import LineBreakingStats, TieredLineBreaker
+
+
+@pytest.fixture
+def english():
+    return get_hyphenator("en-us")
+
+
+def _measure(texts):
+    return [float(len(text)) for text in texts]
+
+
+class TestHyphenator:
+    """Test suite for Hyphenator."""
+
+    @pytest.mark.parametrize("word, pieces", [
+        ("hyphenation", ["hy", "phen", "a", "tion"]),
+        ("typesetting", ["type", "set", "ting"]),
+        ("encyclopedia", ["en", "cy", "clo", "pe", "dia"]),
+        ("table", ["ta", "ble"]),          # An exception word
+        ("Algorithm,", ["Al", "go", "rithm,"]),
+        ("cat", ["cat"]),
+        ("don't", ["don't"]),
+    ])
+    def test_split(self, english, word, pieces):
+        assert english.split(word) == pieces
+
+    def test_hyphen_minimums(self, english):
+        """No piece is shorter than two letters before or three after a hyphen."""
+        assert english.positions("unite") == ()         # patterns allow u-nite
+        assert english.positions("objected") == (2,)    # and object-ed
+        assert english.split("academy") == ["acad", "emy"]
+
+    def test_exception_without_hyphens(self, english):
+        """An exception word written without hyphens is never hyphenated."""
+        assert "project" in english.exceptions
+        assert english.positions("project") == ()
+        assert english.positions("present") == ()
+
+    def test_words_are_memoized(self, english):
+        english.positions("memoization")
+        hits = english._word_positions.cache_info().hits
+        english.positions("memoization")
+        assert english._word_positions.cache_info().hits == hits + 1
+
+    def test_language_lookup(self):
+        assert get_hyphenator("en_US") is get_hyphenator("en-us")
+        assert get_hyphenator("en").language == "en-us"
+        assert get_hyphenator("xx") is None
+
+
+class TestPackedTrie:
+    """Test suite for PackedTrie."""
+
+    def test_points(self):
+        trie = PackedTrie.from_patterns(["1ba", "a1b", ".ab4"])
+        assert trie.points(".abab.") == [0, 0, 1, 4, 1, 0, 0]
+
+    def test_round_trip(self):
+        trie = PackedTrie.from_patterns(["1ba", "a1b", ".ab4"])
+        restored = PackedTrie.from_dict(trie.to_dict())
+        assert restored.points(".abab.") == trie.points(".abab.")
+
+    def test_compiled_trie_is_cached(self, tmp_path, monkeypatch):
+        """A second process loads the compiled trie instead of the patterns."""
+        cache = HyphenationCache()
+        cache.cache.cache_dir = tmp_path
+        monkeypatch.setattr(hyphenation, "hyphenation_cache", cache)
+        hyphenation._load_hyphenator.cache_clear()
+        try:
+            compiled = get_hyphenator("en-us")
+            hyphenation._load_hyphenator.cache_clear()
+            cache.cache.clear()
+            monkeypatch.setattr(hyphenation, "_parse_patterns", lambda lines: pytest.fail("parsed again"))
+            loaded = get_hyphenator("en-us")
+        finally:
+            hyphenation._load_hyphenator.cache_clear()
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert loaded.split("hyphenation") == compiled.split("hyphenation")
+
+
+class TestHyphenatedBreaking:
+    """Test suite for breaking lines at hyphenation points."""
+
+    def test_breakpoints_inside_words(self, english):
+        pieces, word_ends = split_words(["a", "typesetting", "job"], english)
+        assert (pieces, word_ends) == (["a", "type", "set", "ting", "job"],
+                                       [True, False, False, True, True])
+        breakpoints = create_breakpoints(pieces, _measure(pieces), 1, word_ends, 1)
+        assert [bp.is_hyphenated for bp in breakpoints[1:]] == [False, True, True, False, False]
+        assert breakpoints[2].glue_width == 0 and breakpoints[2].hyphen_width == 1
+
+    def test_join_lines(self):
+        pieces, word_ends = ["a", "type", "set", "ting", "job"], [True, False, False, True, True]
+        assert join_lines(pieces, word_ends, [2, 5]) == ["a type-", "setting job"]
+
+    def test_hyphen_counts_in_line_width(self, english):
+        pieces, word_ends = split_words(["typesetting"], english)
+        breakpoints = create_breakpoints(pieces, _measure(pieces), 1, word_ends, 1)
+        assert KnuthPlassBreaker(10)._calculate_line_width(breakpoints, 0, 1) == 5
+
+    def test_narrow_column_breaks_on_first_pass(self, english):
+        """Hyphenation lets long words fill a narrow column within tolerance."""
+        text = "internationalization considerations complicate typesetting " * 3
+        words = text.split()
+        plain = KnuthPlassBreaker(30)
+        assert plain._break_pass(_prepared(plain, create_breakpoints(words, _measure(words), 1)),
+                                 plain.tolerance, final=False) is None
+
+        pieces, word_ends = split_words(words, english)
+        breaker = KnuthPlassBreaker(30)
+        breakpoints = create_breakpoints(pieces, _measure(pieces), 1, word_ends, 1)
+        assert breaker._break_pass(_prepared(breaker, breakpoints), breaker.tolerance, final=False)
+
+    def test_wrap_text_hyphenates(self, english):
+        breaker = TieredLineBreaker(stats=LineBreakingStats(), hyphenator=english)
+        text = "internationalization considerations complicate typesetting " * 3
+        lines = breaker.wrap_text(text, 16, "test", 1, _measure)
+        assert any(line.endswith("-") for line in lines)
+        assert all(len(line) <= 16 for line in lines)
+        assert "".join(line.rstrip("-") if line.endswith("-") else line + " "
+                       for line in lines).split() == text.split()
+        assert breaker.settings_key != TieredLineBreaker().settings_key
+
+
+def _prepared(breaker, breakpoints):
+    breaker._prepare_sums(breakpoints)
+    return breakpoints
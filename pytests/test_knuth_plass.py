@@ -0,0 +1,122 @@
+"""
+Tests for the Knuth-Plass line breaker.
+
+Tests that breaks are optimal for small paragraphs, that forced and
+prohibited breaks are honoured, that overfull lines deactivate their
+nodes so long paragraphs break quickly, and that the math breaker runs
+on the same engine.
+"""
+
+import itertools
+import time
+
+import pytest
+
+from compose.layout.engines.math_engine import MathLayoutEngine
+from compose.layout.knuth_plass import (
+    Breakpoint, BreakType, KnuthPlassBreaker, MathKnuthPlassBreaker,
+    create_breakpoints_from_text,
+)
+
+
+def _words(widths, break_types=None):
+    """Breakpoints for words of the given widths, each followed by a space."""
+    breakpoints = [Breakpoint(0, 0, 0, 0, 0, BreakType.NORMAL, False)]
+    for index, width in enumerate(widths):
+        break_type = (break_types or {}).get(index + 1, BreakType.NORMAL)
+        breakpoints.append(Breakpoint(index + 1, width + 1.0, 0.5, 0.3, 0, break_type, False, 1.0))
+    return breakpoints
+
+
+def _brute_force(breaker, breakpoints):
+    """Cheapest set of line ends among all that the breaker considers feasible."""
+    breaker._prepare_sums(breakpoints)
+    last = len(breakpoints) - 1
+    best = None
+    for count in range(last):
+        for ends in itertools.combinations(range(1, last), count):
+            positions = [0, *ends, last]
+            total, fitness = 0.0, breaker.fitness_classes['decent']
+            for start, end in zip(positions, positions[1:]):
+                width, stretch, shrink = breaker._line_metrics(breakpoints, start, end)
+                if end == last and width <= breaker.line_width:
+                    ratio, badness = 0.0, 0.0
+                else:
+                    ratio, badness = breaker._calculate_badness(width, stretch, shrink)
+                if ratio < -1 or badness > breaker.tolerance:
+                    break
+                new_fitness = breaker._get_fitness_class(ratio)
+                total += breaker._calculate_demerits(badness, breakpoints[end].penalty, fitness, new_fitness)
+                fitness = new_fitness
+            else:
+                if best is None or total < best[0]:
+                    best = (total, positions[1:])
+    return best
+
+
+class TestKnuthPlassBreaker:
+    """Test suite for KnuthPlassBreaker."""
+
+    def test_matches_exhaustive_search(self):
+        """Small paragraphs get the cheapest feasible breaks."""
+        breakpoints = _words([3, 5, 2, 4, 4, 1, 6, 3, 2, 5, 2, 7])
+        checked = 0
+        for line_width in range(12, 26):
+            best = _brute_force(KnuthPlassBreaker(line_width, 1000.0), breakpoints)
+            if best is None:
+                continue
+            breaks = KnuthPlassBreaker(line_width, 1000.0).find_optimal_breaks(breakpoints)
+            assert [line.end_position for line in breaks] == best[1]
+            assert sum(line.demerits for line in breaks) == pytest.approx(best[0])
+            checked += 1
+        assert checked > 3
+
+    def test_lines_are_contiguous(self):
+        """Each line starts where the previous one ended."""
+        breaks = KnuthPlassBreaker(20.0).find_optimal_breaks(_words([4] * 30))
+        assert breaks[0].start_position == 0
+        assert breaks[-1].end_position == 30
+        assert all(a.end_position == b.start_position for a, b in zip(breaks, breaks[1:]))
+
+    def test_forced_and_prohibited_breaks(self):
+        """Forced breaks always end a line and prohibited ones never do."""
+        breakpoints = _words([3] * 12, {2: BreakType.FORCE, 7: BreakType.PREVENT})
+        ends = [line.end_position for line in KnuthPlassBreaker(16.0).find_optimal_breaks(breakpoints)]
+        assert 2 in ends
+        assert 7 not in ends
+
+    def test_overfull_word_is_set(self):
+        """A word wider than the line still gets a line of its own."""
+        breakpoints = _words([2, 40, 2])
+        breaks = KnuthPlassBreaker(10.0).find_optimal_breaks(breakpoints)
+        assert breaks[-1].end_position == 3
+        assert any(line.adjustment_ratio < -1 for line in breaks)
+
+    def test_long_paragraph_is_near_linear(self):
+        """Thousands of words break quickly and every line fits."""
+        text = " ".join(["notwithstanding the foregoing provisions hereof"] * 2000)
+        breakpoints = create_breakpoints_from_text(text, {}, 10)
+        started = time.perf_counter()
+        breaks = KnuthPlassBreaker(line_width=300.0).find_optimal_breaks(breakpoints)
+        assert time.perf_counter() - started < 5
+        assert breaks[-1].end_position == len(breakpoints) - 1
+        assert all(line.adjustment_ratio >= -1 for line in breaks)
+
+    def test_empty_paragraph(self):
+        """A paragraph without words has no lines."""
+        assert KnuthPlassBreaker(10.0).find_optimal_breaks(_words([])) == []
+
+
+class TestMathKnuthPlassBreaker:
+    """Test suite for the math breaker, which shares the engine."""
+
+    def test_math_breaker_uses_engine(self):
+        """The math breaker sets every breakpoint with its own badness."""
+        breaks = MathKnuthPlassBreaker(16.0).find_optimal_breaks(_words([3] * 20))
+        assert breaks[-1].end_position == 20
+
+    def test_math_engine_breaks_expressions(self):
+        """apply_knuth_plass_breaking returns the expression split into lines."""
+        lines = MathLayoutEngine().apply_knuth_plass_breaking("a + b + c = d - e + f + g + h = x", 6)
+        assert len(lines) > 1
+        assert " ".join(lines) == "a + b + c = d - e + f + g + h = x"
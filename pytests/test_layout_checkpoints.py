@@ -0,0 +1,205 @@
+"""
+Tests for page-boundary layout checkpoints.
+
+Tests that the page builder's plan of an unchanged tail carries over to an
+edited document, and that the PDF renderer lays an edited document out
+measuring only the changed blocks, reusing the old pages once a page
+starts where one did, and choosing the same pages as a fresh build.
+"""
+
+from compose.model.ast import Document, Heading, Paragraph, Text
+from compose.render.layout_checkpoints import LayoutCheckpoint, changed_blocks, page_breaks
+from compose.render.page_builder import PageBuilder, PageItem
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+
+
+def _blocks(count=120, edit=None, extra=""):
+    blocks = []
+    for index in range(count):
+        if index % 10 == 0:
+            blocks.append(Heading(level=2, content=[Text(content=f"Section {index}")]))
+        text = f"Paragraph {index} " + "lorem ipsum dolor sit amet " * (8 + index % 9)
+        blocks.append(Paragraph(content=[Text(content=text + (extra if index == edit else ""))]))
+    return blocks
+
+
+def _renderer():
+    renderer = ProfessionalPDFRenderer()
+    renderer.layout_checkpoints = True
+    return renderer
+
+
+def _plan(renderer, blocks):
+    renderer._reset_render_state()
+    return renderer._measure_and_plan(blocks)
+
+
+def _paragraph(block, lines):
+    return [PageItem(height=10.0, block=block, line=line, block_lines=lines, text_lines=1)
+            for line in range(lines)]
+
+
+class TestChangedBlocks:
+    """Test suite for changed_blocks."""
+
+    def test_edit_in_the_middle(self):
+        assert changed_blocks(list("abcdef"), list("abXdef")) == (2, 3)
+
+    def test_insertion_and_removal(self):
+        assert changed_blocks(list("abcdef"), list("abcXdef")) == (3, 3)
+        assert changed_blocks(list("abcdef"), list("abdef")) == (2, 3)
+
+    def test_unchanged(self):
+        assert changed_blocks(list("abc"), list("abc")) == (3, 0)
+
+    def test_page_breaks(self):
+        checkpoints = [LayoutCheckpoint(block=0, y=720), LayoutCheckpoint(block=3, line=4, item=9),
+                       LayoutCheckpoint(block=3, line=40, item=45), LayoutCheckpoint(block=5, item=60)]
+        assert page_breaks(checkpoints) == {3: [4, 40], 5: [0]}
+
+
+class TestPagePlan:
+    """Test suite for PagePlan reuse."""
+
+    def test_tail_plan_carries_over(self):
+        builder = PageBuilder()
+        old = [item for block in range(12) for item in _paragraph(block, 4 + block % 5)]
+        new = _paragraph(0, 9) + old[4:]
+        plan = builder.plan_pages(old, 95)
+
+        reused = builder.plan_pages(new, 95, reuse=plan, reuse_from=20)
+        fresh = builder.plan_pages(new, 95)
+        assert reused.cost == fresh.cost and reused.next == fresh.next
+
+    def test_stop(self):
+        items = [item for block in range(6) for item in _paragraph(block, 6)]
+        plan = PageBuilder().plan_pages(items, 95, stop=20)
+        assert plan.start == 20
+        assert list(plan.pages(20)) == list(PageBuilder().plan_pages(items, 95).pages(20))
+
+
+class TestIncrementalLayout:
+    """Test suite for laying edited documents out from checkpoints."""
+
+    def test_checkpoint_per_planned_page(self):
+        renderer = _renderer()
+        _, breaks = _plan(renderer, _blocks())
+        checkpoints = renderer.layout_record.checkpoints
+        assert checkpoints[0] == LayoutCheckpoint(block=0, y=renderer.page_height - renderer.margin_top)
+        assert page_breaks(checkpoints) == breaks
+        assert renderer.layout_record.replanned == len(checkpoints)
+
+    def test_unchanged_document_reuses_everything(self, monkeypatch):
+        renderer = _renderer()
+        blocks = _blocks()
+        measurements, breaks = _plan(renderer, blocks)
+        monkeypatch.setattr(renderer.measurer.__class__, "measure",
+                            lambda *args: (_ for _ in ()).throw(AssertionError))
+
+        again, again_breaks = _plan(renderer, _blocks())
+        assert again_breaks == breaks
+        assert all(a is b for a, b in zip(again, measurements))
+        assert renderer.layout_record.replanned == 1
+
+    def test_edit_measures_only_changed_block(self):
+        renderer = _renderer()
+        blocks = _blocks()
+        measurements, _ = _plan(renderer, blocks)
+
+        edited = _blocks(edit=80, extra="a few more words " * 12)
+        new_measurements, breaks = _plan(renderer, edited)
+        record = renderer.layout_record
+        index = edited.index(next(block for block in edited
+                                  if isinstance(block, Paragraph) and "Paragraph 80 " in block.content[0].content))
+
+        # Only the edited block was measured again
+        assert [a is b for a, b in zip(new_measurements, measurements)].count(False) == 1
+        assert new_measurements[index] is not measurements[index]
+
+        # The pages are the best paging of the whole edited document
+        fresh = _renderer()
+        _, fresh_breaks = _plan(fresh, edited)
+        assert breaks == fresh_breaks
+        assert record.checkpoints == fresh.layout_record.checkpoints
+        assert 0 < record.replanned <= len(record.checkpoints)
+
+    def test_chained_edits_match_fresh_layout(self):
+        """After any edit history, the pages are those of a fresh build."""
+        renderer = _renderer()
+        blocks = _blocks(150)
+        _plan(renderer, blocks)
+        for trial in range(15):
+            index = (trial * 37) % len(blocks)
+            if trial % 3 == 0:
+                blocks = blocks[:index] + [Paragraph(content=[Text(content="Inserted " * (trial + 1))])] + blocks[index:]
+            elif trial % 3 == 1:
+                blocks = blocks[:index] + blocks[index + 1:]
+            else:
+                text = "Edited paragraph " + "word " * (20 + trial * 7)
+                blocks = blocks[:index] + [Paragraph(content=[Text(content=text)])] + blocks[index + 1:]
+            _, breaks = _plan(renderer, blocks)
+            _, fresh_breaks = _plan(_renderer(), blocks)
+            assert breaks == fresh_breaks
+
+    def test_inserted_block_converges_to_old_pages(self):
+        """A one-line paragraph fits in the room a page break leaves, so later pages stay."""
+        renderer = _renderer()
+        blocks = _blocks()
+        _plan(renderer, blocks)
+        old = renderer.layout_record
+
+        edited = blocks[:31] + [Paragraph(content=[Text(content="Inserted")])] + blocks[31:]
+        _plan(renderer, edited)
+        record = renderer.layout_record
+        assert record.replanned < len(record.checkpoints) - 1
+        tail = record.checkpoints[-3:]
+        assert tail == [checkpoint.shifted(1, 1) for checkpoint in old.checkpoints[-3:]]
+
+    def test_settings_change_lays_out_again(self):
+        renderer = _renderer()
+        _plan(renderer, _blocks())
+        renderer.margin_left = 90
+        _plan(renderer, _blocks())
+        assert renderer.layout_record.replanned == len(renderer.layout_record.checkpoints)
+
+    def test_render_matches_full_layout(self):
+        config = {'pdf': {'layout_checkpoints': True}}
+        renderer = ProfessionalPDFRenderer()
+        renderer.render(Document(blocks=_blocks(), frontmatter={}), config)
+        renderer.render(Document(blocks=_blocks(edit=5, extra="more " * 40), frontmatter={}), config)
+
+        full = ProfessionalPDFRenderer()
+        full.render(Document(blocks=_blocks(edit=5, extra="more " * 40), frontmatter={}))
+        assert renderer.layout_record.replanned < len(renderer.layout_record.checkpoints)
+        assert renderer.current_page == full.current_page
+        assert len(renderer.layout_record.checkpoints) == full.current_page + 1
+
+
+class TestIncrementalBuilds:
+    """Test that watch-mode builds carry only the layout record across."""
+
+    def test_removed_option_returns_to_default(self, tmp_path, monkeypatch):
+        from compose import engine
+        from compose.render import pdf_renderer
+
+        renderers = []
+
+        class Recorded(ProfessionalPDFRenderer):
+            def __init__(self):
+                super().__init__()
+                renderers.append(self)
+
+        monkeypatch.setattr(pdf_renderer, "ProfessionalPDFRenderer", Recorded)
+        monkeypatch.setattr(engine, "_layout_record", None)
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "doc.md").write_text("# Title\n\n" + "Some text here. " * 40 + "\n")
+        config = tmp_path / "compose.toml"
+        config.write_text('output = "pdf"\n[pdf]\nform_xobjects = false\n')
+        engine.build("doc.md", str(config), incremental=True)
+        config.write_text('output = "pdf"\n')
+        engine.build("doc.md", str(config), incremental=True)
+
+        first, second = renderers
+        assert second is not first
+        assert not first.reuse_xobjects and second.reuse_xobjects
+        assert second.layout_record.replanned == 1
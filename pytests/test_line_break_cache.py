@@ -0,0 +1,128 @@
+"""
+Tests for the line break cache.
+
+Tests that paragraph fingerprints change with everything that moves a
+break, that cached breaks survive on disk, that a cached paragraph is
+wrapped without measuring it, and that the renderer measures and renders
+each paragraph from one break computation.
+"""
+
+import pytest
+
+from compose.cache_system import LineBreakCache
+from compose.layout.tiered_breaker import LineBreakingStats, TieredLineBreaker
+from compose.model.ast import Document, Paragraph, Text
+from compose.render import pdf_renderer
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+
+TEXT = "Cached paragraphs are broken into lines only once per build " * 8
+
+
+@pytest.fixture
+def break_cache(tmp_path, monkeypatch):
+    """A fresh line break cache stored under tmp_path."""
+    cache = LineBreakCache()
+    cache.disk.cache_dir = tmp_path
+    monkeypatch.setattr(pdf_renderer, "line_break_cache", cache)
+    return cache
+
+
+def _measure(texts):
+    return [float(len(text)) for text in texts]
+
+
+class TestLineBreakCache:
+    """Test suite for LineBreakCache."""
+
+    def test_fingerprint_covers_settings(self):
+        """Text, width, font, size and breaker settings all change the key."""
+        key = LineBreakCache.fingerprint("some text", 100, "afm:Helvetica", 12, "kp:100")
+        assert key == LineBreakCache.fingerprint("some text", 100, "afm:Helvetica", 12, "kp:100")
+        assert len({key,
+                    LineBreakCache.fingerprint("other text", 100, "afm:Helvetica", 12, "kp:100"),
+                    LineBreakCache.fingerprint("some text", 101, "afm:Helvetica", 12, "kp:100"),
+                    LineBreakCache.fingerprint("some text", 100, "afm:Times-Roman", 12, "kp:100"),
+                    LineBreakCache.fingerprint("some text", 100, "afm:Helvetica", 11, "kp:100"),
+                    LineBreakCache.fingerprint("some text", 100, "afm:Helvetica", 12, "kp:200")}) == 6
+
+    def test_breaks_persist(self, break_cache, tmp_path):
+        """Persistent breaks are found by a new cache reading the same directory."""
+        break_cache.set_breaks("linebreaks:abc", [3, 5], [0.25, 0.0])
+        reloaded = LineBreakCache()
+        reloaded.disk.cache_dir = tmp_path
+        assert reloaded.get_breaks("linebreaks:abc") == ([3, 5], [0.25, 0.0])
+        assert reloaded.get_breaks("linebreaks:abc", persistent=False) == ([3, 5], [0.25, 0.0])
+        assert reloaded.get_breaks("linebreaks:missing") is None
+        assert (reloaded.hits, reloaded.misses) == (2, 1)
+
+    def test_memory_only_breaks(self, break_cache, tmp_path):
+        """Breaks stored without persistence never reach the disk."""
+        break_cache.set_breaks("linebreaks:abc", [3], [0.0], persistent=False)
+        assert break_cache.get_breaks("linebreaks:abc", persistent=False) == ([3], [0.0])
+        assert not list(tmp_path.iterdir())
+
+    def test_memory_bounded_lru(self, break_cache):
+        """Past max_entries the least recently used breaks are dropped."""
+        break_cache.max_entries = 2
+        for name in ("a", "b", "c"):
+            break_cache.set_breaks(f"linebreaks:{name}", [1], [0.0], persistent=False)
+            break_cache.get_breaks("linebreaks:a", persistent=False)
+        assert list(break_cache.breaks) == ["linebreaks:c", "linebreaks:a"]
+        assert break_cache.evictions == 1
+
+    def test_sweep_bounds_disk(self, break_cache, tmp_path):
+        """sweep() removes the oldest files beyond max_disk."""
+        for i in range(4):
+            break_cache.set_breaks(f"linebreaks:{i}", list(range(50)), [0.0] * 50)
+        size = max(f.stat().st_size for f in tmp_path.iterdir())
+        break_cache.max_disk = 2 * size
+        assert break_cache.sweep() == 2
+        assert len(list(tmp_path.iterdir())) == 2
+
+
+class TestCachedWrapping:
+    """Test suite for wrapping through the cache."""
+
+    def test_cached_paragraph_is_not_measured(self, break_cache):
+        """A second wrap of the same paragraph reuses the stored breaks."""
+        stats = LineBreakingStats()
+        breaker = TieredLineBreaker(stats=stats, cache=break_cache)
+        measured = []
+        first = breaker.wrap_text(TEXT, 40, "test", 1, lambda texts: measured.append(texts) or _measure(texts))
+        second = breaker.wrap_text(TEXT, 40, "test", 1, lambda texts: pytest.fail("measured again"))
+        assert first == second == TieredLineBreaker().wrap_words(TEXT.split(), _measure(TEXT.split()), 1, 40)
+        assert len(measured) == 1 and stats.paragraphs == 1
+        assert (break_cache.hits, break_cache.misses) == (1, 1)
+
+    def test_prebroken_without_cache(self):
+        """Breaks found ahead are used, and misses broken, without a cache."""
+        breaker = TieredLineBreaker()
+        other = LineBreakCache.fingerprint("other", 40, "test", 1, breaker.settings_key)
+        lines = breaker.wrap_text(TEXT, 40, "test", 1, _measure, known={other: ([1], [0.0])})
+        assert lines == breaker.wrap_words(TEXT.split(), _measure(TEXT.split()), 1, 40)
+
+    def test_settings_change_breaks_again(self, break_cache):
+        """Changing the breaker's threshold does not reuse older breaks."""
+        breaker = TieredLineBreaker(cache=break_cache)
+        breaker.wrap_text(TEXT, 40, "test", 1, _measure)
+        breaker.badness_threshold = 10
+        breaker.wrap_text(TEXT, 40, "test", 1, _measure)
+        assert break_cache.misses == 2
+
+    def test_measure_and_render_share_breaks(self, break_cache):
+        """Identical paragraphs are broken once; rendering draws the measured lines."""
+        renderer = ProfessionalPDFRenderer()
+        doc = Document(blocks=[Paragraph(content=[Text(content=TEXT)]) for _ in range(3)], frontmatter={})
+        renderer.render(doc)
+        assert (break_cache.misses, break_cache.hits) == (1, 2)
+        assert renderer.measurer.measure(doc.blocks[0]).content_height > 0
+
+    def test_disk_cache_option(self, break_cache, tmp_path):
+        """Breaks are only written to disk with the line_break_cache option."""
+        doc = Document(blocks=[Paragraph(content=[Text(content=TEXT)])], frontmatter={})
+        ProfessionalPDFRenderer().render(doc)
+        assert not list(tmp_path.iterdir())
+
+        doc.blocks[0].content[0].content += " with a new ending"
+        ProfessionalPDFRenderer().render(doc, {'pdf': {'line_break_cache': True}})
+        assert list(tmp_path.iterdir())
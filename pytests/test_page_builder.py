@@ -0,0 +1,140 @@
+"""
+Tests for optimal page breaking.
+
+Tests that the page builder fills pages without overflowing them, that it
+moves lines and blocks to avoid widows, orphans and stranded headings
+where greedy filling leaves them, and that the PDF renderer, the
+multi-page renderer and the layout generator page documents with it.
+"""
+
+from compose.model.ast import Document, Heading, MathBlock, Paragraph, Text
+from compose.render.advanced_layout_rules import HeadingOrphanRule, MinimumPageFullnessRule
+from compose.render.constraint_solver import ConstraintSolver
+from compose.render.layout_generator import LayoutGenerator
+from compose.render.layout_rules import NoOrphanLinesRule, NoOverflowRule
+from compose.render.multi_page import MultiPageRenderer
+from compose.render.page_builder import PageBuilder, PageItem
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+
+
+def _paragraph(block, lines, height=10.0, space=0.0):
+    return [PageItem(height=height, space_before=space if line == 0 else 0.0, block=block,
+                     line=line, block_lines=lines, text_lines=1) for line in range(lines)]
+
+
+class TestPageBuilder:
+    """Test suite for PageBuilder."""
+
+    def test_fills_pages(self):
+        items = [PageItem(height=40, block=index) for index in range(5)]
+        assert PageBuilder().break_pages(items, 100) == [(0, 2), (2, 4), (4, 5)]
+
+    def test_space_dropped_at_page_top(self):
+        items = [PageItem(height=45, space_before=10, block=index) for index in range(4)]
+        assert PageBuilder().break_pages(items, 100) == [(0, 2), (2, 4)]
+
+    def test_avoids_widow(self):
+        """Greedy filling leaves the last line alone; one line moves with it."""
+        pages = PageBuilder().break_pages(_paragraph(0, 10), 95)
+        assert pages == [(0, 8), (8, 10)]
+
+    def test_avoids_orphan(self):
+        items = [PageItem(height=80, block=0)] + _paragraph(1, 5)
+        assert PageBuilder().break_pages(items, 95) == [(0, 1), (1, 6)]
+
+    def test_orphan_allowed_without_its_rule(self):
+        items = [PageItem(height=80, block=0)] + _paragraph(1, 5)
+        builder = PageBuilder.from_rules([NoOverflowRule()])
+        assert builder.break_pages(items, 95) == [(0, 2), (2, 6)]
+
+    def test_keeps_heading_with_content(self):
+        items = [PageItem(height=70, block=0), PageItem(height=20, block=1, heading=True)] + _paragraph(2, 5)
+        assert PageBuilder().break_pages(items, 95) == [(0, 1), (1, 7)]
+
+    def test_forced_break(self):
+        items = [PageItem(height=10, block=0), PageItem(height=10, block=1, forced_break=True)]
+        assert PageBuilder().break_pages(items, 100) == [(0, 1), (1, 2)]
+
+    def test_oversized_item_alone(self):
+        items = [PageItem(height=10, block=0), PageItem(height=250, block=1), PageItem(height=10, block=2)]
+        assert PageBuilder().break_pages(items, 100) == [(0, 1), (1, 2), (2, 3)]
+
+    def test_first_page_left_blank(self):
+        """A block that does not fit the room left on the first page starts the next."""
+        items = [PageItem(height=50, block=0)]
+        assert PageBuilder().break_pages(items, 100, first_page_height=30) == [(0, 0), (0, 1)]
+        assert PageBuilder().break_pages(items, 100, first_page_height=60) == [(0, 1)]
+
+    def test_from_rules(self):
+        builder = PageBuilder.from_rules([NoOrphanLinesRule(), HeadingOrphanRule(),
+                                          MinimumPageFullnessRule(min_fullness=0.5)])
+        assert builder.orphan_penalty > 0 and builder.heading_penalty > 0
+        assert builder.widow_penalty == 0
+        assert builder.min_fullness == 0.5 and builder.max_lines is None
+
+
+class TestPagination:
+    """Test suite for paging documents with the page builder."""
+
+    def test_pdf_paragraphs_split_without_widows(self):
+        blocks = []
+        for index in range(30):
+            if index % 5 == 0:
+                blocks.append(Heading(level=2, content=[Text(content=f"Section {index}")]))
+            blocks.append(Paragraph(content=[Text(content="lorem ipsum dolor sit amet " * (10 + index % 7))]))
+        renderer = ProfessionalPDFRenderer()
+        renderer._reset_render_state()
+        measurements = [renderer.measurer.measure(block) for block in blocks]
+        page_breaks = renderer._plan_page_breaks(blocks, measurements)
+
+        assert page_breaks
+        for index, lines in page_breaks.items():
+            layout = measurements[index].paragraph_layout
+            for line in lines:
+                assert line == 0 or 2 <= line <= len(layout.lines) - 2
+            assert not isinstance(blocks[index - 1], Heading) or lines != [0]
+
+        errors = []
+        renderer._record_validation_errors = errors.extend
+        renderer.render(Document(blocks=blocks, frontmatter={}))
+        assert not [error for error in errors if "margin_bottom" in error]
+
+    def test_math_blocks_stay_above_bottom_margin(self):
+        """Display math is measured as tall as the renderer draws it."""
+        blocks = []
+        for index in range(60):
+            blocks.append(Paragraph(content=[Text(content="lorem ipsum dolor " * (1 + index % 3))]))
+            blocks.append(MathBlock(content="$$a^2 + b^2 = c^2$$"))
+        renderer = ProfessionalPDFRenderer()
+        renderer._reset_render_state()
+        assert renderer.measurer.measure(blocks[1]).content_height == 2 * renderer.current_font_size
+
+        errors = []
+        renderer._record_validation_errors = errors.extend
+        renderer.render(Document(blocks=blocks, frontmatter={}))
+        assert not [error for error in errors if "margin_bottom" in error]
+
+    def test_multi_page_keeps_heading_with_content(self):
+        """Greedy filling ends the first page with the heading."""
+        blocks = [Paragraph(content=[Text(content=f"Paragraph {index}")]) for index in range(2)]
+        blocks.append(Heading(level=2, content=[Text(content="Section")]))
+        blocks.append(Paragraph(content=[Text(content="Section text")]))
+        renderer = MultiPageRenderer(page_height=230)
+        pages = renderer.render_multi_page(Document(blocks=blocks, frontmatter={}), 'html')
+
+        assert len(pages) > 1
+        assert all(not isinstance(page['blocks'][-1], Heading) for page in pages)
+
+    def test_generator_layout_needs_no_solving(self):
+        """Greedy filling ends the first page with the heading."""
+        blocks = [Paragraph(content=[Text(content="Filler text " * 28)]) for _ in range(6)]
+        blocks.append(Heading(level=2, content=[Text(content="Section")]))
+        blocks.append(Paragraph(content=[Text(content="Section text " * 30)]))
+        page_config = {'width': 612, 'height': 792, 'margin_left': 72, 'margin_right': 72,
+                       'margin_top': 72, 'margin_bottom': 72}
+        generator = LayoutGenerator({}, page_config)
+        state = generator.generate_initial_layout(Document(blocks=blocks, frontmatter={}))
+
+        solver = ConstraintSolver(rules=[NoOverflowRule(), HeadingOrphanRule()], verbose=False)
+        solver.solve(state, generator)
+        assert [entry['violations'] for entry in solver.iteration_history] == [0]
@@ -0,0 +1,67 @@
+"""
+Tests for measure-once paragraph layout.
+
+Tests that measuring a paragraph records the lines it will be drawn in,
+that rendering draws exactly those lines without breaking the paragraph
+again, and that the measured height is the height rendering uses.
+"""
+
+from compose.model.ast import Paragraph, Text
+from compose.render.clean_renderer import CleanRenderer
+from compose.render.layout_measurer import ParagraphLayout
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+
+TEXT = "Measured lines are drawn exactly as they were broken " * 6
+
+
+def _renderer():
+    renderer = ProfessionalPDFRenderer()
+    renderer._reset_render_state()
+    return renderer
+
+
+class TestParagraphLayout:
+    """Test suite for ParagraphLayout."""
+
+    def test_from_lines(self):
+        layout = ParagraphLayout.from_lines(["one", "two", "three"], 14.0)
+        assert layout.baselines == [0.0, 14.0, 28.0]
+        assert layout.height == 42.0
+
+    def test_measurement_carries_layout(self):
+        renderer = _renderer()
+        paragraph = Paragraph(content=[Text(content=TEXT)])
+        measurement = renderer.measurer.measure(paragraph)
+        layout = measurement.paragraph_layout
+        assert layout.lines == renderer._paragraph_lines(paragraph)
+        assert measurement.content_height == layout.height
+
+    def test_empty_paragraph_has_no_height(self):
+        """A paragraph without words takes no lines."""
+        measurement = _renderer().measurer.measure(Paragraph(content=[Text(content="  ")]))
+        assert measurement.paragraph_layout.lines == []
+        assert measurement.content_height == 0
+
+
+class TestRenderFromLayout:
+    """Test suite for rendering measured paragraphs."""
+
+    def test_render_does_not_break_again(self, monkeypatch):
+        renderer = _renderer()
+        paragraph = Paragraph(content=[Text(content=TEXT)])
+        layout = renderer.measurer.measure(paragraph).paragraph_layout
+        monkeypatch.setattr(renderer, "_wrap_text", lambda *args: (_ for _ in ()).throw(AssertionError))
+
+        drawn = []
+        monkeypatch.setattr(renderer, "_render_text_with_inline_math", lambda line, y: drawn.append((line, y)))
+        y = renderer._render_paragraph(paragraph, 700, layout)
+        assert drawn == [(line, 700 - baseline) for line, baseline in zip(layout.lines, layout.baselines)]
+        assert y == 700 - layout.height
+
+    def test_clean_renderer_uses_layout(self, monkeypatch):
+        renderer = _renderer()
+        paragraph = Paragraph(content=[Text(content=TEXT)])
+        layout = ParagraphLayout.from_lines(["first line", "second line"], 20.0)
+        monkeypatch.setattr(renderer, "_update_content_bottom", lambda y, descender: None, raising=False)
+        monkeypatch.setattr(renderer, "_wrap_text", lambda *args: (_ for _ in ()).throw(AssertionError))
+        assert CleanRenderer(renderer).render_paragraph(paragraph, 500, layout) == 460
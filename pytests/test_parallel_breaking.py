@@ -0,0 +1,98 @@
+"""
+Tests for parallel paragraph breaking.
+
+Tests that paragraphs broken on the process pool break exactly as they
+would on demand, that small documents never start a pool, and that the
+renderer measures and renders from the breaks the pool produced.
+"""
+
+import pytest
+
+from compose.cache_system import LineBreakCache
+from compose.layout.parallel_breaking import ParallelParagraphBreaker
+from compose.layout.tiered_breaker import LineBreakingStats, TieredLineBreaker
+from compose.model.ast import Document, Paragraph, Text
+from compose.render import pdf_renderer
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+
+TEXTS = [f"Paragraph {i} breaks on a worker process " * (3 + i % 5) for i in range(12)]
+
+
+@pytest.fixture
+def break_cache(tmp_path, monkeypatch):
+    """A fresh line break cache stored under tmp_path."""
+    cache = LineBreakCache()
+    cache.disk.cache_dir = tmp_path
+    monkeypatch.setattr(pdf_renderer, "line_break_cache", cache)
+    return cache
+
+
+def _measure(texts):
+    return [float(len(text)) for text in texts]
+
+
+class TestParallelParagraphBreaker:
+    """Test suite for ParallelParagraphBreaker."""
+
+    def test_pool_breaks_match_serial(self, break_cache):
+        """Wrapping after the pool ran reuses its breaks, which match serial breaking."""
+        stats = LineBreakingStats()
+        breaker = TieredLineBreaker(stats=stats, cache=break_cache)
+        stage = ParallelParagraphBreaker(breaker, workers=2, threshold=4, batch_size=5)
+        broken = stage.break_paragraphs(TEXTS + TEXTS[:3], 40, "test", 1, _measure)
+        assert len(broken) == len(TEXTS)
+        assert stats.paragraphs == len(TEXTS)
+
+        serial = TieredLineBreaker()
+        for text in TEXTS:
+            lines = breaker.wrap_text(text, 40, "test", 1, lambda texts: pytest.fail("measured again"))
+            assert lines == serial.wrap_words(text.split(), _measure(text.split()), 1, 40)
+            assert breaker.wrap_text(text, 40, "test", 1, _measure, known=broken) == lines
+        assert break_cache.hits == len(TEXTS)
+
+    def test_breaks_outlive_cache_bound(self, break_cache):
+        """Breaks evicted from the bounded cache are still found from the returned ones."""
+        break_cache.max_entries = 5
+        breaker = TieredLineBreaker(cache=break_cache)
+        broken = ParallelParagraphBreaker(breaker, workers=2, threshold=4).break_paragraphs(
+            TEXTS, 40, "test", 1, _measure)
+        assert len(broken) == len(TEXTS) > break_cache.max_entries
+        for text in TEXTS:
+            breaker.wrap_text(text, 40, "test", 1, lambda texts: pytest.fail("broken twice"), known=broken)
+
+    def test_below_threshold_stays_serial(self, break_cache):
+        """Too few uncached paragraphs leave the cache untouched."""
+        breaker = TieredLineBreaker(cache=break_cache)
+        breaker.wrap_text(TEXTS[0], 40, "test", 1, _measure)
+        stage = ParallelParagraphBreaker(breaker, workers=2, threshold=len(TEXTS))
+        assert stage.break_paragraphs(TEXTS, 40, "test", 1, _measure) == {}
+        assert not break_cache.has_breaks(LineBreakCache.fingerprint(
+            TEXTS[1], 40, "test", 1, breaker.settings_key), persistent=False)
+
+    def test_needs_cache_and_workers(self):
+        """Without a cache or with a single worker nothing is broken ahead."""
+        assert ParallelParagraphBreaker(TieredLineBreaker(), workers=2, threshold=0).break_paragraphs(
+            TEXTS, 40, "test", 1, _measure) == {}
+        breaker = TieredLineBreaker(cache=LineBreakCache())
+        assert ParallelParagraphBreaker(breaker, workers=1, threshold=0).break_paragraphs(
+            TEXTS, 40, "test", 1, _measure) == {}
+
+    def test_renderer_prebreaks_document(self, break_cache):
+        """Measuring finds every paragraph already broken."""
+        doc = Document(blocks=[Paragraph(content=[Text(content=text)]) for text in TEXTS],
+                       frontmatter={'title': 'Parallel'})
+        renderer = ProfessionalPDFRenderer()
+        pdf = renderer.render(doc, {'pdf': {'break_workers': 2, 'parallel_break_threshold': 4}})
+        assert pdf.startswith(b'%PDF')
+        assert len(renderer.prebroken) == len(TEXTS)
+        assert break_cache.misses == 0
+
+    def test_renderer_keeps_breaks_above_cache_bound(self, break_cache):
+        """A document with more paragraphs than the cache holds is still broken only once."""
+        break_cache.max_entries = 5
+        doc = Document(blocks=[Paragraph(content=[Text(content=text)]) for text in TEXTS],
+                       frontmatter={})
+        renderer = ProfessionalPDFRenderer()
+        renderer.render(doc, {'pdf': {'break_workers': 2, 'parallel_break_threshold': 4}})
+        assert len(renderer.prebroken) == len(TEXTS)
+        assert break_cache.misses == 0
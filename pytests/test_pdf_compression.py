@@ -0,0 +1,159 @@
+"""
+Tests for content stream compression.
+
+Tests the compression levels, statistics, that parallel compression
+produces the same file as compressing on one thread, and reuse of
+compressed pages through the stream cache.
+"""
+
+import os
+import re
+import time
+import zlib
+
+import pytest
+from compose.cache_system import ContentStreamCache
+from compose.render import pdf_renderer
+from compose.render.pdf_compression import ContentCompressor
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Heading, Paragraph, Text
+
+
+def _document() -> Document:
+    blocks = []
+    for i in range(10):
+        blocks.append(Heading(level=1, content=[Text(content=f"Chapter {i}")]))
+        for _ in range(5):
+            blocks.append(Paragraph(content=[Text(content="Compressed page content. " * 15)]))
+    return Document(blocks=blocks, frontmatter={})
+
+
+def _render(**pdf_options) -> bytes:
+    data = ProfessionalPDFRenderer().render(_document(), {'pdf': pdf_options})
+    return re.sub(rb"D:\d{14}", b"D:00000000000000", data)
+
+
+class TestContentCompressor:
+    """Test suite for ContentCompressor."""
+
+    def test_round_trip(self):
+        """Compressed streams inflate back to the original data."""
+        compressor = ContentCompressor(level=9, workers=4)
+        data = b"BT /F1 12 Tf (Hello) Tj ET\n" * 50
+        encoded, filters = compressor.encode(data)
+        compressor.close()
+        assert filters == "/FlateDecode"
+        assert zlib.decompress(encoded) == data
+
+    def test_level_zero_is_uncompressed(self):
+        """Draft level writes the stream as-is with no filter."""
+        compressor = ContentCompressor(level=0)
+        encoded, filters = compressor.encode(b"BT ET")
+        assert encoded == b"BT ET"
+        assert filters is None
+
+    def test_stats_accumulate(self):
+        """Every stream is counted with its input and output sizes."""
+        compressor = ContentCompressor(level=6, workers=2)
+        futures = [compressor.submit(b"q Q\n" * 100) for _ in range(8)]
+        for future in futures:
+            compressor.result(future)
+        compressor.close()
+        assert compressor.stats.streams == 8
+        assert compressor.stats.bytes_in == 8 * 400
+        assert compressor.stats.bytes_out < compressor.stats.bytes_in
+        assert "8 streams at level 6" in compressor.stats.summary(6)
+
+    def test_invalid_level_rejected(self):
+        """Levels outside zlib's range are rejected."""
+        with pytest.raises(ValueError):
+            ContentCompressor(level=10)
+
+
+class TestRendererCompression:
+    """Test compression settings in the PDF renderer."""
+
+    def test_output_independent_of_worker_count(self):
+        """Parallel compression keeps the file byte-for-byte identical."""
+        assert _render(compression_workers=1) == _render(compression_workers=8)
+        assert (_render(streaming=True, compression_workers=1)
+                == _render(streaming=True, compression_workers=8))
+
+    def test_release_level_is_smaller_than_draft(self):
+        """Level 9 output is smaller than uncompressed draft output."""
+        draft = _render(compression_level=0)
+        release = _render(compression_level=9)
+        assert b"/FlateDecode" not in draft
+        assert len(release) < len(draft)
+
+    def test_compression_stats_reported(self):
+        """The renderer exposes the stats of its last render."""
+        renderer = ProfessionalPDFRenderer()
+        renderer.render(_document(), {'pdf': {'compression_level': 9}})
+        stats = renderer.compression_stats
+        assert stats.streams == renderer.emitter.page_count
+        assert stats.wall_seconds >= 0
+
+
+@pytest.fixture
+def stream_cache(tmp_path, monkeypatch):
+    """A fresh content stream cache stored under tmp_path."""
+    cache = ContentStreamCache()
+    cache.cache.cache_dir = tmp_path
+    monkeypatch.setattr(pdf_renderer, "content_stream_cache", cache)
+    return cache
+
+
+class TestStreamCache:
+    """Test reuse of compressed page streams across builds."""
+
+    def test_rebuild_reuses_every_page(self, stream_cache):
+        """An unchanged rebuild compresses nothing and writes the same file."""
+        first = ProfessionalPDFRenderer()
+        first_pdf = first.render(_document(), {'pdf': {'stream_cache': True}})
+        assert first.compression_stats.cache_misses == first.emitter.page_count
+
+        second = ProfessionalPDFRenderer()
+        second_pdf = second.render(_document(), {'pdf': {'stream_cache': True}})
+        stats = second.compression_stats
+        assert stats.cache_hits == second.emitter.page_count
+        assert stats.streams == 0
+        assert "stream cache" in stats.summary(6)
+        strip = lambda data: re.sub(rb"D:\d{14}", b"", data)
+        assert strip(second_pdf) == strip(first_pdf)
+
+    def test_cache_persists_on_disk(self, stream_cache, tmp_path):
+        """A new cache instance finds streams stored by an earlier build."""
+        key = ContentStreamCache.fingerprint(b"BT ET", "3 0 R", 6)
+        stream_cache.set_stream(key, b"compressed")
+
+        reloaded = ContentStreamCache()
+        reloaded.cache.cache_dir = tmp_path
+        assert reloaded.get_stream(key) == b"compressed"
+        assert reloaded.hits == 1
+
+    def test_sweep_bounds_directory(self, stream_cache, tmp_path):
+        """Streams beyond the size bound or unused for too long are removed, oldest first."""
+        keys = [ContentStreamCache.fingerprint(b"page %d" % i, "3 0 R", 6) for i in range(6)]
+        for age, key in enumerate(keys):
+            stream_cache.set_stream(key, b"x" * 1000)
+            path = stream_cache.cache._cache_file_path(key)
+            os.utime(path, (time.time() - age * 60, time.time() - age * 60))
+        size = stream_cache.cache._cache_file_path(keys[0]).stat().st_size
+        stream_cache.max_disk = 3 * size
+
+        assert stream_cache.sweep() == 3
+        assert [stream_cache.cache._cache_file_path(key).exists() for key in keys] == [True] * 3 + [False] * 3
+        assert stream_cache.cache.sweep_persistent(10 * size, max_age=90) == 1
+
+    def test_build_sweeps_cache(self, stream_cache, tmp_path):
+        """A build leaves the stream directory within its bound."""
+        stream_cache.max_disk = 0
+        ProfessionalPDFRenderer().render(_document(), {'pdf': {'stream_cache': True}})
+        assert list(tmp_path.glob('*.cache')) == []
+
+    def test_key_covers_level_and_resources(self):
+        """Streams are only reused with the same level and resources."""
+        base = ContentStreamCache.fingerprint(b"BT ET", "3 0 R", 6)
+        assert base != ContentStreamCache.fingerprint(b"BT ET", "3 0 R", 9)
+        assert base != ContentStreamCache.fingerprint(b"BT ET", "4 0 R", 6)
@@ -0,0 +1,120 @@
+"""
+Tests for streaming page emission.
+
+Tests that pages are written as soon as they are finished, that the
+streamed file matches the buffered one, and that per-page state is
+released once a page is on disk.
+"""
+
+import gc
+import io
+import re
+import weakref
+
+from compose.render.pdf_compression import ContentCompressor
+from compose.render.layout_measurer import LayoutMeasurer
+from compose.render.pdf_emitter import PageEmitter
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.pdf_writer import PDFWriter
+from compose.render.rendering_tracker import RenderingTracker
+from compose.model.ast import Document, Heading, Paragraph, Text
+
+
+def _long_document(sections: int = 12) -> Document:
+    blocks = []
+    for i in range(sections):
+        blocks.append(Heading(level=1, content=[Text(content=f"Section {i}")]))
+        for _ in range(4):
+            blocks.append(Paragraph(content=[Text(content="Streaming output keeps memory flat. " * 12)]))
+    return Document(blocks=blocks, frontmatter={})
+
+
+def _strip_dates(data: bytes) -> bytes:
+    return re.sub(rb"D:\d{14}", b"D:00000000000000", data)
+
+
+class TestPageEmitter:
+    """Test suite for PageEmitter."""
+
+    def test_pages_reference_reserved_objects(self):
+        """Pages point at the reserved page tree and resources numbers."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        pages_root = writer.reserve_object()
+        resources = writer.reserve_object()
+        emitter = PageEmitter(writer, 612, 792, ContentCompressor(workers=1), pages_root, resources)
+
+        first = emitter.emit_page(["BT", "ET"])
+        second = emitter.emit_page(["BT", "ET"], annotations=["<< /Type /Annot >>"])
+        emitter.write_page_tree()
+
+        data = sink.getvalue()
+        assert emitter.page_count == 2
+        assert f"/Parent {pages_root} 0 R".encode() in data
+        assert f"/Resources {resources} 0 R".encode() in data
+        assert f"/Kids [{first} 0 R {second} 0 R]".encode() in data
+        assert data.count(b"/Annots [") == 1
+
+
+class TestStreamingRender:
+    """Test the renderer's streaming mode."""
+
+    def test_streaming_matches_buffered_output(self):
+        """Streaming only changes when pages are written, not what is written."""
+        buffered = ProfessionalPDFRenderer().render(_long_document(), {})
+        streamed = ProfessionalPDFRenderer().render(_long_document(), {'pdf': {'streaming': True}})
+        assert _strip_dates(streamed) == _strip_dates(buffered)
+
+    def test_pages_released_after_emission(self):
+        """No page content or tracker records are left once rendering ends."""
+        renderer = ProfessionalPDFRenderer()
+        renderer.render(_long_document(), {'pdf': {'streaming': True}})
+        assert len(renderer.pages) > 1
+        assert all(page is None for page in renderer.pages)
+        assert renderer.tracker.content == []
+        assert renderer.emitter.page_count == len(renderer.pages)
+
+    def test_drawn_paragraph_layouts_released(self, monkeypatch):
+        """Paragraphs already drawn no longer hold their measured lines."""
+        layouts, alive = [], []
+        measure = LayoutMeasurer.measure
+        render_block = ProfessionalPDFRenderer._render_block_clean
+
+        def tracked_measure(measurer, block, spacing_after=None):
+            result = measure(measurer, block, spacing_after)
+            if result.paragraph_layout is not None:
+                layouts.append(weakref.ref(result.paragraph_layout))
+            return result
+
+        def counting_render(renderer, block, y, measurement=None, page_breaks=()):
+            gc.collect()
+            alive.append(sum(ref() is not None for ref in layouts))
+            return render_block(renderer, block, y, measurement, page_breaks)
+
+        monkeypatch.setattr(LayoutMeasurer, "measure", tracked_measure)
+        monkeypatch.setattr(ProfessionalPDFRenderer, "_render_block_clean", counting_render)
+        ProfessionalPDFRenderer().render(_long_document(), {'pdf': {'streaming': True}})
+        assert len(layouts) == 48
+        assert alive[0] == 48 and alive[-1] == 1
+
+    def test_streaming_to_stream(self):
+        """Streamed output can go straight to a caller-provided stream."""
+        sink = io.BytesIO()
+        ProfessionalPDFRenderer().render(_long_document(2), {'pdf': {'streaming': True}}, output=sink)
+        data = sink.getvalue()
+        assert data.startswith(b"%PDF-")
+        assert data.rstrip().endswith(b"%%EOF")
+
+
+class TestTrackerRelease:
+    """Test RenderingTracker.release_page."""
+
+    def test_release_page_moves_records(self):
+        """Only the requested page's records are moved out."""
+        tracker = RenderingTracker()
+        tracker.record_text(10, 100, 50, 12, page=0)
+        tracker.record_text(10, 100, 50, 12, page=1)
+
+        released = tracker.release_page(0)
+        assert [item.page for item in released.content] == [0]
+        assert [item.page for item in tracker.content] == [1]
@@ -0,0 +1,230 @@
+"""
+Tests for TrueType font embedding.
+
+Tests that font tables are read correctly, that subsets keep exactly
+the used glyphs (and the components of composite glyphs), that parsed
+metrics are cached by file hash, and that the renderer embeds fonts as
+Type 0 fonts.
+"""
+
+import struct
+
+import pytest
+
+from compose.cache_system import FontMetricsCache
+from compose.render import pdf_fonts, pdf_renderer
+from compose.render.pdf_fonts import (
+    EmbeddedFont, FontFormatError, FontMetrics, load_font_metrics,
+    read_font_metrics, subset_truetype,
+)
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Paragraph, Text
+
+
+def _square(size: int) -> bytes:
+    """A simple glyph: one closed square contour."""
+    header = struct.pack(">hhhhh", 1, 0, 0, size, size)
+    points = struct.pack(">HH", 3, 0) + b"\x01" * 4  # endPts, no instructions, on-curve flags
+    xs = struct.pack(">4h", 0, size, 0, -size)
+    ys = struct.pack(">4h", 0, 0, size, 0)
+    return header + points + xs + ys
+
+
+def _composite(component: int) -> bytes:
+    """A composite glyph drawing one other glyph unchanged."""
+    return struct.pack(">hhhhhHHhh", -1, 0, 0, 500, 500, 0x0001 | 0x0002, component, 0, 0)
+
+
+def _build_font(fs_type: int = 0) -> bytes:
+    """
+    Build a minimal TrueType font.
+
+    Glyphs: 0 .notdef, 1 space, 2 'A', 3 'B', 4 'C' (a composite of 'A').
+    """
+    glyphs = [_square(400), b"", _square(500), _square(600), _composite(2)]
+    glyf = b""
+    loca = []
+    for glyph in glyphs:
+        loca.append(len(glyf) // 2)
+        glyf += glyph + b"\0" * (len(glyph) % 2)
+    loca.append(len(glyf) // 2)
+
+    cmap_sub = struct.pack(">HHHHHHH", 4, 16 + 8 * 3, 0, 6, 4, 1, 2)
+    cmap_sub += struct.pack(">3H", 0x20, 0x43, 0xFFFF) + b"\0\0"
+    cmap_sub += struct.pack(">3H", 0x20, 0x41, 0xFFFF)
+    cmap_sub += struct.pack(">3h", 1 - 0x20, 2 - 0x41, 1)
+    cmap_sub += struct.pack(">3H", 0, 0, 0)
+    cmap = struct.pack(">HHHHI", 0, 1, 3, 1, 12) + cmap_sub
+
+    ps_name = "TestSans".encode('utf-16-be')
+    name = struct.pack(">HHH", 0, 1, 18) + struct.pack(">6H", 3, 1, 0x409, 6, len(ps_name), 0) + ps_name
+
+    os2 = struct.pack(">HhHHH", 4, 500, 400, 5, fs_type) + b"\0" * 78 + struct.pack(">h", 700) + b"\0" * 6
+
+    tables = {
+        b"head": (struct.pack(">IIIIHH", 0x00010000, 0, 0, 0x5F0F3CF5, 0, 1000) + b"\0" * 16
+                  + struct.pack(">4hHHhhh", -50, -200, 1000, 900, 0, 8, 2, 0, 0)),
+        b"hhea": struct.pack(">Ihhh", 0x00010000, 800, -200, 0) + b"\0" * 24 + struct.pack(">H", 4),
+        b"maxp": struct.pack(">IH", 0x00005000, len(glyphs)),
+        b"hmtx": struct.pack(">8h", 500, 0, 250, 0, 600, 0, 700, 0) + struct.pack(">h", 0),
+        b"cmap": cmap,
+        b"loca": struct.pack(f">{len(loca)}H", *loca),
+        b"glyf": glyf,
+        b"name": name,
+        b"post": struct.pack(">IiHhI", 0x00030000, 0, 0, 0, 0) + b"\0" * 16,
+        b"OS/2": os2,
+    }
+
+    tags = sorted(tables)
+    font = bytearray(struct.pack(">IHHHH", 0x00010000, len(tags), 0, 0, 0))
+    offset = 12 + 16 * len(tags)
+    body = b""
+    for tag in tags:
+        font += struct.pack(">4sIII", tag, 0, offset + len(body), len(tables[tag]))
+        body += tables[tag] + b"\0" * (-len(tables[tag]) % 4)
+    return bytes(font) + body
+
+
+@pytest.fixture
+def font_path(tmp_path):
+    path = tmp_path / "TestSans.ttf"
+    path.write_bytes(_build_font())
+    return str(path)
+
+
+@pytest.fixture
+def metrics_cache(tmp_path):
+    cache = FontMetricsCache()
+    cache.cache.cache_dir = tmp_path
+    return cache
+
+
+class TestFontMetrics:
+    """Test suite for reading TrueType tables."""
+
+    def test_reads_tables(self):
+        """Names, vertical metrics, advances and the cmap are read."""
+        metrics = read_font_metrics(_build_font())
+        assert metrics.postscript_name == "TestSans"
+        assert metrics.units_per_em == 1000
+        assert (metrics.ascent, metrics.descent, metrics.cap_height) == (800, -200, 700)
+        assert metrics.num_glyphs == 5
+        assert list(metrics.advances) == [500, 250, 600, 700, 700]
+        assert metrics.cmap == {0x20: 1, 0x41: 2, 0x42: 3, 0x43: 4}
+
+    def test_compact_round_trip(self):
+        """Compact metrics rebuild to the same values."""
+        metrics = read_font_metrics(_build_font())
+        assert FontMetrics.from_compact(metrics.to_compact()) == metrics
+
+    def test_rejects_cff_and_restricted_fonts(self):
+        """CFF outlines and fonts whose licence forbids embedding are refused."""
+        with pytest.raises(FontFormatError):
+            read_font_metrics(b"OTTO" + _build_font()[4:])
+        with pytest.raises(FontFormatError):
+            read_font_metrics(_build_font(fs_type=0x0002))
+
+    def test_metrics_cached_by_file_hash(self, font_path, metrics_cache, monkeypatch):
+        """A second load is served from the cache without parsing."""
+        first, digest = load_font_metrics(font_path, metrics_cache)
+
+        def fail(data):
+            raise AssertionError("font was parsed again")
+        monkeypatch.setattr(pdf_fonts, "read_font_metrics", fail)
+        second, second_digest = load_font_metrics(font_path, metrics_cache)
+        assert second == first
+        assert second_digest == digest
+        assert metrics_cache.hits == 1
+
+
+class TestSubset:
+    """Test suite for subset_truetype."""
+
+    def _outline_lengths(self, font: bytes):
+        tables = pdf_fonts._table_directory(font, pdf_fonts._OUTLINE_TABLES)
+        offsets = pdf_fonts._glyph_offsets(font, tables, 5)
+        return [end - start for start, end in zip(offsets, offsets[1:])]
+
+    def test_keeps_used_glyphs_and_components(self):
+        """Unused outlines are emptied; composite components are kept."""
+        subset = subset_truetype(_build_font(), {4})
+        lengths = self._outline_lengths(subset)
+        assert lengths[0] > 0    # .notdef
+        assert lengths[2] > 0    # 'A', a component of 'C'
+        assert lengths[3] == 0   # 'B' was not used
+        assert lengths[4] > 0
+
+    def test_checksum_adjustment(self):
+        """The whole-font checksum matches the TrueType magic number."""
+        subset = subset_truetype(_build_font(), {2, 3})
+        assert pdf_fonts._checksum(subset) == 0xB1B0AFBA
+
+    def test_drops_tables_pdf_does_not_need(self):
+        """Only the tables a PDF viewer reads are copied."""
+        subset = subset_truetype(_build_font(), {2})
+        tags = set(struct.unpack_from(">4s", subset, 12 + 16 * index)[0]
+                   for index in range(struct.unpack_from(">H", subset, 4)[0]))
+        assert tags == {b"glyf", b"head", b"hhea", b"hmtx", b"loca", b"maxp"}
+
+
+class TestEmbeddedFont:
+    """Test suite for EmbeddedFont."""
+
+    def test_encode_records_used_glyphs(self, font_path):
+        """Text is encoded as glyph IDs and the glyphs are remembered."""
+        font = EmbeddedFont("Body", font_path)
+        assert font.encode("AB ?") == b"<0002000300010000>"
+        assert font.used == {2: "A", 3: "B", 1: " "}
+
+    def test_text_width(self, font_path):
+        """Widths come from the font's advances."""
+        font = EmbeddedFont("Body", font_path)
+        assert font.text_width("AB", 10) == pytest.approx(13.0)
+
+    def test_widths_grouped_into_runs(self, font_path):
+        """The /W array groups consecutive glyph IDs."""
+        font = EmbeddedFont("Body", font_path)
+        font.encode("ABC ")
+        assert font._widths() == "1 [250 600 700 700]"
+
+
+class TestRendererEmbedding:
+    """Test suite for fonts embedded by the PDF renderer."""
+
+    def test_replaces_standard_font(self, font_path, metrics_cache, monkeypatch):
+        """Configured fonts are embedded as subset Type 0 fonts."""
+        monkeypatch.setattr(pdf_renderer, "font_metrics_cache", metrics_cache)
+        doc = Document(blocks=[Paragraph(content=[Text(content="ABBA")])], frontmatter={})
+        renderer = ProfessionalPDFRenderer()
+        pdf = renderer.render(doc, {'pdf': {'compression_level': 0,
+                                            'fonts': {'Helvetica': font_path}}})
+        assert b"/Subtype /Type0" in pdf
+        assert b"/FontFile2" in pdf
+        assert b"+TestSans" in pdf
+        assert b"<0002000300030002> Tj" in pdf
+        assert renderer.get_text_width("AB", "Helvetica", 10) == pytest.approx(13.0)
+
+    def test_missing_glyphs_use_notdef_width(self, font_path, metrics_cache, monkeypatch):
+        """Characters drawn as .notdef get its advance, not the PDF default of 1000."""
+        monkeypatch.setattr(pdf_renderer, "font_metrics_cache", metrics_cache)
+        doc = Document(blocks=[Paragraph(content=[Text(content="A?B")])], frontmatter={})
+        pdf = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0,
+                                                             'fonts': {'Helvetica': font_path}}})
+        assert b"<000200000003> Tj" in pdf
+        assert b"/DW 500\n" in pdf
+
+    def test_missing_font_is_reported(self, tmp_path):
+        """A font that cannot be loaded is not registered."""
+        renderer = ProfessionalPDFRenderer()
+        assert not renderer.embed_font("Body", str(tmp_path / "missing.ttf"))
+        assert "Body" not in renderer.embedded_fonts
+
+    def test_empty_font_is_reported(self, tmp_path):
+        """An empty font file is refused like any other malformed font."""
+        empty = tmp_path / "empty.ttf"
+        empty.write_bytes(b"")
+        with pytest.raises(FontFormatError):
+            load_font_metrics(str(empty))
+        renderer = ProfessionalPDFRenderer()
+        assert not renderer.embed_font("Body", str(empty))
+        assert "Body" not in renderer.embedded_fonts
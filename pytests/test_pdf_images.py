@@ -0,0 +1,208 @@
+"""
+Tests for image XObjects.
+
+Tests header parsing for JPEG and PNG, splitting PNG alpha into a soft
+mask, content-hash deduplication and JPEG passthrough in the PDF
+renderer.
+"""
+
+import io
+import struct
+import zlib
+
+import pytest
+from compose.render.pdf_images import (
+    ImageStore, UnsupportedImageError, read_image_info, read_jpeg_info, read_png_info, split_png_alpha
+)
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.pdf_writer import PDFWriter
+from compose.model.ast import Document, Image, Paragraph, Text
+
+
+def _jpeg(width: int, height: int, components: int = 3, adobe: bool = False) -> bytes:
+    """Marker skeleton of a JPEG file: SOI, APP0, optional APP14, SOF0, EOI."""
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    app14 = b"\xff\xee" + struct.pack(">H", 14) + b"Adobe\x00\x64\x00\x00\x00\x00\x02" if adobe else b""
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 8 + 3 * components, 8, height, width, components)
+    sof += b"".join(bytes([i + 1, 0x11, 0]) for i in range(components))
+    return b"\xff\xd8" + app0 + app14 + sof + b"\xff\xd9"
+
+
+def _png(width: int, height: int, color_type: int = 2) -> bytes:
+    """A real, minimal PNG filled with zeros."""
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+    channels = {0: 1, 2: 3, 6: 4}[color_type]
+    raw = b"".join(b"\x00" + bytes(width * channels) for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+def _paeth(left: int, up: int, upper_left: int) -> int:
+    estimate = left + up - upper_left
+    distances = [abs(estimate - left), abs(estimate - up), abs(estimate - upper_left)]
+    return (left, up, upper_left)[distances.index(min(distances))]
+
+
+def _rgba_png(rows, pixel_bytes: int = 4, color_type: int = 6) -> bytes:
+    """A PNG of the given pixel rows, row i stored with filter type i % 5."""
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+    raw = b""
+    prior = bytes(len(rows[0]))
+    for index, row in enumerate(rows):
+        kind = index % 5
+        encoded = bytearray()
+        for i, value in enumerate(row):
+            left = row[i - pixel_bytes] if i >= pixel_bytes else 0
+            upper_left = prior[i - pixel_bytes] if i >= pixel_bytes else 0
+            predicted = [0, left, prior[i], (left + prior[i]) // 2, _paeth(left, prior[i], upper_left)][kind]
+            encoded.append((value - predicted) & 0xFF)
+        raw += bytes([kind]) + bytes(encoded)
+        prior = row
+    width = len(rows[0]) // pixel_bytes
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, len(rows), 8, color_type, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+class TestImageHeaders:
+    """Test header-only image parsing."""
+
+    def test_jpeg_dimensions(self):
+        """Width, height and colour space come from the SOF marker."""
+        info = read_jpeg_info(_jpeg(640, 480))
+        assert (info.width, info.height) == (640, 480)
+        assert info.color_space == "/DeviceRGB"
+        assert info.filter == "/DCTDecode"
+
+    def test_adobe_cmyk_jpeg_is_inverted(self):
+        """Adobe CMYK JPEGs get an inverting /Decode array."""
+        info = read_jpeg_info(_jpeg(10, 10, components=4, adobe=True))
+        assert info.color_space == "/DeviceCMYK"
+        assert info.decode == "[1 0 1 0 1 0 1 0]"
+
+    def test_png_passthrough(self):
+        """PNG image data is passed through with the PNG predictor."""
+        data = _png(7, 3)
+        info = read_png_info(data)
+        assert (info.width, info.height) == (7, 3)
+        assert "/Predictor 15" in info.decode_parms and "/Columns 7" in info.decode_parms
+        assert zlib.decompress(info.data) == b"".join(b"\x00" + bytes(21) for _ in range(3))
+
+    def test_alpha_png_split_into_smask(self):
+        """Colour and alpha of every row filter type are separated."""
+        rows = [bytes((row * 37 + i * 11) % 256 for i in range(12)) for row in range(6)]
+        info = read_png_info(_rgba_png(rows))
+        assert info.alpha and info.color_space == "/DeviceRGB"
+        color, alpha = split_png_alpha(info)
+        pixels = b"".join(rows)
+        assert zlib.decompress(alpha) == pixels[3::4]
+        assert zlib.decompress(color) == bytes(b for i, b in enumerate(pixels) if i % 4 != 3)
+
+    def test_gray_alpha_png(self):
+        """Grey PNGs with alpha split the same way."""
+        rows = [bytes([10, 200, 20, 100]), bytes([30, 0, 40, 255])]
+        info = read_png_info(_rgba_png(rows, pixel_bytes=2, color_type=4))
+        assert info.color_space == "/DeviceGray"
+        color, alpha = split_png_alpha(info)
+        assert zlib.decompress(color) == bytes([10, 20, 30, 40])
+        assert zlib.decompress(alpha) == bytes([200, 100, 0, 255])
+
+    def test_truncated_headers_rejected(self):
+        """A file cut off inside its IHDR or SOF is refused, not a crash."""
+        png, jpeg = _png(4, 4), _jpeg(4, 4)
+        for data in (png[:20], jpeg[:jpeg.index(b"\xff\xc0") + 6]):
+            with pytest.raises(UnsupportedImageError):
+                read_image_info(data)
+
+    def test_unknown_format_rejected(self):
+        """Only JPEG and PNG signatures are accepted."""
+        with pytest.raises(UnsupportedImageError):
+            read_image_info(b"GIF89a")
+
+
+class TestImageStore:
+    """Test content-addressed image storage."""
+
+    def test_identical_content_stored_once(self, tmp_path):
+        """Two paths with the same bytes share one XObject."""
+        for name in ("logo.jpg", "logo-copy.jpg"):
+            (tmp_path / name).write_bytes(_jpeg(50, 20))
+        store = ImageStore()
+        first = store.add_file(str(tmp_path / "logo.jpg"))
+        second = store.add_file(str(tmp_path / "logo-copy.jpg"))
+        third = store.add_file(str(tmp_path / "logo.jpg"))
+        assert first is second is third
+        assert len(store.images) == 1
+        assert store.hits == 2
+
+    def test_corrupt_alpha_png_refused_when_added(self):
+        """Alpha PNGs are decoded on the way in, so bad data fails early."""
+        data = _rgba_png([bytes(range(16)), bytes(range(16, 32))])
+        idat = data.index(b"IDAT") + 4
+        with pytest.raises(UnsupportedImageError):
+            ImageStore().add_bytes(data[:idat] + b"\x00" * 8 + data[idat + 8:])
+
+    def test_data_released_after_writing(self):
+        """Image bytes are written verbatim and then dropped."""
+        data = _jpeg(4, 4)
+        store = ImageStore()
+        info = store.add_bytes(data)
+        sink = io.BytesIO()
+        assert store.write_pending(PDFWriter(sink)) == 1
+        assert store.write_pending(PDFWriter(io.BytesIO())) == 0
+        assert info.data is None
+        assert data in sink.getvalue()
+        assert store.resource_entries() == [("Im1", info.object_number)]
+
+
+class TestRendererImages:
+    """Test image embedding in the PDF renderer."""
+
+    def test_repeated_image_embedded_once(self, tmp_path):
+        """An image used on many pages is one XObject placed many times."""
+        logo = tmp_path / "logo.jpg"
+        logo.write_bytes(_jpeg(300, 100))
+        blocks = []
+        for _ in range(5):
+            blocks.append(Paragraph(content=[Image(alt="logo", url=str(logo))]))
+            blocks.append(Paragraph(content=[Text(content="Report text. " * 30)]))
+        doc = Document(blocks=blocks, frontmatter={})
+
+        data = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0}})
+        assert data.count(b"/Subtype /Image") == 1
+        assert data.count(logo.read_bytes()) == 1
+        assert data.count(b"/Im1 Do") == 5
+        assert b"/Filter /DCTDecode" in data
+        assert b"/Width 300\n/Height 100" in data
+
+    def test_alpha_png_has_smask(self, tmp_path):
+        """An alpha PNG is embedded with its alpha as a soft mask."""
+        icon = tmp_path / "icon.png"
+        icon.write_bytes(_rgba_png([bytes(range(16)), bytes(range(16, 32))]))
+        doc = Document(blocks=[Paragraph(content=[Image(alt="icon", url=str(icon))])], frontmatter={})
+        data = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0}})
+        assert data.count(b"/Subtype /Image") == 2
+        assert b"/SMask " in data
+        assert b"[Image: icon]" not in data
+
+    def test_truncated_image_falls_back_to_alt_text(self, tmp_path):
+        """A truncated PNG is replaced by its alt text like a missing one."""
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(_png(4, 4)[:20])
+        doc = Document(blocks=[Paragraph(content=[Image(alt="plot", url=str(broken))])], frontmatter={})
+        data = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0}})
+        assert b"[Image: plot]" in data
+        assert b"/Subtype /Image" not in data
+
+    def test_missing_image_falls_back_to_alt_text(self):
+        """Unreadable images are replaced by their alt text."""
+        doc = Document(blocks=[Paragraph(content=[Image(alt="chart", url="does-not-exist.png")])],
+                       frontmatter={})
+        data = ProfessionalPDFRenderer().render(doc, {'pdf': {'compression_level': 0}})
+        assert b"[Image: chart]" in data
+        assert b"/Subtype /Image" not in data
@@ -0,0 +1,127 @@
+"""
+Tests for incremental PDF updates.
+
+Tests that unchanged rebuilds leave the file alone, that edits append
+only the changed objects behind a /Prev-chained xref section, and that
+the writer falls back to a full rewrite when it must.
+"""
+
+from compose.render.pdf_incremental import STATE_SUFFIX
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Heading, Paragraph, Text
+
+
+def _document(edited: str = "Stable") -> Document:
+    blocks = []
+    for i in range(6):
+        blocks.append(Heading(level=1, content=[Text(content=f"Section {i}")]))
+        for j in range(4):
+            word = edited if (i, j) == (3, 1) else "Stable"
+            blocks.append(Paragraph(content=[Text(content=f"{word} text keeps pages fixed. " * 12)]))
+    return Document(blocks=blocks, frontmatter={})
+
+
+def _render(path, doc: Document, **options) -> ProfessionalPDFRenderer:
+    renderer = ProfessionalPDFRenderer()
+    renderer.render(doc, {'pdf': {'incremental': True, **options}}, output=path)
+    return renderer
+
+
+class TestIncrementalRender:
+    """Test the renderer's incremental update mode."""
+
+    def test_first_build_is_complete(self, tmp_path):
+        """Without previous state the file is written in full."""
+        path = tmp_path / "out.pdf"
+        renderer = _render(path, _document())
+        data = path.read_bytes()
+        assert not renderer.writer.appended
+        assert data.count(b"%%EOF") == 1
+        assert (tmp_path / f"out.pdf{STATE_SUFFIX}").exists()
+
+    def test_edit_appends_changed_objects(self, tmp_path):
+        """A one-paragraph edit appends a small update chained with /Prev."""
+        path = tmp_path / "out.pdf"
+        _render(path, _document())
+        before = path.read_bytes()
+
+        renderer = _render(path, _document("Edited"))
+        after = path.read_bytes()
+        assert renderer.writer.appended
+        assert after.startswith(before)
+        assert after.count(b"%%EOF") == 2
+        assert 1 <= renderer.writer.objects_written <= 2
+
+        previous_xref = int(before.rsplit(b"startxref\n", 1)[1].split()[0])
+        assert f"/Prev {previous_xref}".encode() in after[len(before):]
+
+    def test_update_offsets(self, tmp_path):
+        """Every entry of the appended xref section points at its object."""
+        path = tmp_path / "out.pdf"
+        _render(path, _document())
+        _render(path, _document("Edited"))
+        data = path.read_bytes()
+
+        xref = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+        lines = data[xref:].split(b"trailer", 1)[0].split(b"\n")[1:]
+        number = None
+        for line in filter(None, lines):
+            fields = line.split()
+            if len(fields) == 2:
+                number = int(fields[0])
+                continue
+            assert data[int(fields[0]):].startswith(b"%d 0 obj" % number)
+            number += 1
+
+    def test_unchanged_rebuild_writes_nothing(self, tmp_path):
+        """Rebuilding identical content leaves the file untouched."""
+        path = tmp_path / "out.pdf"
+        fixed_dates = {'CreationDate': 'D:20240101000000', 'ModDate': 'D:20240101000000'}
+        config = {'pdf': {'incremental': True}, 'metadata': fixed_dates}
+        ProfessionalPDFRenderer().render(_document(), config, output=path)
+        before = path.read_bytes()
+
+        renderer = ProfessionalPDFRenderer()
+        renderer.render(_document(), config, output=path)
+        assert renderer.writer.objects_written == 0
+        assert path.read_bytes() == before
+
+    def test_external_change_forces_rewrite(self, tmp_path):
+        """A file replaced behind the writer's back is rewritten."""
+        path = tmp_path / "out.pdf"
+        _render(path, _document())
+        with open(path, 'ab') as f:
+            f.write(b"% touched\n")
+
+        renderer = _render(path, _document("Edited"))
+        assert not renderer.writer.appended
+        assert path.read_bytes().count(b"%%EOF") == 1
+
+    def test_rewrite_replaces_file(self, tmp_path):
+        """A full rewrite swaps in a new file, so readers of the old one see it whole."""
+        path = tmp_path / "out.pdf"
+        _render(path, _document())
+        with open(path, 'rb') as reader:
+            before = path.read_bytes()
+            path.write_bytes(before + b"% touched\n")  # Forces a rewrite
+            touched = before + b"% touched\n"
+
+            renderer = _render(path, _document("Edited"))
+            assert not renderer.writer.appended
+            assert reader.read() == touched
+        assert not (tmp_path / "out.pdf.tmp").exists()
+
+    def test_compaction(self, tmp_path):
+        """After ``compact_after`` updates the next build rewrites the file."""
+        path = tmp_path / "out.pdf"
+        _render(path, _document(), compact_after=1)
+        assert _render(path, _document("One"), compact_after=1).writer.appended
+        renderer = _render(path, _document("Two"), compact_after=1)
+        assert not renderer.writer.appended
+        assert path.read_bytes().count(b"%%EOF") == 1
+
+    def test_non_path_output_is_not_incremental(self):
+        """Incremental mode needs a file; other outputs are written normally."""
+        data = ProfessionalPDFRenderer().render(_document(), {'pdf': {'incremental': True}})
+        assert data.startswith(b"%PDF-")
+        assert data.count(b"%%EOF") == 1
@@ -0,0 +1,145 @@
+"""
+Tests for linearized PDF output.
+
+Tests that the linearization dictionary leads the file with correct
+parameters, that the first page is written before the other pages and
+that every cross-reference entry points at its object.
+"""
+
+import io
+import re
+
+import pytest
+from compose.render.pdf_linearizer import LinearizingWriter, _split_strings
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Heading, Paragraph, Text
+
+
+def _document(sections: int = 6) -> Document:
+    blocks = []
+    for i in range(sections):
+        blocks.append(Heading(level=1, content=[Text(content=f"Section {i}")]))
+        for _ in range(4):
+            blocks.append(Paragraph(content=[Text(content="Fast web view puts page one first. " * 12)]))
+    return Document(blocks=blocks, frontmatter={})
+
+
+def _linearization_dict(data: bytes) -> dict:
+    match = re.search(rb"/Linearized 1 (.*?)>>", data[:1024], re.S)
+    assert match, "linearization dictionary missing from the first 1024 bytes"
+    body = match.group(1)
+    values = {key.decode(): int(value) for key, value in re.findall(rb"/([LOENT]) (\d+)", body)}
+    values['H'] = [int(v) for v in re.search(rb"/H \[ *(\d+) +(\d+)", body).groups()]
+    return values
+
+
+def _object_offsets(data: bytes) -> dict:
+    """Parse both xref sections into {object number: offset}."""
+    offsets = {}
+    for section in re.finditer(rb"xref\n(\d+) (\d+)\n", data):
+        first, count = int(section.group(1)), int(section.group(2))
+        entries = data[section.end():section.end() + 20 * count]
+        for index in range(count):
+            offset, _, kind = entries[20 * index:20 * index + 18].split()
+            if kind == b"n":
+                offsets[first + index] = int(offset)
+    return offsets
+
+
+@pytest.fixture(scope="module")
+def pdf() -> bytes:
+    return ProfessionalPDFRenderer().render(_document(), {'pdf': {'linearize': True}})
+
+
+class TestLinearizedRender:
+    """Test the renderer's linearized output mode."""
+
+    def test_parameters_match_file(self, pdf):
+        """/L is the file length and /N the page count."""
+        params = _linearization_dict(pdf)
+        assert params['L'] == len(pdf)
+        assert params['N'] == pdf.count(b"/Type /Page\n")
+        assert params['N'] > 1
+
+    def test_first_page_section(self, pdf):
+        """The first page sits before /E and every other page after it."""
+        params = _linearization_dict(pdf)
+        offsets = _object_offsets(pdf)
+        page_offsets = {num: offset for num, offset in offsets.items()
+                        if b"/Type /Page\n" in pdf[offset:offset + 40]}
+        assert offsets[params['O']] < params['E']
+        assert all(offset >= params['E'] for num, offset in page_offsets.items()
+                   if num != params['O'])
+
+    def test_hint_stream_location(self, pdf):
+        """/H brackets exactly one stream object."""
+        offset, length = _linearization_dict(pdf)['H']
+        hint = pdf[offset:offset + length]
+        assert re.match(rb"\d+ 0 obj\n<< /Length \d+ /S \d+", hint)
+        assert hint.endswith(b"endobj\n")
+
+    def test_xref_entries_point_at_objects(self, pdf):
+        """Every in-use entry of both xref sections addresses its object."""
+        for num, offset in _object_offsets(pdf).items():
+            assert pdf[offset:].startswith(b"%d 0 obj" % num)
+
+    def test_main_xref_offset(self, pdf):
+        """/T points at the end of the main xref's subsection header."""
+        main_xref = pdf.rindex(b"xref\n0 ")
+        header = pdf[main_xref:].split(b"\n", 2)
+        assert _linearization_dict(pdf)['T'] == main_xref + len(header[0]) + 1 + len(header[1])
+
+    def test_streaming_is_ignored(self, pdf):
+        """Linearizing needs the whole document, so streaming is overridden."""
+        streamed = ProfessionalPDFRenderer().render(
+            _document(), {'pdf': {'linearize': True, 'streaming': True}})
+        strip = lambda data: re.sub(rb"D:\d{14}", b"", data)
+        assert strip(streamed) == strip(pdf)
+
+
+class TestLinearizingWriter:
+    """Test LinearizingWriter directly."""
+
+    def test_single_page(self):
+        """A one-page document is linearized with an empty main section."""
+        sink = io.BytesIO()
+        writer = LinearizingWriter(sink)
+        writer.write_header()
+        catalog = writer.reserve_object()
+        pages = writer.reserve_object()
+        page = writer.write_object(f"<< /Type /Page /Parent {pages} 0 R /MediaBox [0 0 612 792] >>")
+        writer.write_object(f"<< /Type /Pages /Kids [{page} 0 R] /Count 1 >>", pages)
+        writer.write_object(f"<< /Type /Catalog /Pages {pages} 0 R >>", catalog)
+        length = writer.finish(root=catalog)
+
+        data = sink.getvalue()
+        assert length == len(data)
+        assert _linearization_dict(data)['L'] == len(data)
+        assert data.index(b"/Type /Page ") < data.index(b"/Type /Pages")
+
+    def test_strings_not_renumbered(self):
+        """References are rewritten outside strings only."""
+        sink = io.BytesIO()
+        writer = LinearizingWriter(sink)
+        page = writer.write_object("<< /Type /Page /Parent 2 0 R >>", 3)
+        writer.write_object(f"<< /Type /Pages /Kids [{page} 0 R] /Count 1 >>", 2)
+        writer.write_object("<< /Type /Catalog /Pages 2 0 R >>", 1)
+        info = writer.write_object("<< /Title (Ref 3 0 R) /Subject <33> >>", 4)
+        writer.finish(root=1, info=info)
+
+        data = sink.getvalue()
+        assert b"/Pages 2 0 R" not in data
+        assert b"(Ref 3 0 R)" in data
+
+    def test_requires_pages(self):
+        """A catalog without pages cannot be linearized."""
+        writer = LinearizingWriter(io.BytesIO())
+        writer.write_object("<< /Type /Pages /Kids [] /Count 0 >>", 2)
+        writer.write_object("<< /Type /Catalog /Pages 2 0 R >>", 1)
+        with pytest.raises(ValueError):
+            writer.finish(root=1)
+
+    def test_split_strings(self):
+        """Literal and hex strings are separated, dictionaries are not."""
+        pieces = _split_strings(b"<< /T (a (b) 1 0 R) /H <4142> >>")
+        assert [piece for is_string, piece in pieces if is_string] == [b"(a (b) 1 0 R)", b"<4142>"]
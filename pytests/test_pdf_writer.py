@@ -0,0 +1,192 @@
+"""
+Tests for the streaming PDF writer.
+
+Tests that objects are written straight to the sink with correct
+byte offsets and that the renderer can target paths and streams.
+"""
+
+import io
+import re
+import zlib
+
+import pytest
+from compose.render.pdf_writer import PDFWriter, open_pdf_sink
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.model.ast import Document, Heading, Paragraph, Text
+
+
+def _xref_offsets(data: bytes) -> dict:
+    """Parse the classic xref table into {object number: offset}."""
+    startxref = int(data.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    table = data[startxref:].split(b"trailer", 1)[0].split(b"\n")
+    count = int(table[1].split()[1])
+    offsets = {}
+    for obj_num, line in enumerate(table[2:2 + count]):
+        offset, _, kind = line.split()
+        if kind == b"n":
+            offsets[obj_num] = int(offset)
+    return offsets
+
+
+def _sample_document() -> Document:
+    return Document(blocks=[
+        Heading(level=1, content=[Text(content="Streaming")]),
+        Paragraph(content=[Text(content="Objects go straight to the sink.")]),
+    ], frontmatter={})
+
+
+class TestPDFWriter:
+    """Test suite for PDFWriter."""
+
+    def test_offsets_point_at_objects(self):
+        """Each xref offset points at the matching 'N 0 obj' line."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        writer.write_object("<< /Type /Catalog /Pages 2 0 R >>")
+        writer.write_object("<< /Type /Pages /Kids [] /Count 0 >>")
+        writer.finish(root=1)
+
+        data = sink.getvalue()
+        offsets = _xref_offsets(data)
+        assert set(offsets) == {1, 2}
+        for obj_num, offset in offsets.items():
+            assert data[offset:].startswith(f"{obj_num} 0 obj\n".encode())
+
+    def test_running_offset_matches_bytes_written(self):
+        """The running offset equals the number of bytes in the sink."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        writer.write_stream(b"BT ET", filters=None)
+        total = writer.finish(root=1)
+        assert total == len(sink.getvalue()) == writer.offset
+
+    def test_reserved_objects_can_be_written_later(self):
+        """Reserved numbers may be filled in out of order."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        first = writer.reserve_object()
+        second = writer.write_object("<< /Ref 1 0 R >>")
+        writer.write_object("<< /Type /Catalog >>", first)
+        writer.finish(root=first)
+
+        offsets = _xref_offsets(sink.getvalue())
+        assert offsets[second] < offsets[first]
+
+    def test_unwritten_reservation_becomes_free_entry(self):
+        """A reserved but unused number is listed as a free xref entry."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        writer.write_object("<< >>")
+        writer.reserve_object()
+        writer.finish(root=1)
+
+        data = sink.getvalue()
+        assert b"/Size 3" in data
+        assert set(_xref_offsets(data)) == {1}
+
+    def test_xref_entries_are_twenty_bytes(self):
+        """Every xref entry is exactly 20 bytes long."""
+        sink = io.BytesIO()
+        writer = PDFWriter(sink)
+        writer.write_object("<< >>")
+        xref_offset = writer.write_xref()
+        entries = sink.getvalue()[xref_offset:].split(b"\n", 2)[2]
+        assert len(entries) == 40
+        assert entries[:20] == b"0000000000 65535 f \n"
+        assert entries[20:].endswith(b" 00000 n \n")
+
+    def test_duplicate_object_rejected(self):
+        """Writing the same object number twice is an error."""
+        writer = PDFWriter(io.BytesIO())
+        writer.write_object("<< >>", 1)
+        with pytest.raises(ValueError):
+            writer.write_object("<< >>", 1)
+
+    def test_open_pdf_sink_rejects_unknown_targets(self):
+        """Only paths, streams and None are valid render targets."""
+        with pytest.raises(TypeError):
+            open_pdf_sink(42)
+
+
+class TestObjectStreams:
+    """Test object stream and xref stream output."""
+
+    def _write_sample(self, **kwargs) -> bytes:
+        sink = io.BytesIO()
+        writer = PDFWriter(sink, object_streams=True, **kwargs)
+        catalog = writer.reserve_object()
+        pages = writer.write_object("<< /Type /Pages /Kids [] /Count 0 >>")
+        writer.write_stream(b"BT ET")
+        writer.write_object(f"<< /Type /Catalog /Pages {pages} 0 R >>", catalog)
+        writer.finish(root=catalog)
+        return sink.getvalue()
+
+    def test_dictionaries_packed_into_object_stream(self):
+        """Non-stream objects are not written as top-level objects."""
+        data = self._write_sample()
+        assert b"/Type /ObjStm" in data
+        assert b"/Type /XRef" in data
+        assert b"\nxref\n" not in data
+        assert b"trailer" not in data
+        assert not re.search(rb"\d+ 0 obj\n<< /Type /Catalog", data)
+
+    def test_xref_stream_entries(self):
+        """The xref stream locates direct objects and packed objects."""
+        data = self._write_sample(compression_level=0)
+        startxref = int(data.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+        xref_obj = data[startxref:]
+        assert xref_obj.startswith(b"5 0 obj\n")
+        assert b"/W [1 1 2]" in xref_obj
+
+        rows = xref_obj.split(b"stream\n", 1)[1][:6 * 4]
+        entries = [(rows[i], rows[i + 1], int.from_bytes(rows[i + 2:i + 4], 'big'))
+                   for i in range(0, len(rows), 4)]
+        # 1 catalog, 2 pages (both packed into stream 4), 3 content stream, 5 xref
+        assert entries[1] == (2, 4, 1)
+        assert entries[2] == (2, 4, 0)
+        assert entries[3][0] == 1 and data[entries[3][1]:].startswith(b"3 0 obj")
+        assert entries[4][0] == 1 and data[entries[4][1]:].startswith(b"4 0 obj")
+        assert entries[5] == (1, startxref, 0)
+
+    def test_object_stream_is_compressed(self):
+        """Object streams are Flate-compressed at the writer's level."""
+        data = self._write_sample(compression_level=9)
+        objstm = data.split(b"/Type /ObjStm", 1)[1]
+        body = objstm.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+        assert b"/Type /Catalog" in zlib.decompress(body)
+
+    def test_renderer_output_is_smaller(self):
+        """Object streams shrink rendered documents."""
+        classic = ProfessionalPDFRenderer().render(_sample_document(), {})
+        packed = ProfessionalPDFRenderer().render(_sample_document(), {'pdf': {'object_streams': True}})
+        assert packed.startswith(b"%PDF-1.7")
+        assert len(packed) < len(classic)
+
+
+class TestRenderOutputTargets:
+    """Test render() with different output targets."""
+
+    def test_render_returns_bytes_by_default(self):
+        """Without an output target the PDF comes back as bytes."""
+        data = ProfessionalPDFRenderer().render(_sample_document(), {})
+        assert data.startswith(b"%PDF-1.7\n")
+        assert data.rstrip().endswith(b"%%EOF")
+
+    def test_render_to_stream(self):
+        """A stream target receives the PDF and is returned."""
+        sink = io.BytesIO()
+        result = ProfessionalPDFRenderer().render(_sample_document(), {}, output=sink)
+        assert result is sink
+        assert sink.getvalue().startswith(b"%PDF-")
+        assert not sink.closed
+
+    def test_render_to_path(self, tmp_path):
+        """A path target is written and returned."""
+        path = tmp_path / "out.pdf"
+        result = ProfessionalPDFRenderer().render(_sample_document(), {}, output=str(path))
+        assert result == str(path)
+        data = path.read_bytes()
+        offsets = _xref_offsets(data)
+        assert offsets
+        for obj_num, offset in offsets.items():
+            assert re.match(rb"%d 0 obj\n" % obj_num, data[offset:])
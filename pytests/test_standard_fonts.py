@@ -0,0 +1,109 @@
+"""
+Tests for the standard-14 font metrics.
+
+Tests that widths and kerning match the Adobe AFM data, that fonts are
+only read on first use, and that the renderer, text layout engine and
+layout measurer all measure text the same way.
+"""
+
+import pytest
+
+from compose.layout.standard_fonts import (
+    STANDARD_FONT_NAMES, StandardFontMetrics, load_standard_font, metrics_text_width,
+)
+from compose.model.ast import Paragraph, Text
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.text_layout_engine import TextLayoutEngine
+
+
+class TestStandardFont:
+    """Test suite for StandardFont tables."""
+
+    def test_widths_match_afm(self):
+        """Widths come from the AFM file, including non-ASCII glyphs."""
+        helvetica = load_standard_font("Helvetica")
+        assert helvetica.char_width(ord("A")) == 667
+        assert helvetica.char_width(ord(" ")) == 278
+        assert helvetica.char_width(ord("é")) == 556
+        assert helvetica.char_width(0x20AC) == 556   # Euro, above the dense range
+        assert helvetica.char_width(0xFB01) == 500   # fi ligature
+
+    def test_vertical_metrics(self):
+        """Ascender and descender come from the AFM header."""
+        metrics = StandardFontMetrics()["Helvetica"]
+        assert (metrics["ascent"], metrics["descent"]) == (718, -207)
+        assert metrics["units_per_em"] == 1000
+
+    def test_missing_glyph_width(self):
+        """Characters the font lacks measure as an average letter."""
+        helvetica = load_standard_font("Helvetica")
+        assert helvetica.char_width(0x4E2D) == helvetica.missing_width > 0
+
+    def test_kerning(self):
+        """Kerning pairs narrow the text when requested."""
+        helvetica = load_standard_font("Helvetica")
+        assert helvetica.kern(ord("A"), ord("V")) == -70
+        assert helvetica.text_width("AV", 10) == pytest.approx(13.34)
+        assert helvetica.text_width("AV", 10, kerning=True) == pytest.approx(12.64)
+
+    def test_courier_is_monospaced(self):
+        """Every Courier glyph is 600 units wide."""
+        courier = load_standard_font("Courier")
+        assert courier.fixed_pitch
+        assert courier.text_units("Wil!") == 2400
+
+    def test_symbolic_fonts_use_builtin_codes(self):
+        """Symbol is indexed by its built-in encoding ('a' is alpha)."""
+        assert load_standard_font("Symbol").char_width(ord("a")) == 631
+
+    def test_unknown_font(self):
+        """Non-standard names have no metrics."""
+        assert load_standard_font("Lato") is None
+        assert "Lato" not in StandardFontMetrics()
+
+
+class TestLazyLoading:
+    """Test suite for loading fonts on first use."""
+
+    def test_fonts_load_on_first_lookup(self):
+        """Creating the mapping or testing membership reads nothing."""
+        load_standard_font.cache_clear()
+        metrics = StandardFontMetrics()
+        assert "Times-Roman" in metrics
+        assert len(metrics) == len(STANDARD_FONT_NAMES) == 14
+        assert load_standard_font.cache_info().currsize == 0
+
+        metrics["Times-Roman"]
+        metrics["Times-Roman"]
+        info = load_standard_font.cache_info()
+        assert (info.currsize, info.misses) == (1, 1)
+
+
+class TestSharedMeasurement:
+    """Test suite for the consumers of the standard font metrics."""
+
+    def test_renderer_width(self):
+        """The renderer measures with AFM widths."""
+        renderer = ProfessionalPDFRenderer()
+        expected = (722 + 556 + 222 + 222 + 556) * 12 / 1000
+        assert renderer.get_text_width("Hello", "Helvetica", 12) == pytest.approx(expected)
+
+    def test_layout_engine_agrees(self):
+        """TextLayoutEngine reads the same widths as the renderer."""
+        renderer = ProfessionalPDFRenderer()
+        engine = TextLayoutEngine(renderer.font_metrics)
+        for font in ("Helvetica", "Times-Bold", "Courier-Oblique"):
+            assert engine.measure_text_width("Typeset text", font, 11) == pytest.approx(
+                renderer.get_text_width("Typeset text", font, 11))
+
+    def test_custom_glyph_widths_still_supported(self):
+        """Metrics dictionaries with their own glyph widths still measure."""
+        metrics = {"glyph_widths": {"a": 500, "b": 600}, "units_per_em": 1000}
+        assert metrics_text_width(metrics, "ab", 10) == pytest.approx(11.0)
+
+    def test_measurer_matches_wrapping(self):
+        """The measurer predicts as many lines as the renderer wraps."""
+        renderer = ProfessionalPDFRenderer()
+        text = " ".join(["Widths decide where lines break, so both must agree."] * 12)
+        wrapped = renderer._wrap_text(text, renderer.measurer.content_width)
+        assert renderer.measurer._count_lines(text, "Helvetica", 12) == len(wrapped) > 1
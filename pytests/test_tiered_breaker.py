@@ -0,0 +1,121 @@
+"""
+Tests for tiered line breaking.
+
+Tests that well-set paragraphs keep their first-fit breaks, that badly
+set ones fall back to Knuth-Plass, that the fast path is counted, and
+that the typography engines and renderers break lines with it.
+"""
+
+import random
+
+import pytest
+
+from compose.layout.knuth_plass import KnuthPlassBreaker, create_breakpoints
+from compose.layout.tiered_breaker import LineBreakingStats, TieredLineBreaker
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.typography_engine import TypographyEngine
+from compose.tex_compatibility import TexCompatibilityEngine
+
+
+def _first_fit(words, widths, space, line_width):
+    """Plain first-fit wrapping, as the renderers used to do it."""
+    lines, line, current = [], [], 0.0
+    for word, width in zip(words, widths):
+        if line and current + space + width > line_width:
+            lines.append(' '.join(line))
+            line, current = [word], width
+        else:
+            current += (space if line else 0.0) + width
+            line.append(word)
+    return lines + [' '.join(line)]
+
+
+@pytest.fixture
+def stats():
+    return LineBreakingStats()
+
+
+class TestTieredLineBreaker:
+    """Test suite for TieredLineBreaker."""
+
+    def test_fast_path_matches_first_fit(self, stats):
+        """Evenly set paragraphs keep exactly the first-fit lines."""
+        words = ("aa bbb cc dddd " * 12).split()
+        widths = [len(word) for word in words]
+        breaker = TieredLineBreaker(badness_threshold=1000, stats=stats)
+        assert breaker.wrap_words(words, widths, 1, 20) == _first_fit(words, widths, 1, 20)
+        assert (stats.fast_path, stats.knuth_plass) == (1, 0)
+
+    def test_falls_back_to_knuth_plass(self, stats):
+        """A badly spaced greedy line sends the paragraph to Knuth-Plass."""
+        words = "aaaa bb cccccccc dd eeee ff gggggggg hh".split()
+        breakpoints = create_breakpoints(words, [len(word) for word in words], 1)
+        breaker = TieredLineBreaker(badness_threshold=10, stats=stats)
+        breaks = breaker.find_breaks(breakpoints, 12)
+        assert stats.knuth_plass == 1
+        optimal = KnuthPlassBreaker(12).find_optimal_breaks(breakpoints)
+        assert [line.end_position for line in breaks] == [line.end_position for line in optimal]
+
+    def test_overfull_word_falls_back(self, stats):
+        """A word wider than the line is never accepted by the fast path."""
+        breaker = TieredLineBreaker(stats=stats)
+        assert breaker.wrap_words(["a", "enormous", "b"], [1, 30, 1], 1, 10)[-1].endswith("b")
+        assert stats.knuth_plass == 1
+
+    def test_statistics(self, stats):
+        """The fast path rate is reported and can be reset."""
+        breaker = TieredLineBreaker(badness_threshold=1000, stats=stats)
+        breaker.wrap_words(["one", "two"], [3, 3], 1, 40)
+        breaker.wrap_words(["wide"], [50], 1, 10)
+        assert stats.to_dict() == {'paragraphs': 2, 'fast_path': 1,
+                                   'knuth_plass': 1, 'fast_path_rate': 0.5}
+        stats.reset()
+        assert stats.paragraphs == 0 and stats.fast_path_rate == 0.0
+
+
+class TestBreakerIntegration:
+    """Test suite for the engines and renderers that use the breaker."""
+
+    def test_renderer_wraps_with_breaker(self, stats):
+        """The PDF renderer wraps paragraphs through its tiered breaker."""
+        renderer = ProfessionalPDFRenderer()
+        renderer.line_breaker.stats = stats
+        lines = renderer._wrap_text("Words that need wrapping " * 20, 200)
+        assert stats.paragraphs == 1
+        assert all(renderer.get_text_width(line) <= 200 for line in lines)
+
+    def test_ragged_lines_fit_measure(self):
+        """Lines drawn at natural spacing are never wider than the measure."""
+        rng = random.Random(7)
+        vocabulary = ("a an the of typesetting paragraph measure line breaking optimal "
+                      "spacing justification hyphenation ragged right margin words").split()
+        renderer = ProfessionalPDFRenderer()
+        max_width = renderer.page_width - renderer.margin_left - renderer.margin_right
+        for _ in range(100):
+            text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(20, 120)))
+            for line in renderer._wrap_text(text, max_width):
+                assert renderer.get_text_width(line) <= max_width + 1e-6
+
+    def test_ragged_right_never_shrinks(self, stats):
+        """Ragged-right breaking gives spaces no shrink, so lines only stretch."""
+        words = "aaaa bb cccccccc dd eeee ff gggggggg hh".split()
+        breaker = TieredLineBreaker(badness_threshold=10, stats=stats, ragged_right=True)
+        breaks = breaker.find_breaks(breaker.measured_breakpoints(words, [True] * len(words),
+                                     lambda texts: [len(text) for text in texts]), 12)
+        assert all(line.adjustment_ratio >= 0 for line in breaks)
+        assert breaker.settings_key != TieredLineBreaker(badness_threshold=10).settings_key
+
+    def test_badness_threshold_config(self):
+        """The fast path threshold is read from the pdf options."""
+        renderer = ProfessionalPDFRenderer()
+        renderer._apply_config({'pdf': {'badness_threshold': 500}})
+        assert renderer.line_breaker.badness_threshold == 500
+
+    def test_typography_engines(self):
+        """Paragraph shaping and TeX-style typesetting keep every word in order."""
+        text = "This is a sample paragraph for testing TeX-style line breaking algorithms."
+        lines = TexCompatibilityEngine().typeset_paragraph_tex_style(text, 150.0)
+        assert len(lines) > 1 and ' '.join(lines) == text
+
+        shaped = TypographyEngine()._apply_paragraph_shaping((text + " ").split() * 3)
+        assert all(len(line) <= 60 for line in shaped.split('\n'))
@@ -0,0 +1,118 @@
+"""
+Tests for the shared word width cache.
+
+Tests that text is measured word by word, that the cache is bounded with
+least-recently-used eviction, that it reports its hit rate, and that
+every renderer and layout engine in the process shares it.
+"""
+
+import threading
+
+import pytest
+
+from compose.cache_system import WordWidthCache, get_cache_stats, word_width_cache
+from compose.layout.standard_fonts import load_standard_font
+from compose.render.pdf_renderer import ProfessionalPDFRenderer
+from compose.render.text_layout_engine import TextLayoutEngine
+
+
+class CountingMeasure:
+    """Measures every character as one point and counts the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, word):
+        self.calls.append(word)
+        return float(len(word))
+
+
+class TestWordWidthCache:
+    """Test suite for WordWidthCache."""
+
+    def test_measures_each_word_once(self):
+        """Repeated words and spaces are measured a single time."""
+        cache = WordWidthCache()
+        measure = CountingMeasure()
+        assert cache.text_width("F", "to be or not to be", 10, measure) == 18.0
+        assert sorted(measure.calls) == [" ", "be", "not", "or", "to"]
+        assert cache.text_width("F", "not to be", 10, measure) == 9.0
+        assert len(measure.calls) == 5
+
+    def test_keys_include_font_and_size(self):
+        """The same word in another font or size is measured again."""
+        cache = WordWidthCache()
+        measure = CountingMeasure()
+        cache.word_width("F", "word", 10, measure)
+        cache.word_width("G", "word", 10, measure)
+        cache.word_width("F", "word", 12, measure)
+        assert cache.misses == 3 and cache.hits == 0
+
+    def test_lru_eviction(self):
+        """The least recently used word is evicted when the cache is full."""
+        cache = WordWidthCache(max_entries=2)
+        measure = CountingMeasure()
+        cache.word_width("F", "a", 10, measure)
+        cache.word_width("F", "b", 10, measure)
+        cache.word_width("F", "a", 10, measure)   # 'a' is now most recent
+        cache.word_width("F", "c", 10, measure)
+        assert list(key[2] for key in cache.widths) == ["a", "c"]
+        assert cache.evictions == 1
+
+    def test_hit_rate_and_clear(self):
+        """Statistics report the hit rate and reset with the cache."""
+        cache = WordWidthCache()
+        measure = CountingMeasure()
+        assert cache.hit_rate == 0.0
+        for _ in range(4):
+            cache.word_width("F", "word", 10, measure)
+        assert cache.stats()["hit_rate"] == pytest.approx(0.75)
+        cache.clear()
+        assert cache.stats()["entries"] == cache.hits == cache.misses == 0
+
+    def test_thread_safe(self):
+        """Concurrent lookups stay consistent and within the bound."""
+        cache = WordWidthCache(max_entries=50)
+
+        def work(offset):
+            for index in range(500):
+                word = f"w{(index + offset) % 80}"
+                assert cache.word_width("F", word, 10, len) == len(word)
+
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(cache.widths) <= 50
+        assert cache.hits + cache.misses == 2000
+
+
+class TestSharedService:
+    """Test suite for the process-wide cache used by the renderers."""
+
+    def test_matches_direct_measurement(self):
+        """Cached widths equal measuring the whole text at once."""
+        text = "Widths  are summed word by word"
+        expected = load_standard_font("Times-Roman").text_width(text, 11)
+        assert ProfessionalPDFRenderer().get_text_width(text, "Times-Roman", 11) == pytest.approx(expected)
+
+    def test_shared_across_renderers_and_engines(self):
+        """Words measured by one renderer are hits for every other consumer."""
+        word_width_cache.clear()
+        ProfessionalPDFRenderer().get_text_width("shared measurement", "Helvetica", 12)
+        misses = word_width_cache.misses
+
+        second = ProfessionalPDFRenderer()
+        second.get_text_width("measurement shared", "Helvetica", 12)
+        TextLayoutEngine(second.font_metrics).measure_text_width("shared", "Helvetica", 12)
+        assert word_width_cache.misses == misses
+        assert get_cache_stats()["word_width_cache"]["hits"] == 4
+
+    def test_engine_leaves_shared_cache_alone(self):
+        """Clearing one engine's cache keeps every other consumer's widths."""
+        engine = TextLayoutEngine(ProfessionalPDFRenderer().font_metrics)
+        engine.measure_text_width("kept", "Helvetica", 12)
+        entries = word_width_cache.stats()["entries"]
+        engine.clear_cache()
+        assert word_width_cache.stats()["entries"] == entries > 0